@@ -20,6 +20,88 @@ class Settings(BaseSettings):
     EMAILS_FROM_EMAIL: str
     EMAILS_FROM_NAME: str = "Sistema de Salud CESFAM"
 
+    # Reportes: artefactos generados en segundo plano
+    REPORTES_DIR: str = "storage/reportes"
+    REPORTES_WORKERS: int = 2              # 0 = no levantar el runner en este proceso
+    REPORTES_POLL_SEGUNDOS: float = 5.0
+    REPORTES_CACHE_SEGUNDOS: int = 900     # reutilizar un reporte idéntico generado hace menos de esto
+    DESCARGAS_LOTE: int = 100              # registros de descarga por INSERT
+    DESCARGAS_FLUSH_SEGUNDOS: float = 5.0
+
+    # Catálogos cacheados en memoria (segundos que el navegador puede reusar sin revalidar)
+    CATALOGOS_MAX_AGE: int = 0
+
+    # Caché corta (single-flight) de GET por RUT: paciente, cuidador, gamificación
+    HOT_CACHE_TTL_SEGUNDOS: float = 3.0
+    HOT_CACHE_MAX: int = 2048
+
+    # Máximo de claves por request en los endpoints batch-get
+    BATCH_MAX_CLAVES: int = 200
+
+    # Idempotency-Key en los POST: cuánto se guarda la respuesta y cuánto puede
+    # pasar una clave "en proceso" sin latido (el request la renueva cada un tercio
+    # de esto mientras corre) antes de considerar que su request murió
+    IDEMPOTENCIA_TTL_SEGUNDOS: int = 86400
+    IDEMPOTENCIA_PROCESO_SEGUNDOS: int = 60
+    IDEMPOTENCIA_LIMPIEZA_SEGUNDOS: int = 600
+
+    # GET /sync: cada cuánto un proceso guarda una marca de visibilidad (sync_marca)
+    SYNC_MARCA_SEGUNDOS: float = 1.0
+
+    # Recordatorios de cita: se envían por lotes desde `python -m app.jobs recordatorios`
+    # (o desde la API si RECORDATORIOS_EN_API=True), nunca dentro de un request
+    RECORDATORIOS_EN_API: bool = False
+    RECORDATORIOS_LOTE: int = 200              # recordatorios reclamados por vuelta
+    RECORDATORIOS_CONEXIONES: int = 2          # sesiones SMTP abiertas en paralelo
+    RECORDATORIOS_POR_CONEXION: int = 100      # mensajes por sesión antes de reabrirla
+    RECORDATORIOS_POR_SEGUNDO: float = 5.0     # tope de envíos por segundo (0 = sin tope)
+    RECORDATORIOS_MAX_INTENTOS: int = 3
+    RECORDATORIOS_POLL_SEGUNDOS: float = 30.0
+    RECORDATORIOS_ANTICIPACION_HORAS: int = 24
+    RECORDATORIOS_ZONA_HORARIA: str = "America/Santiago"
+
+    # Alertas de mediciones a cuidadores (app/services/notificaciones.py): las más graves
+    # salen al tiro; el resto se junta en un resumen por (cuidador, paciente)
+    ALERTAS_VENTANA_SEGUNDOS: int = 900
+    ALERTAS_MAX_POR_HORA: int = 6                        # correos de alerta por destinatario
+    ALERTAS_SEVERIDADES_INMEDIATAS: str = "critical,critica"
+
+    # Particiones mensuales de medicion / medicion_detalle (app/jobs/particiones.py)
+    PARTICIONES_MESES_ADELANTE: int = 3      # meses futuros que deben existir siempre
+    PARTICIONES_REVISION_HORAS: float = 12   # cada cuánto las revisa la API (0 = no revisar desde la API)
+
+    # Retención: python -m app.jobs retencion (app/jobs/retencion.py), p. ej. una vez al día por cron
+    RETENCION_DESTINO: str = "tabla"          # tabla (esquema archivo) | parquet
+    RETENCION_DIR: str = "storage/archivo"    # archivos Parquet (zstd) si RETENCION_DESTINO=parquet
+    RETENCION_LOTE: int = 5000                # filas por DELETE
+    RETENCION_PAUSA_MS: float = 200           # espera entre lotes
+    RETENCION_LOCK_TIMEOUT_MS: int = 2000     # si no obtiene los locks en esto, cede y reintenta
+    RETENCION_EVENTOS_DIAS: int = 365         # evento_gamificacion (0 = no archivar)
+    RETENCION_DESCARGAS_DIAS: int = 180       # descarga_reporte
+    RETENCION_HISTORIAL_DIAS: int = 730       # paciente/cuidador/medico_historial
+    RETENCION_MEDICION_MESES: int = 0         # meses de medicion que se conservan; 0 = no archivar
+
+    # Importación masiva por CSV (POST /paciente/import, python -m app.tools.importar)
+    IMPORTACION_LOTE: int = 1000       # filas por validación + INSERT + commit
+    IMPORTACION_PROCESOS: int = 0      # procesos para bcrypt (0 = núcleos del equipo, 1 = sin pool)
+
+    # Registro de consultas lentas (GET /admin/sql-lentas)
+    SQL_LENTA_MS: float = 200.0
+    SQL_LENTA_BUFFER: int = 200                # últimas N consultas lentas en memoria
+    SQL_LENTA_EXPLAIN_MUESTREO: float = 0.0    # fracción de SELECT lentos a los que se les corre EXPLAIN ANALYZE
+
+    # Perfilado por request (X-Perfilar: 1 + X-Admin-Token, o muestreo); GET /admin/perfiles
+    PERFIL_MUESTREO: float = 0.0      # fracción de requests perfilados sin pedirlo
+    PERFIL_INTERVALO_MS: float = 5.0
+    PERFIL_BUFFER: int = 50           # perfiles guardados en memoria
+
+    # Detector de N+1 por request (solo desarrollo): "" | "log" | "raise"
+    N_MAS_UNO: str = ""
+    N_MAS_UNO_UMBRAL: int = 5         # repeticiones de la misma sentencia que cuentan como N+1
+
+    # Endpoints /admin/*: header X-Admin-Token; vacío = deshabilitados
+    ADMIN_TOKEN: str = ""
+
     @property
     def database_url(self) -> str:
         return (
@@ -0,0 +1,37 @@
+# app/core/batch.py
+"""
+Lectura de muchas entidades por clave en una sola consulta (endpoints batch-get).
+
+Se envía un único parámetro array (WHERE pk = ANY(:claves)), así el SQL es el
+mismo sin importar cuántas claves lleguen y Postgres reutiliza el plan.
+"""
+from __future__ import annotations
+
+from typing import Any, Sequence
+
+from sqlalchemy import any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session, lazyload
+
+
+def igual_a_alguna(columna, claves: Sequence[Any]):
+    """columna = ANY(:claves) con las claves como un solo parámetro array"""
+    return columna == any_(bindparam(None, list(claves), type_=ARRAY(columna.type)))
+
+
+def buscar_por_claves(db: Session, modelo, columna, claves: Sequence[Any]) -> list[Any | None]:
+    """
+    Devuelve los objetos en el mismo orden que 'claves', con None donde no hay
+    fila. Las claves repetidas se consultan una vez y se repiten en la salida.
+    """
+    unicas = list(dict.fromkeys(claves))
+    if not unicas:
+        return []
+    objs = (
+        db.query(modelo)
+        .options(lazyload("*"))  # los *Out no usan relaciones: sin los joins automáticos
+        .filter(igual_a_alguna(columna, unicas))
+        .all()
+    )
+    por_clave = {getattr(o, columna.key): o for o in objs}
+    return [por_clave.get(c) for c in claves]
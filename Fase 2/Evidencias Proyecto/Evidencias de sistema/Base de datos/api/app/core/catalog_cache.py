@@ -0,0 +1,194 @@
+# app/core/catalog_cache.py
+"""
+Caché en proceso de los catálogos (region, comuna, cesfam, unidad_medida,
+parametro_clinico, insignia, medicina).
+
+Se precarga al iniciar y se llena bajo demanda (read-through). Cada catálogo se
+guarda ya serializado con su schema *Out, junto con una versión (hash del
+contenido) que se usa para armar ETags fuertes.
+
+Los services invalidan el catálogo al crear/editar/borrar; la invalidación se
+propaga al resto de los workers con NOTIFY y cada proceso la recibe con un hilo
+que hace LISTEN sobre el mismo canal.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import hashlib
+import json
+import logging
+import select
+import threading
+import time
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import text
+
+from app.config import settings
+from app.core.http_cache import etag_coincide
+from app.db import SessionLocal, engine
+from app.models.region import Region
+from app.models.comuna import Comuna
+from app.models.cesfam import Cesfam
+from app.models.unidad_medida import UnidadMedida
+from app.models.parametro_clinico import ParametroClinico
+from app.models.insignia import Insignia
+from app.models.medicina import Medicina
+from app.schemas.region import RegionOut
+from app.schemas.comuna import ComunaOut
+from app.schemas.cesfam import CesfamOut
+from app.schemas.unidad_medida import UnidadMedidaOut
+from app.schemas.parametro_clinico import ParametroClinicoOut
+from app.schemas.insignia import InsigniaOut
+from app.schemas.medicina import MedicinaOut
+
+logger = logging.getLogger(__name__)
+
+CANAL = "catalogos"
+
+# nombre -> (modelo, schema de salida, columna PK)
+CATALOGOS = {
+    "region": (Region, RegionOut, "id_region"),
+    "comuna": (Comuna, ComunaOut, "id_comuna"),
+    "cesfam": (Cesfam, CesfamOut, "id_cesfam"),
+    "unidad_medida": (UnidadMedida, UnidadMedidaOut, "id_unidad"),
+    "parametro_clinico": (ParametroClinico, ParametroClinicoOut, "id_parametro"),
+    "insignia": (Insignia, InsigniaOut, "id_insignia"),
+    "medicina": (Medicina, MedicinaOut, "id_medicina"),
+}
+
+
+@dataclass(frozen=True)
+class _Entrada:
+    filas: list[dict]          # ordenadas por PK, como las listaba el service
+    por_id: dict[int, dict]
+    version: str               # hash del contenido
+
+
+class CatalogCache:
+    def __init__(self):
+        self._entradas: dict[str, _Entrada] = {}
+        self._locks = {nombre: threading.Lock() for nombre in CATALOGOS}
+        self._generacion = dict.fromkeys(CATALOGOS, 0)
+        self._detener = threading.Event()
+        self._hilo: threading.Thread | None = None
+
+    # --------- lectura ---------
+
+    def filas(self, nombre: str) -> list[dict]:
+        return self._entrada(nombre).filas
+
+    def obtener(self, nombre: str, pk: int) -> dict | None:
+        return self._entrada(nombre).por_id.get(pk)
+
+    def etag(self, nombre: str, representacion: str) -> str:
+        """ETag fuerte: versión del catálogo + la URL pedida (path y filtros)"""
+        sufijo = hashlib.sha1(representacion.encode()).hexdigest()[:12]
+        return f'"{self._entrada(nombre).version[:20]}-{sufijo}"'
+
+    def _entrada(self, nombre: str) -> _Entrada:
+        entrada = self._entradas.get(nombre)
+        if entrada is not None:
+            return entrada
+        with self._locks[nombre]:  # una sola carga aunque lleguen varios requests juntos
+            entrada = self._entradas.get(nombre)
+            if entrada is None:
+                generacion = self._generacion[nombre]
+                entrada = self._cargar(nombre)
+                if self._generacion[nombre] == generacion:  # no guardar si se invalidó mientras cargaba
+                    self._entradas[nombre] = entrada
+        return entrada
+
+    def _cargar(self, nombre: str) -> _Entrada:
+        modelo, schema, pk = CATALOGOS[nombre]
+        with SessionLocal() as db:
+            objs = db.query(modelo).order_by(getattr(modelo, pk)).all()
+            filas = [schema.model_validate(o).model_dump(mode="json") for o in objs]
+        version = hashlib.sha256(json.dumps(filas, sort_keys=True).encode()).hexdigest()
+        return _Entrada(filas=filas, por_id={f[pk]: f for f in filas}, version=version)
+
+    # --------- invalidación ---------
+
+    def invalidar(self, nombre: str, notificar: bool = True) -> None:
+        self._generacion[nombre] += 1
+        self._entradas.pop(nombre, None)
+        if notificar:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text("SELECT pg_notify(:canal, :nombre)"), {"canal": CANAL, "nombre": nombre})
+            except Exception:
+                logger.exception(f"No se pudo notificar la invalidación del catálogo {nombre}")
+
+    def invalidar_todo(self) -> None:
+        for nombre in CATALOGOS:
+            self.invalidar(nombre, notificar=False)
+
+    # --------- ciclo de vida ---------
+
+    def start(self) -> None:
+        """Precarga los catálogos y levanta el hilo LISTEN"""
+        for nombre in CATALOGOS:
+            try:
+                self._entrada(nombre)
+            except Exception:
+                logger.exception(f"No se pudo precargar el catálogo {nombre}")
+        if self._hilo is None:
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._escuchar, name="catalogos-listen", daemon=True)
+            self._hilo.start()
+
+    def stop(self) -> None:
+        if self._hilo:
+            self._detener.set()
+            self._hilo.join(timeout=10)
+            self._hilo = None
+
+    def _escuchar(self) -> None:
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        reconexion = False
+        while not self._detener.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(dsn)
+                conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                conn.cursor().execute(f"LISTEN {CANAL}")
+                if reconexion:  # pudimos perder avisos mientras no escuchábamos
+                    self.invalidar_todo()
+                reconexion = True
+                while not self._detener.is_set():
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        aviso = conn.notifies.pop(0)
+                        if aviso.payload in CATALOGOS:
+                            self.invalidar(aviso.payload, notificar=False)
+            except Exception:
+                logger.exception("Se perdió la conexión LISTEN de catálogos; reintentando")
+                time.sleep(5)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+catalog_cache = CatalogCache()
+
+
+def cache_http(nombre: str):
+    """
+    Dependencia para las rutas GET de un catálogo: agrega ETag y Cache-Control,
+    y responde 304 si el cliente ya tiene esa versión.
+    """
+    cache_control = f"public, max-age={settings.CATALOGOS_MAX_AGE}, must-revalidate"
+
+    def _dep(request: Request, response: Response):
+        etag = catalog_cache.etag(nombre, str(request.url.path) + "?" + str(request.url.query))
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+        if etag_coincide(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return _dep
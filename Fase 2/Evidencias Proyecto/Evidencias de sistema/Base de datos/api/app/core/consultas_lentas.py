@@ -0,0 +1,146 @@
+# app/core/consultas_lentas.py
+"""
+Registro de consultas lentas.
+
+En vez de echo=True (que loguea todo), un par de eventos de cursor miden cada
+sentencia y guardan solo las que pasan SQL_LENTA_MS en un buffer circular de
+SQL_LENTA_BUFFER entradas: SQL, forma de los parámetros (tipos, nunca valores:
+son datos clínicos), duración y ruta que la originó.
+
+A una fracción SQL_LENTA_EXPLAIN_MUESTREO de los SELECT lentos se les corre
+EXPLAIN (ANALYZE, BUFFERS) en la misma conexión, dentro de un SAVEPOINT para no
+arruinar la transacción del request si falla. ANALYZE vuelve a ejecutar la
+consulta, por eso se muestrea y solo a lecturas: un SELECT ... FOR UPDATE / SHARE
+(las tomas con SKIP LOCKED de reportes, recordatorios y retención) se salta,
+porque sus locks seguirían tomados hasta el fin de la transacción.
+"""
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, timezone
+import logging
+import random
+import re
+import threading
+import time
+
+from sqlalchemy import event
+
+from app.config import settings
+from app.core.metrics import ruta_actual
+
+logger = logging.getLogger(__name__)
+
+_MAX_SQL = 4000
+_BLOQUEA = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b", re.IGNORECASE)
+
+
+def _forma(parametros, executemany: bool):
+    """Tipos de los parámetros sin sus valores"""
+    if executemany:
+        filas = list(parametros or [])
+        return {"executemany": len(filas), "fila": _forma(filas[0], False) if filas else None}
+    if isinstance(parametros, dict):
+        return {k: _tipo(v) for k, v in parametros.items()}
+    if isinstance(parametros, (list, tuple)):
+        return [_tipo(v) for v in parametros]
+    return None
+
+
+def _tipo(v) -> str:
+    if isinstance(v, (list, tuple, set)):
+        return f"{type(v).__name__}[{len(v)}]"
+    return type(v).__name__
+
+
+class RegistroLentas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entradas: deque = deque(maxlen=settings.SQL_LENTA_BUFFER)
+        self.total = 0   # lentas vistas desde el arranque (el buffer guarda solo las últimas)
+
+    def agregar(self, entrada: dict) -> None:
+        with self._lock:
+            self._entradas.append(entrada)
+            self.total += 1
+
+    def entradas(self, limite: int | None = None) -> list[dict]:
+        with self._lock:
+            lista = list(self._entradas)
+        lista.reverse()  # la más reciente primero
+        return lista[:limite] if limite else lista
+
+    def resumen(self) -> list[dict]:
+        """Agrupadas por (ruta, SQL): qué combinación de filtros es la que duele"""
+        grupos: dict[tuple, dict] = {}
+        for e in self.entradas():
+            g = grupos.setdefault((e["ruta"], e["sql"]), {
+                "ruta": e["ruta"], "sql": e["sql"], "veces": 0, "total_ms": 0.0, "max_ms": 0.0,
+            })
+            g["veces"] += 1
+            g["total_ms"] = round(g["total_ms"] + e["duracion_ms"], 2)
+            g["max_ms"] = max(g["max_ms"], e["duracion_ms"])
+        return sorted(grupos.values(), key=lambda g: g["total_ms"], reverse=True)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+
+registro_lentas = RegistroLentas()
+
+
+def _explain(conn, cursor, statement: str, parameters) -> str | None:
+    if conn.dialect.name != "postgresql" or not statement.lstrip()[:6].upper() == "SELECT":
+        return None
+    if _BLOQUEA.search(statement):
+        return None  # volver a ejecutarla tomaría más locks de fila
+    cur = cursor.connection.cursor()
+    try:
+        cur.execute("SAVEPOINT explain_lenta")
+        try:
+            cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters)
+            plan = "\n".join(fila[0] for fila in cur.fetchall())
+            cur.execute("RELEASE SAVEPOINT explain_lenta")
+            return plan
+        except Exception as e:
+            cur.execute("ROLLBACK TO SAVEPOINT explain_lenta")
+            return f"(EXPLAIN falló: {e})"
+    except Exception:
+        logger.exception("No se pudo capturar el EXPLAIN de una consulta lenta")
+        return None
+    finally:
+        cur.close()
+
+
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("lentas_t0", []).append(time.perf_counter())
+
+
+def _despues(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get("lentas_t0")
+    if not inicios:
+        return
+    ms = (time.perf_counter() - inicios.pop()) * 1000
+    if ms < settings.SQL_LENTA_MS:
+        return
+    plan = None
+    if not executemany and settings.SQL_LENTA_EXPLAIN_MUESTREO > 0 \
+            and random.random() < settings.SQL_LENTA_EXPLAIN_MUESTREO:
+        plan = _explain(conn, cursor, statement, parameters)
+    registro_lentas.agregar({
+        "en": datetime.now(timezone.utc),
+        "duracion_ms": round(ms, 2),
+        "ruta": ruta_actual() or "(fuera de request)",
+        "sql": statement[:_MAX_SQL],
+        "parametros": _forma(parameters, executemany),
+        "filas": cursor.rowcount if cursor.rowcount >= 0 else None,
+        "explain": plan,
+    })
+
+
+def instalar(engine) -> None:
+    """Registra las consultas lentas de este engine (idempotente)"""
+    if not event.contains(engine, "before_cursor_execute", _antes):
+        event.listen(engine, "before_cursor_execute", _antes)
+        event.listen(engine, "after_cursor_execute", _despues)
@@ -0,0 +1,12 @@
+# app/core/http_cache.py
+"""Helpers de caché HTTP (ETag / If-None-Match) compartidos por las rutas."""
+from __future__ import annotations
+
+
+def etag_coincide(if_none_match: str | None, etag: str) -> bool:
+    """True si el If-None-Match del cliente calza con el ETag (comparación débil, RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(t.strip().removeprefix("W/") == etag for t in if_none_match.split(","))
@@ -0,0 +1,245 @@
+# app/core/idempotencia.py
+"""
+Soporte del header Idempotency-Key en los POST.
+
+La primera vez que llega una clave se reserva (fila 'en_proceso'), se ejecuta el
+request y se guarda la respuesta. Los reintentos con la misma clave reciben esa
+respuesta guardada sin volver a ejecutar el endpoint: no se duplican inserts,
+correos de alerta ni puntos de gamificación.
+
+- las claves son por sujeto (hash del header Authorization; sin él, el sujeto
+  anónimo): la misma clave de dos clientes distintos no se mezcla
+- misma clave con otro cuerpo/ruta -> 422
+- misma clave mientras el original sigue ejecutándose -> 409 (reintentar luego).
+  El request dueño renueva latido_en mientras corre; la clave solo se retoma si
+  deja de latir por IDEMPOTENCIA_PROCESO_SEGUNDOS (el proceso murió)
+- completar/liberar solo tocan la fila si el token sigue siendo el del request
+- respuestas 5xx no se guardan: la clave se libera para poder reintentar
+- las claves expiran después de IDEMPOTENCIA_TTL_SEGUNDOS
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+import hashlib
+import logging
+import time
+import uuid
+
+from sqlalchemy import delete, select, update, or_, and_
+from sqlalchemy.dialects.postgresql import insert
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+
+from app.config import settings
+from app.db import engine
+from app.models.idempotencia import Idempotencia
+
+logger = logging.getLogger(__name__)
+
+HEADER = "idempotency-key"
+EN_PROCESO = "en_proceso"
+COMPLETADA = "completada"
+
+
+def _huella(scope, body: bytes) -> str:
+    h = hashlib.sha256()
+    for parte in (scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""), body):
+        h.update(parte)
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _sujeto(scope) -> str:
+    """Dueño de las claves: hash del header Authorization ('' si no viene)"""
+    autorizacion = Headers(scope=scope).get("authorization")
+    return hashlib.sha256(autorizacion.encode()).hexdigest() if autorizacion else ""
+
+
+def _mia(t, sujeto: str, clave: str, token: str):
+    return and_(t.c.sujeto == sujeto, t.c.clave == clave, t.c.estado == EN_PROCESO, t.c.token == token)
+
+
+def _stmt_reservar(sujeto: str, clave: str, huella: str, token: str, ahora: datetime):
+    t = Idempotencia.__table__
+    stmt = insert(t).values(
+        sujeto=sujeto, clave=clave, huella=huella, estado=EN_PROCESO, token=token,
+        creada_en=ahora, latido_en=ahora,
+        expira_en=ahora + timedelta(seconds=settings.IDEMPOTENCIA_TTL_SEGUNDOS),
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[t.c.sujeto, t.c.clave],
+        set_={
+            "huella": stmt.excluded.huella,
+            "estado": EN_PROCESO,
+            "token": stmt.excluded.token,
+            "status_code": None,
+            "content_type": None,
+            "cuerpo": None,
+            "creada_en": stmt.excluded.creada_en,
+            "latido_en": stmt.excluded.latido_en,
+            "expira_en": stmt.excluded.expira_en,
+        },
+        where=or_(
+            t.c.expira_en < ahora,
+            and_(t.c.estado == EN_PROCESO,
+                 t.c.latido_en < ahora - timedelta(seconds=settings.IDEMPOTENCIA_PROCESO_SEGUNDOS)),
+        ),
+    ).returning(t.c.clave)
+
+
+def reservar(sujeto: str, clave: str, huella: str, token: str):
+    """
+    Reserva la clave para el request 'token'. Devuelve None si este request quedó
+    a cargo, o la fila existente (huella, estado, status_code, content_type, cuerpo)
+    si ya estaba. Una clave expirada o 'en_proceso' que dejó de latir se reutiliza.
+    """
+    t = Idempotencia.__table__
+    with engine.begin() as conn:
+        if conn.execute(_stmt_reservar(sujeto, clave, huella, token, datetime.now(timezone.utc))).first() is not None:
+            return None
+        return conn.execute(
+            select(t.c.huella, t.c.estado, t.c.status_code, t.c.content_type, t.c.cuerpo)
+            .where(t.c.sujeto == sujeto, t.c.clave == clave)
+        ).first()
+
+
+def renovar(sujeto: str, clave: str, token: str) -> bool:
+    """Latido del request dueño; False si ya no es suyo"""
+    t = Idempotencia.__table__
+    with engine.begin() as conn:
+        return conn.execute(
+            update(t).where(_mia(t, sujeto, clave, token)).values(latido_en=datetime.now(timezone.utc))
+        ).rowcount > 0
+
+
+def completar(sujeto: str, clave: str, token: str, status_code: int, content_type: str | None,
+              cuerpo: bytes) -> bool:
+    t = Idempotencia.__table__
+    with engine.begin() as conn:
+        return conn.execute(
+            update(t).where(_mia(t, sujeto, clave, token))
+            .values(estado=COMPLETADA, token=None, status_code=status_code,
+                    content_type=content_type, cuerpo=cuerpo)
+        ).rowcount > 0
+
+
+def liberar(sujeto: str, clave: str, token: str) -> None:
+    t = Idempotencia.__table__
+    with engine.begin() as conn:
+        conn.execute(delete(t).where(_mia(t, sujeto, clave, token)))
+
+
+def limpiar_expiradas() -> int:
+    t = Idempotencia.__table__
+    with engine.begin() as conn:
+        return conn.execute(delete(t).where(t.c.expira_en < datetime.now(timezone.utc))).rowcount
+
+
+class IdempotenciaMiddleware:
+    """Middleware ASGI: solo actúa en POST que traen Idempotency-Key"""
+
+    def __init__(self, app):
+        self.app = app
+        self._proxima_limpieza = 0.0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+        clave = Headers(scope=scope).get(HEADER)
+        if not clave:
+            return await self.app(scope, receive, send)
+        if len(clave) > 255:
+            return await JSONResponse({"detail": "Idempotency-Key demasiado larga"}, status_code=400)(scope, receive, send)
+
+        # el cuerpo se lee completo: entra en la huella y luego se le entrega igual al endpoint
+        partes = []
+        while True:
+            msg = await receive()
+            if msg["type"] == "http.disconnect":
+                return
+            partes.append(msg.get("body", b""))
+            if not msg.get("more_body"):
+                break
+        body = b"".join(partes)
+        huella = _huella(scope, body)
+        sujeto = _sujeto(scope)
+        token = uuid.uuid4().hex
+
+        await self._limpiar_si_toca()
+        previa = await run_in_threadpool(reservar, sujeto, clave, huella, token)
+        if previa is not None:
+            return await self._responder_previa(previa, huella)(scope, receive, send)
+
+        entregado = False
+
+        async def receive_replay():
+            nonlocal entregado
+            if not entregado:
+                entregado = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        respuesta = {"status": 500, "content_type": None, "cuerpo": []}
+
+        async def send_captura(msg):
+            if msg["type"] == "http.response.start":
+                respuesta["status"] = msg["status"]
+                respuesta["content_type"] = Headers(raw=msg.get("headers", [])).get("content-type")
+            elif msg["type"] == "http.response.body":
+                respuesta["cuerpo"].append(msg.get("body", b""))
+            await send(msg)
+
+        latido = asyncio.create_task(self._latir(sujeto, clave, token))
+        try:
+            await self.app(scope, receive_replay, send_captura)
+        except BaseException:
+            latido.cancel()
+            await run_in_threadpool(liberar, sujeto, clave, token)
+            raise
+        latido.cancel()
+
+        try:
+            if respuesta["status"] >= 500:
+                await run_in_threadpool(liberar, sujeto, clave, token)
+            elif not await run_in_threadpool(completar, sujeto, clave, token, respuesta["status"],
+                                             respuesta["content_type"], b"".join(respuesta["cuerpo"])):
+                logger.warning(f"La clave de idempotencia {clave} ya no era de este request; respuesta no guardada")
+        except Exception:
+            # la respuesta ya se envió; en el peor caso la clave queda en proceso hasta IDEMPOTENCIA_PROCESO_SEGUNDOS
+            logger.exception(f"No se pudo guardar la respuesta de la clave de idempotencia {clave}")
+
+    @staticmethod
+    async def _latir(sujeto: str, clave: str, token: str) -> None:
+        """Mientras el endpoint corre, renueva latido_en para que nadie retome la clave"""
+        intervalo = settings.IDEMPOTENCIA_PROCESO_SEGUNDOS / 3
+        while True:
+            await asyncio.sleep(intervalo)
+            try:
+                if not await run_in_threadpool(renovar, sujeto, clave, token):
+                    return
+            except Exception:
+                logger.exception(f"No se pudo renovar la clave de idempotencia {clave}")
+
+    @staticmethod
+    def _responder_previa(previa, huella: str) -> Response:
+        if previa.huella != huella:
+            return JSONResponse({"detail": "Idempotency-Key ya usada con otra solicitud"}, status_code=422)
+        if previa.estado != COMPLETADA:
+            return JSONResponse({"detail": "Solicitud con esta Idempotency-Key aún en proceso"},
+                                status_code=409, headers={"Retry-After": "1"})
+        return Response(content=previa.cuerpo, status_code=previa.status_code,
+                        media_type=previa.content_type, headers={"Idempotent-Replayed": "true"})
+
+    async def _limpiar_si_toca(self) -> None:
+        ahora = time.monotonic()
+        if ahora < self._proxima_limpieza:
+            return
+        self._proxima_limpieza = ahora + settings.IDEMPOTENCIA_LIMPIEZA_SEGUNDOS
+        try:
+            borradas = await run_in_threadpool(limpiar_expiradas)
+            if borradas:
+                logger.info(f"Idempotencia: {borradas} claves expiradas eliminadas")
+        except Exception:
+            logger.exception("No se pudieron limpiar las claves de idempotencia expiradas")
@@ -0,0 +1,202 @@
+# app/core/metrics.py
+"""
+Métricas por ruta: latencia y SQL por request.
+
+- MetricasMiddleware (ASGI) mide cada request y lo suma a histogramas por
+  (método, ruta, status). La ruta es la plantilla ("/paciente/{rut_paciente}"),
+  no la URL, así la cantidad de series no crece con los datos.
+- instalar(engine) engancha before/after_cursor_execute: cada sentencia suma
+  cantidad, filas y tiempo de DB al request en curso (vía contextvar; FastAPI
+  copia el contexto al threadpool de los endpoints sync).
+- exportar() entrega todo en formato texto de Prometheus (GET /metrics) y cada
+  respuesta lleva Server-Timing: app;dur=.., db;dur=..;desc="N sql".
+
+Un N+1 nuevo se ve como un salto en db_statements_per_request de esa ruta; un
+count lento, en db_seconds_total.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+import threading
+import time
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+LATENCIA_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SENTENCIAS_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+_EXCLUIDAS = {"/metrics"}
+
+
+@dataclass
+class MedicionSQL:
+    """Lo que gastó en la base el request en curso"""
+    sentencias: int = 0
+    filas: int = 0
+    segundos: float = 0.0
+    scope: dict | None = None   # el router deja aquí la ruta ("route") antes de llamar al endpoint
+
+
+_actual: ContextVar[MedicionSQL | None] = ContextVar("metricas_sql", default=None)
+
+
+class _Histograma:
+    __slots__ = ("buckets", "conteos", "suma", "total")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.conteos = [0] * (len(buckets) + 1)   # el último es +Inf
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float) -> None:
+        self.conteos[bisect_left(self.buckets, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+
+class Registro:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencia: dict[tuple, _Histograma] = {}     # (method, route, status)
+        self.sentencias: dict[tuple, _Histograma] = {}   # (method, route)
+        self.filas: dict[tuple, int] = {}
+        self.db_segundos: dict[tuple, float] = {}
+
+    def observar(self, metodo: str, ruta: str, status: int, segundos: float, sql: MedicionSQL) -> None:
+        clave = (metodo, ruta)
+        with self._lock:
+            h = self.latencia.get((metodo, ruta, status))
+            if h is None:
+                h = self.latencia[(metodo, ruta, status)] = _Histograma(LATENCIA_BUCKETS)
+            h.observar(segundos)
+            h = self.sentencias.get(clave)
+            if h is None:
+                h = self.sentencias[clave] = _Histograma(SENTENCIAS_BUCKETS)
+            h.observar(sql.sentencias)
+            self.filas[clave] = self.filas.get(clave, 0) + sql.filas
+            self.db_segundos[clave] = self.db_segundos.get(clave, 0.0) + sql.segundos
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            self.latencia.clear(); self.sentencias.clear(); self.filas.clear(); self.db_segundos.clear()
+
+    def exportar(self) -> str:
+        lineas: list[str] = []
+        with self._lock:
+            lineas += ["# HELP http_request_duration_seconds Latencia de los requests por ruta",
+                       "# TYPE http_request_duration_seconds histogram"]
+            for (metodo, ruta, status), h in sorted(self.latencia.items()):
+                lineas += _histograma("http_request_duration_seconds",
+                                      f'method="{metodo}",route="{_esc(ruta)}",status="{status}"', h)
+            lineas += ["# HELP db_statements_per_request Sentencias SQL por request",
+                       "# TYPE db_statements_per_request histogram"]
+            for (metodo, ruta), h in sorted(self.sentencias.items()):
+                lineas += _histograma("db_statements_per_request", f'method="{metodo}",route="{_esc(ruta)}"', h)
+            lineas += ["# HELP db_rows_total Filas devueltas o afectadas por ruta",
+                       "# TYPE db_rows_total counter"]
+            for (metodo, ruta), n in sorted(self.filas.items()):
+                lineas.append(f'db_rows_total{{method="{metodo}",route="{_esc(ruta)}"}} {n}')
+            lineas += ["# HELP db_seconds_total Tiempo en la base por ruta",
+                       "# TYPE db_seconds_total counter"]
+            for (metodo, ruta), s in sorted(self.db_segundos.items()):
+                lineas.append(f'db_seconds_total{{method="{metodo}",route="{_esc(ruta)}"}} {s:.6f}')
+        return "\n".join(lineas) + "\n"
+
+
+def _esc(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _histograma(nombre: str, etiquetas: str, h: _Histograma) -> list[str]:
+    lineas, acumulado = [], 0
+    for limite, n in zip(h.buckets, h.conteos):
+        acumulado += n
+        lineas.append(f'{nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+    lineas.append(f'{nombre}_bucket{{{etiquetas},le="+Inf"}} {h.total}')
+    lineas.append(f"{nombre}_sum{{{etiquetas}}} {h.suma:.6f}")
+    lineas.append(f"{nombre}_count{{{etiquetas}}} {h.total}")
+    return lineas
+
+
+registro = Registro()
+
+
+# --------- SQL ---------
+
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metricas_t0", []).append(time.perf_counter())
+
+
+def _despues(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get("metricas_t0")
+    if not inicios:
+        return
+    duracion = time.perf_counter() - inicios.pop()
+    m = _actual.get()
+    if m is not None:
+        m.sentencias += 1
+        m.filas += max(cursor.rowcount, 0)
+        m.segundos += duracion
+
+
+def instalar(engine) -> None:
+    """Cuenta las sentencias de este engine en el request en curso (idempotente)"""
+    if not event.contains(engine, "before_cursor_execute", _antes):
+        event.listen(engine, "before_cursor_execute", _antes)
+        event.listen(engine, "after_cursor_execute", _despues)
+
+
+def medicion_actual() -> MedicionSQL | None:
+    return _actual.get()
+
+
+def ruta_actual() -> str | None:
+    """'GET /paciente/{rut_paciente}' del request en curso, si lo hay"""
+    m = _actual.get()
+    if m is None or m.scope is None:
+        return None
+    ruta = m.scope.get("route")
+    return f"{m.scope['method']} {getattr(ruta, 'path', None) or m.scope['path']}"
+
+
+# --------- ASGI ---------
+
+class MetricasMiddleware:
+    def __init__(self, app, registro: Registro = registro):
+        self.app = app
+        self.registro = registro
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in _EXCLUIDAS:
+            return await self.app(scope, receive, send)
+
+        sql = MedicionSQL(scope=scope)
+        token = _actual.set(sql)
+        inicio = time.perf_counter()
+        status = 500
+
+        async def send_con_timing(msg):
+            nonlocal status
+            if msg["type"] == "http.response.start":
+                status = msg["status"]
+                headers = MutableHeaders(scope=msg)
+                headers.append("Server-Timing",
+                               f'app;dur={(time.perf_counter() - inicio) * 1000:.1f}, '
+                               f'db;dur={sql.segundos * 1000:.1f};desc="{sql.sentencias} sql"')
+            await send(msg)
+
+        try:
+            await self.app(scope, receive, send_con_timing)
+        finally:
+            _actual.reset(token)
+            ruta = scope.get("route")
+            self.registro.observar(
+                scope["method"],
+                getattr(ruta, "path", None) or "sin_ruta",
+                status,
+                time.perf_counter() - inicio,
+                sql,
+            )
@@ -0,0 +1,159 @@
+# app/core/n_mas_uno.py
+"""
+Detector de N+1 para desarrollo y tests.
+
+Con N_MAS_UNO=log|raise la API vigila cada request: agrupa las sentencias por
+forma (el SQL con los binds, con las listas de IN colapsadas) y cuando una
+misma forma se repite N_MAS_UNO_UMBRAL veces avisa con el lugar del código de
+la app que la disparó (típicamente un acceso perezoso a una relación dentro de
+un for):
+
+    N+1: 5x SELECT ... FROM cesfam WHERE ... desde app/services/x.py:42 en list_
+
+En 'log' queda como warning (una vez por forma y request); en 'raise' el
+request falla con NMasUnoError. En producción va apagado (N_MAS_UNO="").
+
+Para tests, ContadorConsultas cuenta todo lo que pasa por un engine dentro de
+un bloque; el fixture assert_max_queries de tests/conftest.py lo usa para fijar
+un máximo de consultas por endpoint.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+import os
+import re
+import sys
+
+from sqlalchemy import event
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))   # .../app
+_ESTE = os.path.abspath(__file__)
+_LISTA_BINDS = re.compile(r"\(\s*(?:%\(\w+\)s|\?|:\w+|\$\d+)(?:\s*,\s*(?:%\(\w+\)s|\?|:\w+|\$\d+))*\s*\)")
+_ESPACIOS = re.compile(r"\s+")
+
+
+class NMasUnoError(RuntimeError):
+    pass
+
+
+def forma(statement: str) -> str:
+    """SQL normalizado: mismo texto salvo el largo de las listas de IN"""
+    return _ESPACIOS.sub(" ", _LISTA_BINDS.sub("(...)", statement)).strip()
+
+
+def lugar_llamada() -> str:
+    """
+    Frame más interno de la app (fuera de este módulo) en la pila actual; si la
+    sentencia no viene de app/ (p.ej. un test), el primero fuera de SQLAlchemy.
+    """
+    frame = sys._getframe(1)
+    otro = None
+    while frame is not None:
+        archivo = os.path.abspath(frame.f_code.co_filename)
+        if archivo != _ESTE:
+            lugar = f"{os.path.relpath(archivo, os.path.dirname(_APP))}:{frame.f_lineno} en {frame.f_code.co_name}"
+            if archivo.startswith(_APP + os.sep):
+                return lugar
+            if otro is None and f"{os.sep}sqlalchemy{os.sep}" not in archivo:
+                otro = lugar
+        frame = frame.f_back
+    return otro or "(desconocido)"
+
+
+class _Vigilancia:
+    def __init__(self, umbral: int, modo: str):
+        self.umbral = umbral
+        self.modo = modo
+        self.formas: Counter = Counter()
+        self.avisadas: set[str] = set()
+
+
+_actual: ContextVar[_Vigilancia | None] = ContextVar("n_mas_uno", default=None)
+
+
+@contextmanager
+def vigilar(umbral: int | None = None, modo: str | None = None):
+    """Vigila las sentencias del bloque (la API lo hace por request con NMasUnoMiddleware)"""
+    token = _actual.set(_Vigilancia(umbral or settings.N_MAS_UNO_UMBRAL, modo or settings.N_MAS_UNO or "log"))
+    try:
+        yield
+    finally:
+        _actual.reset(token)
+
+
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    v = _actual.get()
+    if v is None:
+        return
+    f = forma(statement)
+    v.formas[f] += 1
+    if v.formas[f] < v.umbral or f in v.avisadas:
+        return
+    v.avisadas.add(f)
+    mensaje = f"N+1: {v.formas[f]}x {f[:200]} desde {lugar_llamada()}"
+    if v.modo == "raise":
+        raise NMasUnoError(mensaje)
+    logger.warning(mensaje)
+
+
+def instalar(engine) -> None:
+    """Agrega el detector a este engine (idempotente); sin vigilar() no hace nada"""
+    if not event.contains(engine, "before_cursor_execute", _antes):
+        event.listen(engine, "before_cursor_execute", _antes)
+
+
+class NMasUnoMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        with vigilar():
+            await self.app(scope, receive, send)
+
+
+# --------- tests ---------
+
+class ContadorConsultas:
+    """Cuenta las sentencias de un engine (de cualquier hilo) dentro de un with"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.sentencias: list[tuple[str, str]] = []   # (forma, lugar)
+
+    def _registrar(self, conn, cursor, statement, parameters, context, executemany):
+        self.sentencias.append((forma(statement), lugar_llamada()))
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._registrar)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._registrar)
+        return False
+
+    def __len__(self):
+        return len(self.sentencias)
+
+    def repetidas(self) -> list[tuple[str, int, list[str]]]:
+        """(forma, veces, lugares) de las formas que se ejecutaron más de una vez"""
+        veces = Counter(f for f, _ in self.sentencias)
+        return [
+            (f, n, sorted({l for g, l in self.sentencias if g == f}))
+            for f, n in veces.most_common() if n > 1
+        ]
+
+    def reporte(self) -> str:
+        lineas = [f"{len(self)} sentencias"]
+        for f, n, lugares in self.repetidas():
+            lineas.append(f"  {n}x {f[:200]}")
+            lineas += [f"      desde {l}" for l in lugares]
+        return "\n".join(lineas)
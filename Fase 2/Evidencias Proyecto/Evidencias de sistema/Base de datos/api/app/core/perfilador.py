@@ -0,0 +1,206 @@
+# app/core/perfilador.py
+"""
+Perfilado bajo demanda de requests individuales en producción.
+
+Un request se perfila si trae X-Perfilar: 1 junto a un X-Admin-Token válido, o
+si cae en la fracción PERFIL_MUESTREO. Mientras dura, un hilo toma una muestra
+de las pilas cada PERFIL_INTERVALO_MS (sys._current_frames, sin instrumentar
+nada ni redeploy):
+
+  - el hilo del event loop (middlewares, endpoints async)
+  - los hilos del threadpool que están ejecutando el endpoint de la ruta
+    (endpoints sync); se reconocen porque su pila contiene ese endpoint
+
+Las muestras del loop esperando en select() se descartan, así un endpoint sync
+no cuenta doble. Con tráfico concurrente a la misma ruta o en el event loop
+pueden colarse muestras de otros requests: es un perfil estadístico, no una
+traza.
+
+Los últimos PERFIL_BUFFER perfiles quedan en memoria, por id. Al que pidió el
+perfil por header se le devuelve el id en X-Perfil-Id; se descargan en
+GET /admin/perfiles/{id} como speedscope (https://www.speedscope.app) o como
+pilas colapsadas (flamegraph.pl, inferno).
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+import random
+import sys
+import threading
+import time
+import uuid
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.config import settings
+from app.core.security import admin_token_valido
+
+_MAX_PROFUNDIDAD = 200
+
+
+def _nombre(code, f_globals) -> str:
+    return f"{f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class Perfil:
+    def __init__(self, metodo: str, path: str, motivo: str):
+        self.id = uuid.uuid4().hex
+        self.en = datetime.now(timezone.utc)
+        self.metodo = metodo
+        self.path = path
+        self.ruta: str | None = None
+        self.motivo = motivo
+        self.status: int | None = None
+        self.duracion_ms: float | None = None
+        self.frames: list[tuple[str, str, int]] = []       # (nombre, archivo, línea)
+        self._indices: dict[tuple[str, str, int], int] = {}
+        self.muestras: list[tuple[tuple[int, ...], float]] = []   # (pila raíz->hoja, ms)
+
+    def agregar(self, pila: list, ms: float) -> None:
+        indices = []
+        for frame in pila:
+            i = self._indices.get(frame)
+            if i is None:
+                i = self._indices[frame] = len(self.frames)
+                self.frames.append(frame)
+            indices.append(i)
+        self.muestras.append((tuple(indices), ms))
+
+    def resumen(self) -> dict:
+        return {
+            "id": self.id, "en": self.en, "metodo": self.metodo, "ruta": self.ruta or self.path,
+            "motivo": self.motivo, "status": self.status, "duracion_ms": self.duracion_ms,
+            "muestras": len(self.muestras),
+        }
+
+    def colapsado(self) -> str:
+        """Formato 'a;b;c N' (N en microsegundos) de flamegraph.pl / inferno / speedscope"""
+        pesos: Counter = Counter()
+        for pila, ms in self.muestras:
+            pesos[";".join(self.frames[i][0] for i in pila)] += ms
+        return "".join(f"{pila} {round(ms * 1000)}\n" for pila, ms in pesos.most_common())
+
+    def speedscope(self) -> dict:
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.metodo} {self.ruta or self.path}",
+            "exporter": "cuidasalud-api",
+            "shared": {"frames": [{"name": n, "file": f, "line": l} for n, f, l in self.frames]},
+            "profiles": [{
+                "type": "sampled",
+                "name": f"{self.metodo} {self.ruta or self.path} ({self.id})",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(ms for _, ms in self.muestras), 3),
+                "samples": [list(pila) for pila, _ in self.muestras],
+                "weights": [round(ms, 3) for _, ms in self.muestras],
+            }],
+        }
+
+
+class _Muestreador(threading.Thread):
+    def __init__(self, perfil: Perfil, hilo_loop: int, scope: dict):
+        super().__init__(name=f"perfil-{perfil.id[:8]}", daemon=True)
+        self.perfil = perfil
+        self.hilo_loop = hilo_loop
+        self.scope = scope
+        self.detener = threading.Event()
+
+    def run(self) -> None:
+        intervalo = settings.PERFIL_INTERVALO_MS / 1000
+        anterior = time.perf_counter()
+        while not self.detener.wait(intervalo):
+            ahora = time.perf_counter()
+            self._muestra((ahora - anterior) * 1000)
+            anterior = ahora
+
+    def _muestra(self, ms: float) -> None:
+        ruta = self.scope.get("route")
+        endpoint = getattr(getattr(ruta, "endpoint", None), "__code__", None)
+        propio = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == propio:
+                continue
+            pila = []
+            contiene_endpoint = False
+            while frame is not None and len(pila) < _MAX_PROFUNDIDAD:
+                code = frame.f_code
+                contiene_endpoint = contiene_endpoint or code is endpoint
+                pila.append((_nombre(code, frame.f_globals), code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if ident != self.hilo_loop and not contiene_endpoint:
+                continue
+            if ident == self.hilo_loop and pila and pila[0][0].startswith("selectors:"):
+                continue   # loop ocioso (esperando I/O o al threadpool): lo que pesa está en el otro hilo
+            pila.reverse()
+            self.perfil.agregar(pila, ms)
+
+
+class RegistroPerfiles:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._perfiles: OrderedDict[str, Perfil] = OrderedDict()
+
+    def guardar(self, perfil: Perfil) -> None:
+        with self._lock:
+            self._perfiles[perfil.id] = perfil
+            while len(self._perfiles) > settings.PERFIL_BUFFER:
+                self._perfiles.popitem(last=False)
+
+    def get(self, id_perfil: str) -> Perfil | None:
+        with self._lock:
+            return self._perfiles.get(id_perfil)
+
+    def listar(self) -> list[dict]:
+        with self._lock:
+            perfiles = list(self._perfiles.values())
+        return [p.resumen() for p in reversed(perfiles)]
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._perfiles.clear()
+
+
+registro_perfiles = RegistroPerfiles()
+
+
+class PerfiladorMiddleware:
+    def __init__(self, app, registro: RegistroPerfiles = registro_perfiles):
+        self.app = app
+        self.registro = registro
+
+    def _motivo(self, scope) -> str | None:
+        headers = Headers(scope=scope)
+        if headers.get("x-perfilar") == "1" and admin_token_valido(headers.get("x-admin-token")):
+            return "header"
+        if settings.PERFIL_MUESTREO > 0 and random.random() < settings.PERFIL_MUESTREO:
+            return "muestreo"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        motivo = self._motivo(scope) if scope["type"] == "http" else None
+        if motivo is None:
+            return await self.app(scope, receive, send)
+
+        perfil = Perfil(scope["method"], scope["path"], motivo)
+        muestreador = _Muestreador(perfil, threading.get_ident(), scope)
+        inicio = time.perf_counter()
+
+        async def send_con_id(msg):
+            if msg["type"] == "http.response.start":
+                perfil.status = msg["status"]
+                if motivo == "header":
+                    MutableHeaders(scope=msg).append("X-Perfil-Id", perfil.id)
+            await send(msg)
+
+        muestreador.start()
+        try:
+            await self.app(scope, receive, send_con_id)
+        finally:
+            muestreador.detener.set()
+            await asyncio.to_thread(muestreador.join)  # su última muestra no debe frenar el event loop
+            perfil.duracion_ms = round((time.perf_counter() - inicio) * 1000, 2)
+            perfil.ruta = getattr(scope.get("route"), "path", None)
+            self.registro.guardar(perfil)
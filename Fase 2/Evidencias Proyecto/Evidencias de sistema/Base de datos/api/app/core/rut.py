@@ -0,0 +1,12 @@
+# app/core/rut.py
+"""RUT chilenos planos (sin puntos ni guion), como los espera la API"""
+
+
+def rut(cuerpo: int) -> str:
+    """RUT plano con su dígito verificador (módulo 11)"""
+    s, f = 0, 2
+    for ch in reversed(str(cuerpo)):
+        s += int(ch) * f
+        f = 2 if f == 7 else f + 1
+    r = 11 - (s % 11)
+    return f"{cuerpo}{'0' if r == 11 else 'K' if r == 10 else r}"
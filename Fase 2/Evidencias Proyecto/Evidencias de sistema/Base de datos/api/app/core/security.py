@@ -1,7 +1,9 @@
 # app/core/security.py
 from __future__ import annotations
 from passlib.context import CryptContext
-import bcrypt, hashlib
+import bcrypt, hashlib, hmac
+
+from app.config import settings
 
 # Config passlib (bcrypt "2b", rounds fijos)
 pwd_context = CryptContext(
@@ -71,3 +73,9 @@ def needs_rehash(hashed: str) -> bool:
     except Exception:
         # si no lo reconoce, probablemente legacy: conviene rehashear
         return True
+
+def admin_token_valido(token: str | None) -> bool:
+    """X-Admin-Token contra settings.ADMIN_TOKEN (vacío = nadie es admin)."""
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), settings.ADMIN_TOKEN.encode("utf-8"))
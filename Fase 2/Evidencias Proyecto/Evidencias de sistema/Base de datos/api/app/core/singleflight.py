@@ -0,0 +1,89 @@
+# app/core/singleflight.py
+"""
+Caché corta para lecturas calientes por clave (GET /paciente/{rut}, etc.).
+
+- single-flight: si llegan varios requests iguales a la vez, solo el primero va a
+  la BD y el resto espera ese mismo resultado.
+- LRU acotado con TTL de pocos segundos: las ráfagas siguientes salen de memoria.
+- invalidar() borra la clave al instante; si había una carga en curso, su
+  resultado se entrega a quienes la esperaban pero no se guarda.
+
+Guarda valores ya serializados (dicts), nunca objetos ORM ligados a una sesión.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+import threading
+import time
+
+from app.config import settings
+
+
+class _Vuelo:
+    __slots__ = ("listo", "valor", "error")
+
+    def __init__(self):
+        self.listo = threading.Event()
+        self.valor: Any = None
+        self.error: BaseException | None = None
+
+
+class CacheCorta:
+    def __init__(self, nombre: str, max_items: int | None = None, ttl: float | None = None):
+        self.nombre = nombre
+        self.max_items = max_items or settings.HOT_CACHE_MAX
+        self.ttl = settings.HOT_CACHE_TTL_SEGUNDOS if ttl is None else ttl
+        self._datos: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._vuelos: dict[Hashable, _Vuelo] = {}
+        self._generacion: dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, clave: Hashable, cargar: Callable[[], Any]) -> Any:
+        ahora = time.monotonic()
+        with self._lock:
+            hit = self._datos.get(clave)
+            if hit is not None and hit[0] > ahora:
+                self._datos.move_to_end(clave)
+                return hit[1]
+            vuelo = self._vuelos.get(clave)
+            lider = vuelo is None
+            if lider:
+                vuelo = self._vuelos[clave] = _Vuelo()
+                generacion = self._generacion.get(clave, 0)
+
+        if not lider:
+            vuelo.listo.wait()
+            if vuelo.error is not None:
+                raise vuelo.error
+            return vuelo.valor
+
+        try:
+            vuelo.valor = cargar()
+        except BaseException as e:
+            vuelo.error = e
+            raise
+        finally:
+            with self._lock:
+                self._vuelos.pop(clave, None)
+                guardar = (vuelo.error is None and vuelo.valor is not None  # los 404 no se cachean
+                           and self._generacion.get(clave, 0) == generacion)
+                if guardar and self.ttl > 0:
+                    self._datos[clave] = (time.monotonic() + self.ttl, vuelo.valor)
+                    self._datos.move_to_end(clave)
+                    while len(self._datos) > self.max_items:
+                        self._datos.popitem(last=False)
+            vuelo.listo.set()
+        return vuelo.valor
+
+    def invalidar(self, clave: Hashable) -> None:
+        with self._lock:
+            self._datos.pop(clave, None)
+            self._generacion[clave] = self._generacion.get(clave, 0) + 1
+            if len(self._generacion) > self.max_items:
+                # solo importan las claves con una carga en curso
+                self._generacion = {k: v for k, v in self._generacion.items() if k in self._vuelos}
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._datos.clear()
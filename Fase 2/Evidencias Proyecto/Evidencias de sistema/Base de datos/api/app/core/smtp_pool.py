@@ -0,0 +1,120 @@
+# app/core/smtp_pool.py
+"""
+Envío de muchos correos reutilizando sesiones SMTP.
+
+Abrir una sesión (TCP + STARTTLS + AUTH) cuesta bastante más que enviar un
+mensaje por ella. PoolSMTP mantiene hasta N sesiones abiertas; cada una envía
+muchos mensajes y se reabre cada 'por_conexion' mensajes (los proveedores
+limitan los mensajes por sesión) o si el servidor la cortó. LimiteTasa espacia
+los envíos para no pasar de X por segundo y no caer en el bloqueo por ráfagas.
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from email.message import Message
+import logging
+import time
+
+import aiosmtplib
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LimiteTasa:
+    """Como máximo 'por_segundo' envíos por segundo, repartidos parejo (0 = sin tope)"""
+
+    def __init__(self, por_segundo: float):
+        self.intervalo = 1.0 / por_segundo if por_segundo > 0 else 0.0
+        self._proximo = 0.0
+        self._lock = asyncio.Lock()
+
+    async def esperar(self) -> None:
+        if not self.intervalo:
+            return
+        async with self._lock:
+            ahora = time.monotonic()
+            espera = self._proximo - ahora
+            self._proximo = max(ahora, self._proximo) + self.intervalo
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+
+@dataclass
+class _Sesion:
+    smtp: aiosmtplib.SMTP | None = None
+    enviados: int = 0
+
+
+class PoolSMTP:
+    """
+    Uso:
+        async with PoolSMTP() as pool:
+            await pool.enviar(mensaje)   # concurrente: hasta 'conexiones' a la vez
+    """
+
+    def __init__(self, conexiones: int | None = None, por_conexion: int | None = None,
+                 por_segundo: float | None = None):
+        self.conexiones = max(1, conexiones or settings.RECORDATORIOS_CONEXIONES)
+        self.por_conexion = max(1, por_conexion or settings.RECORDATORIOS_POR_CONEXION)
+        self.limite = LimiteTasa(settings.RECORDATORIOS_POR_SEGUNDO if por_segundo is None else por_segundo)
+        self._sesiones = [_Sesion() for _ in range(self.conexiones)]
+        self._libres: asyncio.Queue[_Sesion] = asyncio.Queue()
+        for s in self._sesiones:
+            self._libres.put_nowait(s)
+
+    async def __aenter__(self) -> "PoolSMTP":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.cerrar()
+
+    async def enviar(self, mensaje: Message) -> None:
+        """Envía por la primera sesión libre; reintenta una vez si el servidor había cortado la sesión"""
+        await self.limite.esperar()
+        sesion = await self._libres.get()
+        try:
+            for intento in (1, 2):
+                if sesion.smtp is None or not sesion.smtp.is_connected or sesion.enviados >= self.por_conexion:
+                    await self._cerrar(sesion)
+                    await self._abrir(sesion)
+                try:
+                    await sesion.smtp.send_message(mensaje)
+                    sesion.enviados += 1
+                    return
+                except aiosmtplib.SMTPServerDisconnected:
+                    await self._cerrar(sesion)
+                    if intento == 2:
+                        raise
+        finally:
+            self._libres.put_nowait(sesion)
+
+    async def cerrar(self) -> None:
+        """Cierra las sesiones abiertas (se vuelven a abrir solas en el próximo envío)"""
+        for s in self._sesiones:
+            await self._cerrar(s)
+
+    @staticmethod
+    async def _abrir(sesion: _Sesion) -> None:
+        smtp = aiosmtplib.SMTP(
+            hostname=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            use_tls=settings.SMTP_SSL,
+            start_tls=settings.SMTP_TLS and not settings.SMTP_SSL,
+        )
+        await smtp.connect()
+        if settings.SMTP_USER and settings.SMTP_PASSWORD:
+            await smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        sesion.smtp, sesion.enviados = smtp, 0
+
+    @staticmethod
+    async def _cerrar(sesion: _Sesion) -> None:
+        smtp, sesion.smtp, sesion.enviados = sesion.smtp, None, 0
+        if smtp is None or not smtp.is_connected:
+            return
+        try:
+            await smtp.quit()
+        except Exception:
+            smtp.close()
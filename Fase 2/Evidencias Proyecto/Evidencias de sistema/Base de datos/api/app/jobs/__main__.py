@@ -0,0 +1,86 @@
+# app/jobs/__main__.py
+"""
+Jobs que corren fuera del proceso de la API.
+
+    python -m app.jobs recordatorios                     # servicio: envía y espera nuevos
+    python -m app.jobs recordatorios --una-vez           # vacía lo vencido y termina
+    python -m app.jobs recordatorios --una-vez --comuna 5
+    python -m app.jobs particiones                       # crea los meses que falten de medicion
+    python -m app.jobs particiones --listar
+    python -m app.jobs particiones --separar 2023-01     # DETACH del mes (para archivar)
+    python -m app.jobs retencion                         # archiva lo que pasó su horizonte
+    python -m app.jobs retencion --politica eventos --destino parquet
+    python -m app.jobs retencion --simular
+
+Ctrl+C / SIGTERM terminan el lote en curso, guardan el avance y salen.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+import threading
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.jobs")
+    sub = parser.add_subparsers(dest="job", required=True)
+
+    p = sub.add_parser("recordatorios", help="Envía los recordatorios de cita pendientes")
+    p.add_argument("--una-vez", action="store_true", help="Terminar cuando no queden recordatorios vencidos")
+    p.add_argument("--comuna", type=int, default=None, help="Solo pacientes de esta comuna (id_comuna)")
+
+    p = sub.add_parser("particiones", help="Particiones mensuales de medicion y medicion_detalle")
+    p.add_argument("--meses-adelante", type=int, default=None)
+    p.add_argument("--listar", action="store_true")
+    p.add_argument("--separar", metavar="AAAA-MM", help="Separar (DETACH) las particiones de ese mes")
+
+    from app.jobs.retencion import DESTINOS, NOMBRES
+    p = sub.add_parser("retencion", help="Archiva y resume las filas más antiguas que su política")
+    p.add_argument("--politica", action="append", choices=NOMBRES, help="Repetible; por defecto todas")
+    p.add_argument("--destino", choices=DESTINOS, default=None, help="Por defecto RETENCION_DESTINO")
+    p.add_argument("--simular", action="store_true", help="Solo contar lo que saldría")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    detener = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: detener.set())
+
+    if args.job == "recordatorios":
+        from app.jobs.recordatorios import ejecutar
+        totales = asyncio.run(ejecutar(una_vez=args.una_vez, id_comuna=args.comuna, detener=detener))
+        print(f"Recordatorios: {totales['enviados']} enviados, {totales['fallidos']} fallidos "
+              f"en {totales['lotes']} lotes ({totales['segundos']} s)")
+    elif args.job == "particiones":
+        from datetime import date
+        from app.db import engine
+        from app.jobs import particiones
+        with engine.begin() as conn:
+            if args.separar:
+                anio, mes = map(int, args.separar.split("-"))
+                separadas = particiones.separar(conn, date(anio, mes, 1))
+                print(f"Separadas: {', '.join(separadas) or 'ninguna (no existían)'}")
+            else:
+                creadas = particiones.asegurar(conn, args.meses_adelante)
+                print(f"Creadas: {', '.join(creadas) or 'ninguna'}")
+            if args.listar:
+                for p in particiones.listar(conn):
+                    print(f"  {p.nombre:<32} {p.filas:>12} filas {p.bytes / 2**20:>10.1f} MB  {p.rango}")
+    elif args.job == "retencion":
+        from app.jobs import retencion
+        if args.simular:
+            for nombre, n in retencion.simular(args.politica).items():
+                print(f"  {nombre:<20} {n:>12} {'meses' if nombre == retencion.MEDICIONES else 'filas'}")
+        else:
+            totales = retencion.ejecutar(args.politica, args.destino, detener=detener)
+            for nombre, n in totales.items():
+                print(f"  {nombre:<20} {n:>12} filas archivadas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
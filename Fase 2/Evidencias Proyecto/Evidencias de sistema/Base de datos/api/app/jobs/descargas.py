@@ -0,0 +1,98 @@
+# app/jobs/descargas.py
+"""
+Registro de descargas de reportes por lotes.
+
+La descarga no espera un INSERT: cada descarga completa se encola en memoria y
+un hilo la escribe junto con las demás en un solo INSERT multi-fila, cada
+DESCARGAS_FLUSH_SEGUNDOS o apenas se juntan DESCARGAS_LOTE filas.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import logging
+import threading
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models.descarga_reporte import DescargaReporte
+
+logger = logging.getLogger(__name__)
+
+
+class BufferDescargas:
+    def __init__(self):
+        self._pendientes: list[dict] = []
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._hilo: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._hilo:
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._loop, name="descargas", daemon=True)
+        self._hilo.start()
+
+    def stop(self) -> None:
+        if self._hilo:
+            self._detener.set()
+            self._despertar.set()
+            self._hilo.join()
+            self._hilo = None
+        self.flush()  # lo que quede en memoria
+
+    def registrar(self, id_reporte: int, rut_medico: str) -> None:
+        with self._lock:
+            self._pendientes.append({
+                "id_reporte": id_reporte,
+                "rut_medico": rut_medico,
+                "descargado_en": datetime.now(timezone.utc),
+            })
+            lleno = len(self._pendientes) >= settings.DESCARGAS_LOTE
+        if lleno:
+            self._despertar.set()
+
+    def flush(self) -> int:
+        with self._lock:
+            filas, self._pendientes = self._pendientes, []
+        if not filas:
+            return 0
+        try:
+            with SessionLocal() as db:
+                db.execute(insert(DescargaReporte), filas)  # executemany -> INSERT multi-fila
+                db.commit()
+        except IntegrityError:
+            # p. ej. un reporte borrado entre la descarga y el flush: se descartan solo esas filas
+            return self._insertar_una_a_una(filas)
+        except Exception:
+            logger.exception(f"No se pudieron registrar {len(filas)} descargas; se reintenta en el próximo flush")
+            with self._lock:
+                self._pendientes[:0] = filas
+            return 0
+        return len(filas)
+
+    def _insertar_una_a_una(self, filas: list[dict]) -> int:
+        ok = 0
+        with SessionLocal() as db:
+            for fila in filas:
+                try:
+                    db.execute(insert(DescargaReporte), [fila])
+                    db.commit()
+                    ok += 1
+                except IntegrityError:
+                    db.rollback()
+                    logger.warning(f"Descarga descartada (reporte {fila['id_reporte']} ya no existe)")
+        return ok
+
+    def _loop(self) -> None:
+        while not self._detener.is_set():
+            self._despertar.wait(settings.DESCARGAS_FLUSH_SEGUNDOS)
+            self._despertar.clear()
+            self.flush()
+
+
+buffer_descargas = BufferDescargas()
@@ -0,0 +1,177 @@
+# app/jobs/particiones.py
+"""
+Particiones mensuales de medicion y medicion_detalle.
+
+Las dos tablas están particionadas por rango de fecha_registro, un mes (UTC)
+por partición: medicion_p2025_11, medicion_detalle_p2025_11, ... El detalle
+copia la fecha de su medición, así que ambas quedan en el mes correspondiente y
+una consulta que filtra por fecha_registro solo lee esos meses (pruning). Lo
+que no cae en ningún mes creado (fechas anteriores a la primera partición) va
+a medicion_default / medicion_detalle_default.
+
+  - asegurar(): crea las particiones del mes en curso y de los
+    PARTICIONES_MESES_ADELANTE siguientes. La API lo corre al levantar y luego
+    cada PARTICIONES_REVISION_HORAS en su propio hilo; también
+    `python -m app.jobs particiones`.
+  - separar(mes): DETACH de las dos particiones del mes. Quedan como tablas
+    comunes con el mismo nombre, fuera de las consultas, para archivarlas
+    (pg_dump, Parquet) y borrarlas con un DROP en vez de un DELETE masivo.
+    Como el DETACH no pasa por el ORM, deja él mismo un sync_borrado por cada
+    medición, para que las apps offline (GET /sync) también las saquen.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+import logging
+import threading
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.config import settings
+from app.db import engine
+
+logger = logging.getLogger(__name__)
+
+TABLAS = ("medicion", "medicion_detalle")   # la referenciada primero
+_LOCK = 0x4D454449                          # pg_advisory_xact_lock: un solo proceso crea particiones a la vez
+
+
+def mes_de(d: date | datetime) -> date:
+    if isinstance(d, datetime):
+        d = d.astimezone(timezone.utc) if d.tzinfo else d
+        d = d.date()
+    return d.replace(day=1)
+
+
+def sumar_meses(mes: date, n: int) -> date:
+    k = mes.year * 12 + mes.month - 1 + n
+    return date(k // 12, k % 12 + 1, 1)
+
+
+def nombre(tabla: str, mes: date) -> str:
+    return f"{tabla}_p{mes:%Y_%m}"
+
+
+def ddl_mes(tabla: str, mes: date) -> str:
+    return (f"CREATE TABLE IF NOT EXISTS {nombre(tabla, mes)} PARTITION OF {tabla} "
+            f"FOR VALUES FROM ('{mes.isoformat()} 00:00:00+00') TO ('{sumar_meses(mes, 1).isoformat()} 00:00:00+00')")
+
+
+@dataclass
+class Particion:
+    tabla: str
+    nombre: str
+    rango: str          # FOR VALUES ... tal como lo muestra Postgres
+    filas: int          # estimación de pg_class.reltuples (-1 = sin ANALYZE)
+    bytes: int
+
+
+def listar(conn: Connection) -> list[Particion]:
+    filas = conn.execute(text("""
+        SELECT p.relname AS tabla, c.relname AS nombre, pg_get_expr(c.relpartbound, c.oid) AS rango,
+               c.reltuples::bigint AS filas, pg_total_relation_size(c.oid) AS bytes
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = ANY(:tablas)
+        ORDER BY p.relname, c.relname
+    """), {"tablas": list(TABLAS)}).all()
+    return [Particion(*f) for f in filas]
+
+
+def asegurar(conn: Connection, meses_adelante: int | None = None, hoy: date | None = None,
+             desde: date | None = None) -> list[str]:
+    """
+    Crea las particiones que falten desde el mes en curso (o desde 'desde', para
+    cargas históricas) hasta meses_adelante; devuelve los nombres creados. Un mes
+    pasado solo se puede crear si la partición default no tiene filas de ese mes.
+    """
+    meses_adelante = settings.PARTICIONES_MESES_ADELANTE if meses_adelante is None else meses_adelante
+    conn.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": _LOCK})
+    existentes = {p.nombre for p in listar(conn)}
+    fin = sumar_meses(mes_de(hoy or datetime.now(timezone.utc)), meses_adelante)
+    mes = mes_de(desde) if desde else sumar_meses(fin, -meses_adelante)
+    creadas = []
+    while mes <= fin:
+        for tabla in TABLAS:
+            if nombre(tabla, mes) not in existentes:
+                conn.execute(text(ddl_mes(tabla, mes)))
+                creadas.append(nombre(tabla, mes))
+        mes = sumar_meses(mes, 1)
+    return creadas
+
+
+def sql_borrados(mes: date) -> str:
+    """Un sync_borrado por medición del mes (los detalles viajan dentro de su medición)"""
+    return (f"INSERT INTO sync_borrado (tabla, clave, rut_paciente) "
+            f"SELECT 'medicion', CAST(id_medicion AS text), rut_paciente FROM {nombre('medicion', mes)}")
+
+
+def separar(conn: Connection, mes: date) -> list[str]:
+    """
+    Saca de las tablas las particiones del mes (primero la del detalle: la FK
+    compuesta no deja separar la de medicion mientras algo la referencie).
+    """
+    mes = mes_de(mes)
+    if mes >= mes_de(datetime.now(timezone.utc)):
+        raise ValueError("Solo se pueden separar meses ya cerrados")
+    existentes = {p.nombre for p in listar(conn)}
+    if nombre("medicion", mes) in existentes:
+        conn.execute(text(sql_borrados(mes)))
+    separadas = []
+    for tabla in reversed(TABLAS):
+        particion = nombre(tabla, mes)
+        if particion not in existentes:
+            continue
+        conn.execute(text(f"ALTER TABLE {tabla} DETACH PARTITION {particion}"))
+        # la tabla separada conserva una copia de la FK hacia medicion: se suelta
+        for fk in conn.execute(text("""
+            SELECT conname FROM pg_constraint
+            WHERE conrelid = CAST(:t AS regclass) AND contype = 'f' AND confrelid = CAST('medicion' AS regclass)
+        """), {"t": particion}).scalars():
+            conn.execute(text(f'ALTER TABLE {particion} DROP CONSTRAINT "{fk}"'))
+        separadas.append(particion)
+    return separadas
+
+
+def ejecutar() -> list[str]:
+    with engine.begin() as conn:
+        creadas = asegurar(conn)
+    if creadas:
+        logger.info(f"Particiones creadas: {', '.join(creadas)}")
+    return creadas
+
+
+class MantenedorParticiones:
+    """Corre ejecutar() al levantar la API y cada PARTICIONES_REVISION_HORAS"""
+
+    def __init__(self):
+        self._hilo: threading.Thread | None = None
+        self._detener = threading.Event()
+
+    def start(self) -> None:
+        if self._hilo or settings.PARTICIONES_REVISION_HORAS <= 0:
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._correr, name="particiones", daemon=True)
+        self._hilo.start()
+
+    def stop(self) -> None:
+        if not self._hilo:
+            return
+        self._detener.set()
+        self._hilo.join(timeout=30)
+        self._hilo = None
+
+    def _correr(self) -> None:
+        while not self._detener.is_set():
+            try:
+                ejecutar()
+            except Exception:
+                logger.exception("No se pudieron asegurar las particiones de medicion")
+            self._detener.wait(settings.PARTICIONES_REVISION_HORAS * 3600)
+
+
+mantenedor = MantenedorParticiones()
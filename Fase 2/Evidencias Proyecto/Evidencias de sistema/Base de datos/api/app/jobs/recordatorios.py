@@ -0,0 +1,237 @@
+# app/jobs/recordatorios.py
+"""
+Envío de recordatorios de cita por lotes.
+
+Corre aparte con `python -m app.jobs recordatorios` o, si RECORDATORIOS_EN_API,
+dentro de la API en su propio hilo y event loop (nunca en el de los requests).
+Cada vuelta:
+  1. reclama hasta RECORDATORIOS_LOTE pendientes cuya hora de envío ya llegó
+     (FOR UPDATE SKIP LOCKED: varios procesos pueden correr a la vez)
+  2. los renderiza con las plantillas ya compiladas y los envía por PoolSMTP,
+     respetando RECORDATORIOS_POR_SEGUNDO
+  3. guarda el resultado cada pocos envíos: enviados, o reprogramados con
+     espera creciente hasta RECORDATORIOS_MAX_INTENTOS
+
+El avance queda en cada fila, así que un reinicio sigue con lo que falta. Los
+'enviando' de un proceso que murió vuelven a pendiente después de _ATASCADO
+(a lo más se repiten los de un grupo aún no guardado); cada proceso lo revisa al
+partir y luego cada _REVISAR_ATASCADOS mientras sigue corriendo.
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+import logging
+import threading
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import aiosmtplib
+from sqlalchemy import select, update
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models.paciente import Paciente
+from app.models.recordatorio_cita import RecordatorioCita
+from app.core.smtp_pool import PoolSMTP
+from app.schemas.email import AppointmentReminder
+from app.services.email import email_service
+from app.services.recordatorio_cita import PENDIENTE, ENVIANDO, ENVIADO, ERROR
+
+logger = logging.getLogger(__name__)
+
+_ATASCADO = timedelta(minutes=15)
+_REVISAR_ATASCADOS = timedelta(minutes=5)
+_GUARDAR_CADA = 50            # resultados por UPDATE de progreso
+_REINTENTO_BASE = timedelta(minutes=5)
+
+
+def _zona():
+    try:
+        return ZoneInfo(settings.RECORDATORIOS_ZONA_HORARIA)
+    except ZoneInfoNotFoundError:
+        logger.warning(f"Zona horaria {settings.RECORDATORIOS_ZONA_HORARIA} no disponible; se usa UTC")
+        return timezone.utc
+
+
+# --------- base de datos (sincrónico, se llama con asyncio.to_thread) ---------
+
+def recuperar_atascados() -> int:
+    t = RecordatorioCita.__table__
+    with SessionLocal() as db:
+        n = db.execute(
+            update(t)
+            .where(t.c.estado == ENVIANDO, t.c.tomado_en < datetime.now(timezone.utc) - _ATASCADO)
+            .values(estado=PENDIENTE, tomado_en=None)
+        ).rowcount
+        db.commit()
+    return n
+
+
+def reclamar(limite: int, id_comuna: int | None = None) -> list:
+    """Marca como 'enviando' hasta 'limite' recordatorios vencidos y los devuelve"""
+    t = RecordatorioCita.__table__
+    ahora = datetime.now(timezone.utc)
+    siguientes = select(t.c.id_recordatorio).where(t.c.estado == PENDIENTE, t.c.enviar_en <= ahora)
+    if id_comuna is not None:
+        siguientes = (siguientes
+                      .join(Paciente.__table__, Paciente.rut_paciente == t.c.rut_paciente)
+                      .where(Paciente.id_comuna == id_comuna))
+    siguientes = siguientes.order_by(t.c.enviar_en).limit(limite).with_for_update(of=t, skip_locked=True)
+
+    with SessionLocal() as db:
+        filas = db.execute(
+            update(t)
+            .where(t.c.id_recordatorio.in_(siguientes))
+            .values(estado=ENVIANDO, tomado_en=ahora, intentos=t.c.intentos + 1)
+            .returning(t.c.id_recordatorio, t.c.email, t.c.nombre_paciente, t.c.fecha_cita,
+                       t.c.nombre_medico, t.c.nombre_cesfam, t.c.intentos)
+        ).all()
+        db.commit()
+    return filas
+
+
+def guardar(enviados: list[int], fallidos: list[tuple[int, int, str, bool]]) -> None:
+    """fallidos: (id, intentos, error, definitivo)"""
+    t = RecordatorioCita.__table__
+    ahora = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        if enviados:
+            db.execute(
+                update(t).where(t.c.id_recordatorio.in_(enviados), t.c.estado == ENVIANDO)
+                .values(estado=ENVIADO, enviado_en=ahora, ultimo_error=None)
+            )
+        for id_recordatorio, intentos, error, definitivo in fallidos:
+            if definitivo or intentos >= settings.RECORDATORIOS_MAX_INTENTOS:
+                valores = dict(estado=ERROR)
+            else:
+                valores = dict(estado=PENDIENTE, enviar_en=ahora + _REINTENTO_BASE * 2 ** (intentos - 1))
+            db.execute(
+                update(t).where(t.c.id_recordatorio == id_recordatorio, t.c.estado == ENVIANDO)
+                .values(tomado_en=None, ultimo_error=error[:500], **valores)
+            )
+        db.commit()
+
+
+# --------- envío ---------
+
+def _mensaje(fila, zona):
+    cita = fila.fecha_cita
+    if cita.tzinfo is None:
+        cita = cita.replace(tzinfo=timezone.utc)
+    cita = cita.astimezone(zona)
+    datos = AppointmentReminder(
+        to=fila.email,
+        patient_name=fila.nombre_paciente,
+        appointment_date=cita.strftime("%d-%m-%Y"),
+        appointment_time=cita.strftime("%H:%M"),
+        doctor_name=fila.nombre_medico,
+        cesfam_name=fila.nombre_cesfam,
+    )
+    return email_service.construir_mensaje(email_service.armar_recordatorio_cita(datos))
+
+
+async def _enviar_lote(pool: PoolSMTP, lote: list, zona) -> tuple[int, int]:
+    async def uno(fila):
+        try:
+            mensaje = _mensaje(fila, zona)
+        except Exception as e:
+            return fila, f"No se pudo armar el recordatorio: {e}", True   # p.ej. email inválido: no se reintenta
+        try:
+            await pool.enviar(mensaje)
+            return fila, None, False
+        except aiosmtplib.SMTPRecipientsRefused as e:
+            return fila, f"Destinatario rechazado: {e}", True
+        except Exception as e:
+            return fila, f"{type(e).__name__}: {e}", False
+
+    enviados: list[int] = []
+    fallidos: list[tuple[int, int, str, bool]] = []
+    total_enviados = total_fallidos = 0
+    for tarea in asyncio.as_completed([uno(f) for f in lote]):
+        fila, error, definitivo = await tarea
+        if error is None:
+            enviados.append(fila.id_recordatorio)
+        else:
+            logger.warning(f"Recordatorio {fila.id_recordatorio}: {error}")
+            fallidos.append((fila.id_recordatorio, fila.intentos, error, definitivo))
+        if len(enviados) + len(fallidos) >= _GUARDAR_CADA:
+            await asyncio.to_thread(guardar, enviados, fallidos)
+            total_enviados += len(enviados); total_fallidos += len(fallidos)
+            enviados, fallidos = [], []
+    if enviados or fallidos:
+        await asyncio.to_thread(guardar, enviados, fallidos)
+        total_enviados += len(enviados); total_fallidos += len(fallidos)
+    return total_enviados, total_fallidos
+
+
+async def ejecutar(una_vez: bool = False, id_comuna: int | None = None,
+                   detener: threading.Event | None = None) -> dict:
+    """
+    Envía los recordatorios vencidos. Con una_vez=True termina cuando no quedan
+    (corrida diaria, p.ej. de una comuna); si no, espera RECORDATORIOS_POLL_SEGUNDOS
+    y vuelve a revisar hasta que se active 'detener'.
+    """
+    detener = detener or threading.Event()
+    zona = _zona()
+    totales = {"enviados": 0, "fallidos": 0, "lotes": 0}
+    inicio = datetime.now(timezone.utc)
+
+    async def revisar_atascados():
+        recuperados = await asyncio.to_thread(recuperar_atascados)
+        if recuperados:
+            logger.info(f"Recordatorios: {recuperados} atascados vuelven a pendiente")
+        return datetime.now(timezone.utc) + _REVISAR_ATASCADOS
+
+    proxima_revision = await revisar_atascados()
+    async with PoolSMTP() as pool:
+        while not detener.is_set():
+            if datetime.now(timezone.utc) >= proxima_revision:
+                # otro proceso pudo morir con filas tomadas mientras este sigue vivo
+                proxima_revision = await revisar_atascados()
+            lote = await asyncio.to_thread(reclamar, settings.RECORDATORIOS_LOTE, id_comuna)
+            if not lote:
+                if una_vez:
+                    break
+                await pool.cerrar()  # no dejar sesiones ociosas mientras se espera
+                await asyncio.to_thread(detener.wait, settings.RECORDATORIOS_POLL_SEGUNDOS)
+                continue
+            enviados, fallidos = await _enviar_lote(pool, lote, zona)
+            totales["enviados"] += enviados
+            totales["fallidos"] += fallidos
+            totales["lotes"] += 1
+            logger.info(f"Recordatorios: lote de {len(lote)} -> {enviados} enviados, {fallidos} fallidos")
+
+    totales["segundos"] = round((datetime.now(timezone.utc) - inicio).total_seconds(), 1)
+    return totales
+
+
+class EnviadorRecordatorios:
+    """Corre ejecutar() en un hilo propio dentro de la API (solo si RECORDATORIOS_EN_API)"""
+
+    def __init__(self):
+        self._hilo: threading.Thread | None = None
+        self._detener = threading.Event()
+
+    def start(self) -> None:
+        if self._hilo or not settings.RECORDATORIOS_EN_API:
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._correr, name="recordatorios", daemon=True)
+        self._hilo.start()
+        logger.info("Envío de recordatorios iniciado en el proceso de la API")
+
+    def stop(self) -> None:
+        if not self._hilo:
+            return
+        self._detener.set()
+        self._hilo.join(timeout=30)
+        self._hilo = None
+
+    def _correr(self) -> None:
+        try:
+            asyncio.run(ejecutar(detener=self._detener))
+        except Exception:
+            logger.exception("El envío de recordatorios se detuvo por un error")
+
+
+enviador = EnviadorRecordatorios()
@@ -0,0 +1,206 @@
+# app/jobs/reportes.py
+"""
+Runner de reportes: un pool acotado de hilos que toma solicitudes pendientes
+y genera su archivo.
+
+Cada hilo reclama una fila con FOR UPDATE SKIP LOCKED, así varios procesos de la
+API pueden correr el runner a la vez sin tomar la misma solicitud. Crear una
+solicitud despierta al pool; además se revisa la cola cada REPORTES_POLL_SEGUNDOS.
+
+Mientras genera, el runner renueva latido_en cada _LATIDO. Una solicitud
+'procesando' sin latido por más de _ATASCADA quedó de un proceso caído y vuelve
+a pendiente; las que siguen latiendo no se tocan, aunque tarden. iniciado_en
+identifica la toma: el resultado de un runner que perdió la solicitud no se guarda.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import logging
+import threading
+import time
+
+from sqlalchemy import and_, or_, select, update
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models.solicitud_reporte import SolicitudReporte
+from app.services import reporte_generador
+from app.services import solicitud_reporte as sr_svc
+
+logger = logging.getLogger(__name__)
+
+_LATIDO = timedelta(seconds=30)
+# Una solicitud 'procesando' sin latido por más de esto se considera abandonada (proceso caído)
+_ATASCADA = timedelta(minutes=2)
+# Filas tomadas antes de que existiera latido_en
+_ATASCADA_SIN_LATIDO = timedelta(minutes=30)
+
+
+class RunnerReportes:
+    def __init__(self):
+        self._executor: ThreadPoolExecutor | None = None
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._lock = threading.Lock()
+        self._proxima_revision = 0.0
+
+    def start(self, workers: int | None = None) -> None:
+        workers = workers or settings.REPORTES_WORKERS
+        if self._executor or workers <= 0:
+            return
+        self._detener.clear()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reportes")
+        for _ in range(workers):
+            self._executor.submit(self._loop)
+        logger.info(f"Runner de reportes iniciado con {workers} workers")
+
+    def stop(self) -> None:
+        if not self._executor:
+            return
+        self._detener.set()
+        self._despertar.set()
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def notificar(self) -> None:
+        """Avisa que hay trabajo nuevo (sin esperar al siguiente poll)"""
+        self._despertar.set()
+
+    # --------- internos ---------
+
+    def _loop(self) -> None:
+        while not self._detener.is_set():
+            self._revisar_atascadas()
+            try:
+                trabajo = self._tomar()
+            except Exception:
+                logger.exception("No se pudo leer la cola de reportes")
+                trabajo = None
+            if trabajo is None:
+                self._despertar.wait(settings.REPORTES_POLL_SEGUNDOS)
+                self._despertar.clear()
+                continue
+            self._procesar(trabajo)
+
+    def _tomar(self):
+        ahora = datetime.now(timezone.utc)
+        siguiente = (
+            select(SolicitudReporte.id_reporte)
+            .where(SolicitudReporte.estado == sr_svc.PENDIENTE)
+            .order_by(SolicitudReporte.creado_en)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(SolicitudReporte)
+            .where(SolicitudReporte.id_reporte == siguiente)
+            .values(estado=sr_svc.PROCESANDO, iniciado_en=ahora, latido_en=ahora)
+            .returning(
+                SolicitudReporte.id_reporte,
+                SolicitudReporte.iniciado_en,
+                SolicitudReporte.huella,
+                SolicitudReporte.tipo,
+                SolicitudReporte.formato,
+                SolicitudReporte.rango_desde,
+                SolicitudReporte.rango_hasta,
+            )
+        )
+        with SessionLocal() as db:
+            fila = db.execute(stmt).first()
+            db.commit()
+        return fila
+
+    @staticmethod
+    def _es_mia(trabajo):
+        return and_(
+            SolicitudReporte.id_reporte == trabajo.id_reporte,
+            SolicitudReporte.estado == sr_svc.PROCESANDO,  # no pisar si la editaron mientras tanto
+            SolicitudReporte.iniciado_en == trabajo.iniciado_en,  # ni si otro runner la retomó
+        )
+
+    def _latir(self, trabajo, listo: threading.Event) -> None:
+        while not listo.wait(_LATIDO.total_seconds()):
+            try:
+                with SessionLocal() as db:
+                    n = db.execute(
+                        update(SolicitudReporte)
+                        .where(self._es_mia(trabajo))
+                        .values(latido_en=datetime.now(timezone.utc))
+                    ).rowcount
+                    db.commit()
+                if not n:
+                    return
+            except Exception:
+                logger.exception(f"No se pudo renovar el latido del reporte {trabajo.id_reporte}")
+
+    def _procesar(self, trabajo) -> None:
+        valores = {}
+        listo = threading.Event()
+        latido = threading.Thread(target=self._latir, args=(trabajo, listo),
+                                  name=f"reporte-{trabajo.id_reporte}-latido", daemon=True)
+        latido.start()
+        try:
+            with SessionLocal() as db:
+                previo = trabajo.huella and sr_svc.artefacto_en_cache(db, trabajo.huella, trabajo.rango_hasta)
+                if previo:
+                    sha, size = previo.archivo_sha256, previo.archivo_bytes
+                else:
+                    sha, size = reporte_generador.generar(
+                        db.connection(), trabajo.tipo, trabajo.formato,
+                        trabajo.rango_desde, trabajo.rango_hasta,
+                    )
+            valores = dict(estado=sr_svc.LISTO, archivo_sha256=sha, archivo_bytes=size, error=None)
+            if previo:
+                valores["iniciado_en"] = previo.iniciado_en  # los datos son de cuando se leyó el original
+        except Exception as e:
+            logger.exception(f"Error generando el reporte {trabajo.id_reporte}")
+            valores = dict(estado=sr_svc.ERROR, error=str(e)[:500])
+        finally:
+            listo.set()
+            latido.join()
+
+        with SessionLocal() as db:
+            db.execute(
+                update(SolicitudReporte)
+                .where(self._es_mia(trabajo))
+                .values(terminado_en=datetime.now(timezone.utc), latido_en=None, **valores)
+            )
+            db.commit()
+
+    def _revisar_atascadas(self) -> None:
+        """_recuperar_atascadas a lo más una vez por _LATIDO entre todos los hilos"""
+        with self._lock:
+            if time.monotonic() < self._proxima_revision:
+                return
+            self._proxima_revision = time.monotonic() + _LATIDO.total_seconds()
+        self._recuperar_atascadas()
+
+    @staticmethod
+    def _stmt_recuperar(ahora: datetime):
+        t = SolicitudReporte
+        return (
+            update(t)
+            .where(
+                t.estado == sr_svc.PROCESANDO,
+                or_(
+                    t.latido_en < ahora - _ATASCADA,
+                    and_(t.latido_en.is_(None), t.iniciado_en < ahora - _ATASCADA_SIN_LATIDO),
+                ),
+            )
+            .values(estado=sr_svc.PENDIENTE, iniciado_en=None, latido_en=None)
+        )
+
+    def _recuperar_atascadas(self) -> None:
+        try:
+            with SessionLocal() as db:
+                n = db.execute(self._stmt_recuperar(datetime.now(timezone.utc))).rowcount
+                db.commit()
+            if n:
+                logger.info(f"Reportes: {n} atascados vuelven a pendiente")
+        except Exception:
+            logger.exception("No se pudieron recuperar reportes atascados")
+
+
+runner = RunnerReportes()
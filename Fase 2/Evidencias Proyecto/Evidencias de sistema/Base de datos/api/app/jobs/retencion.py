@@ -0,0 +1,441 @@
+# app/jobs/retencion.py
+"""
+Retención de las tablas que solo crecen: lo que pasó el horizonte de su
+política sale de la tabla y queda en archivo, con un resumen por día.
+
+    python -m app.jobs retencion                        # todas las políticas
+    python -m app.jobs retencion --politica eventos --destino parquet
+    python -m app.jobs retencion --simular              # cuánto se archivaría
+
+Políticas por fila (evento_gamificacion, descarga_reporte y los *_historial):
+lo anterior a RETENCION_*_DIAS sale en lotes de RETENCION_LOTE filas, en orden
+de clave. Cada lote es una transacción que:
+  1. toma las filas con FOR UPDATE SKIP LOCKED (no espera a nadie)
+  2. las borra y, con RETENCION_DESTINO=tabla, las inserta en archivo.<tabla>
+     (mismas columnas, sin índices). Con parquet se escriben antes en
+     RETENCION_DIR/<tabla>/<tabla>_<primera>_<ultima>.parquet (zstd)
+  3. suma lo borrado a retencion_resumen (filas y total por día y grupo) y,
+     si la tabla se sincroniza (sync.FUENTES), deja cada borrado en
+     sync_borrado como lo haría el ORM, para que las apps también lo suelten
+  4. guarda la última clave en retencion_checkpoint
+Las filas que otro proceso tiene tomadas se saltan en ese lote; la política no
+termina mientras quede alguna anterior al corte más allá de la última clave.
+Entre lotes espera RETENCION_PAUSA_MS, y cada transacción corre con
+lock_timeout: si otro proceso tiene la tabla tomada, el lote cede y se
+reintenta más tarde en vez de quedar en la cola de locks frenando a todos los
+que llegan detrás.
+
+mediciones (solo con RETENCION_MEDICION_MESES > 0): meses completos de
+medicion / medicion_detalle más antiguos que eso, y solo si todas sus alertas
+ya están resueltas o ignoradas. Se separan con particiones.separar() (DETACH,
+sin DELETE) después de dejar en sync_borrado una fila por medición; con
+destino tabla las particiones pasan tal cual al esquema archivo y con parquet
+se exportan y se borran con DROP. Lo que haya en las particiones default no
+se toca.
+
+El corte se fija al empezar y queda en el checkpoint: una corrida interrumpida
+(Ctrl+C, caída) sigue con el mismo corte desde la última clave guardada.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+import logging
+import os
+import threading
+
+from sqlalchemy import column, func, select, table, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+from app.db import Base, engine
+from app.jobs import particiones
+from app.models.retencion import RetencionCheckpoint
+from app.services import export_analitico
+from app.services.sync import FUENTES
+
+logger = logging.getLogger(__name__)
+
+ESQUEMA = "archivo"
+DESTINOS = ("tabla", "parquet")
+
+# Estados del checkpoint
+EN_CURSO = "en_curso"
+SEPARADA = "separada"      # mes de mediciones ya separado, falta moverlo al archivo
+COMPLETA = "completa"
+
+_LOCK = 0x52455445         # pg_try_advisory_lock(_LOCK, hashtext(politica)): una corrida por política
+_ALERTAS_ABIERTAS = ["nueva", "en_proceso"]
+
+
+@dataclass(frozen=True)
+class Politica:
+    tabla: str
+    clave: str            # PK entera: orden de los lotes y checkpoint
+    fecha: str            # columna que se compara con el corte
+    dias: str             # setting con el horizonte en días
+    grupo: str            # expresión SQL del grupo en retencion_resumen
+    total: str = "0"      # expresión SQL que se suma en retencion_resumen.total
+
+
+_RESULTADO = "CASE WHEN resultado THEN 'ok' ELSE 'fallido' END"
+
+POLITICAS = {
+    "eventos": Politica("evento_gamificacion", "id_evento", "fecha", "RETENCION_EVENTOS_DIAS", "tipo", "puntos"),
+    "descargas": Politica("descarga_reporte", "id_descarga", "descargado_en", "RETENCION_DESCARGAS_DIAS", "rut_medico"),
+    "paciente_historial": Politica("paciente_historial", "historial_id", "fecha_cambio",
+                                   "RETENCION_HISTORIAL_DIAS", _RESULTADO),
+    "cuidador_historial": Politica("cuidador_historial", "historial_id", "fecha_cambio",
+                                   "RETENCION_HISTORIAL_DIAS", _RESULTADO),
+    "medico_historial": Politica("medico_historial", "historial_id", "fecha_cambio",
+                                 "RETENCION_HISTORIAL_DIAS", _RESULTADO),
+}
+MEDICIONES = "mediciones"
+NOMBRES = (*POLITICAS, MEDICIONES)
+
+_SUMAR_RESUMEN = """
+    ON CONFLICT (tabla, dia, grupo) DO UPDATE
+    SET filas = retencion_resumen.filas + EXCLUDED.filas, total = retencion_resumen.total + EXCLUDED.total
+"""
+
+
+# --------- piezas comunes ---------
+
+def _columnas(tabla: str) -> list[str]:
+    return [c.name for c in Base.metadata.tables[tabla].columns]
+
+
+def _transaccion(fn, detener: threading.Event):
+    """
+    fn(conn) en una transacción con lock_timeout. Si no obtiene los locks a
+    tiempo, espera (cada vez más) y reintenta; devuelve None si se pidió detener.
+    """
+    espera = 1.0
+    while True:
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(f"SET LOCAL lock_timeout = {int(settings.RETENCION_LOCK_TIMEOUT_MS)}"))
+                return fn(conn)
+        except OperationalError as e:
+            if getattr(e.orig, "pgcode", None) != "55P03":   # lock_not_available
+                raise
+        logger.info(f"Retención: locks ocupados, reintento en {espera:.0f} s")
+        if detener.wait(espera):
+            return None
+        espera = min(espera * 2, 60.0)
+
+
+def _leer_checkpoint(conn: Connection, politica: str):
+    t = RetencionCheckpoint.__table__
+    return conn.execute(select(t).where(t.c.politica == politica)).mappings().first()
+
+
+def _guardar_checkpoint(conn: Connection, politica: str, **valores) -> None:
+    t = RetencionCheckpoint.__table__
+    valores["actualizado_en"] = datetime.now(timezone.utc)
+    stmt = pg_insert(t).values(politica=politica, **valores)
+    conn.execute(stmt.on_conflict_do_update(index_elements=[t.c.politica], set_=valores))
+
+
+def _asegurar_archivo(conn: Connection, tabla: str) -> None:
+    """archivo.<tabla> con las columnas de la original (sin índices ni defaults)"""
+    conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ESQUEMA}"))
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {ESQUEMA}.{tabla} (LIKE public.{tabla})"))
+    # columnas que la original ganó después de crear la de archivo
+    faltan = conn.execute(text("""
+        SELECT a.attname, format_type(a.atttypid, a.atttypmod)
+        FROM pg_attribute a
+        WHERE a.attrelid = CAST(:origen AS regclass) AND a.attnum > 0 AND NOT a.attisdropped
+          AND a.attname NOT IN (SELECT column_name FROM information_schema.columns
+                                WHERE table_schema = :esquema AND table_name = :tabla)
+        ORDER BY a.attnum
+    """), {"origen": f"public.{tabla}", "esquema": ESQUEMA, "tabla": tabla}).all()
+    for nombre, tipo in faltan:
+        conn.execute(text(f'ALTER TABLE {ESQUEMA}.{tabla} ADD COLUMN "{nombre}" {tipo}'))
+
+
+def _escribir_parquet(pa, lotes, schema, destino: Path) -> None:
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    tmp = destino.with_name(destino.name + ".tmp")
+    with pa.parquet.ParquetWriter(str(tmp), schema, compression="zstd") as writer:
+        for lote in lotes:
+            writer.write_batch(lote)
+    os.replace(tmp, destino)   # el archivo aparece completo o no aparece
+
+
+# --------- políticas por fila ---------
+
+def sql_lote(p: Politica, destino: str) -> str:
+    """Un lote completo en una sentencia: borrar, archivar, resumir"""
+    if destino == "tabla":
+        lote = (f"SELECT {p.clave} FROM {p.tabla} WHERE {p.fecha} < :corte AND {p.clave} > :desde "
+                f"ORDER BY {p.clave} LIMIT :lote FOR UPDATE SKIP LOCKED")
+        cols = ", ".join(f'"{c}"' for c in _columnas(p.tabla))
+        archivar = f",\n        archivadas AS (INSERT INTO {ESQUEMA}.{p.tabla} ({cols}) SELECT {cols} FROM movidas)"
+    else:  # parquet: esas claves ya quedaron en el archivo
+        lote = f"SELECT {p.clave} FROM {p.tabla} WHERE {p.clave} = ANY(:claves) FOR UPDATE"
+        archivar = ""
+    if p.tabla in FUENTES:
+        # el DELETE directo no pasa por el after_delete del ORM: el borrado para GET /sync va aquí
+        archivar += (f",\n        borrados AS (INSERT INTO sync_borrado (tabla, clave, rut_paciente) "
+                     f"SELECT :tabla, CAST({FUENTES[p.tabla][1].key} AS text), rut_paciente FROM movidas)")
+    return f"""
+        WITH lote AS ({lote}),
+        movidas AS (
+            DELETE FROM {p.tabla} t USING lote WHERE t.{p.clave} = lote.{p.clave}
+            RETURNING t.*
+        ){archivar},
+        resumen AS (
+            INSERT INTO retencion_resumen (tabla, dia, grupo, filas, total)
+            SELECT :tabla, CAST({p.fecha} AT TIME ZONE 'UTC' AS date), {p.grupo}, count(*), coalesce(sum({p.total}), 0)
+            FROM movidas GROUP BY 2, 3
+            {_SUMAR_RESUMEN}
+        )
+        SELECT count(*), max({p.clave}) FROM movidas
+    """
+
+
+def _exportar_lote(pa, p: Politica, corte: datetime, desde: int) -> list[int]:
+    """Escribe el siguiente lote a Parquet y devuelve sus claves"""
+    t = Base.metadata.tables[p.tabla]
+    stmt = (select(t).where(t.c[p.fecha] < corte, t.c[p.clave] > desde)
+            .order_by(t.c[p.clave]).limit(settings.RETENCION_LOTE))
+    schema = export_analitico._schema(pa, stmt)
+    with engine.connect() as conn:
+        filas = conn.execute(stmt).all()
+    if not filas:
+        return []
+    claves = [f._mapping[p.clave] for f in filas]
+    lote = pa.RecordBatch.from_arrays(
+        [pa.array(col, type=field.type) for col, field in zip(zip(*filas), schema)], schema=schema)
+    archivo = Path(settings.RETENCION_DIR) / p.tabla / f"{p.tabla}_{claves[0]:012d}_{claves[-1]:012d}.parquet"
+    _escribir_parquet(pa, [lote], schema, archivo)
+    return claves
+
+
+def _quedan(conn: Connection, p: Politica, corte: datetime, desde: int) -> bool:
+    t = Base.metadata.tables[p.tabla]
+    return conn.execute(select(
+        select(t.c[p.clave]).where(t.c[p.fecha] < corte, t.c[p.clave] > desde).exists()
+    )).scalar_one()
+
+
+def _archivar_filas(nombre: str, p: Politica, destino: str, detener: threading.Event) -> int:
+    dias = getattr(settings, p.dias)
+    if dias <= 0:
+        return 0
+    with engine.begin() as conn:
+        cp = _leer_checkpoint(conn, nombre)
+        if cp and cp["estado"] == EN_CURSO:
+            corte, desde, filas = cp["corte"], cp["ultima_clave"], cp["filas"]
+            logger.info(f"Retención {nombre}: se retoma desde {p.clave} > {desde} (corte {corte:%Y-%m-%d})")
+        else:
+            corte, desde, filas = datetime.now(timezone.utc) - timedelta(days=dias), 0, 0
+            _guardar_checkpoint(conn, nombre, estado=EN_CURSO, corte=corte, ultima_clave=0, filas=0)
+        if destino == "tabla":
+            _asegurar_archivo(conn, p.tabla)
+
+    pa = export_analitico._pyarrow() if destino == "parquet" else None
+    sql = text(sql_lote(p, destino))
+    movidas = 0
+    espera = 1.0
+    while not detener.is_set():
+        params = {"corte": corte, "desde": desde, "lote": settings.RETENCION_LOTE, "tabla": p.tabla}
+        if pa:
+            params["claves"] = _exportar_lote(pa, p, corte, desde)
+            if not params["claves"]:
+                break
+
+        def lote(conn):
+            n, ultima = conn.execute(sql, params).one()
+            # con parquet se avanza aunque otro proceso haya borrado esas filas antes
+            ultima = max(params["claves"]) if pa else ultima
+            if ultima is not None:
+                _guardar_checkpoint(conn, nombre, estado=EN_CURSO, corte=corte, ultima_clave=ultima, filas=filas + n)
+            return n, ultima
+
+        r = _transaccion(lote, detener)
+        if r is None:
+            break
+        n, ultima = r
+        if ultima is None:
+            # lote vacío: o no queda nada, o todo lo que queda está tomado (SKIP LOCKED)
+            with engine.connect() as conn:
+                if not _quedan(conn, p, corte, desde):
+                    break
+            logger.info(f"Retención {nombre}: las filas restantes están bloqueadas, reintento en {espera:.0f} s")
+            if detener.wait(espera):
+                break
+            espera = min(espera * 2, 60.0)
+            continue
+        espera = 1.0
+        desde, filas, movidas = ultima, filas + n, movidas + n
+        if n:
+            logger.info(f"Retención {nombre}: {n} filas archivadas (hasta {p.clave} {ultima})")
+        if detener.wait(settings.RETENCION_PAUSA_MS / 1000):
+            break
+
+    if not detener.is_set():
+        with engine.begin() as conn:
+            _guardar_checkpoint(conn, nombre, estado=COMPLETA, corte=corte, ultima_clave=desde, filas=filas)
+    return movidas
+
+
+# --------- mediciones (meses completos) ---------
+
+def meses_vencidos(conn: Connection) -> list[date]:
+    """Meses con partición que ya pasaron RETENCION_MEDICION_MESES"""
+    limite = particiones.sumar_meses(particiones.mes_de(datetime.now(timezone.utc)),
+                                     -settings.RETENCION_MEDICION_MESES)
+    meses = []
+    for p in particiones.listar(conn):
+        try:
+            mes = datetime.strptime(p.nombre, "medicion_p%Y_%m").date()
+        except ValueError:
+            continue   # medicion_default y las del detalle
+        if mes < limite:
+            meses.append(mes)
+    return sorted(meses)
+
+
+def _resumir_mes(conn: Connection, medicion: str, detalle: str) -> int:
+    n = conn.execute(text(f"SELECT count(*) FROM {medicion}")).scalar_one()
+    conn.execute(text(f"""
+        INSERT INTO retencion_resumen (tabla, dia, grupo, filas, total)
+        SELECT 'medicion', CAST(fecha_registro AT TIME ZONE 'UTC' AS date), severidad_max || '/' || estado_alerta,
+               count(*), count(*) FILTER (WHERE tiene_alerta)
+        FROM {medicion} GROUP BY 2, 3
+        {_SUMAR_RESUMEN}
+    """))
+    conn.execute(text(f"""
+        INSERT INTO retencion_resumen (tabla, dia, grupo, filas, total)
+        SELECT 'medicion_detalle', CAST(fecha_registro AT TIME ZONE 'UTC' AS date), CAST(id_parametro AS text),
+               count(*), count(*) FILTER (WHERE fuera_rango)
+        FROM {detalle} GROUP BY 2, 3
+        {_SUMAR_RESUMEN}
+    """))
+    return n
+
+
+def _exportar_tabla(pa, tabla: str, nombre: str) -> None:
+    origen = table(nombre, *[column(c.name, c.type) for c in Base.metadata.tables[tabla].columns])
+    stmt = select(origen)
+    schema = export_analitico._schema(pa, stmt)
+    _escribir_parquet(pa, export_analitico._iter_batches(pa, stmt, schema), schema,
+                      Path(settings.RETENCION_DIR) / tabla / f"{nombre}.parquet")
+
+
+def _archivar_mes(mes: date, separado: bool, destino: str, detener: threading.Event) -> int:
+    politica = f"{MEDICIONES}:{mes:%Y-%m}"
+    nombres = {t: particiones.nombre(t, mes) for t in particiones.TABLAS}
+
+    if not separado:
+        def separar(conn):
+            abiertas = conn.execute(text(
+                f"SELECT count(*) FROM {nombres['medicion']} WHERE tiene_alerta AND estado_alerta = ANY(:abiertas)"
+            ), {"abiertas": _ALERTAS_ABIERTAS}).scalar_one()
+            if abiertas:
+                logger.warning(f"Retención: {nombres['medicion']} tiene {abiertas} alertas abiertas; se deja")
+                return -1
+            n = _resumir_mes(conn, nombres["medicion"], nombres["medicion_detalle"])
+            particiones.separar(conn, mes)  # deja también los sync_borrado de cada medición
+            _guardar_checkpoint(conn, politica, estado=SEPARADA, corte=None, ultima_clave=0, filas=n)
+            return n
+
+        n = _transaccion(separar, detener)
+        if n is None or n < 0:
+            return 0
+    else:
+        with engine.connect() as conn:
+            n = _leer_checkpoint(conn, politica)["filas"]
+
+    # separadas: ya no las ve ninguna consulta, así que moverlas no bloquea a nadie
+    if destino == "parquet":
+        pa = export_analitico._pyarrow()
+        for tabla, nombre in nombres.items():
+            _exportar_tabla(pa, tabla, nombre)
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ESQUEMA}"))
+        for nombre in nombres.values():
+            if destino == "tabla":
+                conn.execute(text(f"ALTER TABLE {nombre} SET SCHEMA {ESQUEMA}"))
+            else:
+                conn.execute(text(f"DROP TABLE {nombre}"))
+        _guardar_checkpoint(conn, politica, estado=COMPLETA, corte=None, ultima_clave=0, filas=n)
+    logger.info(f"Retención {MEDICIONES}: {mes:%Y-%m} archivado ({n} mediciones)")
+    return n
+
+
+def _archivar_mediciones(destino: str, detener: threading.Event) -> int:
+    if settings.RETENCION_MEDICION_MESES <= 0:
+        return 0
+    t = RetencionCheckpoint.__table__
+    with engine.connect() as conn:
+        # meses que quedaron separados en una corrida anterior
+        pendientes = {
+            datetime.strptime(p, f"{MEDICIONES}:%Y-%m").date()
+            for p in conn.execute(select(t.c.politica).where(t.c.politica.like(f"{MEDICIONES}:%"),
+                                                             t.c.estado == SEPARADA)).scalars()
+        }
+        meses = sorted(pendientes | set(meses_vencidos(conn)))
+    movidas = 0
+    for mes in meses:
+        if detener.is_set():
+            break
+        movidas += _archivar_mes(mes, mes in pendientes, destino, detener)
+    return movidas
+
+
+# --------- entrada ---------
+
+def simular(politicas: list[str] | None = None) -> dict[str, int]:
+    """Filas (o meses, para mediciones) que saldrían hoy, sin tocar nada"""
+    resultado = {}
+    with engine.connect() as conn:
+        for nombre in politicas or NOMBRES:
+            if nombre == MEDICIONES:
+                resultado[nombre] = len(meses_vencidos(conn)) if settings.RETENCION_MEDICION_MESES > 0 else 0
+                continue
+            p = POLITICAS[nombre]
+            dias = getattr(settings, p.dias)
+            t = Base.metadata.tables[p.tabla]
+            corte = datetime.now(timezone.utc) - timedelta(days=dias)
+            resultado[nombre] = (conn.execute(select(func.count()).select_from(t).where(t.c[p.fecha] < corte))
+                                 .scalar_one() if dias > 0 else 0)
+    return resultado
+
+
+def ejecutar(politicas: list[str] | None = None, destino: str | None = None,
+             detener: threading.Event | None = None) -> dict[str, int]:
+    """Corre las políticas pedidas (todas por defecto); devuelve filas archivadas por política"""
+    destino = destino or settings.RETENCION_DESTINO
+    if destino not in DESTINOS:
+        raise ValueError(f"Destino no soportado: {destino}")
+    politicas = list(politicas or NOMBRES)
+    desconocidas = set(politicas) - set(NOMBRES)
+    if desconocidas:
+        raise ValueError(f"Políticas desconocidas: {', '.join(sorted(desconocidas))}")
+    if destino == "parquet":
+        export_analitico._pyarrow()   # falla antes de empezar si no está instalado
+    detener = detener or threading.Event()
+
+    totales = {}
+    for nombre in politicas:
+        if detener.is_set():
+            break
+        # conexión aparte y en autocommit: sostiene el lock sin dejar una transacción abierta
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock:
+            if not lock.scalar(text("SELECT pg_try_advisory_lock(:k, hashtext(:p))"), {"k": _LOCK, "p": nombre}):
+                logger.warning(f"Retención {nombre}: otra corrida la tiene tomada; se salta")
+                continue
+            try:
+                if nombre == MEDICIONES:
+                    totales[nombre] = _archivar_mediciones(destino, detener)
+                else:
+                    totales[nombre] = _archivar_filas(nombre, POLITICAS[nombre], destino, detener)
+            finally:
+                lock.execute(text("SELECT pg_advisory_unlock(:k, hashtext(:p))"), {"k": _LOCK, "p": nombre})
+    return totales
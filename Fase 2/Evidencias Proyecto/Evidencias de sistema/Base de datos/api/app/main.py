@@ -1,11 +1,43 @@
 # app/main.py
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.config import settings
 from app.db import Base, engine
+from app.jobs.reportes import runner as reportes_runner
+from app.jobs.descargas import buffer_descargas
+from app.jobs.recordatorios import enviador as recordatorios_enviador
+from app.jobs.particiones import mantenedor as particiones_mantenedor
+from app.services.notificaciones import agregador as alertas_agregador
+from app.services import importacion
+from app.core.catalog_cache import catalog_cache
+from app.core.idempotencia import IdempotenciaMiddleware
+from app.core import consultas_lentas, metrics, n_mas_uno
+from app.core.perfilador import PerfiladorMiddleware
 from app.routes import ALL_ROUTERS
 
-app = FastAPI(title="CuidaSalud API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    catalog_cache.start()  # precarga catálogos + LISTEN de invalidaciones
+    reportes_runner.start()  # no hace nada si REPORTES_WORKERS=0
+    buffer_descargas.start()
+    recordatorios_enviador.start()  # solo si RECORDATORIOS_EN_API; si no, python -m app.jobs recordatorios
+    alertas_agregador.start()
+    particiones_mantenedor.start()  # meses futuros de medicion/medicion_detalle
+    yield
+    particiones_mantenedor.stop()
+    alertas_agregador.stop()  # envía los resúmenes pendientes
+    recordatorios_enviador.stop()
+    reportes_runner.stop()
+    buffer_descargas.stop()
+    catalog_cache.stop()
+    importacion.cerrar()  # pool de procesos de bcrypt, si se llegó a usar
+
+app = FastAPI(title="CuidaSalud API", version="1.0.0", lifespan=lifespan)
 
 # ⚠️ DEV-ONLY: DROP & CREATE en cada arranque (ojo con esto en prod)
 # Base.metadata.drop_all(bind=engine)
@@ -19,6 +51,9 @@ ALLOWED_ORIGINS = [
     "http://127.0.0.1:5173",
 ]
 
+# Idempotency-Key en POST (reintentos de la app móvil); va dentro de CORS
+app.add_middleware(IdempotenciaMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,   # <- NO "*"
@@ -28,9 +63,27 @@ app.add_middleware(
     expose_headers=["*"],            # opcional
 )
 
+# Detector de N+1 (N_MAS_UNO=log|raise, solo desarrollo)
+if settings.N_MAS_UNO:
+    n_mas_uno.instalar(engine)
+    app.add_middleware(n_mas_uno.NMasUnoMiddleware)
+
+# Perfil de un request puntual (X-Perfilar: 1 + X-Admin-Token), ver GET /admin/perfiles
+app.add_middleware(PerfiladorMiddleware)
+
+# Latencia y SQL por ruta (GET /metrics, header Server-Timing); va por fuera de todo
+metrics.instalar(engine)
+consultas_lentas.instalar(engine)  # GET /admin/sql-lentas
+app.add_middleware(metrics.MetricasMiddleware)
+
 for r in ALL_ROUTERS:
     app.include_router(r)
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    """Métricas en formato texto de Prometheus"""
+    return PlainTextResponse(metrics.registro.exportar(), media_type="text/plain; version=0.0.4")
@@ -21,4 +21,10 @@ from .nota_clinica import NotaClinica
 from .medicion import Medicion
 from .medicion_detalle import MedicionDetalle
 from .medicina import Medicina
-from .medicina_detalle import MedicinaDetalle
\ No newline at end of file
+from .medicina_detalle import MedicinaDetalle
+from .sync import SyncBorrado, SyncMarca
+from .idempotencia import Idempotencia
+from .toma_medicamento import TomaMedicamento
+from .adherencia_semanal import AdherenciaSemanal
+from .recordatorio_cita import RecordatorioCita
+from .retencion import RetencionResumen, RetencionCheckpoint
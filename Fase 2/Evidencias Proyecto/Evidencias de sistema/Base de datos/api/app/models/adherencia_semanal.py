@@ -0,0 +1,12 @@
+# app/models/adherencia_semanal.py
+from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from app.db import Base
+
+class AdherenciaSemanal(Base):
+    """Totales por paciente y semana, mantenidos al escribir (ver app/services/adherencia.py)"""
+    __tablename__ = "adherencia_semanal"
+
+    rut_paciente = Column(String, ForeignKey("paciente.rut_paciente", ondelete="CASCADE"), primary_key=True)
+    semana = Column(Date, primary_key=True)  # lunes de la semana (UTC)
+    dosis_programadas = Column(Integer, nullable=False, default=0)
+    dosis_tomadas = Column(Integer, nullable=False, default=0)
@@ -1,7 +1,8 @@
 # app/models/evento_gamificacion.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db import Base
+from app.models.sync import columna_version_sync
 
 class EventoGamificacion(Base):
     __tablename__ = "evento_gamificacion"
@@ -11,5 +12,10 @@ class EventoGamificacion(Base):
     tipo = Column(String, nullable=False)
     puntos = Column(Integer, nullable=False)
     fecha = Column(DateTime(timezone=True), nullable=False)
+    version_sync = columna_version_sync()  # GET /sync
 
     paciente = relationship("Paciente", back_populates="eventos_gamificacion", lazy="joined")
+
+# Línea de tiempo del paciente: eventos por RUT en orden de fecha
+Index("ix_evento_gamificacion_rut_fecha", EventoGamificacion.rut_paciente, EventoGamificacion.fecha)
+Index("ix_evento_gamificacion_rut_version_sync", EventoGamificacion.rut_paciente, EventoGamificacion.version_sync)
@@ -1,7 +1,8 @@
 # app/models/gamificacion_perfil.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db import Base
+from app.models.sync import columna_version_sync
 
 class GamificacionPerfil(Base):
     __tablename__ = "gamificacion_perfil"
@@ -10,5 +11,8 @@ class GamificacionPerfil(Base):
     puntos = Column(Integer, nullable=False)
     racha_dias = Column(Integer, nullable=False)
     ultima_actividad = Column(DateTime(timezone=True), nullable=False)
+    version_sync = columna_version_sync()  # GET /sync
 
     paciente = relationship("Paciente", back_populates="gamificacion", lazy="joined")
+
+Index("ix_gamificacion_perfil_rut_version_sync", GamificacionPerfil.rut_paciente, GamificacionPerfil.version_sync)
@@ -0,0 +1,19 @@
+# app/models/idempotencia.py
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+from app.db import Base
+
+class Idempotencia(Base):
+    """Respuesta guardada de un POST con header Idempotency-Key (ver app/core/idempotencia.py)"""
+    __tablename__ = "idempotencia"
+
+    sujeto = Column(String(64), primary_key=True)     # sha256 del Authorization ('' = anónimo)
+    clave = Column(String(255), primary_key=True)
+    huella = Column(String(64), nullable=False)       # sha256 de método + ruta + query + cuerpo
+    estado = Column(String, nullable=False)           # en_proceso | completada
+    token = Column(String(32), nullable=True)         # request dueño mientras está en proceso
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String, nullable=True)
+    cuerpo = Column(LargeBinary, nullable=True)
+    creada_en = Column(DateTime(timezone=True), nullable=False)
+    latido_en = Column(DateTime(timezone=True), nullable=False)   # lo renueva el request dueño
+    expira_en = Column(DateTime(timezone=True), nullable=False, index=True)
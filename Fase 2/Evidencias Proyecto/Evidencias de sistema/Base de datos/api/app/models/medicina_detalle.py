@@ -1,7 +1,8 @@
 # app/models/medicina_detalle.py
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db import Base
+from app.models.sync import columna_version_sync
 
 class MedicinaDetalle(Base):
     __tablename__ = "medicina_detalle"
@@ -14,8 +15,14 @@ class MedicinaDetalle(Base):
     instrucciones_toma = Column(String, nullable=False)
     fecha_inicio = Column(DateTime(timezone=True), nullable=False)
     fecha_fin = Column(DateTime(timezone=True), nullable=False)
+    intervalo_horas = Column(Integer, nullable=True)  # una dosis cada N horas desde fecha_inicio; NULL = dosis única
     tomada = Column(Boolean, nullable=False)
     fecha_tomada = Column(DateTime(timezone=True), nullable=True)
+    version_sync = columna_version_sync()  # GET /sync
 
     medicina = relationship("Medicina", back_populates="detalles", lazy="joined")
     paciente = relationship("Paciente", back_populates="medicina_detalles", lazy="joined")
+
+Index("ix_medicina_detalle_rut_version_sync", MedicinaDetalle.rut_paciente, MedicinaDetalle.version_sync)
+# dosis pendientes de los pacientes de un cuidador (GET /cuidador/{rut}/dosis-pendientes)
+Index("ix_medicina_detalle_rut_inicio_tomada", MedicinaDetalle.rut_paciente, MedicinaDetalle.fecha_inicio, MedicinaDetalle.tomada)
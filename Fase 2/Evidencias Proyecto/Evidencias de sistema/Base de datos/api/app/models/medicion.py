@@ -2,6 +2,7 @@
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db import Base
+from app.models.sync import columna_version_sync
 
 class Medicion(Base):
     __tablename__ = "medicion"
@@ -11,7 +12,8 @@ class Medicion(Base):
     rut_paciente = Column(String, ForeignKey("paciente.rut_paciente", ondelete="RESTRICT"), nullable=False, index=True)  # ← String
     id_reporte = Column(Integer, ForeignKey("solicitud_reporte.id_reporte", ondelete="RESTRICT"), nullable=True, index=True)
 
-    fecha_registro = Column(DateTime(timezone=True), nullable=False)
+    # Clave de partición (un mes por partición, ver app/jobs/particiones.py): va en la PK
+    fecha_registro = Column(DateTime(timezone=True), primary_key=True)
     origen = Column(String, nullable=False)
     registrado_por = Column(String, nullable=False)
     observacion = Column(String, nullable=False)
@@ -27,6 +29,7 @@ class Medicion(Base):
     tomada_en = Column(DateTime(timezone=True), nullable=True)
     resuelta_en = Column(DateTime(timezone=True), nullable=True)
     ignorada_en = Column(DateTime(timezone=True), nullable=True)
+    version_sync = columna_version_sync()  # GET /sync
 
     solicitud = relationship("SolicitudReporte", back_populates="mediciones", lazy="joined")
     paciente = relationship("Paciente", lazy="joined")
@@ -34,5 +37,11 @@ class Medicion(Base):
 
     detalles = relationship("MedicionDetalle", back_populates="medicion", cascade="all,delete-orphan", passive_deletes=True)
 
+    __table_args__ = {"postgresql_partition_by": "RANGE (fecha_registro)"}
+    # En el ORM la identidad sigue siendo solo el id (db.get(Medicion, id)); la secuencia lo hace único
+    __mapper_args__ = {"primary_key": [id_medicion]}
+
 Index("ix_medicion_alerta_estado_fecha", Medicion.tiene_alerta, Medicion.estado_alerta, Medicion.fecha_registro.desc())
 Index("ix_medicion_tomada_por_estado", Medicion.tomada_por, Medicion.estado_alerta)
+Index("ix_medicion_rut_fecha", Medicion.rut_paciente, Medicion.fecha_registro)
+Index("ix_medicion_rut_version_sync", Medicion.rut_paciente, Medicion.version_sync)
@@ -1,12 +1,14 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, ForeignKeyConstraint, Float
 from sqlalchemy.orm import relationship
 from app.db import Base
 
 class MedicionDetalle(Base):
     __tablename__ = "medicion_detalle"
 
-    id_detalle = Column(Integer, primary_key=True, index=True)
-    id_medicion = Column(Integer, ForeignKey("medicion.id_medicion", ondelete="CASCADE"), nullable=False, index=True)
+    id_detalle = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id_medicion = Column(Integer, nullable=False, index=True)
+    # Copia de medicion.fecha_registro: el detalle cae en la partición del mismo mes que su medición
+    fecha_registro = Column(DateTime(timezone=True), primary_key=True)
     id_parametro = Column(Integer, ForeignKey("parametro_clinico.id_parametro", ondelete="RESTRICT"), nullable=False, index=True)
     id_unidad = Column(Integer, ForeignKey("unidad_medida.id_unidad", ondelete="RESTRICT"), nullable=False, index=True)
 
@@ -24,3 +26,11 @@ class MedicionDetalle(Base):
 
     # Acceso al paciente (no hay FK directa en DDL; lo exponemos vía relación inversa en Paciente con viewonly)
     #paciente = relationship("Paciente", viewonly=True, primaryjoin="Medicion.rut_paciente==SolicitudReporte.rut_paciente", uselist=False)
+
+    __table_args__ = (
+        # ON UPDATE CASCADE: si cambia la fecha de la medición, sus detalles la siguen de partición
+        ForeignKeyConstraint(["id_medicion", "fecha_registro"], ["medicion.id_medicion", "medicion.fecha_registro"],
+                             ondelete="CASCADE", onupdate="CASCADE"),
+        {"postgresql_partition_by": "RANGE (fecha_registro)"},
+    )
+    __mapper_args__ = {"primary_key": [id_detalle]}
@@ -1,7 +1,9 @@
 # app/models/nota_clinica.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from app.db import Base
+from app.models.sync import columna_version_sync
 
 class NotaClinica(Base):
     __tablename__ = "nota_clinica"
@@ -14,7 +16,16 @@ class NotaClinica(Base):
     tipo_nota = Column(String, nullable=False)
     creada_en = Column(DateTime(timezone=True), nullable=False)
     id_cesfam = Column(Integer, ForeignKey("cesfam.id_cesfam"))
+    version_sync = columna_version_sync()  # GET /sync
+
+    # Columna generada por Postgres: se recalcula sola en cada INSERT/UPDATE de "nota".
+    # deferred: solo se usa para filtrar, no se carga en los objetos.
+    nota_tsv = deferred(Column(TSVECTOR, Computed("to_tsvector('spanish', coalesce(nota, ''))", persisted=True)))
 
     paciente = relationship("Paciente", back_populates="notas", lazy="joined")
     medico = relationship("EquipoMedico", back_populates="notas", lazy="joined")
     cesfam = relationship("Cesfam", back_populates="notas", viewonly=True)
+
+Index("ix_nota_clinica_nota_tsv", NotaClinica.nota_tsv, postgresql_using="gin")
+Index("ix_nota_clinica_rut_creada_en", NotaClinica.rut_paciente, NotaClinica.creada_en)
+Index("ix_nota_clinica_rut_version_sync", NotaClinica.rut_paciente, NotaClinica.version_sync)
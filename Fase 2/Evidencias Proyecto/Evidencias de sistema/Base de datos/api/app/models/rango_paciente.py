@@ -1,7 +1,8 @@
 # app/models/rango_paciente.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.db import Base
+from app.models.sync import columna_version_sync
 
 class RangoPaciente(Base):
     __tablename__ = "rango_paciente"
@@ -18,6 +19,9 @@ class RangoPaciente(Base):
     vigencia_hasta = Column(DateTime(timezone=True), nullable=False)
     version = Column(Integer, nullable=False)
     definido_por = Column(Boolean, nullable=False)
+    version_sync = columna_version_sync()  # GET /sync
 
     paciente = relationship("Paciente", lazy="joined")
     parametro = relationship("ParametroClinico", back_populates="rangos", lazy="joined")
+
+Index("ix_rango_paciente_rut_version_sync", RangoPaciente.rut_paciente, RangoPaciente.version_sync)
@@ -0,0 +1,27 @@
+# app/models/recordatorio_cita.py
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from app.db import Base
+
+class RecordatorioCita(Base):
+    """Recordatorio de cita por enviar; lo despacha en lotes app/jobs/recordatorios.py"""
+    __tablename__ = "recordatorio_cita"
+
+    id_recordatorio = Column(Integer, primary_key=True, index=True)
+    rut_paciente = Column(String, ForeignKey("paciente.rut_paciente", ondelete="CASCADE"), nullable=False, index=True)
+    email = Column(String, nullable=False)
+    nombre_paciente = Column(String, nullable=False)
+    fecha_cita = Column(DateTime(timezone=True), nullable=False)
+    nombre_medico = Column(String, nullable=False)
+    nombre_cesfam = Column(String, nullable=False)
+
+    # Envío: pendiente -> enviando -> enviado | error
+    enviar_en = Column(DateTime(timezone=True), nullable=False)
+    estado = Column(String, nullable=False)
+    intentos = Column(Integer, nullable=False, default=0)
+    ultimo_error = Column(String, nullable=True)
+    tomado_en = Column(DateTime(timezone=True), nullable=True)
+    enviado_en = Column(DateTime(timezone=True), nullable=True)
+    creado_en = Column(DateTime(timezone=True), nullable=False)
+
+# Cola: el job toma los pendientes cuya hora de envío ya llegó
+Index("ix_recordatorio_cita_estado_enviar_en", RecordatorioCita.estado, RecordatorioCita.enviar_en)
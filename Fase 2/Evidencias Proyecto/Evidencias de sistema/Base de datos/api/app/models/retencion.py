@@ -0,0 +1,24 @@
+# app/models/retencion.py
+from sqlalchemy import Column, String, Date, DateTime, BigInteger
+from app.db import Base
+
+class RetencionResumen(Base):
+    """Totales por día de las filas que la retención sacó de las tablas (ver app/jobs/retencion.py)"""
+    __tablename__ = "retencion_resumen"
+
+    tabla = Column(String, primary_key=True)
+    dia = Column(Date, primary_key=True)          # día UTC de la fecha de la fila
+    grupo = Column(String, primary_key=True)      # según la política: tipo de evento, médico, severidad/estado...
+    filas = Column(BigInteger, nullable=False, default=0)
+    total = Column(BigInteger, nullable=False, default=0)  # suma de la columna de la política (puntos, fuera de rango)
+
+class RetencionCheckpoint(Base):
+    """Avance de cada política; una corrida interrumpida sigue desde aquí"""
+    __tablename__ = "retencion_checkpoint"
+
+    politica = Column(String, primary_key=True)   # "eventos", "mediciones:2023-01", ...
+    estado = Column(String, nullable=False)       # en_curso | separada | completa
+    corte = Column(DateTime(timezone=True), nullable=True)   # se archiva lo anterior a esto
+    ultima_clave = Column(BigInteger, nullable=False, default=0)
+    filas = Column(BigInteger, nullable=False, default=0)
+    actualizado_en = Column(DateTime(timezone=True), nullable=False)
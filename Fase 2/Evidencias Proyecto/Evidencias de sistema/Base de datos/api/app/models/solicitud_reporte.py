@@ -1,5 +1,5 @@
 # app/models/solicitud_reporte.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db import Base
 
@@ -15,7 +15,19 @@ class SolicitudReporte(Base):
     estado = Column(String, nullable=False)
     creado_en = Column(DateTime(timezone=True), nullable=False)
 
+    # Ejecución del reporte (la llena el runner de app/jobs/reportes.py)
+    huella = Column(String(64), nullable=True, index=True)            # sha256 de tipo/formato/rango
+    archivo_sha256 = Column(String(64), nullable=True)                # artefacto direccionado por contenido
+    archivo_bytes = Column(Integer, nullable=True)
+    error = Column(String, nullable=True)
+    iniciado_en = Column(DateTime(timezone=True), nullable=True)
+    terminado_en = Column(DateTime(timezone=True), nullable=True)
+    latido_en = Column(DateTime(timezone=True), nullable=True)        # lo renueva el runner mientras procesa
+
     medico = relationship("EquipoMedico", back_populates="solicitudes", lazy="joined")
     # Relación paciente eliminada
     descargas = relationship("DescargaReporte", back_populates="reporte", viewonly=True)
     mediciones = relationship("Medicion", back_populates="solicitud", viewonly=True)
+
+# Cola de trabajos: el runner toma las pendientes en orden de llegada
+Index("ix_solicitud_reporte_estado_creado_en", SolicitudReporte.estado, SolicitudReporte.creado_en)
@@ -0,0 +1,44 @@
+# app/models/sync.py
+"""
+Soporte para la sincronización incremental (GET /sync).
+
+Las tablas que se sincronizan tienen una columna version_sync que toma un valor
+nuevo de la secuencia global sync_version_seq en cada INSERT y UPDATE. Los
+borrados quedan registrados en sync_borrado con su propia versión.
+
+La versión se toma con sync_version_next(), que antes del nextval le asigna
+un xid a la transacción: así sync_marca puede saber cuándo ya terminaron todas
+las transacciones que tomaron versiones hasta cierto número (ver
+app/services/sync.py, version_visible).
+"""
+from sqlalchemy import Column, BigInteger, String, DateTime, Sequence, text, func
+
+from app.db import Base
+
+SYNC_SEQ = Sequence("sync_version_seq", metadata=Base.metadata)
+_NEXTVAL = text("sync_version_next()")
+
+
+def columna_version_sync() -> Column:
+    # onupdate con expresión SQL: también aplica a los update() de Core
+    return Column(BigInteger, nullable=False, server_default=_NEXTVAL, onupdate=_NEXTVAL)
+
+
+class SyncBorrado(Base):
+    __tablename__ = "sync_borrado"
+
+    id_borrado = Column(BigInteger, primary_key=True, autoincrement=True)
+    tabla = Column(String, nullable=False)
+    clave = Column(String, nullable=False)
+    rut_paciente = Column(String, nullable=False, index=True)  # sin FK: sobrevive al borrado del paciente
+    version_sync = Column(BigInteger, nullable=False, server_default=_NEXTVAL, index=True)
+    borrado_en = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class SyncMarca(Base):
+    """Última versión de la secuencia vista por una transacción (de id 'transaccion')"""
+    __tablename__ = "sync_marca"
+
+    transaccion = Column(BigInteger, primary_key=True)   # pg_current_xact_id() como bigint
+    version = Column(BigInteger, nullable=False)
+    creada_en = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,11 @@
+# app/models/toma_medicamento.py
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from app.db import Base
+
+class TomaMedicamento(Base):
+    """Una dosis tomada; las dosis programadas no se guardan, salen de la regla de MedicinaDetalle"""
+    __tablename__ = "toma_medicamento"
+
+    id_detalle = Column(Integer, ForeignKey("medicina_detalle.id_detalle", ondelete="CASCADE"), primary_key=True)
+    programada_en = Column(DateTime(timezone=True), primary_key=True)
+    tomada_en = Column(DateTime(timezone=True), nullable=False)
@@ -34,6 +34,10 @@ from .medicina import router as medicina_router
 from .medicina_detalle import router as medicina_detalle_router
 from .auth import router as auth_router
 from .email import router as email_router
+from .export_analitico import router as export_analitico_router
+from .sync import router as sync_router
+from .recordatorio_cita import router as recordatorio_cita_router
+from .admin import router as admin_router
 
 ALL_ROUTERS = [
     region_router,
@@ -62,4 +66,8 @@ ALL_ROUTERS = [
     medicina_router,
     auth_router,
     email_router,
+    export_analitico_router,
+    sync_router,
+    recordatorio_cita_router,
+    admin_router,
 ]
\ No newline at end of file
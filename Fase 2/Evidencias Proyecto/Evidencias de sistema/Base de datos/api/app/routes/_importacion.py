@@ -0,0 +1,31 @@
+# app/routes/_importacion.py
+"""POST .../import compartido por paciente, cuidador y equipo médico (app/services/importacion.py)"""
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+from app.db import get_db
+from app.schemas.importacion import ResultadoImportacion
+from app.services import importacion as importacion_svc
+
+# Cuerpo de los POST .../import: el CSV tal cual (no multipart)
+_CSV = {"requestBody": {"required": True, "content": {"text/csv": {"schema": {"type": "string"}}}}}
+
+def ruta_importar(router: APIRouter, nombre_tipo: str) -> None:
+    """Registra POST {prefix}/import para el tipo dado (una clave de importacion_svc.TIPOS)"""
+
+    async def importar(request: Request, background: BackgroundTasks,
+                       solo_validar: bool = Query(False, description="Revisar el archivo sin crear nada"),
+                       enviar_bienvenida: bool = Query(True),
+                       db: Session = Depends(get_db)):
+        try:
+            resultado, correos = await importacion_svc.importar_request(request, db, nombre_tipo, solo_validar)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        if enviar_bienvenida and correos:
+            background.add_task(importacion_svc.enviar_bienvenidas, correos)
+            resultado.correos_en_cola = len(correos)
+        return resultado
+
+    importar.__name__ = f"import_{nombre_tipo}"
+    importar.__doc__ = (f"Alta masiva desde CSV (cabecera con los campos de POST {router.prefix}); "
+                        "reporte de errores por fila")
+    router.post("/import", response_model=ResultadoImportacion, openapi_extra=_CSV)(importar)
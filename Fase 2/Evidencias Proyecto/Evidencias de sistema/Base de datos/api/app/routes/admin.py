@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.core.consultas_lentas import registro_lentas
+from app.core.perfilador import registro_perfiles
+from app.core.security import admin_token_valido
+
+
+def verificar_admin(x_admin_token: str | None = Header(None)):
+    """Sin ADMIN_TOKEN configurado los endpoints /admin no existen"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(404, "Not found")
+    if not admin_token_valido(x_admin_token):
+        raise HTTPException(403, "Token de administración inválido")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(verificar_admin)])
+
+@router.get("/sql-lentas")
+def list_sql_lentas(limit: int = Query(50, ge=1, le=1000),
+                    agrupar: bool = Query(False, description="Agrupar por (ruta, SQL) en vez de listar")):
+    """Últimas consultas sobre SQL_LENTA_MS, la más reciente primero"""
+    return {
+        "umbral_ms": settings.SQL_LENTA_MS,
+        "total_vistas": registro_lentas.total,
+        "items": registro_lentas.resumen()[:limit] if agrupar else registro_lentas.entradas(limit),
+    }
+
+@router.delete("/sql-lentas", status_code=status.HTTP_204_NO_CONTENT)
+def clear_sql_lentas():
+    registro_lentas.limpiar()
+
+@router.get("/perfiles")
+def list_perfiles():
+    """Perfiles guardados (X-Perfilar o PERFIL_MUESTREO), el más reciente primero"""
+    return registro_perfiles.listar()
+
+@router.get("/perfiles/{id_perfil}")
+def get_perfil(id_perfil: str,
+               formato: str = Query("speedscope", pattern="^(speedscope|colapsado)$")):
+    """speedscope: abrir en https://www.speedscope.app; colapsado: flamegraph.pl / inferno"""
+    perfil = registro_perfiles.get(id_perfil)
+    if not perfil:
+        raise HTTPException(404, "Not found")
+    if formato == "colapsado":
+        return PlainTextResponse(perfil.colapsado())
+    return perfil.speedscope()
+
+@router.delete("/perfiles", status_code=status.HTTP_204_NO_CONTENT)
+def clear_perfiles():
+    registro_perfiles.limpiar()
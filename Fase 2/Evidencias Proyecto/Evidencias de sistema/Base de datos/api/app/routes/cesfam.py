@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from app.db import get_db
+from app.core.catalog_cache import catalog_cache, cache_http
 from app.schemas.common import Page
 from app.schemas.cesfam import CesfamCreate, CesfamUpdate, CesfamOut, CesfamSetEstado
 from app.services import cesfam as svc
 
 router = APIRouter(prefix="/cesfam", tags=["cesfam"])
 
-@router.get("", response_model=Page[CesfamOut])
+@router.get("", response_model=Page[CesfamOut], dependencies=[Depends(cache_http("cesfam"))])
 def list_cesfam(page: int = 1, page_size: int = 20,
                 id_comuna: int | None = Query(None),
                 estado: bool | None = Query(True),
@@ -15,9 +16,9 @@ def list_cesfam(page: int = 1, page_size: int = 20,
     items, total = svc.list_(db, skip=(page-1)*page_size, limit=page_size, id_comuna=id_comuna, estado=estado)
     return Page(items=items, total=total, page=page, page_size=page_size)
 
-@router.get("/{id_cesfam}", response_model=CesfamOut)
-def get_cesfam(id_cesfam: int, db: Session = Depends(get_db)):
-    obj = svc.get(db, id_cesfam)
+@router.get("/{id_cesfam}", response_model=CesfamOut, dependencies=[Depends(cache_http("cesfam"))])
+def get_cesfam(id_cesfam: int):
+    obj = catalog_cache.obtener("cesfam", id_cesfam)
     if not obj: raise HTTPException(404, "Not found")
     return obj
 
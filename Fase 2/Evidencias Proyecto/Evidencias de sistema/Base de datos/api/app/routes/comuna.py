@@ -1,20 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from app.db import get_db
+from app.core.catalog_cache import catalog_cache, cache_http
 from app.schemas.common import Page
 from app.schemas.comuna import ComunaCreate, ComunaUpdate, ComunaOut
 from app.services import comuna as svc
 
 router = APIRouter(prefix="/comuna", tags=["comuna"])
 
-@router.get("", response_model=Page[ComunaOut])
+@router.get("", response_model=Page[ComunaOut], dependencies=[Depends(cache_http("comuna"))])
 def list_comuna(page: int = 1, page_size: int = 20, id_region: int | None = Query(None), db: Session = Depends(get_db)):
     items, total = svc.list_(db, skip=(page-1)*page_size, limit=page_size, id_region=id_region)
     return Page(items=items, total=total, page=page, page_size=page_size)
 
-@router.get("/{id_comuna}", response_model=ComunaOut)
-def get_comuna(id_comuna: int, db: Session = Depends(get_db)):
-    obj = svc.get(db, id_comuna)
+@router.get("/{id_comuna}", response_model=ComunaOut, dependencies=[Depends(cache_http("comuna"))])
+def get_comuna(id_comuna: int):
+    obj = catalog_cache.obtener("comuna", id_comuna)
     if not obj: raise HTTPException(404, "Not found")
     return obj
 
@@ -1,9 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from app.db import get_db
-from app.schemas.common import Page
+from app.schemas.common import Page, BatchGet, BatchResult
 from app.schemas.cuidador import CuidadorCreate, CuidadorUpdate, CuidadorOut, CuidadorSetEstado
+from app.schemas.adherencia import DosisPendienteOut
 from app.services import cuidador as svc
+from app.services import adherencia as adherencia_svc
+from app.routes._importacion import ruta_importar
+from datetime import datetime, timedelta, timezone
 import logging
 
 logger = logging.getLogger(__name__)
@@ -31,14 +35,31 @@ def find_cuidador_by_email(email: str, only_active: bool = Query(True), db: Sess
         raise HTTPException(404, "Cuidador no encontrado")
     return obj
 
+@router.post("/batch-get", response_model=BatchResult[CuidadorOut])
+def batch_get_cuidador(payload: BatchGet[str], db: Session = Depends(get_db)):
+    """Varios cuidadores por clave en una consulta; mismo orden que 'keys', null si no existe"""
+    return BatchResult(items=svc.get_many(db, payload.keys))
+
 @router.get("/{rut_cuidador}", response_model=CuidadorOut)
 def get_cuidador(rut_cuidador: str, db: Session = Depends(get_db)):
     """Buscar cuidador por RUT"""
-    obj = svc.get(db, rut_cuidador)
+    obj = svc.get_cached(db, rut_cuidador)
     if not obj: 
         raise HTTPException(404, "Cuidador no encontrado")
     return obj
 
+@router.get("/{rut_cuidador}/dosis-pendientes", response_model=list[DosisPendienteOut])
+def dosis_pendientes_cuidador(rut_cuidador: str,
+                              horas: int = Query(24, ge=1, le=168, description="Ventana hacia atrás desde ahora"),
+                              db: Session = Depends(get_db)):
+    """Dosis vencidas y no tomadas de todos los pacientes activos del cuidador"""
+    if not svc.get(db, rut_cuidador):
+        raise HTTPException(404, "Cuidador no encontrado")
+    ahora = datetime.now(timezone.utc)
+    return adherencia_svc.dosis_pendientes(db, rut_cuidador, ahora - timedelta(hours=horas), ahora)
+
+ruta_importar(router, "cuidador")
+
 @router.post("", response_model=CuidadorOut, status_code=status.HTTP_201_CREATED)
 def create_cuidador(payload: CuidadorCreate, db: Session = Depends(get_db)):
     return svc.create(db, payload)
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import RedirectResponse
 from datetime import datetime
 from sqlalchemy.orm import Session
 from app.db import get_db
@@ -20,6 +21,11 @@ def list_dr(page: int = 1, page_size: int = 20,
                              desde=desde, hasta=hasta)
     return Page(items=items, total=total, page=page, page_size=page_size)
 
+@router.get("/{id_reporte}/file", include_in_schema=False)
+def download_file(id_reporte: int, request: Request):
+    """Ruta antigua: el archivo se sirve (y la descarga se registra) en /solicitud-reporte/{id}/archivo"""
+    return RedirectResponse(request.url_for("get_sr_archivo", id_reporte=id_reporte), status_code=308)
+
 @router.get("/{id_descarga}", response_model=DescargaReporteOut)
 def get_dr(id_descarga: int, db: Session = Depends(get_db)):
     obj = svc.get(db, id_descarga)
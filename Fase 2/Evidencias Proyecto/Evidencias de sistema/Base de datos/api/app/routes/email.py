@@ -54,7 +54,7 @@ async def send_welcome_email(welcome_data: WelcomeEmail, background_tasks: Backg
 
 @router.post("/appointment-reminder", response_model=Dict[str, Any])
 async def send_appointment_reminder(reminder_data: AppointmentReminder, background_tasks: BackgroundTasks):
-    """Envía recordatorio de cita médica"""
+    """Envía recordatorio de cita médica (uno por llamada; para envíos masivos usar POST /recordatorio-cita/lote)"""
     try:
         background_tasks.add_task(email_service.send_appointment_reminder, reminder_data)
         
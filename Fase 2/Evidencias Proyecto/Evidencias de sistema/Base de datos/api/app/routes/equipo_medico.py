@@ -3,9 +3,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from app.db import get_db
-from app.schemas.common import Page
+from app.schemas.common import Page, BatchGet, BatchResult
 from app.schemas.equipo_medico import EquipoMedicoCreate, EquipoMedicoUpdate, EquipoMedicoOut, EquipoMedicoSetEstado
 from app.services import equipo_medico as svc
+from app.routes._importacion import ruta_importar
 
 router = APIRouter(prefix="/equipo-medico", tags=["equipo_medico"])
 
@@ -37,6 +38,11 @@ def find_medico_by_email(email: str,
         raise HTTPException(404, "Equipo médico no encontrado")
     return obj
 
+@router.post("/batch-get", response_model=BatchResult[EquipoMedicoOut])
+def batch_get_medico(payload: BatchGet[str], db: Session = Depends(get_db)):
+    """Varios médicos por clave en una consulta; mismo orden que 'keys', null si no existe"""
+    return BatchResult(items=svc.get_many(db, payload.keys))
+
 @router.get("/{rut_medico}", response_model=EquipoMedicoOut)
 def get_medico(rut_medico: str, db: Session = Depends(get_db)):
     """Buscar equipo médico por RUT"""
@@ -45,6 +51,8 @@ def get_medico(rut_medico: str, db: Session = Depends(get_db)):
         raise HTTPException(404, "Equipo médico no encontrado")
     return obj
 
+ruta_importar(router, "equipo_medico")
+
 @router.post("", response_model=EquipoMedicoOut, status_code=status.HTTP_201_CREATED)
 def create_medico(payload: EquipoMedicoCreate, db: Session = Depends(get_db)):
     return svc.create(db, payload)
@@ -0,0 +1,50 @@
+# app/routes/export_analitico.py
+import os
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
+
+from app.services import export_analitico as svc
+
+router = APIRouter(prefix="/export-analitico", tags=["export-analitico"])
+
+@router.get("/{dataset}")
+def export_analitico(
+    dataset: str,
+    formato: str = Query("parquet", pattern="^(parquet|arrow)$"),
+    rut_paciente: str | None = Query(None),
+    desde: datetime | None = Query(None),
+    hasta: datetime | None = Query(None),
+):
+    """Descarga columnar (Parquet o Arrow IPC) de mediciones o adherencia a medicamentos"""
+    if dataset not in svc.DATASETS:
+        raise HTTPException(status_code=404, detail="Not found")
+    filtros = dict(rut_paciente=rut_paciente, desde=desde, hasta=hasta)
+
+    try:
+        if formato == "arrow":
+            stream = svc.iter_arrow_stream(dataset, **filtros)
+            next_chunk = next(stream)  # valida pyarrow antes de enviar los headers
+        else:
+            path = svc.write_parquet(dataset, **filtros)
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    if formato == "arrow":
+        def _body():
+            yield next_chunk
+            yield from stream
+        return StreamingResponse(
+            _body(),
+            media_type="application/vnd.apache.arrow.stream",
+            headers={"Content-Disposition": f'attachment; filename="{dataset}.arrows"'},
+        )
+
+    return FileResponse(
+        path,
+        media_type="application/vnd.apache.parquet",
+        filename=f"{dataset}.parquet",
+        background=BackgroundTask(os.unlink, path),
+    )
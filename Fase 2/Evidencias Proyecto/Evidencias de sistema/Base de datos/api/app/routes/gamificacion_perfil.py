@@ -14,7 +14,7 @@ def list_gp(page: int = 1, page_size: int = 20, rut_paciente: str | None = Query
 
 @router.get("/{rut_paciente}", response_model=GamificacionPerfilOut)
 def get_gp(rut_paciente: str, db: Session = Depends(get_db)):
-    obj = svc.get(db, rut_paciente)
+    obj = svc.get_cached(db, rut_paciente)
     if not obj: raise HTTPException(404, "Not found")
     return obj
 
@@ -1,20 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from app.db import get_db
+from app.core.catalog_cache import catalog_cache, cache_http
 from app.schemas.common import Page
 from app.schemas.insignia import InsigniaCreate, InsigniaUpdate, InsigniaOut
 from app.services import insignia as svc
 
 router = APIRouter(prefix="/insignia", tags=["insignia"])
 
-@router.get("", response_model=Page[InsigniaOut])
+@router.get("", response_model=Page[InsigniaOut], dependencies=[Depends(cache_http("insignia"))])
 def list_insignia(page: int = 1, page_size: int = 20, codigo: int | None = Query(None), db: Session = Depends(get_db)):
     items, total = svc.list_(db, skip=(page-1)*page_size, limit=page_size, codigo=codigo)
     return Page(items=items, total=total, page=page, page_size=page_size)
 
-@router.get("/{id_insignia}", response_model=InsigniaOut)
-def get_insignia(id_insignia: int, db: Session = Depends(get_db)):
-    obj = svc.get(db, id_insignia)
+@router.get("/{id_insignia}", response_model=InsigniaOut, dependencies=[Depends(cache_http("insignia"))])
+def get_insignia(id_insignia: int):
+    obj = catalog_cache.obtener("insignia", id_insignia)
     if not obj: raise HTTPException(404, "Not found")
     return obj
 
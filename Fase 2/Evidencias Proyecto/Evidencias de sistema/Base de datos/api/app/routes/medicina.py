@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from app.db import get_db
+from app.core.catalog_cache import catalog_cache, cache_http
 from app.schemas.common import Page
 from app.schemas.medicina import MedicinaCreate, MedicinaUpdate, MedicinaOut
 from app.services import medicina as svc
 
 router = APIRouter(prefix="/medicina", tags=["medicacion"])
 
-@router.get("", response_model=Page[MedicinaOut])
+@router.get("", response_model=Page[MedicinaOut], dependencies=[Depends(cache_http("medicina"))])
 def list_meds(page: int = 1, page_size: int = 20,
               id_unidad: int | None = Query(None),
               q: str | None = Query(None),
@@ -15,9 +16,9 @@ def list_meds(page: int = 1, page_size: int = 20,
     items, total = svc.list_(db, skip=(page-1)*page_size, limit=page_size, id_unidad=id_unidad, q=q)
     return Page(items=items, total=total, page=page, page_size=page_size)
 
-@router.get("/{id_medicina}", response_model=MedicinaOut)
-def get_med(id_medicina: int, db: Session = Depends(get_db)):
-    obj = svc.get(db, id_medicina)
+@router.get("/{id_medicina}", response_model=MedicinaOut, dependencies=[Depends(cache_http("medicina"))])
+def get_med(id_medicina: int):
+    obj = catalog_cache.obtener("medicina", id_medicina)
     if not obj: raise HTTPException(404, "Not found")
     return obj
 
@@ -8,7 +8,9 @@ from app.schemas.medicina_detalle import (
     MedicinaDetalleUpdate,
     MedicinaDetalleOut,
 )
+from app.schemas.adherencia import TomasIn, TomasOut, BulkTomarIn, BulkTomarOut
 from app.services import medicina_detalle as svc
+from app.services import adherencia as adherencia_svc
 
 router = APIRouter(prefix="/medicina-detalle", tags=["medicacion"])
 
@@ -25,6 +27,19 @@ def list_mdet(page: int = 1, page_size: int = 20,
                              desde=desde, hasta=hasta, tomada=tomada)
     return Page(items=items, total=total, page=page, page_size=page_size)
 
+@router.post("/tomas", response_model=TomasOut)
+def registrar_tomas(payload: TomasIn, db: Session = Depends(get_db)):
+    """Registra en lote dosis tomadas (cada una debe ser una dosis programada de su prescripción)"""
+    try:
+        return adherencia_svc.registrar_tomas(db, [t.model_dump() for t in payload.tomas])
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+@router.post("/bulk-tomar", response_model=BulkTomarOut)
+def bulk_tomar(payload: BulkTomarIn, db: Session = Depends(get_db)):
+    """Marca/desmarca como tomadas muchas prescripciones de dosis única en un solo UPDATE"""
+    return adherencia_svc.marcar_dosis_unicas(db, payload.ids, payload.tomada, payload.fecha_tomada)
+
 @router.get("/{id_detalle}", response_model=MedicinaDetalleOut)
 def get_mdet(id_detalle: int, db: Session = Depends(get_db)):
     obj = svc.get(db, id_detalle)
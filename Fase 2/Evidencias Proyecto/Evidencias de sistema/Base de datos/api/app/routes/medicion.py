@@ -1,10 +1,11 @@
 # app/routes/medicion.py
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from datetime import datetime
 from sqlalchemy.orm import Session
 
 from app.db import get_db
-from app.schemas.common import Page
+from app.schemas.common import Page, BatchGet, BatchResult
 from app.schemas.medicion import (
     MedicionCreate,
     MedicionUpdate,
@@ -66,6 +67,42 @@ def list_medicion_alertas(
     )
     return Page(items=items, total=total, page=page, page_size=page_size)
 
+_EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+@router.get("/export")
+def export_medicion(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    rut_paciente: str | None = Query(None),
+    desde: datetime | None = Query(None),
+    hasta: datetime | None = Query(None),
+    tiene_alerta: bool | None = Query(None),
+    estado_alerta: str | None = Query(None, pattern="^(nueva|en_proceso|resuelta|ignorada)$"),
+    tomada_por: str | None = Query(None),
+):
+    """Exporta mediciones + detalles en streaming (CSV o NDJSON), con los mismos filtros del listado"""
+    stream = svc.iter_export(
+        format,
+        rut_paciente=rut_paciente,
+        desde=desde,
+        hasta=hasta,
+        tiene_alerta=tiene_alerta,
+        estado_alerta=estado_alerta,
+        tomada_por=tomada_por,
+    )
+    return StreamingResponse(
+        stream,
+        media_type=_EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="mediciones.{format}"'},
+    )
+
+@router.post("/batch-get", response_model=BatchResult[MedicionOut])
+def batch_get_medicion(payload: BatchGet[int], db: Session = Depends(get_db)):
+    """Varios mediciones por clave en una consulta; mismo orden que 'keys', null si no existe"""
+    return BatchResult(items=svc.get_many(db, payload.keys))
+
 @router.get("/{id_medicion}", response_model=MedicionOut)
 def get_medicion(id_medicion: int, db: Session = Depends(get_db)):
     obj = svc.get(db, id_medicion)
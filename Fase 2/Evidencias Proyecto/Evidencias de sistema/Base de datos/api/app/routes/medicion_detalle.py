@@ -24,7 +24,10 @@ def get_md(id_detalle: int, db: Session = Depends(get_db)):
 
 @router.post("", response_model=MedicionDetalleOut, status_code=status.HTTP_201_CREATED)
 def create_md(payload: MedicionDetalleCreate, db: Session = Depends(get_db)):
-    return svc.create(db, payload)
+    try:
+        return svc.create(db, payload)
+    except ValueError as e:
+        raise HTTPException(404, str(e))
 
 @router.patch("/{id_detalle}", response_model=MedicionDetalleOut)
 def update_md(id_detalle: int, payload: MedicionDetalleUpdate, db: Session = Depends(get_db)):
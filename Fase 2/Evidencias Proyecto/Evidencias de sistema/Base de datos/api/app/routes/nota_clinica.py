@@ -3,7 +3,7 @@ from datetime import datetime
 from sqlalchemy.orm import Session
 from app.db import get_db
 from app.schemas.common import Page
-from app.schemas.nota_clinica import NotaClinicaCreate, NotaClinicaUpdate, NotaClinicaOut
+from app.schemas.nota_clinica import NotaClinicaCreate, NotaClinicaUpdate, NotaClinicaOut, NotaClinicaSearchOut
 from app.services import nota_clinica as svc
 
 router = APIRouter(prefix="/nota-clinica", tags=["clinica"])
@@ -21,6 +21,25 @@ def list_notas(page: int = 1, page_size: int = 20,
                              tipo_nota=tipo_nota, desde=desde, hasta=hasta)
     return Page(items=items, total=total, page=page, page_size=page_size)
 
+@router.get("/search", response_model=Page[NotaClinicaSearchOut])
+def search_notas(q: str = Query(..., min_length=2, max_length=200),
+                 page: int = 1, page_size: int = 20,
+                 id_cesfam: int | None = Query(None),
+                 rut_paciente: str | None = Query(None),
+                 rut_medico: str | None = Query(None),
+                 desde: datetime | None = Query(None),
+                 hasta: datetime | None = Query(None),
+                 db: Session = Depends(get_db)):
+    """Búsqueda de texto completo en notas clínicas, ordenada por relevancia"""
+    rows, total = svc.search(db, q, skip=(page-1)*page_size, limit=page_size,
+                             id_cesfam=id_cesfam, rut_paciente=rut_paciente,
+                             rut_medico=rut_medico, desde=desde, hasta=hasta)
+    items = [
+        NotaClinicaSearchOut(**NotaClinicaOut.model_validate(obj).model_dump(), rank=rank, snippet=snippet)
+        for obj, rank, snippet in rows
+    ]
+    return Page(items=items, total=total, page=page, page_size=page_size)
+
 @router.get("/{id_nota}", response_model=NotaClinicaOut)
 def get_nota(id_nota: int, db: Session = Depends(get_db)):
     obj = svc.get(db, id_nota)
@@ -1,10 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from datetime import date, datetime
 from sqlalchemy.orm import Session
 from app.db import get_db
-from app.schemas.common import Page
+from app.schemas.common import Page, BatchGet, BatchResult
 from app.schemas.paciente import PacienteCreate, PacienteUpdate, PacienteOut, PacienteSetEstado
+from app.schemas.timeline import TimelineOut
+from app.schemas.adherencia import AdherenciaOut
 from app.services import paciente as svc
-from app.models.paciente import Paciente
+from app.services import timeline as timeline_svc
+from app.services import adherencia as adherencia_svc
+from app.routes._importacion import ruta_importar
 
 router = APIRouter(prefix="/paciente", tags=["paciente"])
 
@@ -32,23 +37,52 @@ def find_paciente_by_email(email: str, only_active: bool = Query(True), db: Sess
         raise HTTPException(404, "Paciente no encontrado")
     return obj
 
+@router.post("/batch-get", response_model=BatchResult[PacienteOut])
+def batch_get_paciente(payload: BatchGet[str], only_active: bool = Query(True), db: Session = Depends(get_db)):
+    """Varios pacientes por clave en una consulta; mismo orden que 'keys', null si no existe (o está deshabilitado)"""
+    return BatchResult(items=svc.get_many(db, payload.keys, only_active=only_active))
+
 @router.get("/{rut_paciente}", response_model=PacienteOut)
 def get_paciente(rut_paciente: str, only_active: bool = Query(True), db: Session = Depends(get_db)):
     """Buscar paciente por RUT"""
-    if only_active:
-        # Buscar solo pacientes activos
-        obj = db.query(Paciente).filter(
-            Paciente.rut_paciente == rut_paciente,
-            Paciente.estado == True
-        ).first()
-    else:
-        # Buscar cualquier paciente (activo o inactivo)
-        obj = svc.get(db, rut_paciente)
-    
+    obj = svc.get_cached(db, rut_paciente)
+    if obj and only_active and not obj["estado"]:
+        obj = None  # solo pacientes activos
+
     if not obj: 
         raise HTTPException(404, "Paciente no encontrado")
     return obj
 
+@router.get("/{rut_paciente}/timeline", response_model=TimelineOut)
+def get_paciente_timeline(rut_paciente: str,
+                          desde: datetime | None = Query(None),
+                          hasta: datetime | None = Query(None),
+                          cursor: str | None = Query(None),
+                          limit: int = Query(50, ge=1, le=200),
+                          tipos: list[str] | None = Query(None),
+                          db: Session = Depends(get_db)):
+    """Mediciones, medicamentos, notas, gamificación y cuidadores del paciente en un solo stream por fecha"""
+    try:
+        data = timeline_svc.get_timeline(db, rut_paciente, desde=desde, hasta=hasta,
+                                         cursor=cursor, limit=limit, tipos=tipos)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if data is None:
+        raise HTTPException(404, "Paciente no encontrado")
+    return data
+
+@router.get("/{rut_paciente}/adherencia", response_model=AdherenciaOut)
+def get_paciente_adherencia(rut_paciente: str,
+                            desde: date | None = Query(None, description="Por defecto, 12 semanas atrás"),
+                            hasta: date | None = Query(None, description="Por defecto, la semana en curso"),
+                            db: Session = Depends(get_db)):
+    """Adherencia semanal a la medicación (dosis tomadas / dosis vencidas)"""
+    if desde and hasta and desde > hasta:
+        raise HTTPException(400, "desde debe ser anterior a hasta")
+    return adherencia_svc.get_adherencia(db, rut_paciente, desde=desde, hasta=hasta)
+
+ruta_importar(router, "paciente")
+
 @router.post("", response_model=PacienteOut, status_code=status.HTTP_201_CREATED)
 def create_paciente(payload: PacienteCreate, db: Session = Depends(get_db)):
     return svc.create(db, payload)
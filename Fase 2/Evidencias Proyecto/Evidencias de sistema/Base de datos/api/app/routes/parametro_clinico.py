@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from app.db import get_db
+from app.core.catalog_cache import catalog_cache, cache_http
 from app.schemas.common import Page
 from app.schemas.parametro_clinico import ParametroClinicoCreate, ParametroClinicoUpdate, ParametroClinicoOut
 from app.services import parametro_clinico as svc
 
 router = APIRouter(prefix="/parametro-clinico", tags=["parametros"])
 
-@router.get("", response_model=Page[ParametroClinicoOut])
+@router.get("", response_model=Page[ParametroClinicoOut], dependencies=[Depends(cache_http("parametro_clinico"))])
 def list_param(page: int = 1, page_size: int = 20,
                id_unidad: int | None = Query(None),
                codigo: str | None = Query(None),
@@ -15,9 +16,9 @@ def list_param(page: int = 1, page_size: int = 20,
     items, total = svc.list_(db, skip=(page-1)*page_size, limit=page_size, id_unidad=id_unidad, codigo=codigo)
     return Page(items=items, total=total, page=page, page_size=page_size)
 
-@router.get("/{id_parametro}", response_model=ParametroClinicoOut)
-def get_param(id_parametro: int, db: Session = Depends(get_db)):
-    obj = svc.get(db, id_parametro)
+@router.get("/{id_parametro}", response_model=ParametroClinicoOut, dependencies=[Depends(cache_http("parametro_clinico"))])
+def get_param(id_parametro: int):
+    obj = catalog_cache.obtener("parametro_clinico", id_parametro)
     if not obj: raise HTTPException(404, "Not found")
     return obj
 
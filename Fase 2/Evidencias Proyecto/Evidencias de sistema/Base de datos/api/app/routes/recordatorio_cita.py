@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from datetime import datetime
+from sqlalchemy.orm import Session
+from app.db import get_db
+from app.schemas.common import Page
+from app.schemas.recordatorio_cita import (
+    RecordatorioCitaCreate,
+    RecordatorioCitaLote,
+    RecordatorioCitaLoteOut,
+    RecordatorioCitaOut,
+)
+from app.services import recordatorio_cita as svc
+
+router = APIRouter(prefix="/recordatorio-cita", tags=["email"])
+
+@router.get("", response_model=Page[RecordatorioCitaOut])
+def list_rc(page: int = 1, page_size: int = 20,
+            rut_paciente: str | None = Query(None),
+            estado: str | None = Query(None),
+            desde: datetime | None = Query(None),
+            hasta: datetime | None = Query(None),
+            db: Session = Depends(get_db)):
+    items, total = svc.list_(db, skip=(page-1)*page_size, limit=page_size,
+                             rut_paciente=rut_paciente, estado=estado, desde=desde, hasta=hasta)
+    return Page(items=items, total=total, page=page, page_size=page_size)
+
+@router.get("/{id_recordatorio}", response_model=RecordatorioCitaOut)
+def get_rc(id_recordatorio: int, db: Session = Depends(get_db)):
+    obj = svc.get(db, id_recordatorio)
+    if not obj:
+        raise HTTPException(404, "Not found")
+    return obj
+
+@router.post("", response_model=RecordatorioCitaOut, status_code=status.HTTP_201_CREATED)
+def create_rc(payload: RecordatorioCitaCreate, db: Session = Depends(get_db)):
+    """Encola un recordatorio; lo envía el job de recordatorios, no este request"""
+    try:
+        return svc.create(db, payload)
+    except ValueError as e:
+        raise HTTPException(404, str(e))
+
+@router.post("/lote", response_model=RecordatorioCitaLoteOut, status_code=status.HTTP_201_CREATED)
+def create_rc_lote(payload: RecordatorioCitaLote, db: Session = Depends(get_db)):
+    """Encola muchos recordatorios (p.ej. la agenda del día de un CESFAM) en un solo INSERT"""
+    try:
+        return {"creados": svc.create_many(db, payload.recordatorios)}
+    except ValueError as e:
+        raise HTTPException(404, str(e))
+
+@router.delete("/{id_recordatorio}")
+def delete_rc(id_recordatorio: int, db: Session = Depends(get_db)):
+    ok = svc.delete(db, id_recordatorio)
+    if not ok:
+        raise HTTPException(404, "Not found")
+    return {"message": "Deleted"}
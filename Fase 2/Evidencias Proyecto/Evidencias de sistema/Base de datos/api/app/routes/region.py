@@ -1,20 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.db import get_db
+from app.core.catalog_cache import catalog_cache, cache_http
 from app.schemas.common import Page
 from app.schemas.region import RegionCreate, RegionUpdate, RegionOut
 from app.services import region as svc
 
 router = APIRouter(prefix="/region", tags=["region"])
 
-@router.get("", response_model=Page[RegionOut])
+@router.get("", response_model=Page[RegionOut], dependencies=[Depends(cache_http("region"))])
 def list_region(page: int = 1, page_size: int = 20, db: Session = Depends(get_db)):
     items, total = svc.list_(db, skip=(page-1)*page_size, limit=page_size)
     return Page(items=items, total=total, page=page, page_size=page_size)
 
-@router.get("/{id_region}", response_model=RegionOut)
-def get_region(id_region: int, db: Session = Depends(get_db)):
-    obj = svc.get(db, id_region)
+@router.get("/{id_region}", response_model=RegionOut, dependencies=[Depends(cache_http("region"))])
+def get_region(id_region: int):
+    obj = catalog_cache.obtener("region", id_region)
     if not obj: raise HTTPException(404, "Not found")
     return obj
 
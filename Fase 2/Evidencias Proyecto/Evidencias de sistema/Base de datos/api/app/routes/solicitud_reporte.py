@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
 from datetime import datetime
 from sqlalchemy.orm import Session
 from app.db import get_db
 from app.schemas.common import Page
 from app.schemas.solicitud_reporte import SolicitudReporteCreate, SolicitudReporteUpdate, SolicitudReporteOut
 from app.services import solicitud_reporte as svc
+from app.services import reporte_generador
+from app.jobs.reportes import runner
+from app.jobs.descargas import buffer_descargas
+from app.core.http_cache import etag_coincide
 
 router = APIRouter(prefix="/solicitud-reporte", tags=["reportes"])
 
@@ -27,24 +33,73 @@ def get_sr(id_reporte: int, db: Session = Depends(get_db)):
     if not obj: raise HTTPException(404, "Not found")
     return obj
 
+def _incluye_final(http_range: str, size: int) -> bool:
+    """True si el rango pedido llega al último byte (la descarga se completa con esta respuesta)"""
+    unidad, _, specs = http_range.partition("=")
+    if unidad.strip() != "bytes":
+        return False
+    for spec in specs.split(","):
+        inicio, _, fin = spec.strip().partition("-")
+        if not inicio or not fin:  # "-N" (sufijo) o "N-" abiertos incluyen el final
+            return True
+        if fin.isdigit() and int(fin) >= size - 1:
+            return True
+    return False
+
+@router.get("/{id_reporte}/archivo")
+def get_sr_archivo(id_reporte: int, request: Request, db: Session = Depends(get_db)):
+    """Descarga el archivo del reporte con soporte de Range / If-Range y ETag fuerte (sha256 del contenido)"""
+    obj = svc.get(db, id_reporte)
+    if not obj: raise HTTPException(404, "Not found")
+    if obj.estado != svc.LISTO:
+        raise HTTPException(409, f"El reporte está en estado '{obj.estado}'")
+    if obj.archivo_sha256 is None:
+        raise HTTPException(404, "Archivo no encontrado")
+    ruta = reporte_generador.ruta_artefacto(obj.archivo_sha256, obj.formato)
+    if not ruta.exists():
+        raise HTTPException(404, "Archivo no encontrado")
+
+    etag = f'"{obj.archivo_sha256}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=0, must-revalidate"}
+    if etag_coincide(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    # Solo cuenta como descarga (descarga_reporte) la respuesta que entrega el final del
+    # archivo; la tarea corre después de enviar el último byte, así que un corte a mitad
+    # no se registra.
+    http_range = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    completa = (http_range is None or (if_range is not None and if_range != etag)
+                or _incluye_final(http_range, obj.archivo_bytes or ruta.stat().st_size))
+    background = None
+    if request.method == "GET" and completa:
+        background = BackgroundTask(buffer_descargas.registrar, obj.id_reporte, obj.rut_medico)
+
+    ext, media_type = reporte_generador.FORMATOS[obj.formato]
+    return FileResponse(
+        ruta,
+        media_type=media_type,
+        filename=f"reporte_{obj.tipo}_{obj.id_reporte}{ext}",
+        headers=headers,
+        background=background,
+    )
+
 @router.post("", response_model=SolicitudReporteOut, status_code=status.HTTP_201_CREATED)
 def create_sr(payload: SolicitudReporteCreate, db: Session = Depends(get_db)):
     obj = svc.create(db, payload)
-    # Crear registro en descarga_reporte automáticamente
-    from app.services import descarga_reporte as descarga_svc
-    from app.schemas.descarga_reporte import DescargaReporteCreate
-    descarga_payload = DescargaReporteCreate(
-        rut_medico=obj.rut_medico,
-        id_reporte=obj.id_reporte,
-        descargado_en=datetime.now()
-    )
-    descarga_svc.create(db, descarga_payload)
+    if obj.estado == svc.PENDIENTE:
+        runner.notificar()
     return obj
 
 @router.patch("/{id_reporte}", response_model=SolicitudReporteOut)
 def update_sr(id_reporte: int, payload: SolicitudReporteUpdate, db: Session = Depends(get_db)):
-    obj = svc.update(db, id_reporte, payload)
+    try:
+        obj = svc.update(db, id_reporte, payload)
+    except ValueError as e:
+        raise HTTPException(409, str(e))
     if not obj: raise HTTPException(404, "Not found")
+    if obj.estado == svc.PENDIENTE:
+        runner.notificar()
     return obj
 
 @router.delete("/{id_reporte}")
@@ -0,0 +1,24 @@
+# app/routes/sync.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.schemas.sync import SyncOut
+from app.services import sync as svc
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+@router.get("", response_model=SyncOut)
+def sync(since: str | None = Query(None, description="Token de la sincronización anterior; vacío = todo"),
+         rut_cuidador: str | None = Query(None),
+         rut_paciente: str | None = Query(None),
+         limit: int = Query(500, ge=1, le=5000),
+         db: Session = Depends(get_db)):
+    """Cambios (altas, ediciones y borrados) desde el token, para los pacientes del cuidador o para un paciente"""
+    if (rut_cuidador is None) == (rut_paciente is None):
+        raise HTTPException(400, "Indique rut_cuidador o rut_paciente")
+    ruts = svc.pacientes_de_cuidador(db, rut_cuidador) if rut_cuidador else [rut_paciente]
+    try:
+        return svc.cambios_desde(db, ruts, since, limit=limit)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
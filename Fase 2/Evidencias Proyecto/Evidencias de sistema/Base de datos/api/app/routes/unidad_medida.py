@@ -1,20 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.db import get_db
+from app.core.catalog_cache import catalog_cache, cache_http
 from app.schemas.common import Page
 from app.schemas.unidad_medida import UnidadMedidaCreate, UnidadMedidaUpdate, UnidadMedidaOut
 from app.services import unidad_medida as svc
 
 router = APIRouter(prefix="/unidad-medida", tags=["parametros"])
 
-@router.get("", response_model=Page[UnidadMedidaOut])
+@router.get("", response_model=Page[UnidadMedidaOut], dependencies=[Depends(cache_http("unidad_medida"))])
 def list_um(page: int = 1, page_size: int = 20, db: Session = Depends(get_db)):
     items, total = svc.list_(db, skip=(page-1)*page_size, limit=page_size)
     return Page(items=items, total=total, page=page, page_size=page_size)
 
-@router.get("/{id_unidad}", response_model=UnidadMedidaOut)
-def get_um(id_unidad: int, db: Session = Depends(get_db)):
-    obj = svc.get(db, id_unidad)
+@router.get("/{id_unidad}", response_model=UnidadMedidaOut, dependencies=[Depends(cache_http("unidad_medida"))])
+def get_um(id_unidad: int):
+    obj = catalog_cache.obtener("unidad_medida", id_unidad)
     if not obj: raise HTTPException(404, "Not found")
     return obj
 
@@ -0,0 +1,49 @@
+from pydantic import BaseModel, Field
+from datetime import date, datetime
+
+class TomaIn(BaseModel):
+    id_detalle: int = Field(..., ge=1)
+    programada_en: datetime = Field(..., description="Dosis programada a la que corresponde la toma")
+    tomada_en: datetime | None = Field(None, description="Si no se envía, se usa la hora del servidor")
+
+class TomasIn(BaseModel):
+    tomas: list[TomaIn] = Field(..., min_length=1, max_length=1000)
+
+class TomasOut(BaseModel):
+    registradas: int
+    repetidas: int      # ya estaban registradas (reintentos)
+
+class BulkTomarIn(BaseModel):
+    ids: list[int] = Field(..., min_length=1, max_length=1000, description="Prescripciones de dosis única")
+    tomada: bool = True
+    fecha_tomada: datetime | None = Field(None, description="Si no se envía, se usa la hora del servidor")
+
+class BulkTomarOut(BaseModel):
+    actualizadas: list[int]
+    omitidas: list[int]   # no existen, son recurrentes (usar /tomas) o ya tenían ese estado
+
+class DosisPendienteOut(BaseModel):
+    id_detalle: int
+    rut_paciente: str
+    id_medicina: int
+    nombre_medicina: str
+    dosis: str
+    instrucciones_toma: str
+    programada_en: datetime
+    recurrente: bool
+
+class AdherenciaSemanaOut(BaseModel):
+    semana: date                 # lunes de la semana
+    dosis_programadas: int
+    dosis_vencidas: int          # igual a programadas salvo en la semana en curso
+    dosis_tomadas: int
+    tasa: float | None = None    # tomadas / vencidas
+
+class AdherenciaOut(BaseModel):
+    rut_paciente: str
+    desde: date
+    hasta: date
+    semanas: list[AdherenciaSemanaOut]
+    dosis_vencidas: int
+    dosis_tomadas: int
+    tasa: float | None = None
@@ -1,10 +1,20 @@
 from typing import Generic, TypeVar
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.config import settings
 
 T = TypeVar("T")
+K = TypeVar("K")
 
 class Page(BaseModel, Generic[T]):
     items: list[T]
     total: int
     page: int
     page_size: int
+
+class BatchGet(BaseModel, Generic[K]):
+    keys: list[K] = Field(..., min_length=1, max_length=settings.BATCH_MAX_CLAVES)
+
+class BatchResult(BaseModel, Generic[T]):
+    # mismo orden que BatchGet.keys; null donde la clave no existe
+    items: list[T | None]
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+
+class ErrorFila(BaseModel):
+    fila: int                  # línea del CSV (la cabecera es la 1)
+    clave: str | None = None   # RUT de la fila, si venía
+    campo: str | None = None
+    mensaje: str
+
+class ResultadoImportacion(BaseModel):
+    tipo: str
+    filas: int
+    creados: int              # con solo_validar: los que se crearían
+    solo_validar: bool = False
+    correos_en_cola: int = 0
+    errores: list[ErrorFila]
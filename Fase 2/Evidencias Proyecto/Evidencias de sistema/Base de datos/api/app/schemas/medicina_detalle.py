@@ -13,6 +13,10 @@ class MedicinaDetalleCreate(BaseModel):
     )
     fecha_inicio: datetime = Field(..., description="Fecha y hora de inicio del tratamiento")
     fecha_fin: datetime = Field(..., description="Fecha y hora de finalización del tratamiento")
+    intervalo_horas: int | None = Field(
+        default=None, ge=1, le=720,
+        description="Una dosis cada N horas desde fecha_inicio hasta fecha_fin. Vacío = dosis única."
+    )
 
     # Estado + NUEVO timestamp
     tomada: bool = Field(..., description="Indica si el paciente ya tomó la dosis")
@@ -49,6 +53,7 @@ class MedicinaDetalleUpdate(BaseModel):
     instrucciones_toma: str | None = Field(None, min_length=5, max_length=255)
     fecha_inicio: datetime | None = None
     fecha_fin: datetime | None = None
+    intervalo_horas: int | None = Field(None, ge=1, le=720)
 
     # Estado + (opcional) fecha_tomada, aunque el backend la seteará automáticamente
     tomada: bool | None = None
@@ -76,6 +81,7 @@ class MedicinaDetalleOut(BaseModel):
     instrucciones_toma: str
     fecha_inicio: datetime
     fecha_fin: datetime
+    intervalo_horas: int | None = None
     tomada: bool
     # NUEVO
     fecha_tomada: datetime | None
@@ -65,3 +65,7 @@ class NotaClinicaOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+class NotaClinicaSearchOut(NotaClinicaOut):
+    rank: float
+    snippet: str  # fragmento HTML-escapado con los términos encontrados entre <mark></mark>
@@ -0,0 +1,36 @@
+from pydantic import BaseModel, EmailStr, Field
+from datetime import datetime
+
+class RecordatorioCitaCreate(BaseModel):
+    rut_paciente: str
+    fecha_cita: datetime
+    nombre_medico: str = Field(..., min_length=1, max_length=120)
+    nombre_cesfam: str = Field(..., min_length=1, max_length=120)
+    email: EmailStr | None = Field(None, description="Si no se envía, se usa el email del paciente")
+    enviar_en: datetime | None = Field(
+        None, description="Cuándo enviarlo. Por defecto RECORDATORIOS_ANTICIPACION_HORAS antes de la cita."
+    )
+
+class RecordatorioCitaLote(BaseModel):
+    recordatorios: list[RecordatorioCitaCreate] = Field(..., min_length=1, max_length=5000)
+
+class RecordatorioCitaOut(BaseModel):
+    id_recordatorio: int
+    rut_paciente: str
+    email: str
+    nombre_paciente: str
+    fecha_cita: datetime
+    nombre_medico: str
+    nombre_cesfam: str
+    enviar_en: datetime
+    estado: str
+    intentos: int
+    ultimo_error: str | None
+    enviado_en: datetime | None
+    creado_en: datetime
+
+    class Config:
+        from_attributes = True
+
+class RecordatorioCitaLoteOut(BaseModel):
+    creados: int
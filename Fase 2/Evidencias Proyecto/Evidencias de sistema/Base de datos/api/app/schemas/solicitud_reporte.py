@@ -79,6 +79,10 @@ class SolicitudReporteOut(BaseModel):
     formato: str
     estado: str
     creado_en: datetime
+    archivo_bytes: int | None = None
+    error: str | None = None
+    iniciado_en: datetime | None = None
+    terminado_en: datetime | None = None
 
     class Config:
         from_attributes = True
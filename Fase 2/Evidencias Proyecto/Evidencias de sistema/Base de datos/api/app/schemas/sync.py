@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any
+
+class SyncBorradoOut(BaseModel):
+    tabla: str
+    clave: str
+    rut_paciente: str
+    borrado_en: datetime
+
+class SyncOut(BaseModel):
+    token: str                               # enviar como ?since= en la próxima llamada
+    pacientes: list[str]                     # pacientes incluidos en esta sincronización
+    cambios: dict[str, list[dict[str, Any]]] # tabla -> filas creadas/modificadas
+    borrados: list[SyncBorradoOut]
+    hay_mas: bool                            # True: volver a llamar de inmediato con el nuevo token
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any
+
+from app.schemas.paciente import PacienteOut
+from app.schemas.gamificacion_perfil import GamificacionPerfilOut
+
+class TimelineEvento(BaseModel):
+    fecha: datetime
+    tipo: str        # medicion | medicina | nota_clinica | evento_gamificacion | insignia | cuidador
+    id: str
+    datos: dict[str, Any]
+
+class TimelineOut(BaseModel):
+    paciente: PacienteOut | None = None              # solo en la primera página
+    gamificacion: GamificacionPerfilOut | None = None
+    items: list[TimelineEvento]
+    next_cursor: str | None = None
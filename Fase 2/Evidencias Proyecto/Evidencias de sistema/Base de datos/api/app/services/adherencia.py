@@ -0,0 +1,418 @@
+# app/services/adherencia.py
+"""
+Dosis programadas y adherencia por semana.
+
+Una prescripción (MedicinaDetalle) define sus dosis con una regla compacta:
+fecha_inicio + k * intervalo_horas, mientras sea anterior a fecha_fin (sin
+intervalo = una sola dosis en fecha_inicio). Las dosis se calculan al vuelo con
+aritmética, nunca se materializan; solo se guardan las tomas (toma_medicamento).
+
+adherencia_semanal guarda por paciente y semana cuántas dosis había programadas
+y cuántas se tomaron. Se ajusta en la misma transacción que cada cambio:
+  - alta/edición/borrado de una prescripción -> se resta su aporte anterior y se suma el nuevo
+  - registro de tomas en lote -> +1 tomada por cada toma nueva
+  - bulk-tomar de dosis únicas -> +1/-1 tomada por cada toma creada/borrada
+así GET /paciente/{rut}/adherencia lee unas pocas filas ya sumadas.
+
+Todos esos caminos toman primero la fila de la prescripción con bloquear()
+(FOR UPDATE): si una toma se confirmara entre capturar() y actualizar_rollup()
+de una edición, se contaría dos veces (su +1 y la diferencia nuevo - anterior).
+"""
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterator
+
+from sqlalchemy import select, delete, update, or_, and_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, lazyload
+
+from app.core.batch import igual_a_alguna
+from app.models.medicina import Medicina
+from app.models.medicina_detalle import MedicinaDetalle
+from app.models.paciente_cuidador import PacienteCuidador
+from app.models.toma_medicamento import TomaMedicamento
+from app.models.adherencia_semanal import AdherenciaSemanal
+
+SEMANA = timedelta(days=7)
+
+
+def _utc(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def semana_de(dt: datetime) -> date:
+    """Lunes (UTC) de la semana de dt"""
+    d = _utc(dt).date()
+    return d - timedelta(days=d.weekday())
+
+
+def _inicio_semana(semana: date) -> datetime:
+    return datetime(semana.year, semana.month, semana.day, tzinfo=timezone.utc)
+
+
+# --------- motor de la regla ---------
+
+def _rango_k(inicio: datetime, fin: datetime, intervalo_horas: int | None,
+             desde: datetime, hasta: datetime) -> range:
+    """Índices k de las dosis inicio + k*paso que caen en [desde, hasta) y antes de fin"""
+    inicio, fin, desde, hasta = _utc(inicio), _utc(fin), _utc(desde), _utc(hasta)
+    if not intervalo_horas:
+        return range(1) if desde <= inicio < hasta and inicio < fin else range(0)
+    paso = timedelta(hours=intervalo_horas)
+    lo, hi = max(inicio, desde), min(fin, hasta)
+    if hi <= lo:
+        return range(0)
+    primero = -((inicio - lo) // paso)   # ceil((lo - inicio) / paso)
+    ultimo = -((inicio - hi) // paso)    # primer k con dosis >= hi
+    return range(primero, ultimo)
+
+
+def ocurrencias(det: MedicinaDetalle, desde: datetime, hasta: datetime) -> Iterator[datetime]:
+    """Dosis programadas de la prescripción en [desde, hasta), generadas una a una"""
+    paso = timedelta(hours=det.intervalo_horas or 0)
+    inicio = _utc(det.fecha_inicio)
+    for k in _rango_k(det.fecha_inicio, det.fecha_fin, det.intervalo_horas, desde, hasta):
+        yield inicio + k * paso
+
+
+def contar(det: MedicinaDetalle, desde: datetime, hasta: datetime) -> int:
+    return len(_rango_k(det.fecha_inicio, det.fecha_fin, det.intervalo_horas, desde, hasta))
+
+
+def es_ocurrencia(det: MedicinaDetalle, t: datetime) -> bool:
+    t = _utc(t)
+    return contar(det, t, t + timedelta(microseconds=1)) == 1
+
+
+def programadas_por_semana(det: MedicinaDetalle) -> Counter:
+    conteo: Counter = Counter()
+    semana = semana_de(det.fecha_inicio)
+    fin = _utc(det.fecha_fin)
+    while _inicio_semana(semana) < fin:
+        desde = _inicio_semana(semana)
+        n = contar(det, desde, desde + SEMANA)
+        if n:
+            conteo[semana] = n
+        if not det.intervalo_horas:
+            break
+        semana += SEMANA
+    return conteo
+
+
+# --------- mantenimiento del rollup ---------
+
+def bloquear(db: Session, ids: list[int]) -> dict[int, MedicinaDetalle]:
+    """
+    SELECT ... FOR UPDATE de las prescripciones, en orden de id (dos lotes que
+    se cruzan no se bloquean mutuamente). Recarga el estado de las que ya
+    estaban en la sesión.
+    """
+    if not ids:
+        return {}
+    q = (db.query(MedicinaDetalle)
+         .options(lazyload("*"))  # sin joins: FOR UPDATE solo sobre medicina_detalle
+         .filter(igual_a_alguna(MedicinaDetalle.id_detalle, sorted(set(ids))))
+         .order_by(MedicinaDetalle.id_detalle)
+         .with_for_update()
+         .populate_existing())
+    return {d.id_detalle: d for d in q}
+
+
+@dataclass
+class Aporte:
+    """Lo que una prescripción suma a adherencia_semanal"""
+    rut_paciente: str
+    programadas: Counter
+    tomadas: Counter
+
+
+def capturar(db: Session, det: MedicinaDetalle) -> Aporte:
+    tomadas: Counter = Counter()
+    if det.id_detalle is not None:
+        for (programada_en,) in db.execute(
+            select(TomaMedicamento.programada_en).where(TomaMedicamento.id_detalle == det.id_detalle)
+        ):
+            tomadas[semana_de(programada_en)] += 1
+    return Aporte(det.rut_paciente, programadas_por_semana(det), tomadas)
+
+
+def _restar(a: Counter, b: Counter) -> dict:
+    # a diferencia de Counter.__sub__, conserva los negativos
+    return {k: a.get(k, 0) - b.get(k, 0) for k in set(a) | set(b)}
+
+
+def _sumar(db: Session, rut_paciente: str, programadas: dict, tomadas: dict) -> None:
+    """Suma (o resta, con valores negativos) a las semanas del paciente"""
+    semanas = sorted(set(programadas) | set(tomadas))
+    filas = [
+        {"rut_paciente": rut_paciente, "semana": s,
+         "dosis_programadas": programadas.get(s, 0), "dosis_tomadas": tomadas.get(s, 0)}
+        for s in semanas if programadas.get(s, 0) or tomadas.get(s, 0)
+    ]
+    if not filas:
+        return
+    t = AdherenciaSemanal.__table__
+    stmt = insert(t).values(filas)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[t.c.rut_paciente, t.c.semana],
+        set_={
+            "dosis_programadas": t.c.dosis_programadas + stmt.excluded.dosis_programadas,
+            "dosis_tomadas": t.c.dosis_tomadas + stmt.excluded.dosis_tomadas,
+        },
+    ))
+
+
+def actualizar_rollup(db: Session, anterior: Aporte | None, det: MedicinaDetalle | None) -> None:
+    """
+    Llamar dentro de la transacción del cambio, después de flush: 'anterior' es
+    capturar() antes de modificar (None en un alta) y 'det' la prescripción ya
+    modificada (None si se borró).
+    """
+    if det is None:
+        if anterior is not None:
+            _sumar(db, anterior.rut_paciente, _restar(Counter(), anterior.programadas), _restar(Counter(), anterior.tomadas))
+        return
+
+    if not det.intervalo_horas:
+        # dosis única: la toma sigue al flag 'tomada' de siempre
+        db.execute(delete(TomaMedicamento).where(TomaMedicamento.id_detalle == det.id_detalle))
+        if det.tomada:
+            db.add(TomaMedicamento(id_detalle=det.id_detalle, programada_en=det.fecha_inicio,
+                                   tomada_en=det.fecha_tomada or datetime.now(timezone.utc)))
+            db.flush()
+    else:
+        # tomas que dejaron de calzar con la regla nueva
+        invalidas = [
+            p for (p,) in db.execute(
+                select(TomaMedicamento.programada_en).where(TomaMedicamento.id_detalle == det.id_detalle))
+            if not es_ocurrencia(det, p)
+        ]
+        if invalidas:
+            db.execute(delete(TomaMedicamento).where(
+                TomaMedicamento.id_detalle == det.id_detalle,
+                TomaMedicamento.programada_en.in_(invalidas),
+            ))
+
+    nuevo = capturar(db, det)
+    if anterior is None:
+        _sumar(db, nuevo.rut_paciente, nuevo.programadas, nuevo.tomadas)
+    elif anterior.rut_paciente == nuevo.rut_paciente:
+        # solo la diferencia: una edición que no cambia el calendario no escribe nada
+        _sumar(db, nuevo.rut_paciente, _restar(nuevo.programadas, anterior.programadas),
+               _restar(nuevo.tomadas, anterior.tomadas))
+    else:
+        _sumar(db, anterior.rut_paciente, _restar(Counter(), anterior.programadas), _restar(Counter(), anterior.tomadas))
+        _sumar(db, nuevo.rut_paciente, nuevo.programadas, nuevo.tomadas)
+
+
+# --------- tomas en lote ---------
+
+def registrar_tomas(db: Session, tomas: list[dict]) -> dict:
+    """
+    tomas: [{id_detalle, programada_en, tomada_en?}]. Todo o nada: si alguna no
+    corresponde a una dosis programada se lanza ValueError. Las tomas ya
+    registradas se ignoran (reintentos).
+    """
+    if not tomas:
+        return {"registradas": 0, "repetidas": 0}
+    detalles = bloquear(db, [t["id_detalle"] for t in tomas])
+
+    ahora = datetime.now(timezone.utc)
+    filas = {}
+    for t in tomas:
+        det = detalles.get(t["id_detalle"])
+        if det is None:
+            raise ValueError(f"Prescripción {t['id_detalle']} no existe")
+        programada = _utc(t["programada_en"])
+        if not es_ocurrencia(det, programada):
+            raise ValueError(f"{programada.isoformat()} no es una dosis programada de la prescripción {det.id_detalle}")
+        filas[(det.id_detalle, programada)] = {
+            "id_detalle": det.id_detalle, "programada_en": programada,
+            "tomada_en": _utc(t.get("tomada_en") or ahora),
+        }
+
+    stmt = (
+        insert(TomaMedicamento.__table__).values(list(filas.values()))
+        .on_conflict_do_nothing()
+        .returning(TomaMedicamento.id_detalle, TomaMedicamento.programada_en)
+    )
+    nuevas = db.execute(stmt).all()
+
+    por_rut: dict[str, Counter] = {}
+    for id_detalle, programada_en in nuevas:
+        det = detalles[id_detalle]
+        por_rut.setdefault(det.rut_paciente, Counter())[semana_de(programada_en)] += 1
+        if not det.intervalo_horas and not det.tomada:
+            det.tomada, det.fecha_tomada = True, filas[(id_detalle, _utc(programada_en))]["tomada_en"]
+    for rut, tomadas in por_rut.items():
+        _sumar(db, rut, {}, tomadas)
+
+    db.commit()
+    return {"registradas": len(nuevas), "repetidas": len(filas) - len(nuevas)}
+
+
+def marcar_dosis_unicas(db: Session, ids: list[int], tomada: bool = True,
+                        fecha_tomada: datetime | None = None) -> dict:
+    """
+    Marca (o desmarca) varias prescripciones de dosis única con un solo UPDATE.
+    Se omiten las que no existen, las recurrentes (sus dosis van por
+    registrar_tomas) y las que ya tenían ese estado; los ids repetidos cuentan
+    una vez. Qué se actualiza se decide sobre las filas ya tomadas con
+    bloquear(). toma_medicamento y adherencia_semanal quedan igual que con el
+    PATCH individual.
+    """
+    unicos = list(dict.fromkeys(ids))
+    cuando = _utc(fecha_tomada) if fecha_tomada else datetime.now(timezone.utc)
+    detalles = bloquear(db, unicos)
+    candidatos = [i for i in unicos
+                  if i in detalles and not detalles[i].intervalo_horas and bool(detalles[i].tomada) != tomada]
+    filas = []
+    t = MedicinaDetalle.__table__
+    if candidatos:
+        filas = db.execute(
+            update(t)
+            .where(igual_a_alguna(t.c.id_detalle, candidatos))
+            .values(tomada=tomada, fecha_tomada=cuando if tomada else None)
+            .returning(t.c.id_detalle, t.c.rut_paciente)
+        ).all()
+    actualizadas = [f.id_detalle for f in filas]
+
+    if actualizadas:
+        tt = TomaMedicamento.__table__
+        if tomada:
+            cambios = db.execute(
+                insert(tt).from_select(
+                    ["id_detalle", "programada_en", "tomada_en"],
+                    select(t.c.id_detalle, t.c.fecha_inicio, t.c.fecha_tomada)
+                    .where(igual_a_alguna(t.c.id_detalle, actualizadas)),
+                ).on_conflict_do_nothing().returning(tt.c.id_detalle, tt.c.programada_en)
+            ).all()
+        else:
+            cambios = db.execute(
+                delete(tt).where(igual_a_alguna(tt.c.id_detalle, actualizadas))
+                .returning(tt.c.id_detalle, tt.c.programada_en)
+            ).all()
+
+        rut_de = {f.id_detalle: f.rut_paciente for f in filas}
+        signo = 1 if tomada else -1
+        por_rut: dict[str, Counter] = {}
+        for id_detalle, programada_en in cambios:
+            por_rut.setdefault(rut_de[id_detalle], Counter())[semana_de(programada_en)] += signo
+        for rut, tomadas in por_rut.items():
+            _sumar(db, rut, {}, tomadas)
+
+    db.commit()
+    hechas = set(actualizadas)
+    return {"actualizadas": actualizadas, "omitidas": [i for i in unicos if i not in hechas]}
+
+
+# --------- lectura ---------
+
+def dosis_pendientes(db: Session, rut_cuidador: str, desde: datetime, hasta: datetime) -> list[dict]:
+    """
+    Dosis programadas en [desde, hasta) y aún no tomadas de todos los pacientes
+    con vínculo activo al cuidador, de la más antigua a la más reciente.
+
+    Una sola consulta trae las prescripciones candidatas (índice rut_paciente,
+    fecha_inicio, tomada); las recurrentes se expanden con la regla y se cruzan
+    con sus tomas de la ventana.
+    """
+    d = MedicinaDetalle
+    filas = db.execute(
+        select(d.id_detalle, d.rut_paciente, d.id_medicina, Medicina.nombre.label("nombre_medicina"),
+               d.dosis, d.instrucciones_toma, d.fecha_inicio, d.fecha_fin, d.intervalo_horas)
+        .join(PacienteCuidador, PacienteCuidador.rut_paciente == d.rut_paciente)
+        .join(Medicina, Medicina.id_medicina == d.id_medicina)
+        .where(
+            PacienteCuidador.rut_cuidador == rut_cuidador,
+            PacienteCuidador.activo == True,
+            d.fecha_inicio < hasta,
+            or_(
+                and_(d.intervalo_horas.is_(None), d.tomada == False, d.fecha_inicio >= desde),
+                and_(d.intervalo_horas.is_not(None), d.fecha_fin > desde),
+            ),
+        )
+    ).all()
+
+    recurrentes = [f.id_detalle for f in filas if f.intervalo_horas]
+    tomadas = set()
+    if recurrentes:
+        tomadas = {
+            (i, _utc(p)) for i, p in db.execute(
+                select(TomaMedicamento.id_detalle, TomaMedicamento.programada_en)
+                .where(igual_a_alguna(TomaMedicamento.id_detalle, recurrentes),
+                       TomaMedicamento.programada_en >= desde, TomaMedicamento.programada_en < hasta)
+            )
+        }
+
+    pendientes = []
+    for f in filas:
+        for programada in ocurrencias(f, desde, hasta):
+            if (f.id_detalle, programada) in tomadas:
+                continue
+            pendientes.append({
+                "id_detalle": f.id_detalle,
+                "rut_paciente": f.rut_paciente,
+                "id_medicina": f.id_medicina,
+                "nombre_medicina": f.nombre_medicina,
+                "dosis": f.dosis,
+                "instrucciones_toma": f.instrucciones_toma,
+                "programada_en": programada,
+                "recurrente": bool(f.intervalo_horas),
+            })
+    pendientes.sort(key=lambda p: (p["programada_en"], p["rut_paciente"], p["id_detalle"]))
+    return pendientes
+
+
+def get_adherencia(db: Session, rut_paciente: str, desde: date | None = None, hasta: date | None = None) -> dict:
+    """Semanas en [desde, hasta] (por defecto las últimas 12). La semana en curso solo cuenta las dosis ya vencidas."""
+    ahora = datetime.now(timezone.utc)
+    actual = semana_de(ahora)
+    hasta = min(semana_de(_inicio_semana(hasta)) if hasta else actual, actual)
+    desde = semana_de(_inicio_semana(desde)) if desde else hasta - 11 * SEMANA
+
+    filas = db.execute(
+        select(AdherenciaSemanal.semana, AdherenciaSemanal.dosis_programadas, AdherenciaSemanal.dosis_tomadas)
+        .where(AdherenciaSemanal.rut_paciente == rut_paciente,
+               AdherenciaSemanal.semana >= desde, AdherenciaSemanal.semana <= hasta)
+        .order_by(AdherenciaSemanal.semana)
+    ).all()
+
+    vencidas_actual = None
+    if hasta == actual:
+        # semana en curso: solo las dosis hasta ahora, desde las prescripciones vigentes
+        inicio = _inicio_semana(actual)
+        vigentes = (
+            db.query(MedicinaDetalle).options(lazyload("*"))
+            .filter(MedicinaDetalle.rut_paciente == rut_paciente,
+                    MedicinaDetalle.fecha_inicio < ahora, MedicinaDetalle.fecha_fin > inicio)
+        )
+        vencidas_actual = sum(contar(d, inicio, ahora) for d in vigentes)
+
+    semanas = []
+    for f in filas:
+        if not f.dosis_programadas and not f.dosis_tomadas:
+            continue  # semana que quedó en cero tras editar/borrar prescripciones
+        vencidas = vencidas_actual if f.semana == actual else f.dosis_programadas
+        semanas.append({
+            "semana": f.semana,
+            "dosis_programadas": f.dosis_programadas,
+            "dosis_vencidas": vencidas,
+            "dosis_tomadas": f.dosis_tomadas,
+            "tasa": round(min(f.dosis_tomadas / vencidas, 1.0), 4) if vencidas else None,
+        })
+
+    total_vencidas = sum(s["dosis_vencidas"] for s in semanas)
+    total_tomadas = sum(s["dosis_tomadas"] for s in semanas)
+    return {
+        "rut_paciente": rut_paciente,
+        "desde": desde,
+        "hasta": hasta,
+        "semanas": semanas,
+        "dosis_vencidas": total_vencidas,
+        "dosis_tomadas": total_tomadas,
+        "tasa": round(min(total_tomadas / total_vencidas, 1.0), 4) if total_vencidas else None,
+    }
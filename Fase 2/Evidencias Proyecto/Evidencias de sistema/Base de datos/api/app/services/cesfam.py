@@ -1,16 +1,16 @@
 from sqlalchemy.orm import Session
+from app.core.catalog_cache import catalog_cache
 from app.models.cesfam import Cesfam
 from app.schemas.cesfam import CesfamCreate, CesfamUpdate
 
 def list_(db: Session, skip: int, limit: int, id_comuna: int | None = None, estado: bool | None = True):
-    q = db.query(Cesfam)
+    # catálogo en memoria (app/core/catalog_cache.py)
+    filas = catalog_cache.filas("cesfam")
     if id_comuna is not None:
-        q = q.filter(Cesfam.id_comuna == id_comuna)
+        filas = [f for f in filas if f["id_comuna"] == id_comuna]
     if estado is not None:
-        q = q.filter(Cesfam.estado == estado)
-    total = q.count()
-    items = q.order_by(Cesfam.id_cesfam).offset(skip).limit(limit).all()
-    return items, total
+        filas = [f for f in filas if f["estado"] == estado]
+    return filas[skip:skip + limit], len(filas)
 
 def get(db: Session, id_cesfam: int):
     return db.get(Cesfam, id_cesfam)
@@ -18,6 +18,7 @@ def get(db: Session, id_cesfam: int):
 def create(db: Session, data: CesfamCreate):
     obj = Cesfam(**data.model_dump())
     db.add(obj); db.commit(); db.refresh(obj)
+    catalog_cache.invalidar("cesfam")
     return obj
 
 def update(db: Session, id_cesfam: int, data: CesfamUpdate):
@@ -26,6 +27,7 @@ def update(db: Session, id_cesfam: int, data: CesfamUpdate):
     for k, v in data.model_dump(exclude_none=True).items():
         setattr(obj, k, v)
     db.commit(); db.refresh(obj)
+    catalog_cache.invalidar("cesfam")
     return obj
 
 def set_estado(db: Session, id_cesfam: int, habilitar: bool) -> bool:
@@ -33,6 +35,7 @@ def set_estado(db: Session, id_cesfam: int, habilitar: bool) -> bool:
     if not obj: return False
     obj.estado = habilitar
     db.commit(); db.refresh(obj)
+    catalog_cache.invalidar("cesfam")
     return True
 
 def delete(db: Session, id_cesfam: int) -> bool:
@@ -1,14 +1,14 @@
 from sqlalchemy.orm import Session
+from app.core.catalog_cache import catalog_cache
 from app.models.comuna import Comuna
 from app.schemas.comuna import ComunaCreate, ComunaUpdate
 
 def list_(db: Session, skip: int, limit: int, id_region: int | None = None):
-    q = db.query(Comuna)
+    # catálogo en memoria (app/core/catalog_cache.py)
+    filas = catalog_cache.filas("comuna")
     if id_region is not None:
-        q = q.filter(Comuna.id_region == id_region)
-    total = q.count()
-    items = q.order_by(Comuna.id_comuna).offset(skip).limit(limit).all()
-    return items, total
+        filas = [f for f in filas if f["id_region"] == id_region]
+    return filas[skip:skip + limit], len(filas)
 
 def get(db: Session, id_comuna: int):
     return db.get(Comuna, id_comuna)
@@ -16,6 +16,7 @@ def get(db: Session, id_comuna: int):
 def create(db: Session, data: ComunaCreate):
     obj = Comuna(**data.model_dump())
     db.add(obj); db.commit(); db.refresh(obj)
+    catalog_cache.invalidar("comuna")
     return obj
 
 def update(db: Session, id_comuna: int, data: ComunaUpdate):
@@ -24,10 +25,12 @@ def update(db: Session, id_comuna: int, data: ComunaUpdate):
     for k, v in data.model_dump(exclude_none=True).items():
         setattr(obj, k, v)
     db.commit(); db.refresh(obj)
+    catalog_cache.invalidar("comuna")
     return obj
 
 def delete(db: Session, id_comuna: int):
     obj = get(db, id_comuna)
     if not obj: return False
     db.delete(obj); db.commit()
+    catalog_cache.invalidar("comuna")
     return True
@@ -4,13 +4,17 @@ import asyncio
 import logging
 
 from app.models.cuidador import Cuidador
-from app.schemas.cuidador import CuidadorCreate, CuidadorUpdate
+from app.schemas.cuidador import CuidadorCreate, CuidadorUpdate, CuidadorOut
+from app.core.batch import buscar_por_claves
+from app.core.singleflight import CacheCorta
 from app.core.security import hash_password  # 🔐 usa core
 from app.services.email import email_service
 from app.schemas.email import WelcomeEmail
 
 logger = logging.getLogger(__name__)
 
+_cache = CacheCorta("cuidador")
+
 def list_(db: Session, skip: int, limit: int,
           estado: bool | None = True,
           primer_nombre: str | None = None,
@@ -38,6 +42,16 @@ def list_(db: Session, skip: int, limit: int,
 def get(db: Session, rut_cuidador: str):
     return db.get(Cuidador, rut_cuidador)
 
+def get_many(db: Session, ruts: list[str]):
+    return buscar_por_claves(db, Cuidador, Cuidador.rut_cuidador, ruts)
+
+def get_cached(db: Session, rut_cuidador: str):
+    """Lectura para GET /cuidador/{rut}: requests simultáneos comparten una consulta"""
+    def cargar():
+        obj = get(db, rut_cuidador)
+        return CuidadorOut.model_validate(obj).model_dump() if obj else None
+    return _cache.get_or_load(rut_cuidador, cargar)
+
 def create(db: Session, data: CuidadorCreate):
     payload = data.model_dump()
     raw_password = payload.get("contrasena")
@@ -148,6 +162,7 @@ def update(db: Session, rut_cuidador: str, data: CuidadorUpdate):
         print("SERVICE UPDATE - Haciendo commit...")
         db.commit()
         db.refresh(obj)
+        _cache.invalidar(rut_cuidador)
         print("SERVICE UPDATE - Commit exitoso")
     else:
         print("SERVICE UPDATE - No se requiere commit")
@@ -159,6 +174,7 @@ def set_estado(db: Session, rut_cuidador: str, habilitar: bool) -> bool:
     if not obj: return False
     obj.estado = habilitar
     db.commit(); db.refresh(obj)
+    _cache.invalidar(rut_cuidador)
     return True
 
 def delete(db: Session, rut_cuidador: str) -> bool:
@@ -7,6 +7,7 @@ from email import encoders
 import aiosmtplib
 from jinja2 import Template
 from typing import List, Optional, Dict, Any
+from functools import lru_cache
 import logging
 from pathlib import Path
 
@@ -22,6 +23,13 @@ from app.schemas.email import (
 
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=32)
+def plantilla(fuente: str) -> Template:
+    """Compila cada plantilla HTML una sola vez por proceso"""
+    return Template(fuente)
+
+
 class EmailService:
     def __init__(self):
         self.smtp_host = settings.SMTP_HOST
@@ -29,36 +37,42 @@ class EmailService:
         self.smtp_user = settings.SMTP_USER
         self.smtp_password = settings.SMTP_PASSWORD
         self.smtp_tls = settings.SMTP_TLS
+        self.smtp_ssl = settings.SMTP_SSL
         self.from_email = settings.EMAILS_FROM_EMAIL
         self.from_name = settings.EMAILS_FROM_NAME
 
+    def construir_mensaje(self, email_data: EmailSchema) -> MIMEMultipart:
+        """Arma el MIME (texto plano + HTML opcional) sin enviarlo"""
+        message = MIMEMultipart("alternative")
+        message["From"] = f"{self.from_name} <{self.from_email}>"
+        message["To"] = ", ".join(email_data.to)
+        message["Subject"] = email_data.subject
+
+        # Agregar texto plano
+        text_part = MIMEText(email_data.body, "plain", "utf-8")
+        message.attach(text_part)
+
+        # Agregar HTML si está disponible
+        if email_data.html_body:
+            html_part = MIMEText(email_data.html_body, "html", "utf-8")
+            message.attach(html_part)
+        return message
+
     async def send_email(self, email_data: EmailSchema) -> Dict[str, Any]:
         """Envía un email básico"""
         try:
-            # Crear mensaje
-            message = MIMEMultipart("alternative")
-            message["From"] = f"{self.from_name} <{self.from_email}>"
-            message["To"] = ", ".join(email_data.to)
-            message["Subject"] = email_data.subject
-
-            # Agregar texto plano
-            text_part = MIMEText(email_data.body, "plain", "utf-8")
-            message.attach(text_part)
-
-            # Agregar HTML si está disponible
-            if email_data.html_body:
-                html_part = MIMEText(email_data.html_body, "html", "utf-8")
-                message.attach(html_part)
+            message = self.construir_mensaje(email_data)
 
             # Enviar email usando aiosmtplib con configuración correcta para Gmail
             await aiosmtplib.send(
                 message,
                 hostname=self.smtp_host,
                 port=self.smtp_port,
-                username=self.smtp_user,
-                password=self.smtp_password,
-                start_tls=True,
-                use_tls=False  # No usar TLS directo, solo STARTTLS
+                # Sin credenciales (p.ej. el sumidero local de los tests) no se hace AUTH
+                username=self.smtp_user or None,
+                password=self.smtp_password or None,
+                start_tls=self.smtp_tls and not self.smtp_ssl,  # Gmail: STARTTLS en el 587
+                use_tls=self.smtp_ssl
             )
 
             logger.info(f"Email enviado exitosamente a: {', '.join(email_data.to)}")
@@ -78,7 +92,10 @@ class EmailService:
 
     async def send_welcome_email(self, welcome_data: WelcomeEmail) -> Dict[str, Any]:
         """Envía email de bienvenida a nuevo paciente"""
-        
+        return await self.send_email(self.armar_bienvenida(welcome_data))
+
+    def armar_bienvenida(self, welcome_data: WelcomeEmail) -> EmailSchema:
+        """Arma el email de bienvenida sin enviarlo (importación masiva: se envían por PoolSMTP)"""
         html_template = """
         <html>
             <head>
@@ -138,7 +155,7 @@ class EmailService:
         Sistema de Salud CESFAM
         """
         
-        template = Template(html_template)
+        template = plantilla(html_template)
         html_content = template.render(
             patient_name=welcome_data.patient_name,
             user_email=welcome_data.to,
@@ -151,11 +168,14 @@ class EmailService:
             body=text_content,
             html_body=html_content
         )
-        
-        return await self.send_email(email_data)
+        return email_data
 
     async def send_appointment_reminder(self, reminder_data: AppointmentReminder) -> Dict[str, Any]:
         """Envía recordatorio de cita médica"""
+        return await self.send_email(self.armar_recordatorio_cita(reminder_data))
+
+    def armar_recordatorio_cita(self, reminder_data: AppointmentReminder) -> EmailSchema:
+        """Renderiza el recordatorio de cita (también lo usa el envío por lotes)"""
         
         html_template = """
         <html>
@@ -197,7 +217,7 @@ class EmailService:
         </html>
         """
         
-        template = Template(html_template)
+        template = plantilla(html_template)
         html_content = template.render(
             patient_name=reminder_data.patient_name,
             appointment_date=reminder_data.appointment_date,
@@ -229,12 +249,14 @@ class EmailService:
             body=text_content,
             html_body=html_content
         )
-        
-        return await self.send_email(email_data)
+        return email_data
 
     async def send_alert_notification(self, alert_data: AlertNotification) -> Dict[str, Any]:
         """Envía notificación de alerta médica"""
-        
+        return await self.send_email(self.armar_alerta(alert_data))
+
+    def armar_alerta(self, alert_data: AlertNotification) -> EmailSchema:
+        """Renderiza una alerta individual (también la usa el agregador de notificaciones)"""
         severity_colors = {
             "critical": "#e53e3e",
             "high": "#ed8936", 
@@ -283,7 +305,7 @@ class EmailService:
         </html>
         """
         
-        template = Template(html_template)
+        template = plantilla(html_template)
         html_content = template.render(
             patient_name=alert_data.patient_name,
             alert_type=alert_data.alert_type,
@@ -300,7 +322,67 @@ class EmailService:
             html_body=html_content
         )
         
-        return await self.send_email(email_data)
+        return email_data
+
+    def armar_resumen_alertas(self, to: str, patient_name: str, items: List[Dict[str, Any]]) -> EmailSchema:
+        """
+        Resumen de varias alertas de un paciente en un solo correo. items:
+        [{severidad, resumen, conteo, primera, ultima}], el más grave primero.
+        """
+        html_template = """
+        <html>
+            <head>
+                <style>
+                    body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+                    .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+                    .header { background-color: #ed8936; color: white; padding: 20px; text-align: center; }
+                    .content { background-color: #f7fafc; padding: 30px; }
+                    table { width: 100%; border-collapse: collapse; margin: 20px 0; }
+                    th, td { text-align: left; padding: 8px; border-bottom: 1px solid #e2e8f0; }
+                    .footer { text-align: center; padding: 20px; color: #666; }
+                </style>
+            </head>
+            <body>
+                <div class="container">
+                    <div class="header">
+                        <h1>Resumen de alertas</h1>
+                    </div>
+                    <div class="content">
+                        <h2>Paciente: {{ patient_name }}</h2>
+                        <p>Se registraron {{ total }} alertas desde la última notificación:</p>
+                        <table>
+                            <tr><th>Severidad</th><th>Descripción</th><th>Veces</th><th>Primera / última</th></tr>
+                            {% for it in items %}
+                            <tr>
+                                <td>{{ it.severidad | upper }}</td>
+                                <td>{{ it.resumen }}</td>
+                                <td>{{ it.conteo }}</td>
+                                <td>{{ it.primera }}{% if it.conteo > 1 %} / {{ it.ultima }}{% endif %}</td>
+                            </tr>
+                            {% endfor %}
+                        </table>
+                        <p><strong>Acción requerida:</strong> Por favor revisa el sistema para más detalles.</p>
+                    </div>
+                    <div class="footer">
+                        <p>Sistema de Salud CESFAM<br>
+                        Este es un email automático, por favor no responder.</p>
+                    </div>
+                </div>
+            </body>
+        </html>
+        """
+        total = sum(it["conteo"] for it in items)
+        html_content = plantilla(html_template).render(patient_name=patient_name, items=items, total=total)
+        lineas = "\n".join(
+            f"- [{it['severidad'].upper()}] {it['resumen']} (x{it['conteo']}, {it['primera']} - {it['ultima']})"
+            for it in items
+        )
+        return EmailSchema(
+            to=[to],
+            subject=f"Resumen de {total} alertas: {patient_name}",
+            body=f"Alertas de {patient_name} desde la última notificación:\n{lineas}",
+            html_body=html_content
+        )
 
     async def send_password_reset(self, reset_data: PasswordReset) -> Dict[str, Any]:
         """Envía email de restablecimiento de contraseña"""
@@ -346,7 +428,7 @@ class EmailService:
         </html>
         """
         
-        template = Template(html_template)
+        template = plantilla(html_template)
         html_content = template.render(
             user_name=reset_data.user_name,
             reset_token=reset_data.reset_token,
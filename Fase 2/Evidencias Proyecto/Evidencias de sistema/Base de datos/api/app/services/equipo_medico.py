@@ -4,6 +4,7 @@ import logging
 
 from app.models.equipo_medico import EquipoMedico
 from app.schemas.equipo_medico import EquipoMedicoCreate, EquipoMedicoUpdate
+from app.core.batch import buscar_por_claves
 from app.core.security import hash_password  # 🔐
 from app.services.email import email_service
 from app.schemas.email import WelcomeEmail
@@ -43,6 +44,9 @@ def list_(db: Session, skip: int, limit: int,
 def get(db: Session, rut_medico: str):
     return db.get(EquipoMedico, rut_medico)
 
+def get_many(db: Session, ruts: list[str]):
+    return buscar_por_claves(db, EquipoMedico, EquipoMedico.rut_medico, ruts)
+
 def create(db: Session, data: EquipoMedicoCreate):
     payload = data.model_dump()
     raw_password = payload.get("contrasenia")
@@ -0,0 +1,159 @@
+# app/services/export_analitico.py
+"""
+Exportación columnar (Arrow / Parquet) para análisis en pandas/polars.
+
+Cada dataset es un SELECT plano (Core, sin objetos ORM) leído por lotes desde un
+cursor del lado del servidor; cada lote se convierte en un RecordBatch con tipos
+reales (timestamps con zona UTC, floats, booleanos), así la memoria queda acotada
+al tamaño del lote.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterator
+import io
+import os
+import tempfile
+
+from sqlalchemy import select, Boolean, DateTime, Float, Integer, BigInteger
+
+from app.db import engine
+from app.models.medicion import Medicion
+from app.models.medicion_detalle import MedicionDetalle
+from app.models.medicina import Medicina
+from app.models.medicina_detalle import MedicinaDetalle
+from app.services import medicion as medicion_svc
+
+FORMATOS = ("parquet", "arrow")
+LOTE = 10_000
+
+
+def _stmt_mediciones(rut_paciente: str | None = None,
+                     desde: datetime | None = None,
+                     hasta: datetime | None = None):
+    return (
+        select(*medicion_svc.EXPORT_COLUMNAS)
+        .select_from(Medicion)
+        .outerjoin(MedicionDetalle, medicion_svc.join_detalle(desde, hasta))
+        .where(*medicion_svc._filtros(rut_paciente=rut_paciente, desde=desde, hasta=hasta))
+        .order_by(Medicion.id_medicion)
+    )
+
+
+def _stmt_adherencia(rut_paciente: str | None = None,
+                   desde: datetime | None = None,
+                   hasta: datetime | None = None):
+    stmt = (
+        select(
+            MedicinaDetalle.id_detalle,
+            MedicinaDetalle.id_medicina,
+            Medicina.nombre.label("nombre_medicina"),
+            MedicinaDetalle.rut_paciente,
+            MedicinaDetalle.dosis,
+            MedicinaDetalle.instrucciones_toma,
+            MedicinaDetalle.fecha_inicio,
+            MedicinaDetalle.fecha_fin,
+            MedicinaDetalle.tomada,
+            MedicinaDetalle.fecha_tomada,
+        )
+        .join(Medicina, Medicina.id_medicina == MedicinaDetalle.id_medicina)
+        .order_by(MedicinaDetalle.id_detalle)
+    )
+    if rut_paciente is not None:
+        stmt = stmt.where(MedicinaDetalle.rut_paciente == rut_paciente)
+    if desde:
+        stmt = stmt.where(MedicinaDetalle.fecha_inicio >= desde)
+    if hasta:
+        stmt = stmt.where(MedicinaDetalle.fecha_inicio < hasta)
+    return stmt
+
+
+DATASETS = {
+    "mediciones": _stmt_mediciones,
+    "adherencia": _stmt_adherencia,
+}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401  (registra pyarrow.parquet)
+    except ImportError as e:  # dependencia opcional: la API funciona sin ella
+        raise RuntimeError("La exportación columnar requiere 'pyarrow' instalado.") from e
+    return pyarrow
+
+
+def _arrow_type(pa, sql_type):
+    if isinstance(sql_type, DateTime):
+        return pa.timestamp("us", tz="UTC") if sql_type.timezone else pa.timestamp("us")
+    if isinstance(sql_type, BigInteger):
+        return pa.int64()
+    if isinstance(sql_type, Integer):
+        return pa.int32()
+    if isinstance(sql_type, Float):
+        return pa.float64()
+    if isinstance(sql_type, Boolean):
+        return pa.bool_()
+    return pa.string()
+
+
+def _schema(pa, stmt):
+    return pa.schema([
+        pa.field(col.key, _arrow_type(pa, col.type), nullable=True)
+        for col in stmt.selected_columns
+    ])
+
+
+def _iter_batches(pa, stmt, schema):
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, max_row_buffer=LOTE).execute(stmt)
+        for filas in result.partitions(LOTE):
+            columnas = list(zip(*filas))
+            yield pa.RecordBatch.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columnas, schema)],
+                schema=schema,
+            )
+
+
+def iter_arrow_stream(dataset: str, **filtros) -> Iterator[bytes]:
+    """Formato IPC de Arrow (stream): se puede enviar a medida que se genera."""
+    pa = _pyarrow()
+    stmt = DATASETS[dataset](**filtros)
+    schema = _schema(pa, stmt)
+
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+
+    def _drain() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0); sink.truncate(0)
+        return data
+
+    yield _drain()  # encabezado con el schema
+    for batch in _iter_batches(pa, stmt, schema):
+        writer.write_batch(batch)
+        yield _drain()
+    writer.close()
+    yield _drain()
+
+
+def write_parquet(dataset: str, **filtros) -> str:
+    """
+    Escribe el dataset a un archivo Parquet temporal (un row group por lote, zstd).
+    Parquet necesita el footer al final, por eso se genera completo antes de descargarlo.
+    Devuelve la ruta; quien llama es responsable de borrarla.
+    """
+    pa = _pyarrow()
+    stmt = DATASETS[dataset](**filtros)
+    schema = _schema(pa, stmt)
+
+    fd, path = tempfile.mkstemp(prefix=f"{dataset}_", suffix=".parquet")
+    os.close(fd)
+    try:
+        with pa.parquet.ParquetWriter(path, schema, compression="zstd") as writer:
+            for batch in _iter_batches(pa, stmt, schema):
+                writer.write_batch(batch)
+    except Exception:
+        os.unlink(path)
+        raise
+    return path
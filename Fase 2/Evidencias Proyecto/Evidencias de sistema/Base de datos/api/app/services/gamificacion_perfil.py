@@ -1,6 +1,9 @@
 from sqlalchemy.orm import Session
 from app.models.gamificacion_perfil import GamificacionPerfil
-from app.schemas.gamificacion_perfil import GamificacionPerfilCreate, GamificacionPerfilUpdate
+from app.schemas.gamificacion_perfil import GamificacionPerfilCreate, GamificacionPerfilUpdate, GamificacionPerfilOut
+from app.core.singleflight import CacheCorta
+
+_cache = CacheCorta("gamificacion_perfil")
 
 def list_(db: Session, skip: int, limit: int, rut_paciente: str | None = None):
     q = db.query(GamificacionPerfil)
@@ -13,6 +16,13 @@ def list_(db: Session, skip: int, limit: int, rut_paciente: str | None = None):
 def get(db: Session, rut_paciente: str):
     return db.get(GamificacionPerfil, rut_paciente)
 
+def get_cached(db: Session, rut_paciente: str):
+    """Lectura para GET /gamificacion-perfil/{rut}: requests simultáneos comparten una consulta"""
+    def cargar():
+        obj = get(db, rut_paciente)
+        return GamificacionPerfilOut.model_validate(obj).model_dump() if obj else None
+    return _cache.get_or_load(rut_paciente, cargar)
+
 def create(db: Session, data: GamificacionPerfilCreate):
     obj = GamificacionPerfil(**data.model_dump())
     db.add(obj); db.commit(); db.refresh(obj)
@@ -24,10 +34,12 @@ def update(db: Session, rut_paciente: str, data: GamificacionPerfilUpdate):
     for k, v in data.model_dump(exclude_none=True).items():
         setattr(obj, k, v)
     db.commit(); db.refresh(obj)
+    _cache.invalidar(rut_paciente)
     return obj
 
 def delete(db: Session, rut_paciente: str):
     obj = get(db, rut_paciente)
     if not obj: return False
     db.delete(obj); db.commit()
+    _cache.invalidar(rut_paciente)
     return True
@@ -0,0 +1,300 @@
+# app/services/importacion.py
+"""
+Importación masiva de pacientes, cuidadores y equipo médico desde CSV.
+
+Para dar de alta un CESFAM nuevo (miles de filas) en vez de un POST por
+persona. El CSV trae una cabecera con los mismos campos que el POST de cada
+recurso (PacienteCreate, CuidadorCreate, EquipoMedicoCreate); las celdas vacías
+son null. Se lee en streaming y se procesa por lotes de IMPORTACION_LOTE filas:
+
+  1. valida el lote completo con un TypeAdapter(list[...]) (mismas reglas que el POST)
+  2. descarta repetidos dentro del archivo y los que ya existen (RUT o email) con
+     una sola consulta por lote; lo mismo para comuna/CESFAM inexistentes
+  3. hashea las contraseñas en un pool de procesos (bcrypt es lo caro)
+  4. inserta con un INSERT multi-fila ... ON CONFLICT DO NOTHING y hace commit
+
+Un lote con errores no detiene el resto: cada fila rechazada queda en el
+reporte con su número de línea. Los correos de bienvenida se devuelven para
+que quien llama los encole todos juntos (enviar_bienvenidas, por PoolSMTP).
+"""
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import csv
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+import io
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+from typing import IO, Iterator
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.core.security import hash_password
+from app.core.smtp_pool import PoolSMTP
+from app.models.cesfam import Cesfam
+from app.models.comuna import Comuna
+from app.models.cuidador import Cuidador
+from app.models.equipo_medico import EquipoMedico
+from app.models.paciente import Paciente
+from app.schemas.cuidador import CuidadorCreate
+from app.schemas.email import WelcomeEmail
+from app.schemas.equipo_medico import EquipoMedicoCreate
+from app.schemas.importacion import ErrorFila, ResultadoImportacion
+from app.schemas.paciente import PacienteCreate
+from app.services.email import email_service
+
+logger = logging.getLogger(__name__)
+
+_SPOOL_MAX = 8 * 1024 * 1024   # bytes del CSV en memoria antes de pasar a disco
+
+
+@dataclass(frozen=True)
+class Tipo:
+    esquema: type[BaseModel]
+    modelo: type
+    pk: str
+    contrasena: str                      # nombre del campo de contraseña
+    nombre: tuple[str, ...]              # campos que forman el nombre del correo de bienvenida
+    referencias: tuple[tuple[str, object], ...] = ()   # (campo, columna que debe existir)
+
+
+TIPOS = {
+    "paciente": Tipo(
+        PacienteCreate, Paciente, "rut_paciente", "contrasena",
+        ("primer_nombre_paciente", "segundo_nombre_paciente", "primer_apellido_paciente", "segundo_apellido_paciente"),
+        (("id_comuna", Comuna.id_comuna), ("id_cesfam", Cesfam.id_cesfam)),
+    ),
+    "cuidador": Tipo(
+        CuidadorCreate, Cuidador, "rut_cuidador", "contrasena",
+        ("primer_nombre_cuidador", "segundo_nombre_cuidador", "primer_apellido_cuidador", "segundo_apellido_cuidador"),
+    ),
+    "equipo_medico": Tipo(
+        EquipoMedicoCreate, EquipoMedico, "rut_medico", "contrasenia",
+        ("primer_nombre_medico", "segundo_nombre_medico", "primer_apellido_medico", "segundo_apellido_medico"),
+        (("id_cesfam", Cesfam.id_cesfam),),
+    ),
+}
+
+
+@lru_cache(maxsize=None)
+def _adaptador(esquema: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[esquema])
+
+
+# --------- lectura y validación (sin base de datos) ---------
+
+def leer(tipo: Tipo, archivo: IO[str]) -> Iterator[tuple[int, dict]]:
+    """(línea, fila) del CSV; la cabecera se valida antes de entregar la primera fila"""
+    lector = csv.DictReader(archivo, restkey="__sobrantes__")
+    if not lector.fieldnames:
+        raise ValueError("El archivo está vacío")
+    lector.fieldnames = [c.strip().lower() for c in lector.fieldnames]
+    campos = tipo.esquema.model_fields
+    desconocidas = [c for c in lector.fieldnames if c not in campos]
+    if desconocidas:
+        raise ValueError(f"Columnas desconocidas: {', '.join(desconocidas)}")
+    faltantes = [c for c, f in campos.items() if f.is_required() and c not in lector.fieldnames]
+    if faltantes:
+        raise ValueError(f"Faltan columnas: {', '.join(faltantes)}")
+    for fila in lector:
+        yield lector.line_num, {k: (v.strip() or None) if isinstance(v, str) else v for k, v in fila.items()}
+
+
+def validar(tipo: Tipo, filas: list[tuple[int, dict]]) -> tuple[list[tuple[int, BaseModel]], list[ErrorFila]]:
+    """Valida el lote de una vez; si hay errores, se revalidan juntas las filas que no fallaron"""
+    errores: list[ErrorFila] = []
+    pendientes = []
+    for linea, datos in filas:
+        if "__sobrantes__" in datos:
+            errores.append(ErrorFila(fila=linea, clave=datos.get(tipo.pk), mensaje="La fila tiene más columnas que la cabecera"))
+        else:
+            pendientes.append((linea, datos))
+    adaptador = _adaptador(tipo.esquema)
+    while pendientes:
+        try:
+            objetos = adaptador.validate_python([d for _, d in pendientes])
+        except ValidationError as e:
+            malas = set()
+            for err in e.errors(include_url=False):
+                i = err["loc"][0]
+                linea, datos = pendientes[i]
+                malas.add(i)
+                errores.append(ErrorFila(fila=linea, clave=datos.get(tipo.pk),
+                                         campo=".".join(str(p) for p in err["loc"][1:]) or None,
+                                         mensaje=err["msg"].removeprefix("Value error, ")))
+            pendientes = [p for i, p in enumerate(pendientes) if i not in malas]
+            continue
+        return [(linea, obj) for (linea, _), obj in zip(pendientes, objetos)], errores
+    return [], errores
+
+
+# --------- contraseñas ---------
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def hashear(contrasenas: list[str]) -> list[str]:
+    """bcrypt de cada contraseña repartido en IMPORTACION_PROCESOS procesos (1 = en este mismo)"""
+    global _pool
+    if settings.IMPORTACION_PROCESOS == 1 or len(contrasenas) < 2:
+        return [hash_password(c) for c in contrasenas]
+    procesos = settings.IMPORTACION_PROCESOS or os.cpu_count() or 1
+    with _pool_lock:
+        if _pool is None:
+            # spawn: no heredar hilos ni conexiones del proceso de la API
+            _pool = ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context("spawn"))
+        pool = _pool
+    trozo = max(1, len(contrasenas) // (procesos * 4))
+    return list(pool.map(hash_password, contrasenas, chunksize=trozo))
+
+
+def cerrar() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+# --------- importación ---------
+
+def _existentes(db: Session, tipo: Tipo, claves: list[str], emails: list[str]) -> tuple[set, set]:
+    pk = getattr(tipo.modelo, tipo.pk)
+    filas = db.execute(select(pk, tipo.modelo.email).where(or_(pk.in_(claves), tipo.modelo.email.in_(emails)))).all()
+    return {f[0] for f in filas}, {(f[1] or "").lower() for f in filas}
+
+
+def _nombre(tipo: Tipo, datos: dict) -> str:
+    return " ".join(" ".join(datos.get(c) or "" for c in tipo.nombre).split())
+
+
+def importar(db: Session, nombre_tipo: str, archivo: IO[str],
+             solo_validar: bool = False) -> tuple[ResultadoImportacion, list[WelcomeEmail]]:
+    """Importa el CSV; devuelve el reporte y los correos de bienvenida de lo que se creó"""
+    tipo = TIPOS.get(nombre_tipo)
+    if tipo is None:
+        raise ValueError(f"Tipo de importación desconocido: {nombre_tipo}")
+    filas = leer(tipo, archivo)
+    total = creados = 0
+    errores: list[ErrorFila] = []
+    correos: list[WelcomeEmail] = []
+    vistos_clave: set[str] = set()
+    vistos_email: set[str] = set()
+
+    while lote := list(islice(filas, settings.IMPORTACION_LOTE)):
+        total += len(lote)
+        validos, errs = validar(tipo, lote)
+        errores += errs
+
+        # Repetidos dentro del archivo, y lo que ya existe en la base (una consulta por lote)
+        candidatos = []
+        for linea, obj in validos:
+            datos = obj.model_dump()
+            datos["email"] = datos["email"].strip().lower()
+            clave = datos[tipo.pk]
+            if clave in vistos_clave:
+                errores.append(ErrorFila(fila=linea, clave=clave, campo=tipo.pk, mensaje="RUT repetido en el archivo"))
+            elif datos["email"] in vistos_email:
+                errores.append(ErrorFila(fila=linea, clave=clave, campo="email", mensaje="Email repetido en el archivo"))
+            else:
+                vistos_clave.add(clave)
+                vistos_email.add(datos["email"])
+                candidatos.append((linea, datos))
+        if not candidatos:
+            continue
+        claves_db, emails_db = _existentes(db, tipo, [d[tipo.pk] for _, d in candidatos],
+                                           [d["email"] for _, d in candidatos])
+        faltan = {}
+        for campo, columna in tipo.referencias:
+            ids = {d[campo] for _, d in candidatos}
+            faltan[campo] = ids - set(db.execute(select(columna).where(columna.in_(ids))).scalars())
+
+        nuevos = []
+        for linea, datos in candidatos:
+            clave = datos[tipo.pk]
+            if clave in claves_db:
+                errores.append(ErrorFila(fila=linea, clave=clave, campo=tipo.pk, mensaje="El RUT ingresado ya existe"))
+            elif datos["email"] in emails_db:
+                errores.append(ErrorFila(fila=linea, clave=clave, campo="email", mensaje="El email ingresado ya existe"))
+            elif malo := next((c for c, _ in tipo.referencias if datos[c] in faltan[c]), None):
+                errores.append(ErrorFila(fila=linea, clave=clave, campo=malo, mensaje=f"No existe {malo}={datos[malo]}"))
+            else:
+                nuevos.append((linea, datos))
+        if solo_validar:
+            creados += len(nuevos)
+            continue
+        if not nuevos:
+            continue
+
+        claras = [d[tipo.contrasena] for _, d in nuevos]
+        for (_, datos), hashed in zip(nuevos, hashear(claras)):
+            datos[tipo.contrasena] = hashed
+        pk = getattr(tipo.modelo, tipo.pk)
+        insertados = set(db.execute(insert(tipo.modelo).on_conflict_do_nothing().returning(pk),
+                                    [d for _, d in nuevos]).scalars())
+        db.commit()
+
+        for (linea, datos), clara in zip(nuevos, claras):
+            clave = datos[tipo.pk]
+            if clave not in insertados:   # lo creó otro request entre la consulta y el INSERT
+                errores.append(ErrorFila(fila=linea, clave=clave, mensaje="Ya existe (creado durante la importación)"))
+                continue
+            creados += 1
+            correos.append(WelcomeEmail(to=datos["email"], patient_name=_nombre(tipo, datos),
+                                        rut=clave, temporary_password=clara))
+
+    logger.info(f"Importación {nombre_tipo}: {total} filas, {creados} creados, {len(errores)} con error")
+    errores.sort(key=lambda e: e.fila)
+    resultado = ResultadoImportacion(tipo=nombre_tipo, filas=total, creados=creados,
+                                     solo_validar=solo_validar, errores=errores)
+    return resultado, correos
+
+
+async def importar_request(request, db: Session, nombre_tipo: str,
+                           solo_validar: bool = False) -> tuple[ResultadoImportacion, list[WelcomeEmail]]:
+    """
+    POST .../import: el cuerpo (text/csv) se copia a un archivo temporal, en
+    memoria hasta _SPOOL_MAX, y se importa en el threadpool (bcrypt y la base
+    son bloqueantes).
+    """
+    with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX, mode="w+b") as crudo:
+        async for parte in request.stream():
+            crudo.write(parte)
+        crudo.seek(0)
+        texto = io.TextIOWrapper(crudo, encoding="utf-8-sig", newline="")
+        try:
+            return await run_in_threadpool(importar, db, nombre_tipo, texto, solo_validar)
+        except UnicodeDecodeError:
+            raise ValueError("El archivo debe venir en UTF-8")
+        finally:
+            texto.detach()
+
+
+async def enviar_bienvenidas(correos: list[WelcomeEmail]) -> tuple[int, int]:
+    """Envía los correos de bienvenida de una importación por sesiones SMTP reutilizadas"""
+    async def uno(datos: WelcomeEmail) -> bool:
+        try:
+            await pool.enviar(email_service.construir_mensaje(email_service.armar_bienvenida(datos)))
+            return True
+        except Exception as e:
+            logger.error(f"No se pudo enviar la bienvenida a {datos.to}: {e}")
+            return False
+
+    enviados = 0
+    async with PoolSMTP() as pool:
+        for tarea in asyncio.as_completed([uno(c) for c in correos]):
+            enviados += await tarea
+    logger.info(f"Bienvenidas de importación: {enviados} enviadas, {len(correos) - enviados} fallidas")
+    return enviados, len(correos) - enviados
@@ -1,14 +1,14 @@
 from sqlalchemy.orm import Session
+from app.core.catalog_cache import catalog_cache
 from app.models.insignia import Insignia
 from app.schemas.insignia import InsigniaCreate, InsigniaUpdate
 
 def list_(db: Session, skip: int, limit: int, codigo: int | None = None):
-    q = db.query(Insignia)
+    # catálogo en memoria (app/core/catalog_cache.py)
+    filas = catalog_cache.filas("insignia")
     if codigo is not None:
-        q = q.filter(Insignia.codigo == codigo)
-    total = q.count()
-    items = q.order_by(Insignia.id_insignia).offset(skip).limit(limit).all()
-    return items, total
+        filas = [f for f in filas if f["codigo"] == codigo]
+    return filas[skip:skip + limit], len(filas)
 
 def get(db: Session, id_insignia: int):
     return db.get(Insignia, id_insignia)
@@ -16,6 +16,7 @@ def get(db: Session, id_insignia: int):
 def create(db: Session, data: InsigniaCreate):
     obj = Insignia(**data.model_dump())
     db.add(obj); db.commit(); db.refresh(obj)
+    catalog_cache.invalidar("insignia")
     return obj
 
 def update(db: Session, id_insignia: int, data: InsigniaUpdate):
@@ -24,10 +25,12 @@ def update(db: Session, id_insignia: int, data: InsigniaUpdate):
     for k, v in data.model_dump(exclude_none=True).items():
         setattr(obj, k, v)
     db.commit(); db.refresh(obj)
+    catalog_cache.invalidar("insignia")
     return obj
 
 def delete(db: Session, id_insignia: int):
     obj = get(db, id_insignia)
     if not obj: return False
     db.delete(obj); db.commit()
+    catalog_cache.invalidar("insignia")
     return True
@@ -1,16 +1,17 @@
 from sqlalchemy.orm import Session
+from app.core.catalog_cache import catalog_cache
 from app.models.medicina import Medicina
 from app.schemas.medicina import MedicinaCreate, MedicinaUpdate
 
 def list_(db: Session, skip: int, limit: int, id_unidad: int | None = None, q: str | None = None):
-    qy = db.query(Medicina)
+    # catálogo en memoria (app/core/catalog_cache.py)
+    filas = catalog_cache.filas("medicina")
     if id_unidad is not None:
-        qy = qy.filter(Medicina.id_unidad == id_unidad)
+        filas = [f for f in filas if f["id_unidad"] == id_unidad]
     if q:
-        qy = qy.filter(Medicina.nombre.ilike(f"%{q}%"))
-    total = qy.count()
-    items = qy.order_by(Medicina.id_medicina).offset(skip).limit(limit).all()
-    return items, total
+        q = q.lower()  # equivalente al ILIKE '%q%' anterior
+        filas = [f for f in filas if q in f["nombre"].lower()]
+    return filas[skip:skip + limit], len(filas)
 
 def get(db: Session, id_medicina: int):
     return db.get(Medicina, id_medicina)
@@ -18,6 +19,7 @@ def get(db: Session, id_medicina: int):
 def create(db: Session, data: MedicinaCreate):
     obj = Medicina(**data.model_dump())
     db.add(obj); db.commit(); db.refresh(obj)
+    catalog_cache.invalidar("medicina")
     return obj
 
 def update(db: Session, id_medicina: int, data: MedicinaUpdate):
@@ -26,10 +28,12 @@ def update(db: Session, id_medicina: int, data: MedicinaUpdate):
     for k, v in data.model_dump(exclude_none=True).items():
         setattr(obj, k, v)
     db.commit(); db.refresh(obj)
+    catalog_cache.invalidar("medicina")
     return obj
 
 def delete(db: Session, id_medicina: int):
     obj = get(db, id_medicina)
     if not obj: return False
     db.delete(obj); db.commit()
+    catalog_cache.invalidar("medicina")
     return True
@@ -2,6 +2,10 @@ from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 from app.models.medicina_detalle import MedicinaDetalle
 from app.schemas.medicina_detalle import MedicinaDetalleCreate, MedicinaDetalleUpdate
+from app.services import adherencia
+
+# campos del PATCH que se pueden dejar en NULL enviando null (el resto se ignora si viene null)
+_ANULABLES = {"intervalo_horas"}
 
 def list_(db: Session, skip: int, limit: int,
           rut_paciente: str | None = None,
@@ -33,15 +37,19 @@ def create(db: Session, data: MedicinaDetalleCreate):
     if payload.get("tomada") and not payload.get("fecha_tomada"):
         payload["fecha_tomada"] = datetime.now(timezone.utc)
     obj = MedicinaDetalle(**payload)
-    db.add(obj); db.commit(); db.refresh(obj)
+    db.add(obj); db.flush()
+    adherencia.actualizar_rollup(db, None, obj)
+    db.commit(); db.refresh(obj)
     return obj
 
 def update(db: Session, id_detalle: int, data: MedicinaDetalleUpdate):
-    obj = get(db, id_detalle)
+    # con la fila tomada: ninguna toma se confirma entre capturar() y actualizar_rollup()
+    obj = adherencia.bloquear(db, [id_detalle]).get(id_detalle)
     if not obj:
         return None
 
-    payload = data.model_dump(exclude_none=True)
+    anterior = adherencia.capturar(db, obj)
+    payload = {k: v for k, v in data.model_dump(exclude_unset=True).items() if v is not None or k in _ANULABLES}
     tomada = payload.pop("tomada", None)
     fecha_tomada = payload.pop("fecha_tomada", None)
 
@@ -56,12 +64,15 @@ def update(db: Session, id_detalle: int, data: MedicinaDetalleUpdate):
             obj.tomada = False
             obj.fecha_tomada = None
 
+    db.flush()
+    adherencia.actualizar_rollup(db, anterior, obj)
     db.commit(); db.refresh(obj)
     return obj
 
 def delete(db: Session, id_detalle: int):
-    obj = get(db, id_detalle)
+    obj = adherencia.bloquear(db, [id_detalle]).get(id_detalle)
     if not obj:
         return False
+    adherencia.actualizar_rollup(db, adherencia.capturar(db, obj), None)
     db.delete(obj); db.commit()
     return True
@@ -1,36 +1,76 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import and_, func, select
 from datetime import datetime, timezone
+from typing import Iterator
+import csv
+import io
+import json
 
+from app.db import engine
+from app.core.batch import buscar_por_claves
 from app.models.paciente_cuidador import PacienteCuidador
 from app.models.medicion import Medicion
+from app.models.medicion_detalle import MedicionDetalle
 from app.schemas.medicion import MedicionCreate, MedicionUpdate
 
-def list_(
-    db: Session,
-    skip: int,
-    limit: int,
+def join_detalle(desde: datetime | None = None, hasta: datetime | None = None):
+    """
+    ON del join medicion -> medicion_detalle. Incluye fecha_registro (clave de
+    la partición) y, si vienen, los límites del rango: así Postgres también
+    descarta los meses del detalle que no corresponden.
+    """
+    conds = [
+        MedicionDetalle.id_medicion == Medicion.id_medicion,
+        MedicionDetalle.fecha_registro == Medicion.fecha_registro,
+    ]
+    if desde:
+        conds.append(MedicionDetalle.fecha_registro >= desde)
+    if hasta:
+        conds.append(MedicionDetalle.fecha_registro < hasta)
+    return and_(*conds)
+
+def _filtros(
     rut_paciente: str | None = None,
     desde: datetime | None = None,
     hasta: datetime | None = None,
     tiene_alerta: bool | None = None,
     estado_alerta: str | None = None,
     tomada_por: str | None = None,
-):
-    q = db.query(Medicion)
-
+) -> list:
+    conds = []
     if rut_paciente is not None:
-        q = q.filter(Medicion.rut_paciente == rut_paciente)
+        conds.append(Medicion.rut_paciente == rut_paciente)
     if desde:
-        q = q.filter(Medicion.fecha_registro >= desde)
+        conds.append(Medicion.fecha_registro >= desde)
     if hasta:
-        q = q.filter(Medicion.fecha_registro < hasta)
+        conds.append(Medicion.fecha_registro < hasta)
     if tiene_alerta is not None:
-        q = q.filter(Medicion.tiene_alerta == tiene_alerta)
+        conds.append(Medicion.tiene_alerta == tiene_alerta)
     if estado_alerta:
-        q = q.filter(Medicion.estado_alerta == estado_alerta)
+        conds.append(Medicion.estado_alerta == estado_alerta)
     if tomada_por is not None:
-        q = q.filter(Medicion.tomada_por == tomada_por)
+        conds.append(Medicion.tomada_por == tomada_por)
+    return conds
+
+def list_(
+    db: Session,
+    skip: int,
+    limit: int,
+    rut_paciente: str | None = None,
+    desde: datetime | None = None,
+    hasta: datetime | None = None,
+    tiene_alerta: bool | None = None,
+    estado_alerta: str | None = None,
+    tomada_por: str | None = None,
+):
+    q = db.query(Medicion).filter(*_filtros(
+        rut_paciente=rut_paciente,
+        desde=desde,
+        hasta=hasta,
+        tiene_alerta=tiene_alerta,
+        estado_alerta=estado_alerta,
+        tomada_por=tomada_por,
+    ))
 
     total = db.query(func.count(Medicion.id_medicion)).select_from(q.subquery()).scalar()
 
@@ -45,51 +85,94 @@ def list_(
 def get(db: Session, id_medicion: int):
     return db.get(Medicion, id_medicion)
 
+def get_many(db: Session, ids: list[int]):
+    return buscar_por_claves(db, Medicion, Medicion.id_medicion, ids)
+
+# ==== Exportación (streaming) ====
+EXPORT_FORMATOS = ("csv", "ndjson")
+EXPORT_LOTE = 5000
+
+# Una fila por detalle (LEFT JOIN: mediciones sin detalle salen con columnas de detalle vacías)
+EXPORT_COLUMNAS = (
+    Medicion.id_medicion,
+    Medicion.rut_paciente,
+    Medicion.fecha_registro,
+    Medicion.origen,
+    Medicion.registrado_por,
+    Medicion.observacion,
+    Medicion.evaluada_en,
+    Medicion.tiene_alerta,
+    Medicion.severidad_max,
+    Medicion.resumen_alerta,
+    Medicion.estado_alerta,
+    Medicion.tomada_por,
+    Medicion.tomada_en,
+    Medicion.resuelta_en,
+    Medicion.ignorada_en,
+    MedicionDetalle.id_detalle,
+    MedicionDetalle.id_parametro,
+    MedicionDetalle.id_unidad,
+    MedicionDetalle.valor_num,
+    MedicionDetalle.valor_texto,
+    MedicionDetalle.fuera_rango,
+    MedicionDetalle.severidad.label("severidad_detalle"),
+    MedicionDetalle.umbral_min,
+    MedicionDetalle.umbral_max,
+    MedicionDetalle.tipo_alerta,
+)
+
+def _valor_export(v):
+    return v.isoformat() if isinstance(v, datetime) else v
+
+def iter_export(formato: str, **filtros) -> Iterator[str]:
+    """
+    Genera la exportación por trozos desde un cursor del lado del servidor.
+    Usa Core (filas planas, sin objetos ORM) y su propia conexión, porque el
+    StreamingResponse sigue consumiendo el generador después de cerrar la sesión del request.
+    """
+    if formato not in EXPORT_FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato}")
+
+    stmt = (
+        select(*EXPORT_COLUMNAS)
+        .select_from(Medicion)
+        .outerjoin(MedicionDetalle, join_detalle(filtros.get("desde"), filtros.get("hasta")))
+        .where(*_filtros(**filtros))
+        .order_by(Medicion.id_medicion)  # orden por PK: el cursor entrega filas sin ordenar todo antes
+    )
+    nombres = [c.key for c in stmt.selected_columns]
+
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, max_row_buffer=EXPORT_LOTE).execute(stmt)
+
+        if formato == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(nombres)
+            for filas in result.partitions(EXPORT_LOTE):
+                writer.writerows([[_valor_export(v) for v in fila] for fila in filas])
+                yield buf.getvalue()
+                buf.seek(0); buf.truncate(0)
+            if buf.tell():
+                yield buf.getvalue()
+        else:
+            for filas in result.partitions(EXPORT_LOTE):
+                yield "".join(
+                    json.dumps(dict(zip(nombres, map(_valor_export, fila))), ensure_ascii=False) + "\n"
+                    for fila in filas
+                )
+
 def create(db: Session, data: MedicionCreate):
     obj = Medicion(**data.model_dump())
     db.add(obj)
     db.commit()
     db.refresh(obj)
 
-    # Si la medición tiene alerta, enviar correo a los cuidadores activos
+    # Si la medición tiene alerta, avisar a los cuidadores activos (el agregador
+    # deduplica, junta en resúmenes y envía desde su propio hilo)
     if obj.tiene_alerta:
-        from app.models.paciente_cuidador import PacienteCuidador
-        from app.models.cuidador import Cuidador
-        from app.services.email import email_service
-        from app.schemas.email import AlertNotification
-        import asyncio
-        # Buscar cuidadores activos del paciente
-        cuidadores = (
-            db.query(Cuidador)
-            .join(PacienteCuidador, Cuidador.rut_cuidador == PacienteCuidador.rut_cuidador)
-            .filter(PacienteCuidador.rut_paciente == obj.rut_paciente)
-            .filter(PacienteCuidador.activo.is_(True))
-            .filter(Cuidador.estado.is_(True))
-            .all()
-        )
-        # Preparar datos de alerta
-
-        for cuidador in cuidadores:
-            alert_data = AlertNotification(
-                to=cuidador.email,
-                patient_name=f"{obj.paciente.primer_nombre_paciente} {obj.paciente.primer_apellido_paciente}",
-                alert_type="Alerta de medición",
-                severity=obj.severidad_max,
-                message=obj.resumen_alerta,
-                date_time=obj.fecha_registro.strftime('%Y-%m-%d %H:%M'),
-            )
-            async def send_alert():
-                try:
-                    await email_service.send_alert_notification(alert_data)
-                except Exception as e:
-                    print(f"Error enviando alerta a cuidador {cuidador.email}: {str(e)}")
-            try:
-                asyncio.create_task(send_alert())
-            except RuntimeError:
-                try:
-                    asyncio.run(send_alert())
-                except Exception as e:
-                    print(f"Error enviando alerta a cuidador {cuidador.email}: {str(e)}")
+        from app.services.notificaciones import notificar_alerta_medicion
+        notificar_alerta_medicion(db, obj)
 
     return obj
 
@@ -1,4 +1,6 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from app.models.medicion import Medicion
 from app.models.medicion_detalle import MedicionDetalle
 from app.schemas.medicion_detalle import MedicionDetalleCreate, MedicionDetalleUpdate
 
@@ -16,7 +18,11 @@ def get(db: Session, id_detalle: int):
     return db.get(MedicionDetalle, id_detalle)
 
 def create(db: Session, data: MedicionDetalleCreate):
-    obj = MedicionDetalle(**data.model_dump())
+    # el detalle va en la partición del mes de su medición: copia su fecha_registro
+    fecha = db.scalar(select(Medicion.fecha_registro).where(Medicion.id_medicion == data.id_medicion))
+    if fecha is None:
+        raise ValueError("La medición no existe")
+    obj = MedicionDetalle(**data.model_dump(), fecha_registro=fecha)
     db.add(obj); db.commit(); db.refresh(obj)
     return obj
 
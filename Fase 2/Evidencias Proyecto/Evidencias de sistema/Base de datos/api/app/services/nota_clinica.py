@@ -1,6 +1,8 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, lazyload
+from sqlalchemy import func, literal_column
 from datetime import datetime
 from app.models.nota_clinica import NotaClinica
+from app.models.paciente import Paciente
 from app.schemas.nota_clinica import NotaClinicaCreate, NotaClinicaUpdate
 
 def list_(db: Session, skip: int, limit: int,
@@ -24,6 +26,69 @@ def list_(db: Session, skip: int, limit: int,
     items = q.order_by(NotaClinica.creada_en.desc()).offset(skip).limit(limit).all()
     return items, total
 
+_TS_CONFIG = literal_column("'spanish'::regconfig")
+
+# Opciones de ts_headline: fragmentos cortos con el término marcado
+_HEADLINE_OPTS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=25, MinWords=8"
+
+# ts_headline no escapa el texto: se escapa antes (& primero) para que el único HTML sea el <mark>
+_ESCAPES_HTML = (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#x27;"))
+
+def _escapar_html(texto):
+    for caracter, entidad in _ESCAPES_HTML:
+        texto = func.replace(texto, caracter, entidad)
+    return texto
+
+def search(db: Session, q: str, skip: int, limit: int,
+           id_cesfam: int | None = None,
+           rut_paciente: str | None = None,
+           rut_medico: str | None = None,
+           desde: datetime | None = None,
+           hasta: datetime | None = None):
+    """Búsqueda de texto completo (español) sobre nota_clinica.nota usando el índice GIN de nota_tsv."""
+    tsq = func.websearch_to_tsquery(_TS_CONFIG, q)
+    rank = func.ts_rank_cd(NotaClinica.nota_tsv, tsq).label("rank")
+
+    base = (
+        db.query(NotaClinica)
+        .options(lazyload("*"))
+        .filter(NotaClinica.nota_tsv.op("@@")(tsq))
+    )
+    if id_cesfam is not None:
+        # la nota puede no traer cesfam propio: se usa el del paciente
+        base = (
+            base.join(Paciente, Paciente.rut_paciente == NotaClinica.rut_paciente)
+                .filter(func.coalesce(NotaClinica.id_cesfam, Paciente.id_cesfam) == id_cesfam)
+        )
+    if rut_paciente is not None:
+        base = base.filter(NotaClinica.rut_paciente == rut_paciente)
+    if rut_medico is not None:
+        base = base.filter(NotaClinica.rut_medico == rut_medico)
+    if desde:
+        base = base.filter(NotaClinica.creada_en >= desde)
+    if hasta:
+        base = base.filter(NotaClinica.creada_en < hasta)
+
+    total = base.count()
+
+    # Se rankea y pagina primero; ts_headline (caro) solo se calcula para la página
+    hits = (
+        base.with_entities(NotaClinica.id_nota.label("id_nota"), rank)
+            .order_by(rank.desc(), NotaClinica.creada_en.desc())
+            .offset(skip)
+            .limit(limit)
+            .subquery()
+    )
+    snippet = func.ts_headline(_TS_CONFIG, _escapar_html(NotaClinica.nota), tsq, _HEADLINE_OPTS).label("snippet")
+    rows = (
+        db.query(NotaClinica, hits.c.rank, snippet)
+        .options(lazyload("*"))
+        .join(hits, hits.c.id_nota == NotaClinica.id_nota)
+        .order_by(hits.c.rank.desc(), NotaClinica.creada_en.desc())
+        .all()
+    )
+    return rows, total
+
 def get(db: Session, id_nota: int):
     return db.get(NotaClinica, id_nota)
 
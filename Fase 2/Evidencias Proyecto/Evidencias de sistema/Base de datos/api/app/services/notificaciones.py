@@ -0,0 +1,270 @@
+# app/services/notificaciones.py
+"""
+Agregador de alertas de mediciones para los cuidadores.
+
+Antes cada medición con alerta mandaba un correo a cada cuidador activo: un
+glucómetro defectuoso generaba decenas de correos iguales por hora. Ahora cada
+alerta pasa por un índice en memoria por (email del cuidador, rut del paciente):
+
+  - severidad inmediata (ALERTAS_SEVERIDADES_INMEDIATAS) -> se envía al tiro,
+    salvo que la misma alerta ya se haya enviado dentro de la ventana
+  - el resto, y las inmediatas repetidas -> se acumulan; las idénticas
+    (severidad + resumen) solo suben un contador. Al cumplirse
+    ALERTAS_VENTANA_SEGUNDOS desde la primera sale un solo correo de resumen
+  - tope de ALERTAS_MAX_POR_HORA correos por destinatario: lo que no cabe
+    espera en el resumen siguiente, no se pierde
+
+El índice es por proceso: con varios workers cada uno agrega lo suyo. Los
+envíos los hace un hilo propio (start/stop en el lifespan de la API), nunca el
+request que creó la medición. Al detenerse se envían los resúmenes pendientes.
+Fuera de la API (CLI, importadores) el hilo no corre: ahí cada alerta se envía
+en el momento, sin agrupar ni tope por hora, para no perderla.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+import logging
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.smtp_pool import PoolSMTP
+from app.models.cuidador import Cuidador
+from app.models.paciente_cuidador import PacienteCuidador
+from app.schemas.email import AlertNotification
+from app.services.email import email_service
+
+logger = logging.getLogger(__name__)
+
+_HORA = 3600.0
+_TICK_SEGUNDOS = 1.0
+
+# Para ordenar el resumen (el más grave primero); lo desconocido va al final
+_RANGO = {
+    "critical": 4, "critica": 4,
+    "high": 3, "alta": 3,
+    "warning": 2, "medium": 2, "media": 2, "moderada": 2,
+    "low": 1, "baja": 1,
+}
+
+
+@dataclass
+class Alerta:
+    email: str
+    rut_paciente: str
+    nombre_paciente: str
+    severidad: str
+    resumen: str
+    fecha: datetime
+
+
+@dataclass
+class _Grupo:
+    """Alertas acumuladas de un paciente para un cuidador"""
+    nombre_paciente: str
+    abierto: float                                   # time.monotonic() de la primera alerta
+    items: dict = field(default_factory=dict)        # (severidad, resumen) -> {conteo, primera, ultima}
+
+
+def _fmt(fecha: datetime) -> str:
+    return fecha.strftime('%Y-%m-%d %H:%M')
+
+
+def _alerta(email: str, nombre_paciente: str, severidad: str, resumen: str, fecha: str):
+    try:
+        return email_service.armar_alerta(AlertNotification(
+            to=email, patient_name=nombre_paciente, alert_type="Alerta de medición",
+            severity=severidad, message=resumen, date_time=fecha,
+        ))
+    except ValueError as e:  # email inválido: se descarta solo ese correo
+        logger.error(f"No se pudo armar la alerta para {email}: {e}")
+        return None
+
+
+class AgregadorAlertas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._grupos: dict[tuple[str, str], _Grupo] = {}
+        self._inmediatas: list[Alerta] = []
+        self._ultima_inmediata: dict[tuple[str, str, str, str], float] = {}  # dedupe de inmediatas
+        self._envios: dict[str, deque] = {}          # email -> instantes de envío de la última hora
+        self.stats: Counter = Counter()
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._hilo: threading.Thread | None = None
+
+    # --------- API ---------
+
+    def start(self) -> None:
+        if self._hilo:
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._loop, name="alertas", daemon=True)
+        self._hilo.start()
+
+    def stop(self) -> None:
+        if not self._hilo:
+            return
+        self._detener.set()
+        self._despertar.set()
+        self._hilo.join(timeout=30)
+        self._hilo = None
+        self.vaciar()  # resúmenes que quedaron abiertos
+
+    @property
+    def activo(self) -> bool:
+        return self._hilo is not None
+
+    def vaciar(self) -> None:
+        """Envía ya todo lo acumulado, sin esperar la ventana ni el tope por destinatario"""
+        self._enviar(self.tomar_listos(forzar=True))
+
+    def registrar(self, alerta: Alerta) -> None:
+        ahora = time.monotonic()
+        with self._lock:
+            self.stats["recibidas"] += 1
+            if alerta.severidad.lower() in self._severidades_inmediatas():
+                clave = (alerta.email, alerta.rut_paciente, alerta.severidad, alerta.resumen)
+                previa = self._ultima_inmediata.get(clave)
+                if previa is None or ahora - previa >= settings.ALERTAS_VENTANA_SEGUNDOS:
+                    self._ultima_inmediata[clave] = ahora
+                    self._inmediatas.append(alerta)
+                    self._despertar.set()
+                    return
+            self._acumular(alerta, ahora)
+
+    def tomar_listos(self, forzar: bool = False) -> list:
+        """
+        Saca lo que toca enviar ahora (inmediatas y resúmenes con la ventana
+        cumplida) respetando el tope por destinatario, y devuelve los correos.
+        """
+        ahora = time.monotonic()
+        ventana = settings.ALERTAS_VENTANA_SEGUNDOS
+        inmediatas, resumenes = [], []
+        with self._lock:
+            pendientes, self._inmediatas = self._inmediatas, []
+            for a in pendientes:
+                if forzar or self._gastar_cupo(a.email, ahora):
+                    inmediatas.append(a)
+                else:
+                    self.stats["limitadas"] += 1
+                    self._acumular(a, ahora)
+            for clave, g in list(self._grupos.items()):
+                if not forzar and (ahora - g.abierto < ventana or not self._gastar_cupo(clave[0], ahora)):
+                    continue
+                del self._grupos[clave]
+                resumenes.append((clave[0], g))
+            self._ultima_inmediata = {k: t for k, t in self._ultima_inmediata.items() if ahora - t < ventana}
+            for email, envios in list(self._envios.items()):
+                while envios and ahora - envios[0] >= _HORA:
+                    envios.popleft()
+                if not envios:
+                    del self._envios[email]
+            self.stats["inmediatas"] += len(inmediatas)
+            self.stats["resumenes"] += len(resumenes)
+
+        correos = []
+        for a in inmediatas:
+            correos.append(_alerta(a.email, a.nombre_paciente, a.severidad, a.resumen, _fmt(a.fecha)))
+        for email, g in resumenes:
+            items = sorted(g.items.values(), key=lambda it: (-_RANGO.get(it["severidad"].lower(), 0), it["primera"]))
+            if len(items) == 1 and items[0]["conteo"] == 1:
+                it = items[0]
+                correos.append(_alerta(email, g.nombre_paciente, it["severidad"], it["resumen"], it["primera"]))
+            else:
+                try:
+                    correos.append(email_service.armar_resumen_alertas(email, g.nombre_paciente, items))
+                except ValueError as e:
+                    logger.error(f"No se pudo armar el resumen de alertas para {email}: {e}")
+        return [c for c in correos if c is not None]
+
+    # --------- internos ---------
+
+    @staticmethod
+    def _severidades_inmediatas() -> set[str]:
+        return {s.strip().lower() for s in settings.ALERTAS_SEVERIDADES_INMEDIATAS.split(",") if s.strip()}
+
+    def _acumular(self, alerta: Alerta, ahora: float) -> None:
+        clave = (alerta.email, alerta.rut_paciente)
+        g = self._grupos.get(clave)
+        if g is None:
+            g = self._grupos[clave] = _Grupo(alerta.nombre_paciente, ahora)
+        fecha = _fmt(alerta.fecha)
+        it = g.items.get((alerta.severidad, alerta.resumen))
+        if it is None:
+            g.items[(alerta.severidad, alerta.resumen)] = {
+                "severidad": alerta.severidad, "resumen": alerta.resumen,
+                "conteo": 1, "primera": fecha, "ultima": fecha,
+            }
+        else:
+            it["conteo"] += 1
+            it["primera"], it["ultima"] = min(it["primera"], fecha), max(it["ultima"], fecha)
+            self.stats["deduplicadas"] += 1
+
+    def _gastar_cupo(self, email: str, ahora: float) -> bool:
+        envios = self._envios.setdefault(email, deque())
+        while envios and ahora - envios[0] >= _HORA:
+            envios.popleft()
+        if len(envios) >= settings.ALERTAS_MAX_POR_HORA:
+            return False
+        envios.append(ahora)
+        return True
+
+    def _loop(self) -> None:
+        while not self._detener.is_set():
+            self._despertar.wait(_TICK_SEGUNDOS)
+            self._despertar.clear()
+            try:
+                self._enviar(self.tomar_listos())
+            except Exception:
+                logger.exception("Error enviando alertas a cuidadores")
+
+    def _enviar(self, correos: list) -> None:
+        if not correos:
+            return
+        asyncio.run(self._enviar_async(correos))
+        self.stats["correos"] += len(correos)
+
+    @staticmethod
+    async def _enviar_async(correos: list) -> None:
+        async with PoolSMTP(conexiones=1, por_segundo=0) as pool:
+            for datos in correos:
+                try:
+                    await pool.enviar(email_service.construir_mensaje(datos))
+                except Exception as e:
+                    logger.error(f"Error enviando alerta a {', '.join(datos.to)}: {e}")
+
+
+agregador = AgregadorAlertas()
+
+
+def notificar_alerta_medicion(db: Session, medicion) -> int:
+    """
+    Registra la alerta de la medición para cada cuidador activo del paciente. Con
+    el agregador corriendo no envía nada aquí; si no (CLI, importadores), envía al tiro.
+    """
+    emails = [
+        e for (e,) in db.query(Cuidador.email)
+        .join(PacienteCuidador, Cuidador.rut_cuidador == PacienteCuidador.rut_cuidador)
+        .filter(PacienteCuidador.rut_paciente == medicion.rut_paciente)
+        .filter(PacienteCuidador.activo.is_(True))
+        .filter(Cuidador.estado.is_(True))
+    ]
+    paciente = medicion.paciente
+    nombre = f"{paciente.primer_nombre_paciente} {paciente.primer_apellido_paciente}"
+    for email in emails:
+        agregador.registrar(Alerta(
+            email=email, rut_paciente=medicion.rut_paciente, nombre_paciente=nombre,
+            severidad=medicion.severidad_max, resumen=medicion.resumen_alerta, fecha=medicion.fecha_registro,
+        ))
+    if emails and not agregador.activo:
+        try:
+            agregador.vaciar()
+        except Exception:
+            logger.exception("Error enviando alertas a cuidadores")
+    return len(emails)
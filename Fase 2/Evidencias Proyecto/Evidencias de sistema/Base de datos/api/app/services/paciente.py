@@ -7,13 +7,17 @@ import asyncio
 import logging
 
 from app.models.paciente import Paciente
-from app.schemas.paciente import PacienteCreate, PacienteUpdate
+from app.schemas.paciente import PacienteCreate, PacienteUpdate, PacienteOut
+from app.core.batch import buscar_por_claves
+from app.core.singleflight import CacheCorta
 from app.core.security import hash_password  # 🔐
 from app.services.email import email_service
 from app.schemas.email import WelcomeEmail
 
 logger = logging.getLogger(__name__)
 
+_cache = CacheCorta("paciente")
+
 def list_(
     db: Session,
     skip: int,
@@ -54,6 +58,19 @@ def list_(
 def get(db: Session, rut_paciente: str) -> Optional[Paciente]:
     return db.get(Paciente, rut_paciente)
 
+def get_many(db: Session, ruts: List[str], only_active: bool = True) -> List[Optional[Paciente]]:
+    objs = buscar_por_claves(db, Paciente, Paciente.rut_paciente, ruts)
+    if only_active:
+        objs = [o if o is not None and o.estado else None for o in objs]  # igual que GET /paciente/{rut}
+    return objs
+
+def get_cached(db: Session, rut_paciente: str) -> Optional[dict]:
+    """Lectura para GET /paciente/{rut}: requests simultáneos comparten una consulta"""
+    def cargar():
+        obj = get(db, rut_paciente)
+        return PacienteOut.model_validate(obj).model_dump() if obj else None
+    return _cache.get_or_load(rut_paciente, cargar)
+
 def create(db: Session, data: PacienteCreate) -> Paciente:
     payload = data.model_dump()
     raw_password = payload.get("contrasena")
@@ -143,6 +160,7 @@ def update(db: Session, rut_paciente: str, data: PacienteUpdate) -> Optional[Pac
         setattr(obj, k, v)
 
     db.commit(); db.refresh(obj)
+    _cache.invalidar(rut_paciente)
     return obj
 
 def set_estado(db: Session, rut_paciente: str, habilitar: bool) -> bool:
@@ -151,6 +169,7 @@ def set_estado(db: Session, rut_paciente: str, habilitar: bool) -> bool:
         return False
     obj.estado = habilitar
     db.commit(); db.refresh(obj)
+    _cache.invalidar(rut_paciente)
     return True
 
 def delete(db: Session, rut_paciente: str) -> bool:
@@ -1,16 +1,16 @@
 from sqlalchemy.orm import Session
+from app.core.catalog_cache import catalog_cache
 from app.models.parametro_clinico import ParametroClinico
 from app.schemas.parametro_clinico import ParametroClinicoCreate, ParametroClinicoUpdate
 
 def list_(db: Session, skip: int, limit: int, id_unidad: int | None = None, codigo: str | None = None):
-    q = db.query(ParametroClinico)
+    # catálogo en memoria (app/core/catalog_cache.py)
+    filas = catalog_cache.filas("parametro_clinico")
     if id_unidad is not None:
-        q = q.filter(ParametroClinico.id_unidad == id_unidad)
+        filas = [f for f in filas if f["id_unidad"] == id_unidad]
     if codigo:
-        q = q.filter(ParametroClinico.codigo == codigo)
-    total = q.count()
-    items = q.order_by(ParametroClinico.id_parametro).offset(skip).limit(limit).all()
-    return items, total
+        filas = [f for f in filas if f["codigo"] == codigo]
+    return filas[skip:skip + limit], len(filas)
 
 def get(db: Session, id_parametro: int):
     return db.get(ParametroClinico, id_parametro)
@@ -18,6 +18,7 @@ def get(db: Session, id_parametro: int):
 def create(db: Session, data: ParametroClinicoCreate):
     obj = ParametroClinico(**data.model_dump())
     db.add(obj); db.commit(); db.refresh(obj)
+    catalog_cache.invalidar("parametro_clinico")
     return obj
 
 def update(db: Session, id_parametro: int, data: ParametroClinicoUpdate):
@@ -26,10 +27,12 @@ def update(db: Session, id_parametro: int, data: ParametroClinicoUpdate):
     for k, v in data.model_dump(exclude_none=True).items():
         setattr(obj, k, v)
     db.commit(); db.refresh(obj)
+    catalog_cache.invalidar("parametro_clinico")
     return obj
 
 def delete(db: Session, id_parametro: int):
     obj = get(db, id_parametro)
     if not obj: return False
     db.delete(obj); db.commit()
+    catalog_cache.invalidar("parametro_clinico")
     return True
@@ -0,0 +1,76 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from app.config import settings
+from app.core.batch import buscar_por_claves
+from app.models.paciente import Paciente
+from app.models.recordatorio_cita import RecordatorioCita
+from app.schemas.recordatorio_cita import RecordatorioCitaCreate
+
+# Estados del envío (app/jobs/recordatorios.py): pendiente -> enviando -> enviado | error
+PENDIENTE = "pendiente"
+ENVIANDO = "enviando"
+ENVIADO = "enviado"
+ERROR = "error"
+
+def list_(db: Session, skip: int, limit: int,
+          rut_paciente: str | None = None,
+          estado: str | None = None,
+          desde: datetime | None = None,
+          hasta: datetime | None = None):
+    q = db.query(RecordatorioCita)
+    if rut_paciente is not None:
+        q = q.filter(RecordatorioCita.rut_paciente == rut_paciente)
+    if estado:
+        q = q.filter(RecordatorioCita.estado == estado)
+    if desde:
+        q = q.filter(RecordatorioCita.fecha_cita >= desde)
+    if hasta:
+        q = q.filter(RecordatorioCita.fecha_cita < hasta)
+    total = q.count()
+    items = q.order_by(RecordatorioCita.fecha_cita).offset(skip).limit(limit).all()
+    return items, total
+
+def get(db: Session, id_recordatorio: int):
+    return db.get(RecordatorioCita, id_recordatorio)
+
+def _fila(data: RecordatorioCitaCreate, paciente: Paciente, ahora: datetime) -> dict:
+    enviar_en = data.enviar_en or data.fecha_cita - timedelta(hours=settings.RECORDATORIOS_ANTICIPACION_HORAS)
+    return {
+        "rut_paciente": paciente.rut_paciente,
+        "email": data.email or paciente.email,
+        "nombre_paciente": f"{paciente.primer_nombre_paciente} {paciente.primer_apellido_paciente}",
+        "fecha_cita": data.fecha_cita,
+        "nombre_medico": data.nombre_medico,
+        "nombre_cesfam": data.nombre_cesfam,
+        "enviar_en": enviar_en,  # si ya pasó, sale en la próxima vuelta del job
+        "estado": PENDIENTE,
+        "intentos": 0,
+        "creado_en": ahora,
+    }
+
+def create_many(db: Session, items: list[RecordatorioCitaCreate]) -> int:
+    """Encola varios recordatorios con un solo INSERT; ValueError si algún paciente no existe"""
+    pacientes = buscar_por_claves(db, Paciente, Paciente.rut_paciente, [d.rut_paciente for d in items])
+    faltan = sorted({d.rut_paciente for d, p in zip(items, pacientes) if p is None})
+    if faltan:
+        raise ValueError(f"Pacientes no encontrados: {', '.join(faltan)}")
+    ahora = datetime.now(timezone.utc)
+    db.execute(insert(RecordatorioCita), [_fila(d, p, ahora) for d, p in zip(items, pacientes)])
+    db.commit()
+    return len(items)
+
+def create(db: Session, data: RecordatorioCitaCreate):
+    paciente = buscar_por_claves(db, Paciente, Paciente.rut_paciente, [data.rut_paciente])[0]
+    if paciente is None:
+        raise ValueError("Paciente no encontrado")
+    obj = RecordatorioCita(**_fila(data, paciente, datetime.now(timezone.utc)))
+    db.add(obj); db.commit(); db.refresh(obj)
+    return obj
+
+def delete(db: Session, id_recordatorio: int):
+    obj = get(db, id_recordatorio)
+    if not obj:
+        return False
+    db.delete(obj); db.commit()
+    return True
@@ -1,12 +1,12 @@
 from sqlalchemy.orm import Session
+from app.core.catalog_cache import catalog_cache
 from app.models.region import Region
 from app.schemas.region import RegionCreate, RegionUpdate
 
 def list_(db: Session, skip: int, limit: int):
-    q = db.query(Region)
-    total = q.count()
-    items = q.order_by(Region.id_region).offset(skip).limit(limit).all()
-    return items, total
+    # catálogo en memoria (app/core/catalog_cache.py)
+    filas = catalog_cache.filas("region")
+    return filas[skip:skip + limit], len(filas)
 
 def get(db: Session, id_region: int):
     return db.get(Region, id_region)
@@ -14,6 +14,7 @@ def get(db: Session, id_region: int):
 def create(db: Session, data: RegionCreate):
     obj = Region(**data.model_dump())
     db.add(obj); db.commit(); db.refresh(obj)
+    catalog_cache.invalidar("region")
     return obj
 
 def update(db: Session, id_region: int, data: RegionUpdate):
@@ -22,10 +23,12 @@ def update(db: Session, id_region: int, data: RegionUpdate):
     for k, v in data.model_dump(exclude_none=True).items():
         setattr(obj, k, v)
     db.commit(); db.refresh(obj)
+    catalog_cache.invalidar("region")
     return obj
 
 def delete(db: Session, id_region: int):
     obj = get(db, id_region)
     if not obj: return False
     db.delete(obj); db.commit()
+    catalog_cache.invalidar("region")
     return True
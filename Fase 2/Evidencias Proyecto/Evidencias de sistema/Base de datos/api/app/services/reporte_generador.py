@@ -0,0 +1,191 @@
+# app/services/reporte_generador.py
+"""
+Construcción de los archivos de reporte (tipos patient / alerts / trends).
+
+Las filas se leen por lotes desde un cursor del lado del servidor y se escriben
+directo al archivo, así un rango grande no se arma completo en memoria. El archivo
+final se guarda direccionado por contenido (sha256), de modo que dos solicitudes
+que producen lo mismo comparten un único artefacto en disco.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+import csv
+import hashlib
+import os
+import tempfile
+
+from sqlalchemy import select, func, and_
+from sqlalchemy.engine import Connection
+
+from app.config import settings
+from app.models.paciente import Paciente
+from app.models.cesfam import Cesfam
+from app.models.medicion import Medicion
+from app.models.medicion_detalle import MedicionDetalle
+from app.models.parametro_clinico import ParametroClinico
+from app.services import medicion as medicion_svc
+
+# formato -> (extensión, media type)
+FORMATOS = {
+    "excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": (".csv", "text/csv; charset=utf-8"),
+}
+LOTE = 2000
+
+
+def huella(tipo: str, formato: str, desde: datetime, hasta: datetime) -> str:
+    """Identifica solicitudes equivalentes (mismo tipo, formato y rango exacto)"""
+    clave = "|".join([tipo, formato, desde.astimezone(timezone.utc).isoformat(), hasta.astimezone(timezone.utc).isoformat()])
+    return hashlib.sha256(clave.encode()).hexdigest()
+
+
+def ruta_artefacto(sha256: str, formato: str) -> Path:
+    ext, _ = FORMATOS[formato]
+    return Path(settings.REPORTES_DIR) / sha256[:2] / f"{sha256}{ext}"
+
+
+# --------- consultas por tipo ---------
+
+def _stmt_patient(desde: datetime, hasta: datetime):
+    return (
+        select(
+            Paciente.rut_paciente,
+            Paciente.primer_nombre_paciente,
+            Paciente.primer_apellido_paciente,
+            Paciente.segundo_apellido_paciente,
+            Paciente.tipo_paciente,
+            Paciente.estado,
+            Cesfam.nombre_cesfam,
+            func.count(Medicion.id_medicion).label("mediciones"),
+            func.count(Medicion.id_medicion).filter(Medicion.tiene_alerta.is_(True)).label("mediciones_con_alerta"),
+            func.max(Medicion.fecha_registro).label("ultima_medicion"),
+        )
+        .join(Cesfam, Cesfam.id_cesfam == Paciente.id_cesfam)
+        .outerjoin(Medicion, and_(
+            Medicion.rut_paciente == Paciente.rut_paciente,
+            Medicion.fecha_registro >= desde,
+            Medicion.fecha_registro < hasta,
+        ))
+        .group_by(Paciente.rut_paciente, Cesfam.nombre_cesfam)
+        .order_by(Paciente.rut_paciente)
+    )
+
+
+def _stmt_alerts(desde: datetime, hasta: datetime):
+    return (
+        select(*medicion_svc.EXPORT_COLUMNAS)
+        .select_from(Medicion)
+        .outerjoin(MedicionDetalle, medicion_svc.join_detalle(desde, hasta))
+        .where(*medicion_svc._filtros(desde=desde, hasta=hasta, tiene_alerta=True))
+        .order_by(Medicion.id_medicion)
+    )
+
+
+def _stmt_trends(desde: datetime, hasta: datetime):
+    dia = func.date_trunc("day", Medicion.fecha_registro).label("dia")
+    return (
+        select(
+            dia,
+            ParametroClinico.codigo,
+            ParametroClinico.descipcion,
+            func.count(MedicionDetalle.valor_num).label("cantidad"),
+            func.avg(MedicionDetalle.valor_num).label("promedio"),
+            func.min(MedicionDetalle.valor_num).label("minimo"),
+            func.max(MedicionDetalle.valor_num).label("maximo"),
+        )
+        .select_from(Medicion)
+        .join(MedicionDetalle, medicion_svc.join_detalle(desde, hasta))
+        .join(ParametroClinico, ParametroClinico.id_parametro == MedicionDetalle.id_parametro)
+        .where(
+            Medicion.fecha_registro >= desde,
+            Medicion.fecha_registro < hasta,
+            MedicionDetalle.valor_num.is_not(None),
+        )
+        .group_by(dia, ParametroClinico.codigo, ParametroClinico.descipcion)
+        .order_by(dia, ParametroClinico.codigo)
+    )
+
+
+# tipo -> (consulta, nombre de hoja), los mismos tipos que ofrece el front
+TIPOS = {
+    "patient": (_stmt_patient, "Pacientes"),
+    "alerts": (_stmt_alerts, "Alertas"),
+    "trends": (_stmt_trends, "Tendencias"),
+}
+
+
+# --------- escritura ---------
+
+def _valor_excel(v):
+    # Excel no guarda zona horaria: se escriben en UTC
+    if isinstance(v, datetime) and v.tzinfo is not None:
+        return v.astimezone(timezone.utc).replace(tzinfo=None)
+    return v
+
+
+def _escribir_csv(path: str, columnas, lotes) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columnas)
+        for filas in lotes:
+            writer.writerows([[medicion_svc._valor_export(v) for v in fila] for fila in filas])
+
+
+def _escribir_excel(path: str, columnas, lotes, hoja: str) -> None:
+    try:
+        from openpyxl import Workbook
+    except ImportError as e:
+        raise RuntimeError("Los reportes en Excel requieren 'openpyxl' instalado.") from e
+    wb = Workbook(write_only=True)  # modo streaming: no mantiene las celdas en memoria
+    ws = wb.create_sheet(hoja)
+    ws.append(list(columnas))
+    for filas in lotes:
+        for fila in filas:
+            ws.append([_valor_excel(v) for v in fila])
+    wb.save(path)
+
+
+def _guardar(tmp_path: str, formato: str) -> tuple[str, int]:
+    h = hashlib.sha256()
+    with open(tmp_path, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    sha = h.hexdigest()
+    destino = ruta_artefacto(sha, formato)
+    size = os.path.getsize(tmp_path)
+    if destino.exists():
+        os.unlink(tmp_path)  # mismo contenido ya guardado
+    else:
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, destino)
+    return sha, size
+
+
+def generar(conn: Connection, tipo: str, formato: str, desde: datetime, hasta: datetime) -> tuple[str, int]:
+    """Genera el reporte y devuelve (sha256, bytes) del artefacto guardado"""
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo de reporte no soportado: {tipo}")
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de reporte no soportado: {formato}")
+
+    consulta, hoja = TIPOS[tipo]
+    stmt = consulta(desde, hasta)
+    columnas = [c.key for c in stmt.selected_columns]
+
+    base = Path(settings.REPORTES_DIR)
+    base.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=base, suffix=".tmp")
+    os.close(fd)
+    try:
+        result = conn.execution_options(stream_results=True, max_row_buffer=LOTE).execute(stmt)
+        lotes = result.partitions(LOTE)
+        if formato == "csv":
+            _escribir_csv(tmp_path, columnas, lotes)
+        else:
+            _escribir_excel(tmp_path, columnas, lotes, hoja)
+        return _guardar(tmp_path, formato)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
@@ -1,7 +1,18 @@
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from app.config import settings
 from app.models.solicitud_reporte import SolicitudReporte
 from app.schemas.solicitud_reporte import SolicitudReporteCreate, SolicitudReporteUpdate
+from app.services import reporte_generador
+
+# Estados del trabajo: pendiente -> procesando -> listo | error
+PENDIENTE = "pendiente"
+PROCESANDO = "procesando"
+LISTO = "listo"
+ERROR = "error"
+
+# Campos que definen el contenido del reporte (si cambian hay que regenerarlo)
+_CAMPOS_CONTENIDO = ("tipo", "formato", "rango_desde", "rango_hasta")
 
 def list_(db: Session, skip: int, limit: int,
           rut_medico: str | None = None,
@@ -24,16 +35,61 @@ def list_(db: Session, skip: int, limit: int,
 def get(db: Session, id_reporte: int):
     return db.get(SolicitudReporte, id_reporte)
 
+def artefacto_en_cache(db: Session, huella: str, hasta: datetime):
+    """
+    Último reporte idéntico ya generado, dentro de la ventana REPORTES_CACHE_SEGUNDOS.
+    Solo sirve uno cuyos datos se leyeron (iniciado_en) con el rango ya cerrado: si
+    se generó antes de 'hasta', le faltan las mediciones que llegaron después.
+    """
+    limite = datetime.now(timezone.utc) - timedelta(seconds=settings.REPORTES_CACHE_SEGUNDOS)
+    previo = (
+        db.query(SolicitudReporte.archivo_sha256, SolicitudReporte.archivo_bytes,
+                 SolicitudReporte.formato, SolicitudReporte.iniciado_en)
+        .filter(
+            SolicitudReporte.huella == huella,
+            SolicitudReporte.estado == LISTO,
+            SolicitudReporte.terminado_en >= limite,
+            SolicitudReporte.iniciado_en >= hasta,
+        )
+        .order_by(SolicitudReporte.terminado_en.desc())
+        .first()
+    )
+    if previo and reporte_generador.ruta_artefacto(previo.archivo_sha256, previo.formato).exists():
+        return previo
+    return None
+
+def _preparar(db: Session, obj: SolicitudReporte):
+    """Deja la solicitud en cola, o lista de inmediato si hay un artefacto idéntico reciente"""
+    obj.huella = reporte_generador.huella(obj.tipo, obj.formato, obj.rango_desde, obj.rango_hasta)
+    obj.estado = PENDIENTE
+    obj.archivo_sha256 = obj.archivo_bytes = obj.error = None
+    obj.iniciado_en = obj.terminado_en = obj.latido_en = None
+    previo = artefacto_en_cache(db, obj.huella, obj.rango_hasta)
+    if previo:
+        obj.archivo_sha256 = previo.archivo_sha256
+        obj.archivo_bytes = previo.archivo_bytes
+        obj.iniciado_en = previo.iniciado_en  # los datos son de cuando se leyó el original
+        obj.estado = LISTO
+        obj.terminado_en = datetime.now(timezone.utc)
+
 def create(db: Session, data: SolicitudReporteCreate):
     obj = SolicitudReporte(**data.model_dump())
+    _preparar(db, obj)  # el estado lo maneja el runner de reportes
     db.add(obj); db.commit(); db.refresh(obj)
     return obj
 
 def update(db: Session, id_reporte: int, data: SolicitudReporteUpdate):
     obj = get(db, id_reporte)
     if not obj: return None
-    for k, v in data.model_dump(exclude_none=True).items():
+    cambios = data.model_dump(exclude_none=True)
+    # el estado es del runner: por PATCH solo se puede volver a encolar
+    estado = cambios.pop("estado", obj.estado)
+    if estado not in (obj.estado, PENDIENTE):
+        raise ValueError(f"estado '{estado}' no se puede fijar por PATCH; solo '{PENDIENTE}' para regenerar")
+    for k, v in cambios.items():
         setattr(obj, k, v)
+    if estado != obj.estado or any(k in cambios for k in _CAMPOS_CONTENIDO):
+        _preparar(db, obj)
     db.commit(); db.refresh(obj)
     return obj
 
@@ -0,0 +1,226 @@
+# app/services/sync.py
+"""
+Sincronización incremental para las apps de cuidador y paciente (GET /sync).
+
+Cada fila sincronizable lleva version_sync (secuencia global, se renueva en cada
+INSERT/UPDATE) y cada borrado deja una fila en sync_borrado. El token que recibe
+el cliente es la versión hasta la que ya tiene todo: la siguiente llamada trae
+solo lo que cambió después, así que el tráfico depende de cuánto cambió y no del
+tamaño de los datos.
+
+Las versiones se toman al ejecutar cada sentencia, no al confirmar: una
+transacción lenta puede confirmar la versión 100 después de que otra confirmó
+la 101. Por eso cada respuesta llega solo hasta version_visible(): la mayor
+versión que ya no tiene ninguna transacción en vuelo por debajo. Lo que está
+por encima sale en una llamada siguiente.
+
+Si cambia el conjunto de pacientes del cuidador (lista 'pacientes' de la
+respuesta), el cliente debe pedir una sincronización completa (sin token) para
+esos pacientes: sus filas antiguas tienen versiones menores al token.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+from sqlalchemy import BigInteger, String, cast, delete, event, func, insert, select, text, update
+from sqlalchemy.orm import Session, lazyload
+
+from app.config import settings
+from app.core.batch import igual_a_alguna
+from app.db import engine
+from app.models.sync import SyncBorrado, SyncMarca
+from app.models.paciente_cuidador import PacienteCuidador
+from app.models.medicion import Medicion
+from app.models.medicion_detalle import MedicionDetalle
+from app.models.medicina_detalle import MedicinaDetalle
+from app.models.nota_clinica import NotaClinica
+from app.models.rango_paciente import RangoPaciente
+from app.models.gamificacion_perfil import GamificacionPerfil
+from app.models.evento_gamificacion import EventoGamificacion
+from app.schemas.medicion import MedicionOut
+from app.schemas.medicion_detalle import MedicionDetalleOut
+from app.schemas.medicina_detalle import MedicinaDetalleOut
+from app.schemas.nota_clinica import NotaClinicaOut
+from app.schemas.rango_paciente import RangoPacienteOut
+from app.schemas.gamificacion_perfil import GamificacionPerfilOut
+from app.schemas.evento_gamificacion import EventoGamificacionOut
+
+# tabla -> (modelo, columna PK, schema de salida)
+FUENTES = {
+    "medicion": (Medicion, Medicion.id_medicion, MedicionOut),
+    "medicina_detalle": (MedicinaDetalle, MedicinaDetalle.id_detalle, MedicinaDetalleOut),
+    "nota_clinica": (NotaClinica, NotaClinica.id_nota, NotaClinicaOut),
+    "rango_paciente": (RangoPaciente, RangoPaciente.id_rango, RangoPacienteOut),
+    "gamificacion_perfil": (GamificacionPerfil, GamificacionPerfil.rut_paciente, GamificacionPerfilOut),
+    "evento_gamificacion": (EventoGamificacion, EventoGamificacion.id_evento, EventoGamificacionOut),
+}
+
+
+# --------- registro de cambios (eventos del ORM) ---------
+
+def _registrar_borrado(tabla: str, pk: str):
+    def _after_delete(mapper, connection, target):
+        connection.execute(insert(SyncBorrado).values(
+            tabla=tabla, clave=str(getattr(target, pk)), rut_paciente=target.rut_paciente,
+        ))
+    return _after_delete
+
+
+def _tocar_medicion(mapper, connection, target):
+    """Los detalles viajan dentro de su medición: un cambio en ellos renueva la versión de la medición"""
+    connection.execute(
+        update(Medicion.__table__)
+        .where(Medicion.__table__.c.id_medicion == target.id_medicion,
+               Medicion.__table__.c.fecha_registro == target.fecha_registro)
+        .values(version_sync=func.sync_version_next())
+    )
+
+
+for _tabla, (_modelo, _pk, _) in FUENTES.items():
+    event.listen(_modelo, "after_delete", _registrar_borrado(_tabla, _pk.key))
+for _evento in ("after_insert", "after_update", "after_delete"):
+    event.listen(MedicionDetalle, _evento, _tocar_medicion)
+
+
+# --------- marca de visibilidad ---------
+
+def _como_bigint(xid8):
+    return cast(cast(xid8, String), BigInteger)
+
+
+# la transacción más antigua que sigue en vuelo (o la siguiente, si no hay ninguna)
+_XMIN = _como_bigint(func.pg_snapshot_xmin(func.pg_current_snapshot()))
+_VISIBLE = select(func.max(SyncMarca.version)).where(SyncMarca.transaccion < _XMIN)
+
+_marca_lock = threading.Lock()
+_ultima_marca = 0.0
+
+
+def registrar_marca(forzar: bool = False) -> None:
+    """
+    Guarda (última versión entregada por la secuencia, xid nuevo). Toda
+    transacción que tomó una versión hasta esa ya tenía un xid menor, así que
+    cuando el xmin de un snapshot supera el xid de la marca, todas terminaron.
+    Como mucho una cada SYNC_MARCA_SEGUNDOS por proceso.
+    """
+    global _ultima_marca
+    with _marca_lock:
+        if not forzar and time.monotonic() - _ultima_marca < settings.SYNC_MARCA_SEGUNDOS:
+            return
+        _ultima_marca = time.monotonic()
+    # transacción propia: el xid se asigna en el INSERT, después de leer la secuencia
+    with engine.begin() as conn:
+        version = conn.execute(text(
+            "SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END FROM sync_version_seq"
+        )).scalar_one()
+        conn.execute(insert(SyncMarca).values(version=version,
+                                              transaccion=_como_bigint(func.pg_current_xact_id())))
+        # las marcas ya superadas por una más nueva y también visible sobran
+        conn.execute(delete(SyncMarca).where(SyncMarca.transaccion < _XMIN,
+                                             SyncMarca.version < _VISIBLE.scalar_subquery()))
+
+
+def version_visible(db: Session) -> int | None:
+    """Mayor versión sin transacciones en vuelo por debajo (None si aún no hay marcas visibles)"""
+    return db.execute(_VISIBLE).scalar()
+
+
+# --------- lectura ---------
+
+def parse_token(token: str | None) -> int:
+    if not token:
+        return 0
+    try:
+        version = int(token)
+    except ValueError as e:
+        raise ValueError("Token de sincronización inválido") from e
+    if version < 0:
+        raise ValueError("Token de sincronización inválido")
+    return version
+
+
+def pacientes_de_cuidador(db: Session, rut_cuidador: str) -> list[str]:
+    filas = (
+        db.query(PacienteCuidador.rut_paciente)
+        .filter(PacienteCuidador.rut_cuidador == rut_cuidador, PacienteCuidador.activo == True)
+        .order_by(PacienteCuidador.rut_paciente)
+        .all()
+    )
+    return [f.rut_paciente for f in filas]
+
+
+def _pendientes(db: Session, modelo, ruts: list[str], desde: int, hasta: int, limit: int) -> list:
+    """Hasta limit+1 filas con versión en (desde, hasta], en orden de versión"""
+    return (
+        db.query(modelo)
+        .options(lazyload("*"))
+        .filter(igual_a_alguna(modelo.rut_paciente, ruts),
+                modelo.version_sync > desde, modelo.version_sync <= hasta)
+        .order_by(modelo.version_sync)
+        .limit(limit + 1)
+        .all()
+    )
+
+
+def cambios_desde(db: Session, ruts: list[str], token: str | None, limit: int = 500) -> dict:
+    """
+    Filas creadas/modificadas y borradas después del token y hasta
+    version_visible(), como mucho 'limit' por tabla. Si alguna tabla quedó
+    cortada, el nuevo token se fija en la última versión entregada de esa tabla
+    (y se descarta lo posterior del resto), así la siguiente llamada continúa
+    sin saltarse nada.
+    """
+    desde = parse_token(token)
+    if not ruts:
+        return {"token": str(desde), "pacientes": [], "cambios": {t: [] for t in FUENTES},
+                "borrados": [], "hay_mas": False}
+
+    registrar_marca()
+    # antes de leer las filas: todo lo que está hasta 'hasta' ya está confirmado
+    hasta = max(desde, version_visible(db) or 0)
+
+    filas = {tabla: _pendientes(db, modelo, ruts, desde, hasta, limit) for tabla, (modelo, _, _) in FUENTES.items()}
+    filas["_borrados"] = _pendientes(db, SyncBorrado, ruts, desde, hasta, limit)
+
+    tope = None
+    for lista in filas.values():
+        if len(lista) > limit:
+            ultima = lista[limit - 1].version_sync
+            tope = ultima if tope is None else min(tope, ultima)
+    if tope is not None:
+        filas = {t: [o for o in lista if o.version_sync <= tope] for t, lista in filas.items()}
+        nuevo_token = tope
+    else:
+        nuevo_token = hasta  # se revisó todo (desde, hasta]
+
+    borrados = filas.pop("_borrados")
+    cambios = {
+        tabla: [FUENTES[tabla][2].model_validate(o).model_dump(mode="json") for o in lista]
+        for tabla, lista in filas.items()
+    }
+
+    # detalles de las mediciones entregadas, en una sola consulta
+    ids = [m["id_medicion"] for m in cambios["medicion"]]
+    if ids:
+        fechas = [o.fecha_registro for o in filas["medicion"]]
+        detalles: dict[int, list[dict]] = {}
+        q = (db.query(MedicionDetalle)
+             .options(lazyload("*"))
+             .filter(igual_a_alguna(MedicionDetalle.id_medicion, ids),
+                     MedicionDetalle.fecha_registro.between(min(fechas), max(fechas))))
+        for d in q:
+            detalles.setdefault(d.id_medicion, []).append(MedicionDetalleOut.model_validate(d).model_dump(mode="json"))
+        for m in cambios["medicion"]:
+            m["detalles"] = detalles.get(m["id_medicion"], [])
+
+    return {
+        "token": str(nuevo_token),
+        "pacientes": ruts,
+        "cambios": cambios,
+        "borrados": [
+            {"tabla": b.tabla, "clave": b.clave, "rut_paciente": b.rut_paciente, "borrado_en": b.borrado_en}
+            for b in borrados
+        ],
+        "hay_mas": tope is not None,
+    }
@@ -0,0 +1,201 @@
+# app/services/timeline.py
+"""
+Línea de tiempo del paciente: mediciones, medicamentos, notas clínicas, eventos
+de gamificación, insignias y cuidadores en un solo stream ordenado por fecha.
+
+Número fijo de consultas por página, sin importar cuántos eventos tenga:
+  1. UNION ALL de todas las fuentes (cada rama ya filtrada por el cursor y con LIMIT)
+  2. detalles de las mediciones que quedaron en la página
+El encabezado (paciente + perfil de gamificación) sale de las cachés cortas de
+cada service y solo se envía en la primera página.
+
+Orden: fecha DESC, tipo DESC, id DESC. El cursor es esa tupla del último evento
+entregado, en base64.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+import base64
+import json
+
+from sqlalchemy import select, union_all, cast, func, literal_column, String, JSON, or_, and_
+from sqlalchemy.orm import Session, lazyload
+
+from app.core.catalog_cache import catalog_cache
+from app.models.medicion import Medicion
+from app.models.medicion_detalle import MedicionDetalle
+from app.models.medicina_detalle import MedicinaDetalle
+from app.models.nota_clinica import NotaClinica
+from app.models.evento_gamificacion import EventoGamificacion
+from app.models.usuario_insignia import UsuarioInsignia
+from app.models.paciente_cuidador import PacienteCuidador
+from app.schemas.medicion_detalle import MedicionDetalleOut
+from app.services import paciente as paciente_svc
+from app.services import gamificacion_perfil as gamificacion_svc
+
+# tipo -> (columna fecha, columna id, {clave: columna} para "datos")
+FUENTES = {
+    "medicion": (Medicion.fecha_registro, Medicion.id_medicion, {
+        "id_medicion": Medicion.id_medicion,
+        "origen": Medicion.origen,
+        "registrado_por": Medicion.registrado_por,
+        "observacion": Medicion.observacion,
+        "tiene_alerta": Medicion.tiene_alerta,
+        "severidad_max": Medicion.severidad_max,
+        "resumen_alerta": Medicion.resumen_alerta,
+        "estado_alerta": Medicion.estado_alerta,
+    }),
+    "medicina": (MedicinaDetalle.fecha_inicio, MedicinaDetalle.id_detalle, {
+        "id_detalle": MedicinaDetalle.id_detalle,
+        "id_medicina": MedicinaDetalle.id_medicina,
+        "dosis": MedicinaDetalle.dosis,
+        "instrucciones_toma": MedicinaDetalle.instrucciones_toma,
+        "fecha_fin": MedicinaDetalle.fecha_fin,
+        "tomada": MedicinaDetalle.tomada,
+        "fecha_tomada": MedicinaDetalle.fecha_tomada,
+    }),
+    "nota_clinica": (NotaClinica.creada_en, NotaClinica.id_nota, {
+        "id_nota": NotaClinica.id_nota,
+        "rut_medico": NotaClinica.rut_medico,
+        "tipo_autor": NotaClinica.tipo_autor,
+        "tipo_nota": NotaClinica.tipo_nota,
+        "nota": NotaClinica.nota,
+    }),
+    "evento_gamificacion": (EventoGamificacion.fecha, EventoGamificacion.id_evento, {
+        "id_evento": EventoGamificacion.id_evento,
+        "tipo": EventoGamificacion.tipo,
+        "puntos": EventoGamificacion.puntos,
+    }),
+    "insignia": (UsuarioInsignia.otorgada_en, UsuarioInsignia.id_insignia, {
+        "id_insignia": UsuarioInsignia.id_insignia,
+    }),
+    "cuidador": (PacienteCuidador.fecha_inicio, PacienteCuidador.rut_cuidador, {
+        "rut_cuidador": PacienteCuidador.rut_cuidador,
+        "permiso_registro": PacienteCuidador.permiso_registro,
+        "permiso_lectura": PacienteCuidador.permiso_lectura,
+        "fecha_fin": PacienteCuidador.fecha_fin,
+        "activo": PacienteCuidador.activo,
+    }),
+}
+
+
+def encode_cursor(fecha: datetime, tipo: str, id_: str) -> str:
+    raw = json.dumps([fecha.isoformat(), tipo, id_]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        fecha, tipo, id_ = json.loads(raw)
+        return datetime.fromisoformat(fecha), str(tipo), str(id_)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor inválido") from e
+
+
+def _despues_del_cursor(tipo: str, fecha_col, id_txt, cursor):
+    """(fecha, tipo, id) < cursor, resuelto en Python para el tipo constante de la rama"""
+    c_fecha, c_tipo, c_id = cursor
+    if tipo < c_tipo:
+        return fecha_col <= c_fecha
+    if tipo > c_tipo:
+        return fecha_col < c_fecha
+    return or_(fecha_col < c_fecha, and_(fecha_col == c_fecha, id_txt < c_id))
+
+
+def _rama(tipo: str, rut_paciente: str, desde, hasta, cursor, limite: int):
+    fecha_col, id_col, datos = FUENTES[tipo]
+    modelo = fecha_col.class_
+    id_txt = cast(id_col, String).collate("C")  # mismo orden que las comparaciones de Python
+    pares = []
+    for clave, col in datos.items():
+        pares += [literal_column(f"'{clave}'"), col]
+
+    stmt = select(
+        fecha_col.label("fecha"),
+        literal_column(f"'{tipo}'", String).label("tipo"),
+        id_txt.label("id"),
+        func.json_build_object(*pares, type_=JSON).label("datos"),
+    ).where(modelo.rut_paciente == rut_paciente)
+    if desde:
+        stmt = stmt.where(fecha_col >= desde)
+    if hasta:
+        stmt = stmt.where(fecha_col < hasta)
+    if cursor:
+        stmt = stmt.where(_despues_del_cursor(tipo, fecha_col, id_txt, cursor))
+    # cada rama aporta a lo más 'limite' filas: usa el índice (rut_paciente, fecha)
+    rama = stmt.order_by(fecha_col.desc(), id_txt.desc()).limit(limite).subquery(f"rama_{tipo}")
+    return select(rama)
+
+
+def get_timeline(db: Session, rut_paciente: str,
+                 desde: datetime | None = None,
+                 hasta: datetime | None = None,
+                 cursor: str | None = None,
+                 limit: int = 50,
+                 tipos: list[str] | None = None) -> dict | None:
+    """Devuelve None si el paciente no existe; ValueError si el cursor o los tipos no sirven"""
+    if tipos is not None:
+        invalidos = sorted(set(tipos) - set(FUENTES))
+        if invalidos or not tipos:
+            raise ValueError(f"tipos inválidos: {', '.join(invalidos) or '(ninguno)'}; "
+                             f"válidos: {', '.join(FUENTES)}")
+    tipos = list(dict.fromkeys(tipos or FUENTES))  # sin repetidos: cada tipo es una rama del UNION
+    primera_pagina = cursor is None
+    pos = decode_cursor(cursor) if cursor else None
+
+    paciente = gamificacion = None
+    if primera_pagina:
+        paciente = paciente_svc.get_cached(db, rut_paciente)
+        if paciente is None:
+            return None
+        gamificacion = gamificacion_svc.get_cached(db, rut_paciente)
+
+    ramas = [_rama(t, rut_paciente, desde, hasta, pos, limit + 1) for t in tipos]
+    u = union_all(*ramas).subquery("timeline")
+    filas = db.execute(
+        select(u.c.fecha, u.c.tipo, u.c.id, u.c.datos)
+        .order_by(u.c.fecha.desc(), u.c.tipo.collate("C").desc(), u.c.id.desc())
+        .limit(limit + 1)
+    ).all()
+
+    hay_mas = len(filas) > limit
+    filas = filas[:limit]
+
+    # detalles de las mediciones de esta página en una sola consulta
+    mediciones = [f for f in filas if f.tipo == "medicion"]
+    detalles: dict[int, list[dict]] = {}
+    if mediciones:
+        fechas = [f.fecha for f in mediciones]
+        q = (db.query(MedicionDetalle)
+             .options(lazyload("*"))  # sin los joins de medicion/parametro/unidad
+             .filter(MedicionDetalle.id_medicion.in_([int(f.id) for f in mediciones]),
+                     # rango de fechas de la página: solo lee las particiones de esos meses
+                     MedicionDetalle.fecha_registro.between(min(fechas), max(fechas))))
+        for d in q:
+            detalles.setdefault(d.id_medicion, []).append(MedicionDetalleOut.model_validate(d).model_dump())
+
+    items = []
+    for f in filas:
+        datos = dict(f.datos)
+        if f.tipo == "medicion":
+            datos["detalles"] = detalles.get(int(f.id), [])
+        elif f.tipo == "medicina":
+            med = catalog_cache.obtener("medicina", datos["id_medicina"])
+            datos["nombre_medicina"] = med["nombre"] if med else None
+        elif f.tipo == "insignia":
+            ins = catalog_cache.obtener("insignia", datos["id_insignia"])
+            datos["nombre_insignia"] = ins["nombre_insignia"] if ins else None
+        items.append({"fecha": f.fecha, "tipo": f.tipo, "id": f.id, "datos": datos})
+
+    next_cursor = None
+    if hay_mas and filas:
+        ultimo = filas[-1]
+        next_cursor = encode_cursor(ultimo.fecha, ultimo.tipo, ultimo.id)
+
+    return {
+        "paciente": paciente,
+        "gamificacion": gamificacion,
+        "items": items,
+        "next_cursor": next_cursor,
+    }
@@ -1,12 +1,12 @@
 from sqlalchemy.orm import Session
+from app.core.catalog_cache import catalog_cache
 from app.models.unidad_medida import UnidadMedida
 from app.schemas.unidad_medida import UnidadMedidaCreate, UnidadMedidaUpdate
 
 def list_(db: Session, skip: int, limit: int):
-    q = db.query(UnidadMedida)
-    total = q.count()
-    items = q.order_by(UnidadMedida.id_unidad).offset(skip).limit(limit).all()
-    return items, total
+    # catálogo en memoria (app/core/catalog_cache.py)
+    filas = catalog_cache.filas("unidad_medida")
+    return filas[skip:skip + limit], len(filas)
 
 def get(db: Session, id_unidad: int):
     return db.get(UnidadMedida, id_unidad)
@@ -14,6 +14,7 @@ def get(db: Session, id_unidad: int):
 def create(db: Session, data: UnidadMedidaCreate):
     obj = UnidadMedida(**data.model_dump())
     db.add(obj); db.commit(); db.refresh(obj)
+    catalog_cache.invalidar("unidad_medida")
     return obj
 
 def update(db: Session, id_unidad: int, data: UnidadMedidaUpdate):
@@ -22,10 +23,12 @@ def update(db: Session, id_unidad: int, data: UnidadMedidaUpdate):
     for k, v in data.model_dump(exclude_none=True).items():
         setattr(obj, k, v)
     db.commit(); db.refresh(obj)
+    catalog_cache.invalidar("unidad_medida")
     return obj
 
 def delete(db: Session, id_unidad: int):
     obj = get(db, id_unidad)
     if not obj: return False
     db.delete(obj); db.commit()
+    catalog_cache.invalidar("unidad_medida")
     return True
@@ -0,0 +1,71 @@
+# app/tools/importar.py
+"""
+Importación masiva desde CSV (lo mismo que POST /paciente/import y compañía).
+
+    python -m app.tools.importar paciente pacientes.csv
+    python -m app.tools.importar cuidador cuidadores.csv --solo-validar
+    python -m app.tools.importar equipo_medico medicos.csv --errores errores.csv --sin-correos
+
+La cabecera lleva los campos del POST de cada recurso. Sale con código 1 si
+alguna fila tuvo error; el detalle va a --errores (CSV) o a la salida de error.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import sys
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.services import importacion
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.importar", description="Importación masiva desde CSV")
+    parser.add_argument("tipo", choices=sorted(importacion.TIPOS))
+    parser.add_argument("archivo", help="CSV en UTF-8 con cabecera")
+    parser.add_argument("--solo-validar", action="store_true", help="Revisar el archivo sin crear nada")
+    parser.add_argument("--sin-correos", action="store_true", help="No enviar los correos de bienvenida")
+    parser.add_argument("--errores", help="Escribir el reporte de errores en este CSV")
+    args = parser.parse_args(argv)
+
+    # Sin el echo del engine de la API: serían miles de líneas de SQL
+    engine = create_engine(settings.database_url)
+    t0 = time.perf_counter()
+    try:
+        with sessionmaker(bind=engine)() as db, open(args.archivo, encoding="utf-8-sig", newline="") as archivo:
+            resultado, correos = importacion.importar(db, args.tipo, archivo, solo_validar=args.solo_validar)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        importacion.cerrar()
+        engine.dispose()
+    seg = time.perf_counter() - t0
+
+    verbo = "se crearían" if args.solo_validar else "creados"
+    print(f"{resultado.filas} filas, {resultado.creados} {verbo}, {len(resultado.errores)} con error "
+          f"({seg:.1f} s, {resultado.filas / seg if seg else 0:.0f} filas/s)")
+    if correos and not args.sin_correos:
+        enviados, fallidos = asyncio.run(importacion.enviar_bienvenidas(correos))
+        print(f"Bienvenidas: {enviados} enviadas, {fallidos} fallidas")
+
+    if resultado.errores:
+        if args.errores:
+            with open(args.errores, "w", encoding="utf-8", newline="") as f:
+                w = csv.writer(f)
+                w.writerow(["fila", "clave", "campo", "mensaje"])
+                w.writerows([e.fila, e.clave or "", e.campo or "", e.mensaje] for e in resultado.errores)
+            print(f"Errores en {args.errores}")
+        else:
+            for e in resultado.errores:
+                print(f"  línea {e.fila} {e.clave or ''} {e.campo or ''}: {e.mensaje}", file=sys.stderr)
+    return 1 if resultado.errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
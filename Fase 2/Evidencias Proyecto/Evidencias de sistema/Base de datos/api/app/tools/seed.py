@@ -0,0 +1,540 @@
+# app/tools/seed.py
+"""
+Generador de datos sintéticos a escala de producción.
+
+    python -m app.tools.seed                                  # 10k pacientes, prueba rápida
+    python -m app.tools.seed --pacientes 500000 --cesfams 300 --mediciones 40 \\
+        --eventos 60 --anios 3 --procesos 8                   # ~20M mediciones, ~40M detalles
+
+Qué genera (determinista para una misma --semilla):
+  - 16 regiones, una comuna por CESFAM, --cesfams CESFAM y --medicos-por-cesfam médicos
+  - unidades y parámetros clínicos (glucosa, presión, FC, SpO2, temperatura);
+    se reutilizan si ya existen con el mismo código
+  - pacientes con RUT válido desde --rut-base, cada uno en un CESFAM; un 15%
+    "descompensado" (sus valores se corren hacia fuera de rango)
+  - cuidadores (uno cada 3 pacientes) con una cola larga: unos pocos cuidan a
+    muchos pacientes; 70% de los pacientes tiene un cuidador, 20% dos
+  - mediciones repartidas en --anios con 1 a 3 detalles (glucometría, presión+FC,
+    oximetría+FC, temperatura), valores normales por parámetro y alerta/severidad
+    según los rangos; las alertas viejas quedan resueltas o ignoradas por un
+    médico del CESFAM del paciente, las de la última semana nuevas o en proceso
+  - eventos de gamificación y su perfil con el total de puntos
+
+Las tablas grandes se cargan con COPY (formato texto) desde generadores, en
+--procesos procesos por tramos de pacientes. Los ids de medición y detalle se
+reservan al inicio avanzando las secuencias (no sembrar mientras la API
+inserta mediciones) y se crean las particiones mensuales de todo el rango de
+fechas. Todas las cuentas usan la contraseña SEED_CONTRASENA y su email es
+<rol><RUT sin DV>@seed.cuidasalud.cl. Al final se corre ANALYZE.
+"""
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import math
+import multiprocessing
+import random
+import sys
+import tempfile
+import time
+from typing import Iterator
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.core.rut import rut
+from app.core.security import hash_password
+from app.jobs import particiones
+from app.models.cesfam import Cesfam
+from app.models.comuna import Comuna
+from app.models.equipo_medico import EquipoMedico
+from app.models.parametro_clinico import ParametroClinico
+from app.models.region import Region
+from app.models.unidad_medida import UnidadMedida
+
+SEED_CONTRASENA = "Seed.2025"
+DOMINIO = "seed.cuidasalud.cl"
+NULO = "\\N"
+
+REGIONES = [
+    "Arica y Parinacota", "Tarapacá", "Antofagasta", "Atacama", "Coquimbo", "Valparaíso",
+    "Metropolitana de Santiago", "Libertador General Bernardo O'Higgins", "Maule", "Ñuble",
+    "Biobío", "La Araucanía", "Los Ríos", "Los Lagos", "Aysén del General Carlos Ibáñez del Campo",
+    "Magallanes y de la Antártica Chilena",
+]
+UNIDADES = {"mg/dL": "Miligramos por decilitro", "mmHg": "Milímetros de mercurio",
+            "lpm": "Latidos por minuto", "%": "Porcentaje", "°C": "Grados Celsius"}
+
+NOMBRES = ["María", "José", "Ana", "Juan", "Rosa", "Luis", "Carmen", "Pedro", "Patricia", "Jorge",
+           "Elena", "Carlos", "Teresa", "Manuel", "Isabel", "Francisco", "Gloria", "Sergio", "Sonia", "Raúl"]
+APELLIDOS = ["González", "Muñoz", "Rojas", "Díaz", "Pérez", "Soto", "Contreras", "Silva", "Martínez",
+             "Sepúlveda", "Morales", "Rodríguez", "López", "Fuentes", "Hernández", "Torres", "Araya",
+             "Flores", "Espinoza", "Valenzuela", "Castillo", "Tapia", "Reyes", "Gutiérrez", "Castro"]
+ENFERMEDADES = ["Diabetes tipo 2", "Hipertensión arterial", "Diabetes tipo 2, Hipertensión arterial",
+                "EPOC", "Insuficiencia cardíaca", "Diabetes tipo 1"]
+SANGRE = ["O+", "O+", "O+", "A+", "A+", "B+", "AB+", "O-", "A-"]
+SEGUROS = ["FONASA", "FONASA", "FONASA", "FONASA", "ISAPRE"]
+ORIGENES = ["App cuidador", "App cuidador", "App paciente", "Cesfam"]
+EVENTOS = [("Registro De Medicion", 10, 0.6), ("Inicio De Sesion", 2, 0.25),
+           ("Racha Semanal", 25, 0.1), ("Meta Cumplida", 50, 0.05)]
+
+
+@dataclass(frozen=True)
+class Parametro:
+    codigo: str
+    descripcion: str
+    unidad: str
+    ref_min: float
+    ref_max: float
+    crit_min: float
+    crit_max: float
+    media: float
+    desv: float
+    decimales: int
+    alerta_baja: str
+    alerta_alta: str
+
+
+PARAMETROS = [
+    Parametro("GLUCOSA", "Glucosa capilar", "mg/dL", 70, 180, 54, 300, 135, 38, 0, "Hipoglucemia", "Hiperglucemia"),
+    Parametro("PAS", "Presión sistólica", "mmHg", 90, 140, 80, 180, 127, 15, 0, "Hipotensión", "Hipertensión"),
+    Parametro("PAD", "Presión diastólica", "mmHg", 60, 90, 50, 110, 78, 9, 0, "Hipotensión", "Hipertensión"),
+    Parametro("FC", "Frecuencia cardíaca", "lpm", 60, 100, 40, 130, 76, 11, 0, "Bradicardia", "Taquicardia"),
+    Parametro("SPO2", "Saturación de oxígeno", "%", 92, 100, 88, 101, 96, 1.8, 0, "Hipoxemia", "Hipoxemia"),
+    Parametro("TEMP", "Temperatura axilar", "°C", 36, 38, 35, 39.5, 36.7, 0.45, 1, "Hipotermia", "Fiebre"),
+]
+_POR_CODIGO = {p.codigo: p for p in PARAMETROS}
+# (parámetros de la medición, probabilidad)
+TIPOS_MEDICION = [(("GLUCOSA",), 0.45), (("PAS", "PAD", "FC"), 0.35), (("SPO2", "FC"), 0.12), (("TEMP",), 0.08)]
+MAX_DETALLES = max(len(ps) for ps, _ in TIPOS_MEDICION)
+
+
+@dataclass(frozen=True)
+class Config:
+    pacientes: int = 10_000
+    cesfams: int = 50
+    medicos_por_cesfam: int = 8
+    mediciones: int = 40          # promedio por paciente
+    eventos: int = 30             # promedio por paciente
+    anios: float = 2.0
+    semilla: int = 1
+    rut_base: int = 40_000_000    # pacientes; cuidadores en +5M, médicos en +8M
+    procesos: int = 4
+
+    @property
+    def cuidadores(self) -> int:
+        return max(1, self.pacientes // 3)
+
+    def rut_paciente(self, i: int) -> str:
+        return rut(self.rut_base + i)
+
+    def rut_cuidador(self, j: int) -> str:
+        return rut(self.rut_base + 5_000_000 + j)
+
+    def rut_medico(self, cesfam: int, k: int) -> str:
+        return rut(self.rut_base + 8_000_000 + cesfam * self.medicos_por_cesfam + k)
+
+
+@dataclass
+class Paciente:
+    i: int
+    rut: str
+    cesfam: int                   # índice, no id
+    descompensado: bool
+    mediciones: int
+    eventos: int
+    cuidadores: tuple[int, ...]
+    rng: random.Random            # sigue generando sus mediciones y eventos
+
+
+def paciente(cfg: Config, i: int) -> Paciente:
+    """Todo lo del paciente i sale de su propio generador: cualquier proceso lo reconstruye igual"""
+    rng = random.Random(cfg.semilla * 1_000_003 + i)
+    cesfam = rng.randrange(cfg.cesfams)
+    descompensado = rng.random() < 0.15
+    mediciones = max(1, int(rng.lognormvariate(math.log(cfg.mediciones) - 0.18, 0.6)))
+    eventos = rng.randint(cfg.eventos // 2, cfg.eventos * 3 // 2) if cfg.eventos else 0
+    r = rng.random()
+    n_cuid = 0 if r < 0.10 else 2 if r > 0.80 else 1
+    cuidadores = tuple(sorted({int(cfg.cuidadores * rng.random() ** 2.5) for _ in range(n_cuid)}))
+    return Paciente(i, cfg.rut_paciente(i), cesfam, descompensado, mediciones, eventos, cuidadores, rng)
+
+
+# --------- filas (formato texto de COPY) ---------
+
+def _ts(segundos: float) -> str:
+    return datetime.fromtimestamp(segundos, tz=timezone.utc).isoformat()
+
+
+def _nombre(rng: random.Random) -> tuple[str, str, str, str]:
+    return rng.choice(NOMBRES), rng.choice(NOMBRES), rng.choice(APELLIDOS), rng.choice(APELLIDOS)
+
+
+def fila_paciente(cfg: Config, p: Paciente, id_cesfam: int, id_comuna: int, clave: str, ahora: float) -> str:
+    rng = p.rng
+    n1, n2, a1, a2 = _nombre(rng)
+    nacimiento = ahora - rng.uniform(35, 92) * 365.25 * 86400
+    ingreso = ahora - rng.uniform(0.5, 15) * 365.25 * 86400
+    return "\t".join((
+        p.rut, str(id_comuna), n1, n2, a1, a2, _ts(nacimiento), "t" if rng.random() < 0.5 else "f",
+        rng.choice(SANGRE), rng.choice(ENFERMEDADES), rng.choice(SEGUROS), f"Calle {rng.randint(1, 999)} #{rng.randint(1, 3000)}",
+        str(900_000_000 + p.i % 99_999_999), f"paciente{p.rut[:-1]}@{DOMINIO}", clave, "cronico",
+        f"{rng.choice(NOMBRES)} {a1}", str(910_000_000 + p.i % 89_999_999), "t", str(id_cesfam), _ts(ingreso), "t",
+    ))
+
+
+def _valor(rng: random.Random, par: Parametro, descompensado: bool) -> float:
+    desplazamiento = 1.3 * par.desv if descompensado else 0.0
+    if par.codigo == "SPO2":
+        desplazamiento = -desplazamiento
+    v = rng.gauss(par.media + desplazamiento, par.desv)
+    if par.codigo == "SPO2":
+        v = min(v, 100.0)
+    return round(max(v, 1.0), par.decimales)
+
+
+def _severidad(par: Parametro, v: float) -> tuple[str, str]:
+    if v < par.crit_min or v > par.crit_max:
+        return "critical", par.alerta_baja if v < par.ref_min else par.alerta_alta
+    if v < par.ref_min or v > par.ref_max:
+        return "warning", par.alerta_baja if v < par.ref_min else par.alerta_alta
+    return "normal", "Ninguna"
+
+
+_RANGO = {"normal": 0, "warning": 1, "critical": 2}
+
+
+def filas_medicion(cfg: Config, p: Paciente, id_inicio: int, id_detalle_base: int, ids_parametro: dict,
+                   ids_unidad: dict, ahora: float, detalles) -> Iterator[str]:
+    """
+    Filas de medicion del paciente; los detalles se escriben en 'detalles' (un
+    archivo) porque van en otro COPY. id_detalle = base + MAX_DETALLES*(id - id_base) + j.
+    """
+    rng = p.rng
+    desde = ahora - cfg.anios * 365.25 * 86400
+    semana = ahora - 7 * 86400
+    tipos, pesos = zip(*TIPOS_MEDICION)
+    for k in range(p.mediciones):
+        id_medicion = id_inicio + k
+        fecha = rng.uniform(desde, ahora - 60)
+        peor, resumen = "normal", []
+        for j, codigo in enumerate(rng.choices(tipos, pesos)[0]):
+            par = _POR_CODIGO[codigo]
+            v = _valor(rng, par, p.descompensado)
+            sev, tipo_alerta = _severidad(par, v)
+            if _RANGO[sev] > _RANGO[peor]:
+                peor = sev
+            texto = f"{v:g} {par.unidad}"
+            if sev != "normal":
+                resumen.append(f"{par.descripcion} {texto}")
+            detalles.write("\t".join((
+                str(id_detalle_base + MAX_DETALLES * id_medicion + j), str(id_medicion), _ts(fecha),
+                str(ids_parametro[codigo]), str(ids_unidad[par.unidad]), f"{v:g}", texto,
+                "f" if sev == "normal" else "t", sev, f"{par.ref_min:g}", f"{par.ref_max:g}", tipo_alerta,
+            )) + "\n")
+
+        alerta = peor != "normal"
+        estado, tomada_por, tomada_en, resuelta_en, ignorada_en = "nueva", NULO, NULO, NULO, NULO
+        if alerta:
+            r = rng.random()
+            if fecha >= semana:
+                estado = "en_proceso" if r < 0.3 else "nueva"
+            else:
+                estado = "resuelta" if r < 0.85 else "ignorada" if r < 0.95 else "en_proceso"
+            if estado != "nueva":
+                t = fecha + rng.uniform(300, 12 * 3600)
+                tomada_por, tomada_en = cfg.rut_medico(p.cesfam, rng.randrange(cfg.medicos_por_cesfam)), _ts(t)
+                cierre = _ts(t + rng.uniform(600, 2 * 86400))
+                resuelta_en = cierre if estado == "resuelta" else NULO
+                ignorada_en = cierre if estado == "ignorada" else NULO
+        yield "\t".join((
+            str(id_medicion), p.rut, _ts(fecha), rng.choice(ORIGENES), "Cuidador", "", _ts(fecha),
+            "t" if alerta else "f", peor, "; ".join(resumen) if alerta else "Sin alerta",
+            estado, tomada_por, tomada_en, resuelta_en, ignorada_en,
+        ))
+
+
+def filas_evento(cfg: Config, p: Paciente, ahora: float, puntos: Counter) -> Iterator[str]:
+    rng = p.rng
+    desde = ahora - cfg.anios * 365.25 * 86400
+    tipos = [(t, pts) for t, pts, _ in EVENTOS]
+    pesos = [w for _, _, w in EVENTOS]
+    for _ in range(p.eventos):
+        tipo, pts = rng.choices(tipos, pesos)[0]
+        puntos[p.rut] += pts
+        yield "\t".join((p.rut, tipo, str(pts), _ts(rng.uniform(desde, ahora))))
+
+
+# --------- COPY ---------
+
+COLUMNAS = {
+    "paciente": ("rut_paciente", "id_comuna", "primer_nombre_paciente", "segundo_nombre_paciente",
+                 "primer_apellido_paciente", "segundo_apellido_paciente", "fecha_nacimiento", "sexo",
+                 "tipo_de_sangre", "enfermedades", "seguro", "direccion", "telefono", "email", "contrasena",
+                 "tipo_paciente", "nombre_contacto", "telefono_contacto", "estado", "id_cesfam",
+                 "fecha_inicio_cesfam", "activo_cesfam"),
+    "cuidador": ("rut_cuidador", "primer_nombre_cuidador", "segundo_nombre_cuidador", "primer_apellido_cuidador",
+                 "segundo_apellido_cuidador", "sexo", "direccion", "telefono", "email", "contrasena", "estado"),
+    "paciente_cuidador": ("rut_paciente", "rut_cuidador", "permiso_registro", "permiso_lectura",
+                          "fecha_inicio", "fecha_fin", "activo"),
+    "medicion": ("id_medicion", "rut_paciente", "fecha_registro", "origen", "registrado_por", "observacion",
+                 "evaluada_en", "tiene_alerta", "severidad_max", "resumen_alerta", "estado_alerta",
+                 "tomada_por", "tomada_en", "resuelta_en", "ignorada_en"),
+    "medicion_detalle": ("id_detalle", "id_medicion", "fecha_registro", "id_parametro", "id_unidad", "valor_num",
+                         "valor_texto", "fuera_rango", "severidad", "umbral_min", "umbral_max", "tipo_alerta"),
+    "evento_gamificacion": ("rut_paciente", "tipo", "puntos", "fecha"),
+    "gamificacion_perfil": ("rut_paciente", "puntos", "racha_dias", "ultima_actividad"),
+}
+
+
+class _Lector:
+    """Archivo de solo lectura sobre un iterador de líneas (sin '\\n'), para copy_expert"""
+
+    def __init__(self, lineas):
+        self._lineas = iter(lineas)
+        self._resto = ""
+        self.filas = 0
+
+    def read(self, n: int = -1) -> str:
+        partes, largo = [self._resto], len(self._resto)
+        while n < 0 or largo < n:
+            try:
+                linea = next(self._lineas)
+            except StopIteration:
+                break
+            partes.append(linea)
+            partes.append("\n")
+            largo += len(linea) + 1
+            self.filas += 1
+        datos = "".join(partes)
+        if n < 0:
+            self._resto = ""
+            return datos
+        self._resto = datos[n:]
+        return datos[:n]
+
+    readline = read
+
+
+def copiar(cursor, tabla: str, lineas) -> int:
+    lector = _Lector(lineas)
+    cursor.copy_expert(f"COPY {tabla} ({', '.join(COLUMNAS[tabla])}) FROM STDIN", lector, size=1 << 16)
+    return lector.filas
+
+
+def _engine():
+    return create_engine(settings.database_url, poolclass=NullPool)
+
+
+# --------- carga ---------
+
+@dataclass
+class Catalogos:
+    ids_cesfam: list[int]
+    comuna_de_cesfam: dict[int, int]
+    ids_parametro: dict[str, int]
+    ids_unidad: dict[str, int]
+
+
+def _asegurar(conn, modelo, columna_id, filtros: dict, valores: dict) -> int:
+    condiciones = [getattr(modelo, k) == v for k, v in filtros.items()]
+    existente = conn.execute(select(columna_id).where(*condiciones).limit(1)).scalar()
+    if existente is not None:
+        return existente
+    return conn.execute(insert(modelo).values(**filtros, **valores).returning(columna_id)).scalar_one()
+
+
+def cargar_catalogos(conn, cfg: Config, clave: str) -> Catalogos:
+    """Regiones, comunas, CESFAM, médicos, unidades y parámetros (pocas filas: INSERT normal)"""
+    ids_region = [_asegurar(conn, Region, Region.id_region, {"nombre_region": n}, {}) for n in REGIONES]
+    ids_cesfam, comuna_de_cesfam = [], {}
+    for c in range(cfg.cesfams):
+        id_comuna = _asegurar(conn, Comuna, Comuna.id_comuna, {"nombre_comuna": f"Comuna Seed {c + 1}"},
+                              {"id_region": ids_region[c % len(ids_region)]})
+        id_cesfam = _asegurar(conn, Cesfam, Cesfam.id_cesfam, {"nombre_cesfam": f"CESFAM Seed {c + 1}"}, {
+            "id_comuna": id_comuna, "telefono": 220_000_000 + c, "direccion": f"Avenida Principal {100 + c}",
+            "email": f"cesfam{c + 1}@{DOMINIO}", "estado": True,
+        })
+        ids_cesfam.append(id_cesfam)
+        comuna_de_cesfam[id_cesfam] = id_comuna
+
+    rng = random.Random(cfg.semilla)
+    medicos = []
+    for c, id_cesfam in enumerate(ids_cesfam):
+        for k in range(cfg.medicos_por_cesfam):
+            n1, n2, a1, a2 = _nombre(rng)
+            medicos.append({
+                "rut_medico": cfg.rut_medico(c, k), "id_cesfam": id_cesfam, "primer_nombre_medico": n1,
+                "segundo_nombre_medico": n2, "primer_apellido_medico": a1, "segundo_apellido_medico": a2,
+                "email": f"medico{cfg.rut_medico(c, k)[:-1]}@{DOMINIO}", "contrasenia": clave, "telefono": 930_000_000 + len(medicos),
+                "direccion": "Sin dirección", "rol": "medico", "especialidad": "Medicina general",
+                "estado": True, "is_admin": k == 0,
+            })
+    for i in range(0, len(medicos), 1000):
+        conn.execute(insert(EquipoMedico).values(medicos[i:i + 1000]).on_conflict_do_nothing())
+
+    ids_unidad = {u: _asegurar(conn, UnidadMedida, UnidadMedida.id_unidad, {"codigo": u}, {"descipcion": d})
+                  for u, d in UNIDADES.items()}
+    ids_parametro = {
+        p.codigo: _asegurar(conn, ParametroClinico, ParametroClinico.id_parametro, {"codigo": p.codigo}, {
+            "id_unidad": ids_unidad[p.unidad], "descipcion": p.descripcion,
+            "rango_ref_min": int(p.ref_min), "rango_ref_max": math.ceil(p.ref_max),
+        })
+        for p in PARAMETROS
+    }
+    return Catalogos(ids_cesfam, comuna_de_cesfam, ids_parametro, ids_unidad)
+
+
+def filas_cuidador(cfg: Config, clave: str):
+    rng = random.Random(cfg.semilla + 7)
+    for j in range(cfg.cuidadores):
+        n1, n2, a1, a2 = _nombre(rng)
+        yield "\t".join((cfg.rut_cuidador(j), n1, n2, a1, a2, "t" if rng.random() < 0.3 else "f",
+                         "Sin dirección", str(940_000_000 + j % 59_999_999), f"cuidador{cfg.rut_cuidador(j)[:-1]}@{DOMINIO}", clave, "t"))
+
+
+@dataclass(frozen=True)
+class Tramo:
+    desde: int                    # índices de paciente [desde, hasta)
+    hasta: int
+    id_medicion: int              # primer id de medición del tramo
+
+
+def _cargar_tramo(args) -> Counter:
+    cfg, tramo, cat, clave, ahora, id_medicion_base, id_detalle_base = args
+    filas: Counter = Counter()
+    engine = _engine()
+    conn = engine.raw_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute("SET synchronous_commit TO off")
+
+        def pacientes():
+            return (paciente(cfg, i) for i in range(tramo.desde, tramo.hasta))
+
+        filas["paciente"] += copiar(cur, "paciente", (
+            fila_paciente(cfg, p, cat.ids_cesfam[p.cesfam], cat.comuna_de_cesfam[cat.ids_cesfam[p.cesfam]], clave, ahora)
+            for p in pacientes()))
+        inicio = _ts(ahora - 365 * 86400)
+        fin = _ts(ahora + 10 * 365 * 86400)
+        filas["paciente_cuidador"] += copiar(cur, "paciente_cuidador", (
+            f"{p.rut}\t{cfg.rut_cuidador(j)}\tt\tt\t{inicio}\t{fin}\tt"
+            for p in pacientes() for j in p.cuidadores))
+        conn.commit()
+
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as detalles:
+            def mediciones():
+                siguiente = tramo.id_medicion
+                for p in pacientes():
+                    yield from filas_medicion(cfg, p, siguiente, id_detalle_base - MAX_DETALLES * id_medicion_base,
+                                              cat.ids_parametro, cat.ids_unidad, ahora, detalles)
+                    siguiente += p.mediciones
+            filas["medicion"] += copiar(cur, "medicion", mediciones())
+            detalles.seek(0)
+            filas["medicion_detalle"] += copiar(cur, "medicion_detalle", (l.rstrip("\n") for l in detalles))
+        conn.commit()
+
+        puntos: Counter = Counter()
+
+        def eventos():
+            for p in pacientes():
+                yield from filas_evento(cfg, p, ahora, puntos)
+        filas["evento_gamificacion"] += copiar(cur, "evento_gamificacion", eventos())
+        ultima = _ts(ahora)
+        filas["gamificacion_perfil"] += copiar(cur, "gamificacion_perfil", (
+            f"{cfg.rut_paciente(i)}\t{puntos[cfg.rut_paciente(i)]}\t{random.Random(i).randint(0, 30)}\t{ultima}"
+            for i in range(tramo.desde, tramo.hasta)))
+        conn.commit()
+    finally:
+        conn.close()
+        engine.dispose()
+    return filas
+
+
+def _reservar(conn, tabla: str, columna: str, cantidad: int) -> int:
+    """Avanza la secuencia en 'cantidad' y devuelve el primer id reservado"""
+    secuencia = conn.execute(text("SELECT pg_get_serial_sequence(:t, :c)"), {"t": tabla, "c": columna}).scalar_one()
+    ultimo = conn.execute(text(
+        f"SELECT setval(:s, GREATEST((SELECT COALESCE(MAX({columna}), 0) FROM {tabla}), "
+        f"(SELECT last_value FROM {secuencia})) + :n)"
+    ), {"s": secuencia, "n": cantidad}).scalar_one()
+    return ultimo - cantidad + 1
+
+
+def sembrar(cfg: Config, salida=sys.stdout) -> Counter:
+    t0 = time.perf_counter()
+    ahora = time.time()
+    clave = hash_password(SEED_CONTRASENA)
+    engine = _engine()
+
+    with engine.begin() as conn:
+        existe = conn.execute(text("SELECT 1 FROM paciente WHERE rut_paciente = :r"),
+                              {"r": cfg.rut_paciente(0)}).first()
+        if existe:
+            raise SystemExit(f"Ya hay pacientes desde el RUT {cfg.rut_paciente(0)}: usar otra --rut-base")
+        cat = cargar_catalogos(conn, cfg, clave)
+        # un mes por partición desde la medición más antigua posible (si no, todo iría a la default)
+        particiones.asegurar(conn, desde=particiones.mes_de(
+            datetime.fromtimestamp(ahora - cfg.anios * 365.25 * 86400, timezone.utc)))
+        n_cuidadores = copiar(conn.connection.cursor(), "cuidador", filas_cuidador(cfg, clave))
+
+    # Tramos de pacientes con sus rangos de ids de medición (el conteo por paciente es determinista)
+    tam = max(1, min(20_000, math.ceil(cfg.pacientes / (cfg.procesos * 4))))
+    conteos = [paciente(cfg, i).mediciones for i in range(cfg.pacientes)]
+    total_mediciones = sum(conteos)
+    with engine.begin() as conn:
+        id_medicion_base = _reservar(conn, "medicion", "id_medicion", total_mediciones)
+        id_detalle_base = _reservar(conn, "medicion_detalle", "id_detalle", MAX_DETALLES * total_mediciones)
+    tramos, siguiente = [], id_medicion_base
+    for desde in range(0, cfg.pacientes, tam):
+        hasta = min(cfg.pacientes, desde + tam)
+        tramos.append(Tramo(desde, hasta, siguiente))
+        siguiente += sum(conteos[desde:hasta])
+    del conteos
+    print(f"Catálogos y {n_cuidadores} cuidadores listos; {len(tramos)} tramos, "
+          f"{total_mediciones} mediciones a generar", file=salida)
+
+    filas: Counter = Counter(cuidador=n_cuidadores)
+    args = [(cfg, t, cat, clave, ahora, id_medicion_base, id_detalle_base) for t in tramos]
+    with multiprocessing.get_context("spawn").Pool(cfg.procesos) as pool:
+        for hechos, parcial in enumerate(pool.imap_unordered(_cargar_tramo, args), 1):
+            filas.update(parcial)
+            seg = time.perf_counter() - t0
+            print(f"  tramo {hechos}/{len(tramos)}: {sum(filas.values())} filas, "
+                  f"{sum(filas.values()) / seg * 60:,.0f} filas/min", file=salida)
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for tabla in COLUMNAS:
+            conn.execute(text(f"ANALYZE {tabla}"))
+    engine.dispose()
+
+    seg = time.perf_counter() - t0
+    for tabla, n in filas.most_common():
+        print(f"  {tabla:<22} {n:>12,}", file=salida)
+    print(f"{sum(filas.values()):,} filas en {seg:.0f} s ({sum(filas.values()) / seg * 60:,.0f} filas/min)", file=salida)
+    return filas
+
+
+def main(argv: list[str] | None = None) -> int:
+    d = Config()
+    parser = argparse.ArgumentParser(prog="python -m app.tools.seed", description="Datos sintéticos vía COPY")
+    parser.add_argument("--pacientes", type=int, default=d.pacientes)
+    parser.add_argument("--cesfams", type=int, default=d.cesfams)
+    parser.add_argument("--medicos-por-cesfam", type=int, default=d.medicos_por_cesfam)
+    parser.add_argument("--mediciones", type=int, default=d.mediciones, help="Promedio por paciente")
+    parser.add_argument("--eventos", type=int, default=d.eventos, help="Eventos de gamificación promedio por paciente")
+    parser.add_argument("--anios", type=float, default=d.anios, help="Años de historia")
+    parser.add_argument("--semilla", type=int, default=d.semilla)
+    parser.add_argument("--rut-base", type=int, default=d.rut_base, help="Primer RUT (sin DV) de los pacientes")
+    parser.add_argument("--procesos", type=int, default=d.procesos)
+    args = parser.parse_args(argv)
+    sembrar(Config(**{k: v for k, v in vars(args).items()}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
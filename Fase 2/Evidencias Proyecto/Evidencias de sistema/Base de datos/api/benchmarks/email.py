@@ -0,0 +1,170 @@
+# benchmarks/email.py
+"""
+Benchmark de los flujos de correo contra un sumidero SMTP local (sin red).
+
+    python -m benchmarks.email                                 # todos los flujos
+    python -m benchmarks.email -f alerta -f recordatorio-pool -n 2000 -c 50
+    python -m benchmarks.email --json
+
+Por flujo mide mensajes/s, latencia por mensaje (p50/p95/p99) y cuántas
+conexiones SMTP abrió. Los flujos "directos" son los de EmailService (una
+sesión por correo); los "-pool" arman el mismo correo y lo envían por PoolSMTP
+como el job de recordatorios.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass, asdict
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+# Settings exige estas variables; el benchmark no usa la base ni el SMTP real
+for _k, _v in {"POSTGRES_USER": "bench", "POSTGRES_PASSWORD": "bench", "POSTGRES_DB": "bench",
+               "SMTP_USER": "", "SMTP_PASSWORD": "", "EMAILS_FROM_EMAIL": "bench@cuidasalud.cl"}.items():
+    os.environ.setdefault(_k, _v)
+
+from app.core.smtp_pool import PoolSMTP
+from app.schemas.email import WelcomeEmail, AlertNotification, AppointmentReminder
+from app.services.email import email_service
+from benchmarks.smtp_sink import SumideroSMTP
+
+
+def _bienvenida(i: int) -> WelcomeEmail:
+    return WelcomeEmail(to=f"paciente{i}@bench.cl", patient_name=f"Paciente {i}",
+                        rut=f"{10000000 + i}K", temporary_password="Temporal123")
+
+
+def _alerta(i: int) -> AlertNotification:
+    return AlertNotification(to=f"cuidador{i}@bench.cl", patient_name=f"Paciente {i}",
+                             alert_type="Alerta de medición", severity="critical",
+                             message="Glucosa 450 mg/dL", date_time="2025-11-09 10:00")
+
+
+def _recordatorio(i: int) -> AppointmentReminder:
+    return AppointmentReminder(to=f"paciente{i}@bench.cl", patient_name=f"Paciente {i}",
+                               appointment_date="10-11-2025", appointment_time="13:30",
+                               doctor_name="Dra. Rojas", cesfam_name="CESFAM Centro")
+
+
+def _directo(enviar, datos):
+    async def uno(i: int, _pool) -> bool:
+        resultado = await enviar(datos(i))
+        return resultado["success"]
+    return uno
+
+
+def _con_pool(armar, datos):
+    async def uno(i: int, pool: PoolSMTP) -> bool:
+        await pool.enviar(email_service.construir_mensaje(armar(datos(i))))
+        return True
+    return uno
+
+
+FLUJOS = {
+    "bienvenida": _directo(email_service.send_welcome_email, _bienvenida),
+    "alerta": _directo(email_service.send_alert_notification, _alerta),
+    "recordatorio": _directo(email_service.send_appointment_reminder, _recordatorio),
+    "alerta-pool": _con_pool(email_service.armar_alerta, _alerta),
+    "recordatorio-pool": _con_pool(email_service.armar_recordatorio_cita, _recordatorio),
+}
+
+
+@dataclass
+class Resultado:
+    flujo: str
+    mensajes: int
+    concurrencia: int
+    errores: int
+    recibidos: int
+    conexiones: int
+    segundos: float
+    mensajes_por_segundo: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+def _percentil(ordenadas: list[float], p: float) -> float:
+    if not ordenadas:
+        return 0.0
+    k = min(len(ordenadas) - 1, max(0, round(p / 100 * len(ordenadas)) - 1))
+    return ordenadas[k]
+
+
+async def correr(sumidero: SumideroSMTP, flujo: str, mensajes: int, concurrencia: int,
+                 conexiones_pool: int = 4) -> Resultado:
+    """Envía 'mensajes' correos del flujo con hasta 'concurrencia' en vuelo; el sumidero ya debe apuntar la app"""
+    uno = FLUJOS[flujo]
+    sem = asyncio.Semaphore(concurrencia)
+    latencias: list[float] = []
+    errores = 0
+    recibidos0, conexiones0 = sumidero.contadores()
+
+    async def tarea(i: int, pool) -> None:
+        nonlocal errores
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                ok = await uno(i, pool)
+            except Exception:
+                ok = False
+            latencias.append(time.perf_counter() - t0)
+            errores += not ok
+
+    inicio = time.perf_counter()
+    async with PoolSMTP(conexiones=conexiones_pool, por_segundo=0) as pool:
+        await asyncio.gather(*(tarea(i, pool) for i in range(mensajes)))
+    segundos = time.perf_counter() - inicio
+    await asyncio.sleep(0.05)  # el sumidero cuenta en su propio hilo
+
+    recibidos1, conexiones1 = sumidero.contadores()
+    latencias.sort()
+    return Resultado(
+        flujo=flujo,
+        mensajes=mensajes,
+        concurrencia=concurrencia,
+        errores=errores,
+        recibidos=recibidos1 - recibidos0,
+        conexiones=conexiones1 - conexiones0,
+        segundos=round(segundos, 3),
+        mensajes_por_segundo=round(mensajes / segundos, 1) if segundos else 0.0,
+        p50_ms=round(statistics.median(latencias) * 1000, 2) if latencias else 0.0,
+        p95_ms=round(_percentil(latencias, 95) * 1000, 2),
+        p99_ms=round(_percentil(latencias, 99) * 1000, 2),
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.email")
+    parser.add_argument("-f", "--flujo", action="append", choices=sorted(FLUJOS), help="Repetible; por defecto todos")
+    parser.add_argument("-n", "--mensajes", type=int, default=500)
+    parser.add_argument("-c", "--concurrencia", type=int, default=20)
+    parser.add_argument("--conexiones-pool", type=int, default=4, help="Sesiones de PoolSMTP en los flujos -pool")
+    parser.add_argument("--json", action="store_true", help="Una línea JSON por flujo")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.CRITICAL)  # EmailService registra cada envío
+
+    resultados = []
+    with SumideroSMTP() as sumidero, sumidero.apuntar():
+        for flujo in args.flujo or list(FLUJOS):
+            resultados.append(asyncio.run(correr(sumidero, flujo, args.mensajes, args.concurrencia,
+                                                 args.conexiones_pool)))
+
+    if args.json:
+        for r in resultados:
+            print(json.dumps(asdict(r)))
+    else:
+        print(f"{'flujo':<18}{'msg/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'conex':>7}{'errores':>9}")
+        for r in resultados:
+            print(f"{r.flujo:<18}{r.mensajes_por_segundo:>9}{r.p50_ms:>9}{r.p95_ms:>9}{r.p99_ms:>9}"
+                  f"{r.conexiones:>7}{r.errores:>9}")
+    return 1 if any(r.errores or r.recibidos != r.mensajes for r in resultados) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
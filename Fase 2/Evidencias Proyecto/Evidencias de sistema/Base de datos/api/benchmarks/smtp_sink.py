@@ -0,0 +1,111 @@
+# benchmarks/smtp_sink.py
+"""
+Sumidero SMTP en proceso (aiosmtpd) para tests y benchmarks sin red.
+
+Acepta todo, no reenvía nada y cuenta mensajes y conexiones. `apuntar()`
+deja a EmailService, PoolSMTP y settings hablando con él (sin TLS ni AUTH)
+y restaura la configuración al salir.
+"""
+from __future__ import annotations
+
+from collections import deque
+from contextlib import contextmanager
+import socket
+import threading
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import SMTP
+
+from app.config import settings
+from app.services.email import email_service
+
+
+class _Handler:
+    def __init__(self, sumidero: "SumideroSMTP"):
+        self.sumidero = sumidero
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sumidero._recibido(envelope)
+        return "250 OK"
+
+
+class _Controller(Controller):
+    def __init__(self, sumidero: "SumideroSMTP", **kwargs):
+        self.sumidero = sumidero
+        super().__init__(_Handler(sumidero), **kwargs)
+
+    def factory(self):
+        sumidero = self.sumidero
+
+        class _SMTPContado(SMTP):
+            def connection_made(self, transport):
+                sumidero._conectado()
+                super().connection_made(transport)
+
+        return _SMTPContado(self.handler, **self.SMTP_kwargs)
+
+
+def _puerto_libre(host: str) -> int:
+    with socket.socket() as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+
+class SumideroSMTP:
+    def __init__(self, host: str = "127.0.0.1", port: int | None = None, guardar: int = 100):
+        self.host = host
+        self.port = port or _puerto_libre(host)
+        self.mensajes = 0
+        self.conexiones = 0
+        self.ultimos: deque = deque(maxlen=guardar)  # (remitente, destinatarios, bytes)
+        self._lock = threading.Lock()
+        self._controller = _Controller(self, hostname=host, port=self.port)
+
+    def __enter__(self) -> "SumideroSMTP":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._controller.start()
+        with self._lock:  # el controller se conecta una vez para saber que el servidor está arriba
+            self.mensajes = self.conexiones = 0
+
+    def stop(self) -> None:
+        self._controller.stop()
+
+    def contadores(self) -> tuple[int, int]:
+        with self._lock:
+            return self.mensajes, self.conexiones
+
+    @contextmanager
+    def apuntar(self):
+        """Configura el envío de la app contra este sumidero mientras dure el bloque"""
+        previos_settings = {k: getattr(settings, k) for k in
+                            ("SMTP_HOST", "SMTP_PORT", "SMTP_TLS", "SMTP_SSL", "SMTP_USER", "SMTP_PASSWORD")}
+        previos_servicio = {k: getattr(email_service, k) for k in
+                            ("smtp_host", "smtp_port", "smtp_tls", "smtp_ssl", "smtp_user", "smtp_password")}
+        valores = dict(host=self.host, port=self.port, tls=False, ssl=False, user="", password="")
+        try:
+            for k, v in valores.items():
+                setattr(settings, f"SMTP_{k.upper()}", v)
+                setattr(email_service, f"smtp_{k}", v)
+            yield self
+        finally:
+            for k, v in previos_settings.items():
+                setattr(settings, k, v)
+            for k, v in previos_servicio.items():
+                setattr(email_service, k, v)
+
+    # --------- llamados desde el hilo del servidor ---------
+
+    def _conectado(self) -> None:
+        with self._lock:
+            self.conexiones += 1
+
+    def _recibido(self, envelope) -> None:
+        with self._lock:
+            self.mensajes += 1
+            self.ultimos.append((envelope.mail_from, list(envelope.rcpt_tos), envelope.content))
@@ -0,0 +1,12 @@
+"""
+Pruebas de carga de la API con los flujos reales del front.
+
+    python -m loadtest --levantar -u 20 -d 60          # API local (uvicorn) + sumidero SMTP
+    python -m loadtest --url http://staging:8000 -u 50 -d 300 -f medico-triage --json
+
+- datos.py     pacientes, cuidadores y médicos de carga (idempotente, RUT 3xxxxxxx)
+- flujos.py    login por rol, registro de signos del cuidador, triage de
+               alertas, dashboard del paciente y solicitud de reportes
+- runner.py    usuarios virtuales, estadísticas por paso (req/s, p50/p95/p99)
+- servidor.py  levanta la API en un puerto libre con el SMTP apuntando a un sumidero
+"""
@@ -0,0 +1,81 @@
+# loadtest/__main__.py
+"""
+    python -m loadtest --levantar --workers 2 -u 20 -d 60
+    python -m loadtest --url http://127.0.0.1:8000 -u 50 -d 300 -f medico-triage -f paciente-dashboard
+    python -m loadtest --levantar -u 20 -d 60 --json > resultado.json     # para comparar entre versiones
+
+Antes de correr asegura los datos de carga en la base de POSTGRES_* (usar
+--sin-preparar si ya están y la base no es accesible desde aquí).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from contextlib import nullcontext
+from dataclasses import asdict
+import json
+import sys
+
+import httpx
+
+from loadtest.flujos import FLUJOS
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest")
+    destino = parser.add_mutually_exclusive_group(required=True)
+    destino.add_argument("--url", help="API ya levantada")
+    destino.add_argument("--levantar", action="store_true", help="Levantar la API local con uvicorn")
+    parser.add_argument("--workers", type=int, default=1, help="Workers de uvicorn con --levantar")
+    parser.add_argument("-u", "--usuarios", type=int, default=20)
+    parser.add_argument("-d", "--duracion", type=float, default=60, help="Segundos")
+    parser.add_argument("-f", "--flujo", action="append", choices=sorted(FLUJOS),
+                        help="Repetible; por defecto la mezcla completa con sus pesos")
+    parser.add_argument("--pausa", type=float, default=1.0, help="Media en segundos entre flujos de un usuario")
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--pacientes", type=int, default=200, help="Pacientes de carga a asegurar")
+    parser.add_argument("--medicos", type=int, default=10)
+    parser.add_argument("--sin-preparar", action="store_true")
+    parser.add_argument("--json", action="store_true", help="Resultado como JSON")
+    args = parser.parse_args(argv)
+
+    # app.config se valida al importar: después de --help
+    from loadtest.datos import preparar
+    from loadtest.runner import correr, formatear
+    from loadtest.servidor import levantar
+
+    if args.sin_preparar:
+        datos = None   # mismos usuarios que preparar(); el parámetro de carga se busca por la API
+    else:
+        datos = preparar(pacientes=args.pacientes, medicos=args.medicos)
+
+    mezcla = {f: FLUJOS[f][1] for f in args.flujo} if args.flujo else None
+    with (levantar(workers=args.workers) if args.levantar else nullcontext(args.url)) as url:
+        if datos is None:
+            datos = asyncio.run(_datos_remotos(url, args.pacientes, args.medicos))
+        resultado = asyncio.run(correr(url, datos, args.usuarios, args.duracion, mezcla,
+                                       pausa=args.pausa, semilla=args.semilla))
+
+    if args.json:
+        print(json.dumps(asdict(resultado), ensure_ascii=False))
+    else:
+        print(formatear(resultado))
+    return 1 if any(p.errores for p in resultado.pasos) else 0
+
+
+async def _datos_remotos(url: str, pacientes: int, medicos: int):
+    from loadtest.datos import CODIGO_PARAMETRO, Datos, plan
+
+    async with httpx.AsyncClient(base_url=url) as cliente:
+        r = await cliente.get("/parametro-clinico", params={"codigo": CODIGO_PARAMETRO})
+        r.raise_for_status()
+        items = r.json()["items"]
+    if not items:
+        raise SystemExit(f"No existe el parámetro {CODIGO_PARAMETRO}: correr sin --sin-preparar una vez")
+    ms, ps, cs = plan(pacientes, medicos)
+    return Datos(medicos=ms, pacientes=ps, cuidadores=cs,
+                 id_parametro=items[0]["id_parametro"], id_unidad=items[0]["id_unidad"])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+# loadtest/datos.py
+"""
+Datos de carga: una región/comuna/CESFAM "Carga", médicos, pacientes y
+cuidadores con RUT de rangos propios (30M, 31M, 32M) y una contraseña común.
+
+preparar() es idempotente (ON CONFLICT DO NOTHING): se puede correr contra una
+base ya sembrada o recién creada; solo agrega lo que falte. Las mediciones,
+alertas y reportes los generan los propios flujos.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.rut import rut
+from app.core.security import hash_password
+from app.db import SessionLocal
+from app.models.cesfam import Cesfam
+from app.models.comuna import Comuna
+from app.models.cuidador import Cuidador
+from app.models.equipo_medico import EquipoMedico
+from app.models.gamificacion_perfil import GamificacionPerfil
+from app.models.paciente import Paciente
+from app.models.paciente_cuidador import PacienteCuidador
+from app.models.parametro_clinico import ParametroClinico
+from app.models.region import Region
+from app.models.unidad_medida import UnidadMedida
+
+CONTRASENA = "Carga.2025"
+DOMINIO = "carga.cuidasalud.cl"
+NOMBRE = "Carga"
+CODIGO_PARAMETRO = "GLU-CARGA"
+PACIENTES_POR_CUIDADOR = 2
+
+_BASE_MEDICO = 30_000_000
+_BASE_PACIENTE = 31_000_000
+_BASE_CUIDADOR = 32_000_000
+
+
+@dataclass
+class Usuario:
+    rut: str
+    email: str
+    pacientes: list[str] = field(default_factory=list)   # solo cuidadores
+
+
+@dataclass
+class Datos:
+    medicos: list[Usuario]
+    pacientes: list[Usuario]
+    cuidadores: list[Usuario]
+    id_parametro: int
+    id_unidad: int
+    contrasena: str = CONTRASENA
+
+
+def plan(pacientes: int, medicos: int, pacientes_por_cuidador: int = PACIENTES_POR_CUIDADOR):
+    """Usuarios de carga (deterministas: los mismos que crea preparar())"""
+    ms = [Usuario(rut(_BASE_MEDICO + i), f"medico{i}@{DOMINIO}") for i in range(medicos)]
+    ps = [Usuario(rut(_BASE_PACIENTE + i), f"paciente{i}@{DOMINIO}") for i in range(pacientes)]
+    cs = []
+    for j, i in enumerate(range(0, pacientes, pacientes_por_cuidador)):
+        cs.append(Usuario(rut(_BASE_CUIDADOR + j), f"cuidador{j}@{DOMINIO}",
+                          [p.rut for p in ps[i:i + pacientes_por_cuidador]]))
+    return ms, ps, cs
+
+
+def _asegurar(db, modelo, columna_id, filtros: dict, valores: dict) -> int:
+    """id de la fila que cumple 'filtros', creándola si no existe"""
+    condiciones = [getattr(modelo, k) == v for k, v in filtros.items()]
+    existente = db.execute(select(columna_id).where(*condiciones).limit(1)).scalar()
+    if existente is not None:
+        return existente
+    obj = modelo(**filtros, **valores)
+    db.add(obj)
+    db.flush()
+    return getattr(obj, columna_id.key)
+
+
+def _insertar(db, modelo, filas: list[dict]) -> None:
+    if filas:
+        db.execute(insert(modelo).values(filas).on_conflict_do_nothing())
+
+
+def preparar(pacientes: int = 200, medicos: int = 10,
+             pacientes_por_cuidador: int = PACIENTES_POR_CUIDADOR) -> Datos:
+    ms, ps, cs = plan(pacientes, medicos, pacientes_por_cuidador)
+    clave = hash_password(CONTRASENA)   # bcrypt una vez, no por usuario
+    ahora = datetime.now(timezone.utc)
+
+    with SessionLocal() as db:
+        id_region = _asegurar(db, Region, Region.id_region, {"nombre_region": NOMBRE}, {})
+        id_comuna = _asegurar(db, Comuna, Comuna.id_comuna, {"nombre_comuna": NOMBRE}, {"id_region": id_region})
+        id_cesfam = _asegurar(db, Cesfam, Cesfam.id_cesfam, {"nombre_cesfam": f"CESFAM {NOMBRE}"}, {
+            "id_comuna": id_comuna, "telefono": 200000000, "direccion": "Sin dirección",
+            "email": f"cesfam@{DOMINIO}", "estado": True,
+        })
+        id_unidad = _asegurar(db, UnidadMedida, UnidadMedida.id_unidad, {"codigo": "mg/dL"},
+                              {"descipcion": "Miligramos por decilitro"})
+        id_parametro = _asegurar(db, ParametroClinico, ParametroClinico.id_parametro, {"codigo": CODIGO_PARAMETRO}, {
+            "id_unidad": id_unidad, "descipcion": "Glucosa (carga)", "rango_ref_min": 70, "rango_ref_max": 180,
+        })
+
+        _insertar(db, EquipoMedico, [{
+            "rut_medico": m.rut, "id_cesfam": id_cesfam, "primer_nombre_medico": "Médico",
+            "segundo_nombre_medico": "De", "primer_apellido_medico": NOMBRE, "segundo_apellido_medico": str(i),
+            "email": m.email, "contrasenia": clave, "telefono": 900000000 + i, "direccion": "Sin dirección",
+            "rol": "medico", "especialidad": "Medicina general", "estado": True, "is_admin": False,
+        } for i, m in enumerate(ms)])
+        _insertar(db, Paciente, [{
+            "rut_paciente": p.rut, "id_comuna": id_comuna, "primer_nombre_paciente": "Paciente",
+            "segundo_nombre_paciente": "De", "primer_apellido_paciente": NOMBRE, "segundo_apellido_paciente": str(i),
+            "fecha_nacimiento": datetime(1950, 1, 1, tzinfo=timezone.utc), "sexo": bool(i % 2),
+            "tipo_de_sangre": "O+", "enfermedades": "Diabetes tipo 2", "seguro": "FONASA",
+            "direccion": "Sin dirección", "telefono": 910000000 + i, "email": p.email, "contrasena": clave,
+            "tipo_paciente": "cronico", "nombre_contacto": "Contacto", "telefono_contacto": 920000000 + i,
+            "estado": True, "id_cesfam": id_cesfam, "fecha_inicio_cesfam": ahora, "activo_cesfam": True,
+        } for i, p in enumerate(ps)])
+        _insertar(db, Cuidador, [{
+            "rut_cuidador": c.rut, "primer_nombre_cuidador": "Cuidador", "segundo_nombre_cuidador": "De",
+            "primer_apellido_cuidador": NOMBRE, "segundo_apellido_cuidador": str(j), "sexo": bool(j % 2),
+            "direccion": "Sin dirección", "telefono": 930000000 + j, "email": c.email,
+            "contrasena": clave, "estado": True,
+        } for j, c in enumerate(cs)])
+        _insertar(db, PacienteCuidador, [{
+            "rut_paciente": rp, "rut_cuidador": c.rut, "permiso_registro": True, "permiso_lectura": True,
+            "fecha_inicio": ahora, "fecha_fin": ahora + timedelta(days=3650), "activo": True,
+        } for c in cs for rp in c.pacientes])
+        _insertar(db, GamificacionPerfil, [{
+            "rut_paciente": p.rut, "puntos": 0, "racha_dias": 0, "ultima_actividad": ahora,
+        } for p in ps])
+        db.commit()
+
+    return Datos(medicos=ms, pacientes=ps, cuidadores=cs, id_parametro=id_parametro, id_unidad=id_unidad)
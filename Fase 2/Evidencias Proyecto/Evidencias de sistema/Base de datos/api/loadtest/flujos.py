@@ -0,0 +1,156 @@
+# loadtest/flujos.py
+"""
+Flujos de usuario, en el orden en que el front llama a la API.
+
+Cada flujo recibe una Sesion (cliente HTTP + estadísticas) y hace sus pasos con
+sesion.paso(nombre, ...); el nombre es lo que aparece en el reporte. Todos
+empiezan con el login de su rol, como cada vez que se abre la app.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import random
+
+import httpx
+
+from loadtest.datos import Datos, Usuario
+
+
+class ErrorPaso(Exception):
+    """El paso devolvió un status inesperado: el resto del flujo no tiene sentido"""
+
+
+class Sesion:
+    def __init__(self, cliente: httpx.AsyncClient, estadisticas, datos: Datos, rng: random.Random):
+        self.cliente = cliente
+        self.estadisticas = estadisticas
+        self.datos = datos
+        self.rng = rng
+
+    async def paso(self, nombre: str, metodo: str, url: str, esperado=(200, 201),
+                   tolerado=(), **kwargs) -> httpx.Response | None:
+        """
+        Ejecuta y mide un request. 'tolerado' son status que el flujo sabe manejar
+        (p.ej. 409 al tomar una alerta que otro médico ya tomó): no son error,
+        pero el flujo no sigue con ese recurso.
+        """
+        with self.estadisticas.medir(nombre) as medicion:
+            try:
+                r = await self.cliente.request(metodo, url, **kwargs)
+            except httpx.HTTPError as e:
+                medicion.fallo(type(e).__name__)
+                raise ErrorPaso(f"{nombre}: {e}") from e
+            medicion.status(r.status_code)
+            if r.status_code in esperado:
+                return r
+            if r.status_code in tolerado:
+                medicion.tolerado()
+                return None
+            medicion.fallo(str(r.status_code))
+            raise ErrorPaso(f"{nombre}: {r.status_code} {r.text[:200]}")
+
+    async def login(self, rol: str, usuario: Usuario) -> None:
+        await self.paso(f"login {rol}", "POST", "/auth/login",
+                        json={"email": usuario.email, "password": self.datos.contrasena, "role": rol})
+
+
+def _ahora() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(seconds=1)   # la API rechaza fechas futuras
+
+
+async def cuidador_registra(s: Sesion) -> None:
+    """Cuidador ingresa signos vitales de uno de sus pacientes"""
+    cuidador = s.rng.choice(s.datos.cuidadores)
+    rut_paciente = s.rng.choice(cuidador.pacientes)
+    await s.login("caregiver", cuidador)
+    await s.paso("cuidador: dosis pendientes", "GET", f"/cuidador/{cuidador.rut}/dosis-pendientes")
+
+    glucosa = s.rng.choice([95, 110, 130, 160, 250, 420])
+    alerta = glucosa > 180
+    severidad = "critical" if glucosa > 300 else "warning" if alerta else "normal"
+    r = await s.paso("medicion: crear", "POST", "/medicion", json={
+        "rut_paciente": rut_paciente,
+        "fecha_registro": _ahora().isoformat(),
+        "origen": "App cuidador",
+        "registrado_por": "Cuidador",
+        "observacion": "Carga",
+        "evaluada_en": _ahora().isoformat(),
+        "tiene_alerta": alerta,
+        "severidad_max": severidad,
+        "resumen_alerta": f"Glucosa {glucosa} mg/dL" if alerta else "Sin alerta",
+    })
+    id_medicion = r.json()["id_medicion"]
+    await s.paso("medicion-detalle: crear", "POST", "/medicion-detalle", json={
+        "id_medicion": id_medicion,
+        "id_parametro": s.datos.id_parametro,
+        "id_unidad": s.datos.id_unidad,
+        "valor_num": glucosa,
+        "valor_texto": f"{glucosa} mg/dL",
+        "fuera_rango": alerta,
+        "severidad": severidad,
+        "umbral_min": 70,
+        "umbral_max": 180,
+        "tipo_alerta": "Hiperglucemia" if alerta else "Ninguna",
+    })
+    await s.paso("gamificacion: evento", "POST", "/evento-gamificacion", json={
+        "rut_paciente": rut_paciente, "tipo": "Registro de medicion", "puntos": 10, "fecha": _ahora().isoformat(),
+    })
+    await s.paso("gamificacion: perfil", "GET", f"/gamificacion-perfil/{rut_paciente}")
+
+
+async def medico_triage(s: Sesion) -> None:
+    """Médico revisa alertas nuevas, toma una y la resuelve"""
+    medico = s.rng.choice(s.datos.medicos)
+    await s.login("doctor", medico)
+    r = await s.paso("alertas: listar nuevas", "GET", "/medicion/alertas",
+                     params={"estado_alerta": "nueva", "page_size": 20})
+    items = r.json()["items"]
+    if not items:
+        return
+    id_medicion = s.rng.choice(items)["id_medicion"]
+    await s.paso("alertas: detalle", "GET", f"/medicion/{id_medicion}")
+    tomada = await s.paso("alertas: tomar", "POST", f"/medicion/{id_medicion}/tomar",
+                          json={"rut_medico": medico.rut}, tolerado=(409,))
+    if tomada is None:
+        return   # la tomó otro médico entre el listado y el click
+    await s.paso("alertas: cambiar estado", "POST", f"/medicion/{id_medicion}/estado",
+                 json={"nuevo_estado": s.rng.choice(["resuelta", "resuelta", "ignorada"])}, tolerado=(409,))
+
+
+async def paciente_dashboard(s: Sesion) -> None:
+    """Paciente abre la app: perfil, timeline, puntos, adherencia y últimas mediciones"""
+    paciente = s.rng.choice(s.datos.pacientes)
+    await s.login("patient", paciente)
+    await s.paso("paciente: perfil", "GET", f"/paciente/{paciente.rut}")
+    await s.paso("paciente: timeline", "GET", f"/paciente/{paciente.rut}/timeline")
+    await s.paso("gamificacion: perfil", "GET", f"/gamificacion-perfil/{paciente.rut}")
+    await s.paso("paciente: adherencia", "GET", f"/paciente/{paciente.rut}/adherencia")
+    await s.paso("medicion: listar paciente", "GET", "/medicion",
+                 params={"rut_paciente": paciente.rut, "page_size": 10})
+
+
+async def medico_reporte(s: Sesion) -> None:
+    """Médico pide un reporte y revisa la lista de sus solicitudes"""
+    medico = s.rng.choice(s.datos.medicos)
+    await s.login("doctor", medico)
+    hasta = _ahora()
+    r = await s.paso("reporte: solicitar", "POST", "/solicitud-reporte", json={
+        "rut_medico": medico.rut,
+        "rango_desde": (hasta - timedelta(days=s.rng.choice([7, 30, 90]))).isoformat(),
+        "rango_hasta": hasta.isoformat(),
+        "tipo": s.rng.choice(["patient", "alerts", "trends"]),
+        "formato": "csv",
+        "estado": "pendiente",
+        "creado_en": hasta.isoformat(),
+    })
+    await s.paso("reporte: estado", "GET", f"/solicitud-reporte/{r.json()['id_reporte']}")
+    await s.paso("reporte: listar", "GET", "/solicitud-reporte", params={"rut_medico": medico.rut})
+
+
+# nombre -> (flujo, peso en la mezcla por defecto)
+FLUJOS = {
+    "cuidador-registra": (cuidador_registra, 5),
+    "medico-triage": (medico_triage, 3),
+    "paciente-dashboard": (paciente_dashboard, 4),
+    "medico-reporte": (medico_reporte, 1),
+}
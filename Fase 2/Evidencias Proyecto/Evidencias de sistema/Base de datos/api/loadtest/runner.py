@@ -0,0 +1,168 @@
+# loadtest/runner.py
+"""
+Usuarios virtuales y estadísticas.
+
+Cada usuario virtual repite: elegir un flujo según los pesos, ejecutarlo,
+pausar (tiempo de "lectura" exponencial con media 'pausa'). Todos comparten un
+httpx.AsyncClient con tantas conexiones como usuarios. Con la misma semilla la
+secuencia de flujos y datos elegidos por usuario es la misma entre corridas.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+import random
+import time
+
+import httpx
+
+from loadtest.datos import Datos
+from loadtest.flujos import FLUJOS, ErrorPaso, Sesion
+
+
+def _percentil(ordenadas: list[float], p: float) -> float:
+    if not ordenadas:
+        return 0.0
+    k = min(len(ordenadas) - 1, max(0, round(p / 100 * len(ordenadas)) - 1))
+    return ordenadas[k]
+
+
+class _Medicion:
+    __slots__ = ("codigo", "error", "es_tolerado")
+
+    def __init__(self):
+        self.codigo: int | None = None
+        self.error: str | None = None
+        self.es_tolerado = False
+
+    def status(self, codigo: int) -> None:
+        self.codigo = codigo
+
+    def fallo(self, motivo: str) -> None:
+        self.error = motivo
+
+    def tolerado(self) -> None:
+        self.es_tolerado = True
+
+
+class Estadisticas:
+    def __init__(self):
+        self.latencias: dict[str, list[float]] = defaultdict(list)
+        self.errores: dict[str, Counter] = defaultdict(Counter)
+        self.tolerados: Counter = Counter()
+        self.flujos: dict[str, Counter] = defaultdict(Counter)   # flujo -> {ok, error}
+        self.errores_flujo: Counter = Counter()                  # primeras líneas de error, para el reporte
+
+    @contextmanager
+    def medir(self, paso: str):
+        m = _Medicion()
+        t0 = time.perf_counter()
+        try:
+            yield m
+        finally:
+            self.latencias[paso].append(time.perf_counter() - t0)
+            if m.error:
+                self.errores[paso][m.error] += 1
+            if m.es_tolerado:
+                self.tolerados[paso] += 1
+
+
+@dataclass
+class ResultadoPaso:
+    paso: str
+    requests: int
+    errores: int
+    tolerados: int
+    req_por_segundo: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+@dataclass
+class Resultado:
+    segundos: float
+    usuarios: int
+    flujos: dict[str, dict]
+    pasos: list[ResultadoPaso]
+    errores: dict[str, int]
+
+    @property
+    def requests(self) -> int:
+        return sum(p.requests for p in self.pasos)
+
+
+def _resumir(est: Estadisticas, segundos: float, usuarios: int) -> Resultado:
+    pasos = []
+    for paso, lat in sorted(est.latencias.items()):
+        lat = sorted(lat)
+        pasos.append(ResultadoPaso(
+            paso=paso,
+            requests=len(lat),
+            errores=sum(est.errores[paso].values()),
+            tolerados=est.tolerados[paso],
+            req_por_segundo=round(len(lat) / segundos, 2) if segundos else 0.0,
+            p50_ms=round(_percentil(lat, 50) * 1000, 1),
+            p95_ms=round(_percentil(lat, 95) * 1000, 1),
+            p99_ms=round(_percentil(lat, 99) * 1000, 1),
+            max_ms=round(lat[-1] * 1000, 1),
+        ))
+    return Resultado(
+        segundos=round(segundos, 1),
+        usuarios=usuarios,
+        flujos={f: dict(c) for f, c in sorted(est.flujos.items())},
+        pasos=pasos,
+        errores=dict(est.errores_flujo.most_common(10)),
+    )
+
+
+async def correr(base_url: str, datos: Datos, usuarios: int, duracion: float,
+                 mezcla: dict[str, int] | None = None, pausa: float = 1.0,
+                 semilla: int = 1, timeout: float = 30.0,
+                 transport: httpx.AsyncBaseTransport | None = None) -> Resultado:
+    """Corre 'usuarios' usuarios virtuales durante 'duracion' segundos (transport: solo tests)"""
+    mezcla = mezcla or {nombre: peso for nombre, (_, peso) in FLUJOS.items()}
+    nombres, pesos = list(mezcla), list(mezcla.values())
+    est = Estadisticas()
+    fin = time.monotonic() + duracion
+
+    async def usuario(cliente: httpx.AsyncClient, n: int) -> None:
+        rng = random.Random(semilla * 100_003 + n)
+        sesion = Sesion(cliente, est, datos, rng)
+        await asyncio.sleep(rng.uniform(0, min(pausa, duracion)))   # rampa: no todos parten juntos
+        while time.monotonic() < fin:
+            nombre = rng.choices(nombres, pesos)[0]
+            try:
+                await FLUJOS[nombre][0](sesion)
+                est.flujos[nombre]["ok"] += 1
+            except ErrorPaso as e:
+                est.flujos[nombre]["error"] += 1
+                est.errores_flujo[str(e).splitlines()[0][:160]] += 1
+            if pausa > 0:
+                await asyncio.sleep(rng.expovariate(1 / pausa))
+
+    limites = httpx.Limits(max_connections=usuarios, max_keepalive_connections=usuarios)
+    inicio = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url, limits=limites, timeout=timeout,
+                                 transport=transport) as cliente:
+        await asyncio.gather(*(usuario(cliente, n) for n in range(usuarios)))
+    return _resumir(est, time.perf_counter() - inicio, usuarios)
+
+
+def formatear(r: Resultado) -> str:
+    lineas = [f"{r.usuarios} usuarios, {r.segundos} s, {r.requests} requests "
+              f"({round(r.requests / r.segundos, 1) if r.segundos else 0} req/s)", ""]
+    for flujo, c in r.flujos.items():
+        lineas.append(f"  {flujo:<22} {c.get('ok', 0):>7} ok {c.get('error', 0):>6} con error")
+    lineas += ["", f"  {'paso':<30} {'req':>7} {'err':>5} {'409':>5} {'req/s':>8} "
+                   f"{'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"]
+    for p in r.pasos:
+        lineas.append(f"  {p.paso:<30} {p.requests:>7} {p.errores:>5} {p.tolerados:>5} {p.req_por_segundo:>8} "
+                      f"{p.p50_ms:>8} {p.p95_ms:>8} {p.p99_ms:>8} {p.max_ms:>8}")
+    if r.errores:
+        lineas += ["", "  errores más frecuentes:"]
+        lineas += [f"    {n:>5}x {e}" for e, n in r.errores.items()]
+    return "\n".join(lineas)
@@ -0,0 +1,65 @@
+# loadtest/servidor.py
+"""
+Levanta la API (uvicorn, en otro proceso) para una corrida de carga.
+
+El SMTP del proceso apunta a un SumideroSMTP local: las alertas y
+recordatorios que generan los flujos no salen a ningún correo real. La base es
+la de POSTGRES_* del entorno; usar una desechable o ya sembrada.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.smtp_sink import SumideroSMTP
+
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def levantar(workers: int = 1, puerto: int | None = None, espera: float = 30.0, env: dict | None = None):
+    """Entrega la URL base de una API recién levantada; la detiene al salir"""
+    puerto = puerto or _puerto_libre()
+    with SumideroSMTP() as sumidero:
+        entorno = {
+            **os.environ,
+            "SMTP_HOST": sumidero.host, "SMTP_PORT": str(sumidero.port),
+            "SMTP_TLS": "false", "SMTP_SSL": "false", "SMTP_USER": "", "SMTP_PASSWORD": "",
+            **(env or {}),
+        }
+        proceso = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(puerto),
+             "--workers", str(workers), "--log-level", "warning"],
+            env=entorno,
+        )
+        url = f"http://127.0.0.1:{puerto}"
+        try:
+            limite = time.monotonic() + espera
+            while True:
+                if proceso.poll() is not None:
+                    raise RuntimeError(f"La API terminó al arrancar (código {proceso.returncode})")
+                try:
+                    if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if time.monotonic() > limite:
+                    raise RuntimeError(f"La API no respondió /health en {espera} s")
+                time.sleep(0.2)
+            yield url
+        finally:
+            proceso.terminate()
+            try:
+                proceso.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                proceso.kill()
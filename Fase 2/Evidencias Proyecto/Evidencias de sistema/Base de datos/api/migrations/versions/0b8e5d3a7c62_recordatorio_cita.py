@@ -0,0 +1,50 @@
+"""cola recordatorio_cita para el envio por lotes
+
+Revision ID: 0b8e5d3a7c62
+Revises: f2a7c9e4b1d6
+Create Date: 2025-11-09 09:14:37.882041
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b8e5d3a7c62'
+down_revision: Union[str, Sequence[str], None] = 'f2a7c9e4b1d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "recordatorio_cita",
+        sa.Column("id_recordatorio", sa.Integer(), primary_key=True),
+        sa.Column("rut_paciente", sa.String(), sa.ForeignKey("paciente.rut_paciente", ondelete="CASCADE"), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("nombre_paciente", sa.String(), nullable=False),
+        sa.Column("fecha_cita", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("nombre_medico", sa.String(), nullable=False),
+        sa.Column("nombre_cesfam", sa.String(), nullable=False),
+        sa.Column("enviar_en", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("estado", sa.String(), nullable=False),
+        sa.Column("intentos", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("ultimo_error", sa.String(), nullable=True),
+        sa.Column("tomado_en", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("enviado_en", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("creado_en", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_recordatorio_cita_id_recordatorio", "recordatorio_cita", ["id_recordatorio"])
+    op.create_index("ix_recordatorio_cita_rut_paciente", "recordatorio_cita", ["rut_paciente"])
+    op.create_index("ix_recordatorio_cita_estado_enviar_en", "recordatorio_cita", ["estado", "enviar_en"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_recordatorio_cita_estado_enviar_en", table_name="recordatorio_cita")
+    op.drop_index("ix_recordatorio_cita_rut_paciente", table_name="recordatorio_cita")
+    op.drop_index("ix_recordatorio_cita_id_recordatorio", table_name="recordatorio_cita")
+    op.drop_table("recordatorio_cita")
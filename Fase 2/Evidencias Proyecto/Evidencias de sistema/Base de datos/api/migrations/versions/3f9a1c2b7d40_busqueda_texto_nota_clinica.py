@@ -0,0 +1,38 @@
+"""busqueda de texto completo en nota_clinica
+
+Revision ID: 3f9a1c2b7d40
+Revises: 066b6d800b9d
+Create Date: 2025-11-03 10:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c2b7d40'
+down_revision: Union[str, Sequence[str], None] = '066b6d800b9d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "nota_clinica",
+        sa.Column(
+            "nota_tsv",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('spanish', coalesce(nota, ''))", persisted=True),
+        ),
+    )
+    op.create_index("ix_nota_clinica_nota_tsv", "nota_clinica", ["nota_tsv"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_nota_clinica_nota_tsv", table_name="nota_clinica")
+    op.drop_column("nota_clinica", "nota_tsv")
@@ -0,0 +1,32 @@
+"""latido_en en solicitud_reporte: el runner renueva su toma mientras genera
+
+Una solicitud 'procesando' se daba por abandonada a los 30 minutos de
+iniciado_en aunque su runner siguiera vivo; ahora se recupera solo si deja de
+latir.
+
+Revision ID: 4d9f2b6e8a17
+Revises: 7c1e4a9b2f58
+Create Date: 2025-11-13 09:12:40.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d9f2b6e8a17'
+down_revision: Union[str, Sequence[str], None] = '7c1e4a9b2f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("solicitud_reporte", sa.Column("latido_en", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("solicitud_reporte", "latido_en")
@@ -0,0 +1,60 @@
+"""version_sync y sync_borrado para la sincronizacion incremental
+
+Revision ID: 5e2b9c7d1f08
+Revises: c47e1f0a9d25
+Create Date: 2025-11-07 10:18:42.503127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b9c7d1f08'
+down_revision: Union[str, Sequence[str], None] = 'c47e1f0a9d25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLAS = (
+    "medicion",
+    "medicina_detalle",
+    "nota_clinica",
+    "rango_paciente",
+    "gamificacion_perfil",
+    "evento_gamificacion",
+)
+NEXTVAL = sa.text("nextval('sync_version_seq')")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE SEQUENCE IF NOT EXISTS sync_version_seq")
+    for tabla in TABLAS:
+        # las filas existentes reciben una versión al agregar la columna
+        op.add_column(tabla, sa.Column("version_sync", sa.BigInteger(), nullable=False, server_default=NEXTVAL))
+        op.create_index(f"ix_{tabla}_rut_version_sync", tabla, ["rut_paciente", "version_sync"])
+
+    op.create_table(
+        "sync_borrado",
+        sa.Column("id_borrado", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("tabla", sa.String(), nullable=False),
+        sa.Column("clave", sa.String(), nullable=False),
+        sa.Column("rut_paciente", sa.String(), nullable=False),
+        sa.Column("version_sync", sa.BigInteger(), nullable=False, server_default=NEXTVAL),
+        sa.Column("borrado_en", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_sync_borrado_rut_paciente", "sync_borrado", ["rut_paciente"])
+    op.create_index("ix_sync_borrado_version_sync", "sync_borrado", ["version_sync"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_sync_borrado_version_sync", table_name="sync_borrado")
+    op.drop_index("ix_sync_borrado_rut_paciente", table_name="sync_borrado")
+    op.drop_table("sync_borrado")
+    for tabla in reversed(TABLAS):
+        op.drop_index(f"ix_{tabla}_rut_version_sync", table_name=tabla)
+        op.drop_column(tabla, "version_sync")
+    op.execute("DROP SEQUENCE IF EXISTS sync_version_seq")
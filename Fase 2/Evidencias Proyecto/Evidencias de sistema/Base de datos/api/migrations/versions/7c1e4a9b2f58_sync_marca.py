@@ -0,0 +1,61 @@
+"""sync_version_next() y sync_marca: token de sync que no salta versiones
+
+nextval entrega la versión al ejecutar la sentencia, no al confirmar: una
+transacción lenta puede confirmar la versión 100 después de que otra ya
+confirmó la 101. Las versiones pasan a tomarse con sync_version_next(), que
+primero le asigna un xid a la transacción, y sync_marca guarda pares
+(versión, xid) para saber hasta qué versión ya no queda nada en vuelo.
+
+Revision ID: 7c1e4a9b2f58
+Revises: b5c2e7a9f013
+Create Date: 2025-11-12 10:04:17.552861
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4a9b2f58'
+down_revision: Union[str, Sequence[str], None] = 'b5c2e7a9f013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLAS = (
+    "medicion",
+    "medicina_detalle",
+    "nota_clinica",
+    "rango_paciente",
+    "gamificacion_perfil",
+    "evento_gamificacion",
+    "sync_borrado",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION sync_version_next() RETURNS bigint
+        LANGUAGE sql VOLATILE AS $$
+            SELECT pg_current_xact_id();   -- el xid queda asignado antes de tomar la versión
+            SELECT nextval('sync_version_seq');
+        $$
+    """)
+    for tabla in TABLAS:
+        op.execute(f"ALTER TABLE {tabla} ALTER COLUMN version_sync SET DEFAULT sync_version_next()")
+    op.create_table(
+        "sync_marca",
+        sa.Column("transaccion", sa.BigInteger(), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("creada_en", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("sync_marca")
+    for tabla in TABLAS:
+        op.execute(f"ALTER TABLE {tabla} ALTER COLUMN version_sync SET DEFAULT nextval('sync_version_seq')")
+    op.execute("DROP FUNCTION IF EXISTS sync_version_next()")
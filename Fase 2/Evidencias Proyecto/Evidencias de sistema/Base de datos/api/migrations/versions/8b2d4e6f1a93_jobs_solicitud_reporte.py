@@ -0,0 +1,42 @@
+"""ejecucion de reportes en solicitud_reporte
+
+Revision ID: 8b2d4e6f1a93
+Revises: 3f9a1c2b7d40
+Create Date: 2025-11-05 09:41:07.218734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2d4e6f1a93'
+down_revision: Union[str, Sequence[str], None] = '3f9a1c2b7d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("solicitud_reporte", sa.Column("huella", sa.String(length=64), nullable=True))
+    op.add_column("solicitud_reporte", sa.Column("archivo_sha256", sa.String(length=64), nullable=True))
+    op.add_column("solicitud_reporte", sa.Column("archivo_bytes", sa.Integer(), nullable=True))
+    op.add_column("solicitud_reporte", sa.Column("error", sa.String(), nullable=True))
+    op.add_column("solicitud_reporte", sa.Column("iniciado_en", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("solicitud_reporte", sa.Column("terminado_en", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_solicitud_reporte_huella", "solicitud_reporte", ["huella"])
+    op.create_index("ix_solicitud_reporte_estado_creado_en", "solicitud_reporte", ["estado", "creado_en"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_solicitud_reporte_estado_creado_en", table_name="solicitud_reporte")
+    op.drop_index("ix_solicitud_reporte_huella", table_name="solicitud_reporte")
+    op.drop_column("solicitud_reporte", "terminado_en")
+    op.drop_column("solicitud_reporte", "iniciado_en")
+    op.drop_column("solicitud_reporte", "error")
+    op.drop_column("solicitud_reporte", "archivo_bytes")
+    op.drop_column("solicitud_reporte", "archivo_sha256")
+    op.drop_column("solicitud_reporte", "huella")
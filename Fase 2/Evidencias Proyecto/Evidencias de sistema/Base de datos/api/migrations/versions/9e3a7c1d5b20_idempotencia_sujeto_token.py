@@ -0,0 +1,45 @@
+"""idempotencia: clave por sujeto y toma con token + latido
+
+La clave de idempotencia era global (dos clientes con la misma clave veían la
+respuesta del otro) y una clave 'en_proceso' se podía retomar a los
+IDEMPOTENCIA_PROCESO_SEGUNDOS aunque el request original siguiera corriendo.
+
+Revision ID: 9e3a7c1d5b20
+Revises: 4d9f2b6e8a17
+Create Date: 2025-11-13 11:27:55.604113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e3a7c1d5b20'
+down_revision: Union[str, Sequence[str], None] = '4d9f2b6e8a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("idempotencia", sa.Column("sujeto", sa.String(length=64), nullable=False, server_default=""))
+    op.alter_column("idempotencia", "sujeto", server_default=None)
+    op.add_column("idempotencia", sa.Column("token", sa.String(length=32), nullable=True))
+    op.add_column("idempotencia", sa.Column("latido_en", sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE idempotencia SET latido_en = creada_en")
+    op.alter_column("idempotencia", "latido_en", nullable=False)
+    op.drop_constraint("idempotencia_pkey", "idempotencia", type_="primary")
+    op.create_primary_key("idempotencia_pkey", "idempotencia", ["sujeto", "clave"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # las claves repetidas entre sujetos no caben en la PK antigua: se descartan
+    op.execute("DELETE FROM idempotencia WHERE sujeto <> ''")
+    op.drop_constraint("idempotencia_pkey", "idempotencia", type_="primary")
+    op.create_primary_key("idempotencia_pkey", "idempotencia", ["clave"])
+    op.drop_column("idempotencia", "latido_en")
+    op.drop_column("idempotencia", "token")
+    op.drop_column("idempotencia", "sujeto")
@@ -0,0 +1,40 @@
+"""tabla idempotencia para el header Idempotency-Key
+
+Revision ID: a6d3f2e8c514
+Revises: 5e2b9c7d1f08
+Create Date: 2025-11-07 15:44:09.126583
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d3f2e8c514'
+down_revision: Union[str, Sequence[str], None] = '5e2b9c7d1f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "idempotencia",
+        sa.Column("clave", sa.String(length=255), primary_key=True),
+        sa.Column("huella", sa.String(length=64), nullable=False),
+        sa.Column("estado", sa.String(), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("content_type", sa.String(), nullable=True),
+        sa.Column("cuerpo", sa.LargeBinary(), nullable=True),
+        sa.Column("creada_en", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("expira_en", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_idempotencia_expira_en", "idempotencia", ["expira_en"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_idempotencia_expira_en", table_name="idempotencia")
+    op.drop_table("idempotencia")
@@ -0,0 +1,50 @@
+"""esquema archivo y tablas de la retención (resumen y checkpoint)
+
+Las tablas de archivo (archivo.evento_gamificacion, ...) las crea el job la
+primera vez que archiva cada tabla, con las mismas columnas que la original.
+
+Revision ID: b5c2e7a9f013
+Revises: d3b8f1c6e274
+Create Date: 2025-11-11 09:12:40.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5c2e7a9f013'
+down_revision: Union[str, Sequence[str], None] = 'd3b8f1c6e274'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE SCHEMA IF NOT EXISTS archivo")
+    op.create_table(
+        "retencion_resumen",
+        sa.Column("tabla", sa.String(), primary_key=True),
+        sa.Column("dia", sa.Date(), primary_key=True),
+        sa.Column("grupo", sa.String(), primary_key=True),
+        sa.Column("filas", sa.BigInteger(), nullable=False),
+        sa.Column("total", sa.BigInteger(), nullable=False),
+    )
+    op.create_table(
+        "retencion_checkpoint",
+        sa.Column("politica", sa.String(), primary_key=True),
+        sa.Column("estado", sa.String(), nullable=False),
+        sa.Column("corte", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("ultima_clave", sa.BigInteger(), nullable=False),
+        sa.Column("filas", sa.BigInteger(), nullable=False),
+        sa.Column("actualizado_en", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("retencion_checkpoint")
+    op.drop_table("retencion_resumen")
+    # el esquema archivo puede tener datos archivados: no se borra
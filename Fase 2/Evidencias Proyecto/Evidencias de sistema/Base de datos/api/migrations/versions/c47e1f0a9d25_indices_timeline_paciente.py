@@ -0,0 +1,32 @@
+"""indices (rut, fecha) para la linea de tiempo del paciente
+
+Revision ID: c47e1f0a9d25
+Revises: 8b2d4e6f1a93
+Create Date: 2025-11-06 16:02:55.871390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47e1f0a9d25'
+down_revision: Union[str, Sequence[str], None] = '8b2d4e6f1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_medicion_rut_fecha", "medicion", ["rut_paciente", "fecha_registro"])
+    op.create_index("ix_nota_clinica_rut_creada_en", "nota_clinica", ["rut_paciente", "creada_en"])
+    op.create_index("ix_evento_gamificacion_rut_fecha", "evento_gamificacion", ["rut_paciente", "fecha"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_evento_gamificacion_rut_fecha", table_name="evento_gamificacion")
+    op.drop_index("ix_nota_clinica_rut_creada_en", table_name="nota_clinica")
+    op.drop_index("ix_medicion_rut_fecha", table_name="medicion")
@@ -0,0 +1,236 @@
+"""medicion y medicion_detalle particionadas por mes de fecha_registro
+
+Reescribe las dos tablas: las actuales se apartan, se crean las particionadas
+(PK y FK incluyen fecha_registro; el detalle recibe la fecha de su medición),
+se copian las filas y se borran las viejas. Los ids y version_sync se
+conservan y las secuencias siguen siendo las mismas. Correr en una ventana de
+mantención: las tablas quedan bloqueadas mientras se copian.
+
+Requiere PostgreSQL 15+ (FK entre tablas particionadas y UPDATE que mueve la
+medición de mes sin disparar el ON DELETE CASCADE de sus detalles).
+
+Revision ID: d3b8f1c6e274
+Revises: 0b8e5d3a7c62
+Create Date: 2025-11-10 11:26:53.604718
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3b8f1c6e274'
+down_revision: Union[str, Sequence[str], None] = '0b8e5d3a7c62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MESES_ADELANTE = 3
+TS = sa.DateTime(timezone=True)
+
+COLUMNAS_MEDICION = (
+    "id_medicion", "rut_paciente", "id_reporte", "fecha_registro", "origen", "registrado_por", "observacion",
+    "evaluada_en", "tiene_alerta", "severidad_max", "resumen_alerta", "estado_alerta", "tomada_por",
+    "tomada_en", "resuelta_en", "ignorada_en", "version_sync",
+)
+COLUMNAS_DETALLE = (
+    "id_detalle", "id_medicion", "id_parametro", "id_unidad", "valor_num", "valor_texto", "fuera_rango",
+    "severidad", "umbral_min", "umbral_max", "tipo_alerta",
+)
+INDICES_MEDICION = {
+    "ix_medicion_id_medicion": ["id_medicion"],
+    "ix_medicion_rut_paciente": ["rut_paciente"],
+    "ix_medicion_id_reporte": ["id_reporte"],
+    "ix_medicion_tomada_por": ["tomada_por"],
+    "ix_medicion_rut_fecha": ["rut_paciente", "fecha_registro"],
+    "ix_medicion_rut_version_sync": ["rut_paciente", "version_sync"],
+    "ix_medicion_tomada_por_estado": ["tomada_por", "estado_alerta"],
+}
+INDICES_DETALLE = {
+    "ix_medicion_detalle_id_detalle": ["id_detalle"],
+    "ix_medicion_detalle_id_medicion": ["id_medicion"],
+    "ix_medicion_detalle_id_parametro": ["id_parametro"],
+    "ix_medicion_detalle_id_unidad": ["id_unidad"],
+}
+
+
+def _sumar_meses(mes: date, n: int) -> date:
+    k = mes.year * 12 + mes.month - 1 + n
+    return date(k // 12, k % 12 + 1, 1)
+
+
+def _particion_mes(tabla: str, mes: date) -> None:
+    op.execute(
+        f"CREATE TABLE {tabla}_p{mes:%Y_%m} PARTITION OF {tabla} "
+        f"FOR VALUES FROM ('{mes.isoformat()} 00:00:00+00') TO ('{_sumar_meses(mes, 1).isoformat()} 00:00:00+00')"
+    )
+
+
+def _renombrar_indices(tabla: str, sufijo: str) -> None:
+    # los nombres de índice son globales: los de la tabla apartada no pueden chocar con los nuevos
+    op.execute(f"""
+        DO $$
+        DECLARE r record;
+        BEGIN
+            FOR r IN SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = '{tabla}' LOOP
+                EXECUTE format('ALTER INDEX %I RENAME TO %I', r.indexname, left(r.indexname, 50) || '{sufijo}');
+            END LOOP;
+        END $$
+    """)
+
+
+def _columnas_medicion(secuencia: str) -> list:
+    return [
+        sa.Column("id_medicion", sa.Integer(), nullable=False, server_default=sa.text(f"nextval('{secuencia}')")),
+        sa.Column("rut_paciente", sa.String(), sa.ForeignKey("paciente.rut_paciente", ondelete="RESTRICT"), nullable=False),
+        sa.Column("id_reporte", sa.Integer(), sa.ForeignKey("solicitud_reporte.id_reporte", ondelete="RESTRICT"), nullable=True),
+        sa.Column("fecha_registro", TS, nullable=False),
+        sa.Column("origen", sa.String(), nullable=False),
+        sa.Column("registrado_por", sa.String(), nullable=False),
+        sa.Column("observacion", sa.String(), nullable=False),
+        sa.Column("evaluada_en", TS, nullable=False),
+        sa.Column("tiene_alerta", sa.Boolean(), nullable=False),
+        sa.Column("severidad_max", sa.String(), nullable=False),
+        sa.Column("resumen_alerta", sa.String(), nullable=False),
+        sa.Column("estado_alerta", sa.String(), nullable=False),
+        sa.Column("tomada_por", sa.String(), sa.ForeignKey("equipo_medico.rut_medico", ondelete="RESTRICT"), nullable=True),
+        sa.Column("tomada_en", TS, nullable=True),
+        sa.Column("resuelta_en", TS, nullable=True),
+        sa.Column("ignorada_en", TS, nullable=True),
+        sa.Column("version_sync", sa.BigInteger(), nullable=False, server_default=sa.text("nextval('sync_version_seq')")),
+    ]
+
+
+def _columnas_detalle(secuencia: str) -> list:
+    return [
+        sa.Column("id_detalle", sa.Integer(), nullable=False, server_default=sa.text(f"nextval('{secuencia}')")),
+        sa.Column("id_medicion", sa.Integer(), nullable=False),
+        sa.Column("id_parametro", sa.Integer(), sa.ForeignKey("parametro_clinico.id_parametro", ondelete="RESTRICT"), nullable=False),
+        sa.Column("id_unidad", sa.Integer(), sa.ForeignKey("unidad_medida.id_unidad", ondelete="RESTRICT"), nullable=False),
+        sa.Column("valor_num", sa.Float(), nullable=False),
+        sa.Column("valor_texto", sa.String(), nullable=False),
+        sa.Column("fuera_rango", sa.Boolean(), nullable=False),
+        sa.Column("severidad", sa.String(), nullable=False),
+        sa.Column("umbral_min", sa.Float(), nullable=False),
+        sa.Column("umbral_max", sa.Float(), nullable=False),
+        sa.Column("tipo_alerta", sa.String(), nullable=False),
+    ]
+
+
+def _crear_indices() -> None:
+    for nombre, cols in INDICES_MEDICION.items():
+        op.create_index(nombre, "medicion", cols)
+    op.create_index("ix_medicion_alerta_estado_fecha", "medicion",
+                    ["tiene_alerta", "estado_alerta", sa.text("fecha_registro DESC")])
+    for nombre, cols in INDICES_DETALLE.items():
+        op.create_index(nombre, "medicion_detalle", cols)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if int(bind.execute(sa.text("SHOW server_version_num")).scalar_one()) < 150000:
+        raise RuntimeError("El particionado de medicion requiere PostgreSQL 15 o superior")
+
+    seq_medicion = bind.execute(sa.text("SELECT pg_get_serial_sequence('medicion', 'id_medicion')")).scalar_one()
+    seq_detalle = bind.execute(sa.text("SELECT pg_get_serial_sequence('medicion_detalle', 'id_detalle')")).scalar_one()
+    primera = bind.execute(sa.text("SELECT min(fecha_registro) FROM medicion")).scalar()
+
+    # 1) apartar las tablas actuales (las secuencias se quedan para las nuevas)
+    op.execute(f"ALTER SEQUENCE {seq_medicion} OWNED BY NONE")
+    op.execute(f"ALTER SEQUENCE {seq_detalle} OWNED BY NONE")
+    op.rename_table("medicion_detalle", "medicion_detalle_sin_particion")
+    op.rename_table("medicion", "medicion_sin_particion")
+    _renombrar_indices("medicion_detalle_sin_particion", "_sp")
+    _renombrar_indices("medicion_sin_particion", "_sp")
+
+    # 2) tablas particionadas por mes de fecha_registro
+    op.create_table(
+        "medicion", *_columnas_medicion(seq_medicion),
+        sa.PrimaryKeyConstraint("id_medicion", "fecha_registro", name="medicion_pkey"),
+        postgresql_partition_by="RANGE (fecha_registro)",
+    )
+    op.create_table(
+        "medicion_detalle", *_columnas_detalle(seq_detalle),
+        sa.Column("fecha_registro", TS, nullable=False),
+        sa.PrimaryKeyConstraint("id_detalle", "fecha_registro", name="medicion_detalle_pkey"),
+        sa.ForeignKeyConstraint(["id_medicion", "fecha_registro"], ["medicion.id_medicion", "medicion.fecha_registro"],
+                                ondelete="CASCADE", onupdate="CASCADE"),
+        postgresql_partition_by="RANGE (fecha_registro)",
+    )
+    op.execute(f"ALTER SEQUENCE {seq_medicion} OWNED BY medicion.id_medicion")
+    op.execute(f"ALTER SEQUENCE {seq_detalle} OWNED BY medicion_detalle.id_detalle")
+
+    # 3) un mes por partición, desde la medición más antigua hasta MESES_ADELANTE meses desde hoy
+    hoy = datetime.now(timezone.utc).date().replace(day=1)
+    mes = (primera.astimezone(timezone.utc).date().replace(day=1) if primera else hoy)
+    while mes <= _sumar_meses(hoy, MESES_ADELANTE):
+        _particion_mes("medicion", mes)
+        _particion_mes("medicion_detalle", mes)
+        mes = _sumar_meses(mes, 1)
+    op.execute("CREATE TABLE medicion_default PARTITION OF medicion DEFAULT")
+    op.execute("CREATE TABLE medicion_detalle_default PARTITION OF medicion_detalle DEFAULT")
+
+    # 4) copiar (los índices se crean después: más rápido que mantenerlos fila a fila)
+    cols = ", ".join(COLUMNAS_MEDICION)
+    op.execute(f"INSERT INTO medicion ({cols}) SELECT {cols} FROM medicion_sin_particion")
+    cols = ", ".join(COLUMNAS_DETALLE)
+    op.execute(f"""
+        INSERT INTO medicion_detalle ({cols}, fecha_registro)
+        SELECT {", ".join("d." + c for c in COLUMNAS_DETALLE)}, m.fecha_registro
+        FROM medicion_detalle_sin_particion d
+        JOIN medicion_sin_particion m ON m.id_medicion = d.id_medicion
+    """)
+    _crear_indices()
+
+    op.drop_table("medicion_detalle_sin_particion")
+    op.drop_table("medicion_sin_particion")
+    op.execute("ANALYZE medicion")
+    op.execute("ANALYZE medicion_detalle")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    seq_medicion = bind.execute(sa.text("SELECT pg_get_serial_sequence('medicion', 'id_medicion')")).scalar_one()
+    seq_detalle = bind.execute(sa.text("SELECT pg_get_serial_sequence('medicion_detalle', 'id_detalle')")).scalar_one()
+
+    op.execute(f"ALTER SEQUENCE {seq_medicion} OWNED BY NONE")
+    op.execute(f"ALTER SEQUENCE {seq_detalle} OWNED BY NONE")
+    op.rename_table("medicion_detalle", "medicion_detalle_particionada")
+    op.rename_table("medicion", "medicion_particionada")
+    # índices de las dos tablas padre (los de cada partición tienen nombres propios)
+    op.execute("""
+        DO $$
+        DECLARE r record;
+        BEGIN
+            FOR r IN SELECT c.relname FROM pg_class c JOIN pg_index x ON x.indexrelid = c.oid
+                     JOIN pg_class t ON t.oid = x.indrelid
+                     WHERE t.relname IN ('medicion_particionada', 'medicion_detalle_particionada') LOOP
+                EXECUTE format('ALTER INDEX %I RENAME TO %I', r.relname, left(r.relname, 50) || '_part');
+            END LOOP;
+        END $$
+    """)
+
+    op.create_table(
+        "medicion", *_columnas_medicion(seq_medicion),
+        sa.PrimaryKeyConstraint("id_medicion", name="medicion_pkey"),
+    )
+    op.create_table(
+        "medicion_detalle", *_columnas_detalle(seq_detalle),
+        sa.PrimaryKeyConstraint("id_detalle", name="medicion_detalle_pkey"),
+        sa.ForeignKeyConstraint(["id_medicion"], ["medicion.id_medicion"], ondelete="CASCADE"),
+    )
+    op.execute(f"ALTER SEQUENCE {seq_medicion} OWNED BY medicion.id_medicion")
+    op.execute(f"ALTER SEQUENCE {seq_detalle} OWNED BY medicion_detalle.id_detalle")
+
+    cols = ", ".join(COLUMNAS_MEDICION)
+    op.execute(f"INSERT INTO medicion ({cols}) SELECT {cols} FROM medicion_particionada")
+    cols = ", ".join(COLUMNAS_DETALLE)
+    op.execute(f"INSERT INTO medicion_detalle ({cols}) SELECT {cols} FROM medicion_detalle_particionada")
+    _crear_indices()
+
+    op.drop_table("medicion_detalle_particionada")   # arrastra sus particiones
+    op.drop_table("medicion_particionada")
@@ -0,0 +1,63 @@
+"""regla de recurrencia en medicina_detalle, tomas y adherencia semanal
+
+Revision ID: e91c4b6a2d73
+Revises: a6d3f2e8c514
+Create Date: 2025-11-08 11:27:50.664218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91c4b6a2d73'
+down_revision: Union[str, Sequence[str], None] = 'a6d3f2e8c514'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("medicina_detalle", sa.Column("intervalo_horas", sa.Integer(), nullable=True))
+
+    op.create_table(
+        "toma_medicamento",
+        sa.Column("id_detalle", sa.Integer(), sa.ForeignKey("medicina_detalle.id_detalle", ondelete="CASCADE"), primary_key=True),
+        sa.Column("programada_en", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("tomada_en", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_table(
+        "adherencia_semanal",
+        sa.Column("rut_paciente", sa.String(), sa.ForeignKey("paciente.rut_paciente", ondelete="CASCADE"), primary_key=True),
+        sa.Column("semana", sa.Date(), primary_key=True),
+        sa.Column("dosis_programadas", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("dosis_tomadas", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    # Las prescripciones existentes no tienen intervalo: una dosis en fecha_inicio,
+    # tomada según el flag 'tomada'.
+    op.execute("""
+        INSERT INTO toma_medicamento (id_detalle, programada_en, tomada_en)
+        SELECT id_detalle, fecha_inicio, coalesce(fecha_tomada, fecha_inicio)
+        FROM medicina_detalle
+        WHERE tomada AND fecha_inicio < fecha_fin
+    """)
+    op.execute("""
+        INSERT INTO adherencia_semanal (rut_paciente, semana, dosis_programadas, dosis_tomadas)
+        SELECT rut_paciente,
+               date_trunc('week', fecha_inicio AT TIME ZONE 'UTC')::date,
+               count(*),
+               count(*) FILTER (WHERE tomada)
+        FROM medicina_detalle
+        WHERE fecha_inicio < fecha_fin
+        GROUP BY 1, 2
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("adherencia_semanal")
+    op.drop_table("toma_medicamento")
+    op.drop_column("medicina_detalle", "intervalo_horas")
@@ -0,0 +1,32 @@
+"""indice (rut_paciente, fecha_inicio, tomada) en medicina_detalle
+
+Revision ID: f2a7c9e4b1d6
+Revises: e91c4b6a2d73
+Create Date: 2025-11-08 17:42:09.318274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a7c9e4b1d6'
+down_revision: Union[str, Sequence[str], None] = 'e91c4b6a2d73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_medicina_detalle_rut_inicio_tomada",
+        "medicina_detalle",
+        ["rut_paciente", "fecha_inicio", "tomada"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_medicina_detalle_rut_inicio_tomada", table_name="medicina_detalle")
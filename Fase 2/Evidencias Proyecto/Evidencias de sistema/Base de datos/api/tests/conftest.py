@@ -0,0 +1,45 @@
+# tests/conftest.py
+import os
+
+# Settings exige estas variables; los tests no tocan Postgres ni el SMTP real
+for _k, _v in {"POSTGRES_USER": "test", "POSTGRES_PASSWORD": "test", "POSTGRES_DB": "test",
+               "SMTP_USER": "", "SMTP_PASSWORD": "", "EMAILS_FROM_EMAIL": "test@cuidasalud.cl"}.items():
+    os.environ.setdefault(_k, _v)
+
+import pytest
+
+from benchmarks.smtp_sink import SumideroSMTP
+
+
+@pytest.fixture(scope="session")
+def _sumidero():
+    with SumideroSMTP() as s:
+        yield s
+
+
+@pytest.fixture
+def smtp_sink(_sumidero):
+    """Sumidero SMTP local con EmailService/PoolSMTP apuntando a él durante el test"""
+    with _sumidero.apuntar():
+        yield _sumidero
+
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    with assert_max_queries(3, engine): client.get(...)
+    Falla si el bloque ejecuta más sentencias, mostrando las repetidas y desde dónde.
+    """
+    from contextlib import contextmanager
+    from app.core.n_mas_uno import ContadorConsultas
+
+    @contextmanager
+    def _max(n: int, engine=None):
+        if engine is None:
+            from app.db import engine
+        with ContadorConsultas(engine) as contador:
+            yield contador
+        if len(contador) > n:
+            pytest.fail(f"Se esperaban a lo más {n} sentencias SQL y hubo {contador.reporte()}", pytrace=False)
+
+    return _max
@@ -0,0 +1,285 @@
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Select
+
+from app.services import adherencia
+from app.services.adherencia import SEMANA, contar, es_ocurrencia, ocurrencias, programadas_por_semana, semana_de
+
+
+def _t(*args, tz=timezone.utc):
+    return datetime(*args, tzinfo=tz)
+
+
+def _det(inicio, fin, intervalo=None, rut="123456785", id_detalle=1, tomada=False):
+    return SimpleNamespace(id_detalle=id_detalle, rut_paciente=rut, fecha_inicio=inicio, fecha_fin=fin,
+                           intervalo_horas=intervalo, tomada=tomada, fecha_tomada=None)
+
+
+# --------- motor de la regla ---------
+
+def test_bordes_inicio_incluido_fin_excluido():
+    det = _det(_t(2026, 1, 6, 8), _t(2026, 1, 7, 8), intervalo=8)
+    assert list(ocurrencias(det, det.fecha_inicio, det.fecha_fin)) == [
+        _t(2026, 1, 6, 8), _t(2026, 1, 6, 16), _t(2026, 1, 7, 0),
+    ]
+    # la dosis que caería justo en fecha_fin no existe
+    assert not es_ocurrencia(det, _t(2026, 1, 7, 8))
+    # la ventana [desde, hasta) incluye una dosis en 'desde' y excluye una en 'hasta'
+    assert contar(det, _t(2026, 1, 6, 16), _t(2026, 1, 7, 0)) == 1
+    # fuera de la prescripción, o ventana vacía
+    assert contar(det, _t(2026, 1, 1), _t(2026, 1, 6, 8)) == 0
+    assert contar(det, _t(2026, 1, 7, 8), _t(2026, 1, 9)) == 0
+    assert contar(det, _t(2026, 1, 6, 12), _t(2026, 1, 6, 12)) == 0
+
+
+def test_dosis_unica():
+    det = _det(_t(2026, 1, 6, 8), _t(2026, 1, 6, 9))
+    assert contar(det, _t(2026, 1, 6), _t(2026, 1, 7)) == 1
+    assert es_ocurrencia(det, _t(2026, 1, 6, 8)) and not es_ocurrencia(det, _t(2026, 1, 6, 8, 1))
+    assert programadas_por_semana(det) == Counter({date(2026, 1, 5): 1})
+    # sin rango válido no hay dosis (igual que el backfill: WHERE fecha_inicio < fecha_fin)
+    assert programadas_por_semana(_det(_t(2026, 1, 6, 8), _t(2026, 1, 6, 8))) == Counter()
+
+
+def test_semana_es_el_lunes_utc():
+    # 2026-01-05 es lunes; las 22:00 del domingo en Chile ya son lunes en UTC
+    assert semana_de(_t(2026, 1, 11, 23, 59)) == date(2026, 1, 5)
+    assert semana_de(_t(2026, 1, 12)) == date(2026, 1, 12)
+    assert semana_de(_t(2026, 1, 11, 22, tz=timezone(timedelta(hours=-3)))) == date(2026, 1, 12)
+    # naive = UTC
+    assert semana_de(datetime(2026, 1, 11, 23)) == date(2026, 1, 5)
+
+
+def test_dosis_que_cruzan_la_semana_utc():
+    # domingo 20:00 UTC cada 6 h hasta el lunes 14:00 (esa queda fuera)
+    det = _det(_t(2026, 1, 11, 20), _t(2026, 1, 12, 14), intervalo=6)
+    assert programadas_por_semana(det) == Counter({date(2026, 1, 5): 1, date(2026, 1, 12): 2})
+    # mismo instante expresado en -03:00
+    chile = timezone(timedelta(hours=-3))
+    det = _det(_t(2026, 1, 11, 17, tz=chile), _t(2026, 1, 12, 11, tz=chile), intervalo=6)
+    assert programadas_por_semana(det) == Counter({date(2026, 1, 5): 1, date(2026, 1, 12): 2})
+
+
+@pytest.mark.parametrize("intervalo", [1, 5, 7, 10, 13, 25, 49, 170])
+def test_intervalos_que_no_dividen_24h(intervalo):
+    det = _det(_t(2026, 1, 7, 3, 30), _t(2026, 2, 19, 11), intervalo=intervalo)
+    dosis = list(ocurrencias(det, det.fecha_inicio, det.fecha_fin))
+    # paso exacto, dentro del rango, sin saltos
+    assert dosis[0] == det.fecha_inicio and dosis[-1] < det.fecha_fin <= dosis[-1] + timedelta(hours=intervalo)
+    assert all(b - a == timedelta(hours=intervalo) for a, b in zip(dosis, dosis[1:]))
+    # el reparto por semana suma lo mismo y pone cada dosis en su lunes
+    por_semana = programadas_por_semana(det)
+    assert sum(por_semana.values()) == len(dosis) == contar(det, det.fecha_inicio, det.fecha_fin)
+    assert por_semana == Counter(semana_de(d) for d in dosis)
+    # contar por ventanas arbitrarias también suma lo mismo
+    cortes = [det.fecha_inicio + timedelta(hours=h) for h in range(0, 24 * 44, 17)] + [det.fecha_fin]
+    assert sum(contar(det, a, b) for a, b in zip(cortes, cortes[1:])) == len(dosis)
+
+
+# --------- rollup ---------
+
+class _Db:
+    """Las consultas de tomas devuelven 'tomas' (programada_en); el resto no hace nada"""
+
+    def __init__(self, tomas=()):
+        self.tomas = list(tomas)
+
+    def execute(self, stmt):
+        return [(p,) for p in self.tomas] if isinstance(stmt, Select) else []
+
+    def add(self, obj):
+        pass
+
+    def flush(self):
+        pass
+
+
+@pytest.fixture
+def rollup(monkeypatch):
+    tabla: dict = {}
+
+    def sumar(db, rut, programadas, tomadas):
+        for s in set(programadas) | set(tomadas):
+            fila = tabla.setdefault((rut, s), [0, 0])
+            fila[0] += programadas.get(s, 0)
+            fila[1] += tomadas.get(s, 0)
+
+    monkeypatch.setattr(adherencia, "_sumar", sumar)
+    return tabla
+
+
+def _vigentes(tabla):
+    return {k: list(v) for k, v in tabla.items() if v != [0, 0]}
+
+
+def test_rollup_alta_edicion_y_borrado(rollup):
+    db = _Db()
+    det = _det(_t(2026, 1, 11, 20), _t(2026, 1, 19), intervalo=12)
+    adherencia.actualizar_rollup(db, None, det)
+    alta = _vigentes(rollup)
+    assert alta == {("123456785", date(2026, 1, 5)): [1, 0], ("123456785", date(2026, 1, 12)): [14, 0]}
+
+    # editar sin cambiar el calendario no cambia nada; repetirlo tampoco
+    for _ in range(2):
+        adherencia.actualizar_rollup(db, adherencia.capturar(db, det), det)
+        assert _vigentes(rollup) == alta
+
+    # cambiar el intervalo y volver al original deja lo mismo que el alta
+    anterior = adherencia.capturar(db, det)
+    det.intervalo_horas = 5
+    adherencia.actualizar_rollup(db, anterior, det)
+    assert sum(p for p, _ in rollup.values()) == contar(det, det.fecha_inicio, det.fecha_fin)
+    anterior = adherencia.capturar(db, det)
+    det.intervalo_horas = 12
+    adherencia.actualizar_rollup(db, anterior, det)
+    assert _vigentes(rollup) == alta
+
+    # cambio de paciente: sale de uno y entra al otro
+    anterior = adherencia.capturar(db, det)
+    det.rut_paciente = "111111111"
+    adherencia.actualizar_rollup(db, anterior, det)
+    assert _vigentes(rollup) == {("111111111", s): v for (_, s), v in alta.items()}
+
+    # borrar deja todo en cero
+    adherencia.actualizar_rollup(db, adherencia.capturar(db, det), None)
+    assert _vigentes(rollup) == {}
+
+
+def test_rollup_cuenta_tomas_en_la_semana_de_la_dosis(rollup):
+    # la toma de la dosis del domingo 20:00 cuenta en esa semana aunque se tome el lunes
+    db = _Db(tomas=[_t(2026, 1, 11, 20), _t(2026, 1, 12, 8)])
+    det = _det(_t(2026, 1, 11, 20), _t(2026, 1, 19), intervalo=12)
+    adherencia.actualizar_rollup(db, None, det)
+    esperado = {("123456785", date(2026, 1, 5)): [1, 1], ("123456785", date(2026, 1, 12)): [14, 1]}
+    assert _vigentes(rollup) == esperado
+    adherencia.actualizar_rollup(db, adherencia.capturar(db, det), det)
+    assert _vigentes(rollup) == esperado
+    adherencia.actualizar_rollup(db, adherencia.capturar(db, det), None)
+    assert _vigentes(rollup) == {}
+
+
+def test_sumar_no_escribe_semanas_en_cero():
+    ejecutadas = []
+    db = SimpleNamespace(execute=ejecutadas.append)
+    adherencia._sumar(db, "123456785", {date(2026, 1, 5): 0}, {date(2026, 1, 5): 0})
+    assert ejecutadas == []
+    adherencia._sumar(db, "123456785", {date(2026, 1, 5): -2}, {})
+    assert len(ejecutadas) == 1
+
+
+def test_restar_conserva_negativos():
+    a, b = Counter({date(2026, 1, 5): 1}), Counter({date(2026, 1, 5): 3, date(2026, 1, 12): 2})
+    assert adherencia._restar(a, b) == {date(2026, 1, 5): -2, date(2026, 1, 12): -2}
+    assert SEMANA == timedelta(days=7)
+
+
+# --------- bulk-tomar y dosis pendientes ---------
+
+class _DbBulk:
+    """UPDATE/INSERT/DELETE ... RETURNING sobre las prescripciones cuyos ids van en la sentencia"""
+
+    def __init__(self, dets):
+        self.dets = dets
+        self.sentencias = []
+        self.commits = 0
+
+    def execute(self, stmt):
+        from sqlalchemy import Update
+        from sqlalchemy.dialects import postgresql
+
+        self.sentencias.append(type(stmt).__name__)
+        ids = next(v for v in stmt.compile(dialect=postgresql.dialect()).params.values() if isinstance(v, list))
+        if isinstance(stmt, Update):
+            filas = [SimpleNamespace(id_detalle=i, rut_paciente=self.dets[i].rut_paciente) for i in ids]
+        else:
+            filas = [(i, self.dets[i].fecha_inicio) for i in ids]
+        return SimpleNamespace(all=lambda: filas)
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def bulk(monkeypatch, rollup):
+    dets = {
+        3: _det(_t(2026, 1, 11, 20), _t(2026, 1, 11, 21), id_detalle=3),
+        4: _det(_t(2026, 1, 12, 8), _t(2026, 1, 12, 9), id_detalle=4, tomada=True),
+        5: _det(_t(2026, 1, 12, 8), _t(2026, 1, 19), intervalo=8, id_detalle=5),
+        6: _det(_t(2026, 1, 13, 8), _t(2026, 1, 13, 9), id_detalle=6, rut="111111111"),
+    }
+    bloqueados = []
+
+    def bloquear(db, ids):
+        bloqueados.append(list(ids))
+        return {i: dets[i] for i in ids if i in dets}
+
+    monkeypatch.setattr(adherencia, "bloquear", bloquear)
+    return _DbBulk(dets), dets, bloqueados, rollup
+
+
+def test_bulk_tomar_deduplica_y_omite(bulk):
+    db, _, bloqueados, rollup = bulk
+    r = adherencia.marcar_dosis_unicas(db, [3, 3, 4, 5, 9, 6, 3], tomada=True)
+    # repetidos una vez; 4 ya estaba tomada, 5 es recurrente, 9 no existe
+    assert r == {"actualizadas": [3, 6], "omitidas": [4, 5, 9]}
+    assert bloqueados == [[3, 4, 5, 9, 6]] and db.sentencias[0] == "Update"
+    assert _vigentes(rollup) == {("123456785", date(2026, 1, 5)): [0, 1], ("111111111", date(2026, 1, 12)): [0, 1]}
+    assert db.commits == 1
+
+
+def test_bulk_destomar_resta_y_sin_candidatos_no_escribe(bulk):
+    db, _, _, rollup = bulk
+    r = adherencia.marcar_dosis_unicas(db, [4, 4], tomada=False)
+    assert r == {"actualizadas": [4], "omitidas": []}
+    assert db.sentencias == ["Update", "Delete"]
+    assert _vigentes(rollup) == {("123456785", date(2026, 1, 12)): [0, -1]}
+
+    db.sentencias.clear()
+    assert adherencia.marcar_dosis_unicas(db, [3, 5], tomada=False) == {"actualizadas": [], "omitidas": [3, 5]}
+    assert db.sentencias == []
+
+
+class _Resultado(list):
+    def all(self):
+        return list(self)
+
+
+class _DbPendientes:
+    """Primero las prescripciones de la ventana, después las tomas registradas"""
+
+    def __init__(self, filas, tomas):
+        self.resultados = [filas, tomas]
+
+    def execute(self, stmt):
+        return _Resultado(self.resultados.pop(0))
+
+
+def _fila(id_detalle, inicio, fin, intervalo=None, rut="123456785"):
+    return SimpleNamespace(id_detalle=id_detalle, rut_paciente=rut, id_medicina=1, nombre_medicina="Metformina",
+                           dosis="850 mg", instrucciones_toma=None, fecha_inicio=inicio, fecha_fin=fin,
+                           intervalo_horas=intervalo)
+
+
+def test_dosis_pendientes_cruza_tomas_y_ordena():
+    desde, hasta = _t(2026, 1, 12, 0), _t(2026, 1, 13, 0)
+    filas = [
+        _fila(1, _t(2026, 1, 11, 20), _t(2026, 1, 20), intervalo=8),   # 04, 12, 20 del 12
+        _fila(2, _t(2026, 1, 12, 9), _t(2026, 1, 12, 10), rut="111111111"),  # dosis única
+        _fila(3, _t(2026, 1, 12, 22), _t(2026, 1, 13), intervalo=2),   # solo 22:00 (la de 00:00 es 'hasta')
+    ]
+    tomas = [(1, _t(2026, 1, 12, 12))]
+    pendientes = adherencia.dosis_pendientes(_DbPendientes(filas, tomas), "222222222", desde, hasta)
+    assert [(p["id_detalle"], p["programada_en"]) for p in pendientes] == [
+        (1, _t(2026, 1, 12, 4)), (2, _t(2026, 1, 12, 9)), (1, _t(2026, 1, 12, 20)), (3, _t(2026, 1, 12, 22)),
+    ]
+    assert [p["recurrente"] for p in pendientes] == [True, False, True, True]
+    assert pendientes[1]["rut_paciente"] == "111111111" and pendientes[0]["nombre_medicina"] == "Metformina"
+
+
+def test_dosis_pendientes_sin_recurrentes_no_consulta_tomas():
+    db = _DbPendientes([_fila(2, _t(2026, 1, 12, 9), _t(2026, 1, 12, 10))], [])
+    pendientes = adherencia.dosis_pendientes(db, "222222222", _t(2026, 1, 12), _t(2026, 1, 13))
+    assert [p["id_detalle"] for p in pendientes] == [2] and db.resultados == [[]]
@@ -0,0 +1,68 @@
+# tests/test_consultas_lentas.py
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.core import consultas_lentas, metrics
+from app.core.consultas_lentas import registro_lentas
+
+
+def test_registra_lentas_con_ruta_y_sin_valores(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with engine.begin() as c:
+        c.execute(text("create table t (id integer primary key, rut text)"))
+    metrics.instalar(engine)
+    consultas_lentas.instalar(engine)
+    monkeypatch.setattr(settings, "SQL_LENTA_MS", 0.0)   # todo cuenta como lento
+    registro_lentas.limpiar()
+
+    app = FastAPI()
+    app.add_middleware(metrics.MetricasMiddleware, registro=metrics.Registro())
+
+    @app.get("/pacientes/{rut}")
+    def paciente(rut: str):
+        with engine.connect() as c:
+            c.execute(text("select id from t where rut = :rut"), {"rut": rut}).all()
+        return {"ok": True}
+
+    TestClient(app).get("/pacientes/11111111-1")
+
+    [e] = [e for e in registro_lentas.entradas() if "where rut" in e["sql"]]
+    assert e["ruta"] == "GET /pacientes/{rut}"
+    assert e["parametros"] == ["str"]           # sqlite recibe posicionales; nunca el valor
+    assert "11111111-1" not in str(e)
+    assert registro_lentas.resumen()[0]["veces"] >= 1
+
+
+def test_admin_requiere_token(monkeypatch):
+    from app.main import app
+
+    client = TestClient(app)
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "")
+    assert client.get("/admin/sql-lentas").status_code == 404
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secreto")
+    assert client.get("/admin/sql-lentas", headers={"X-Admin-Token": "otro"}).status_code == 403
+    r = client.get("/admin/sql-lentas", headers={"X-Admin-Token": "secreto"})
+    assert r.status_code == 200 and "items" in r.json()
+
+
+def test_explain_no_reejecuta_selects_que_bloquean_filas():
+    from types import SimpleNamespace
+
+    conn = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+    ejecutadas = []
+    cur = SimpleNamespace(execute=lambda sql, *a: ejecutadas.append(sql), fetchall=lambda: [("Seq Scan",)],
+                          close=lambda: None)
+    cursor = SimpleNamespace(connection=SimpleNamespace(cursor=lambda: cur))
+    for sql in (
+        "SELECT id FROM solicitud_reporte WHERE estado = %(e)s LIMIT 1 FOR UPDATE SKIP LOCKED",
+        "select id from t for no key update",
+        "SELECT id FROM t FOR SHARE OF t",
+        "SELECT id FROM t\nFOR  KEY SHARE NOWAIT",
+    ):
+        assert consultas_lentas._explain(conn, cursor, sql, {}) is None, sql
+    assert ejecutadas == []
+    assert consultas_lentas._explain(conn, cursor, "SELECT * FROM medicion", {}) == "Seq Scan"
+    assert ejecutadas[1].startswith("EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM medicion")
@@ -0,0 +1,49 @@
+# tests/test_email.py
+import time
+
+import pytest
+
+from app.core.smtp_pool import LimiteTasa, PoolSMTP
+from app.schemas.email import EmailSchema
+from app.services.email import email_service
+from benchmarks.email import FLUJOS, correr
+
+
+async def test_send_email_llega_al_sumidero(smtp_sink):
+    antes, _ = smtp_sink.contadores()
+    r = await email_service.send_email(EmailSchema(to=["a@test.cl"], subject="Hola", body="cuerpo"))
+    assert r["success"], r["message"]
+    mensajes, _ = smtp_sink.contadores()
+    assert mensajes == antes + 1
+    _, destinatarios, contenido = smtp_sink.ultimos[-1]
+    assert destinatarios == ["a@test.cl"]
+    assert b"Subject: Hola" in contenido
+
+
+async def test_pool_reutiliza_sesiones(smtp_sink):
+    _, conexiones0 = smtp_sink.contadores()
+    datos = EmailSchema(to=["a@test.cl"], subject="x", body="y")
+    async with PoolSMTP(conexiones=1, por_conexion=10, por_segundo=0) as pool:
+        for _ in range(30):
+            await pool.enviar(email_service.construir_mensaje(datos))
+    _, conexiones1 = smtp_sink.contadores()
+    assert conexiones1 - conexiones0 == 3  # una sesión, reabierta cada 10 mensajes
+
+
+async def test_limite_tasa_espacia_envios():
+    limite = LimiteTasa(100)
+    t0 = time.perf_counter()
+    for _ in range(11):
+        await limite.esperar()
+    assert time.perf_counter() - t0 >= 0.09
+
+
+@pytest.mark.parametrize("flujo", sorted(FLUJOS))
+async def test_benchmark_flujo(smtp_sink, flujo):
+    r = await correr(smtp_sink, flujo, mensajes=20, concurrencia=5, conexiones_pool=2)
+    assert r.errores == 0
+    assert r.recibidos == 20
+    if flujo.endswith("-pool"):
+        assert r.conexiones <= 2
+    else:
+        assert r.conexiones == 20
@@ -0,0 +1,153 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.core import idempotencia
+from app.core.idempotencia import COMPLETADA, EN_PROCESO, IdempotenciaMiddleware
+
+
+class _Tabla:
+    """La tabla idempotencia en memoria, con las mismas reglas que el SQL"""
+
+    def __init__(self):
+        self.filas = {}
+
+    def reservar(self, sujeto, clave, huella, token):
+        previa = self.filas.get((sujeto, clave))
+        if previa and not (previa.estado == EN_PROCESO and previa.latido_en < time.monotonic() - 60):
+            return previa
+        self.filas[(sujeto, clave)] = SimpleNamespace(huella=huella, estado=EN_PROCESO, token=token,
+                                                      latido_en=time.monotonic(), status_code=None,
+                                                      content_type=None, cuerpo=None)
+        return None
+
+    def _mia(self, sujeto, clave, token):
+        fila = self.filas.get((sujeto, clave))
+        return fila if fila and fila.estado == EN_PROCESO and fila.token == token else None
+
+    def renovar(self, sujeto, clave, token):
+        return self._mia(sujeto, clave, token) is not None
+
+    def completar(self, sujeto, clave, token, status_code, content_type, cuerpo):
+        fila = self._mia(sujeto, clave, token)
+        if fila:
+            fila.estado, fila.token = COMPLETADA, None
+            fila.status_code, fila.content_type, fila.cuerpo = status_code, content_type, cuerpo
+        return fila is not None
+
+    def liberar(self, sujeto, clave, token):
+        if self._mia(sujeto, clave, token):
+            del self.filas[(sujeto, clave)]
+
+
+@pytest.fixture
+def api(monkeypatch):
+    tabla = _Tabla()
+    for nombre in ("reservar", "renovar", "completar", "liberar"):
+        monkeypatch.setattr(idempotencia, nombre, getattr(tabla, nombre))
+    monkeypatch.setattr(idempotencia, "limpiar_expiradas", lambda: 0)
+
+    llamadas = []
+    app = FastAPI()
+    app.add_middleware(IdempotenciaMiddleware)
+
+    @app.post("/cosas")
+    async def crear(payload: dict):
+        llamadas.append(payload)
+        return JSONResponse({"n": len(llamadas)}, status_code=201)
+
+    @app.post("/lento")
+    async def lento(payload: dict):
+        await asyncio.sleep(0.1)
+        llamadas.append(payload)
+        return {"ok": True}
+
+    @app.post("/falla")
+    async def falla(payload: dict):
+        llamadas.append(payload)
+        return JSONResponse({"detail": "boom"}, status_code=503)
+
+    return TestClient(app), tabla, llamadas
+
+
+def test_reintento_recibe_la_respuesta_guardada(api):
+    client, _, llamadas = api
+    a = client.post("/cosas", json={"x": 1}, headers={"Idempotency-Key": "k1"})
+    b = client.post("/cosas", json={"x": 1}, headers={"Idempotency-Key": "k1"})
+    assert (a.status_code, a.json()) == (b.status_code, b.json()) == (201, {"n": 1})
+    assert b.headers["idempotent-replayed"] == "true" and len(llamadas) == 1
+
+
+def test_misma_clave_con_otro_cuerpo_es_422(api):
+    client, _, llamadas = api
+    client.post("/cosas", json={"x": 1}, headers={"Idempotency-Key": "k1"})
+    r = client.post("/cosas", json={"x": 2}, headers={"Idempotency-Key": "k1"})
+    assert r.status_code == 422 and len(llamadas) == 1
+
+
+def test_clave_en_proceso_es_409_aunque_pase_el_tiempo(api):
+    client, tabla, llamadas = api
+    client.post("/cosas", json={"x": 1}, headers={"Idempotency-Key": "k1"})
+    fila = tabla.filas[("", "k1")]
+    # el original sigue corriendo (su latido es reciente), aunque haya partido hace rato
+    fila.estado, fila.token, fila.latido_en = EN_PROCESO, "otro-request", time.monotonic()
+    r = client.post("/cosas", json={"x": 1}, headers={"Idempotency-Key": "k1"})
+    assert r.status_code == 409 and r.headers["retry-after"] == "1" and len(llamadas) == 1
+
+
+def test_clave_sin_latido_se_retoma_y_el_dueno_anterior_no_la_pisa(api):
+    client, tabla, llamadas = api
+    tabla.reservar("", "k1", "otra-huella", "muerto")
+    tabla.filas[("", "k1")].latido_en = time.monotonic() - 120
+    r = client.post("/cosas", json={"x": 1}, headers={"Idempotency-Key": "k1"})
+    assert r.status_code == 201 and len(llamadas) == 1
+    assert not tabla.completar("", "k1", "muerto", 500, None, b"")
+    assert tabla.filas[("", "k1")].status_code == 201
+
+
+def test_el_request_en_curso_renueva_su_latido(api, monkeypatch):
+    client, tabla, _ = api
+    renovadas = []
+    monkeypatch.setattr(idempotencia.settings, "IDEMPOTENCIA_PROCESO_SEGUNDOS", 0.06)
+    monkeypatch.setattr(idempotencia, "renovar", lambda *a: renovadas.append(a) or tabla.renovar(*a))
+    assert client.post("/lento", json={}, headers={"Idempotency-Key": "k1"}).status_code == 200
+    assert renovadas and tabla.filas[("", "k1")].estado == COMPLETADA
+
+
+def test_5xx_libera_la_clave(api):
+    client, tabla, llamadas = api
+    assert client.post("/falla", json={"x": 1}, headers={"Idempotency-Key": "k1"}).status_code == 503
+    assert tabla.filas == {}
+    assert client.post("/falla", json={"x": 1}, headers={"Idempotency-Key": "k1"}).status_code == 503
+    assert len(llamadas) == 2
+
+
+def test_la_clave_es_por_sujeto(api):
+    client, _, llamadas = api
+    a = client.post("/cosas", json={"x": 1}, headers={"Idempotency-Key": "k1", "Authorization": "Bearer a"})
+    b = client.post("/cosas", json={"x": 2}, headers={"Idempotency-Key": "k1", "Authorization": "Bearer b"})
+    assert (a.status_code, b.status_code) == (201, 201) and len(llamadas) == 2
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_sql_retoma_solo_por_latido_y_por_sujeto():
+    sql = _sql(idempotencia._stmt_reservar("s", "k", "h", "t", datetime(2026, 1, 1, tzinfo=timezone.utc)))
+    assert "ON CONFLICT (sujeto, clave)" in sql
+    donde = sql.split("WHERE", 1)[1]
+    assert "idempotencia.latido_en <" in donde and "creada_en <" not in donde
+
+
+def test_sql_completar_y_liberar_exigen_el_token():
+    from app.models.idempotencia import Idempotencia
+    sql = _sql(idempotencia._mia(Idempotencia.__table__, "s", "k", "t"))
+    assert "idempotencia.sujeto = " in sql and "idempotencia.token = " in sql
@@ -0,0 +1,73 @@
+import io
+
+import pytest
+
+from app.core.security import verify_password
+from app.schemas.email import WelcomeEmail
+from app.services import importacion
+
+CABECERA = ("rut_cuidador,primer_nombre_cuidador,segundo_nombre_cuidador,primer_apellido_cuidador,"
+            "segundo_apellido_cuidador,sexo,direccion,telefono,email,contrasena,estado\n")
+FILA = "{rut},Ana,Maria,Perez,Soto,true,Calle Uno 123,912345678,{email},Clave.2025,true\n"
+
+
+def _leer_validar(texto: str):
+    tipo = importacion.TIPOS["cuidador"]
+    return importacion.validar(tipo, list(importacion.leer(tipo, io.StringIO(texto))))
+
+
+def test_valida_por_lote_con_errores_por_fila():
+    texto = (CABECERA
+             + FILA.format(rut="123456785", email="a@test.cl")
+             + FILA.format(rut="123456780", email="b@test.cl")          # DV incorrecto
+             + FILA.format(rut="111111111", email="no-es-email")        # DV ok, email malo
+             + FILA.format(rut="222222222", email="c@test.cl").replace("912345678", "12"))
+    validos, errores = _leer_validar(texto)
+    assert [linea for linea, _ in validos] == [2]
+    assert validos[0][1].rut_cuidador == "123456785"
+    por_fila = {e.fila: e for e in errores}
+    assert sorted(por_fila) == [3, 4, 5]
+    assert por_fila[3].campo == "rut_cuidador" and por_fila[3].clave == "123456780"
+    assert "verificador" in por_fila[3].mensaje
+    assert por_fila[4].campo == "email"
+    assert por_fila[5].campo == "telefono"
+
+
+def test_columnas_sobrantes_y_celdas_vacias():
+    texto = CABECERA + FILA.format(rut="123456785", email="a@test.cl").replace("\n", ",extra\n")
+    validos, errores = _leer_validar(texto)
+    assert not validos and "más columnas" in errores[0].mensaje
+
+    vacio = CABECERA + FILA.format(rut="123456785", email="a@test.cl").replace("Calle Uno 123", "")
+    validos, errores = _leer_validar(vacio)
+    assert not validos and errores[0].campo == "direccion"
+
+
+@pytest.mark.parametrize("cabecera, mensaje", [
+    ("", "vacío"),
+    (CABECERA.replace("estado", "estado,color"), "desconocidas: color"),
+    (CABECERA.replace(",contrasena", ""), "Faltan columnas: contrasena"),
+])
+def test_cabecera_invalida(cabecera, mensaje):
+    tipo = importacion.TIPOS["cuidador"]
+    with pytest.raises(ValueError, match=mensaje):
+        next(importacion.leer(tipo, io.StringIO(cabecera)))
+
+
+def test_hashear_en_procesos(monkeypatch):
+    monkeypatch.setattr(importacion.settings, "IMPORTACION_PROCESOS", 2)
+    try:
+        hashes = importacion.hashear(["Clave.2025", "Otra.2025", "Tercera.1"])
+    finally:
+        importacion.cerrar()
+    assert verify_password("Otra.2025", hashes[1])
+    assert not verify_password("Clave.2025", hashes[2])
+
+
+async def test_bienvenidas_por_pool(smtp_sink):
+    antes, _ = smtp_sink.contadores()
+    correos = [WelcomeEmail(to=f"n{i}@test.cl", patient_name="Ana Soto", rut="123456785",
+                            temporary_password="Clave.2025") for i in range(3)]
+    assert await importacion.enviar_bienvenidas(correos) == (3, 0)
+    mensajes, _ = smtp_sink.contadores()
+    assert mensajes == antes + 3
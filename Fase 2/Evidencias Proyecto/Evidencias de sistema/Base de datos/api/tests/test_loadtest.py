@@ -0,0 +1,49 @@
+# tests/test_loadtest.py
+import json
+
+import httpx
+
+from app.core.rut import rut
+from loadtest.datos import Datos, plan
+from loadtest.runner import correr, formatear
+from app.schemas.evento_gamificacion import _validate_rut_plain
+
+
+def test_rut_con_dv_valido_para_la_api():
+    for cuerpo in (11111111, 30000000, 31000123, 32000045):
+        assert _validate_rut_plain(rut(cuerpo)) == rut(cuerpo)
+
+
+def _api_falsa():
+    """Responde lo mínimo que leen los flujos; la alerta 2 ya la tomó otro médico"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        ruta, metodo = request.url.path, request.method
+        if metodo == "POST" and ruta == "/medicion":
+            return httpx.Response(201, json={"id_medicion": 7})
+        if metodo == "POST" and ruta == "/solicitud-reporte":
+            return httpx.Response(201, json={"id_reporte": 3})
+        if ruta == "/medicion/alertas":
+            return httpx.Response(200, json={"items": [{"id_medicion": 2}], "total": 1})
+        if ruta == "/medicion/2/tomar":
+            return httpx.Response(409, json={"detail": "ya tomada"})
+        if ruta.endswith("/adherencia"):
+            return httpx.Response(500, text="boom")
+        return httpx.Response(200, json={"items": []})
+    return httpx.MockTransport(handler)
+
+
+async def test_correr_mide_pasos_y_separa_tolerados_de_errores():
+    ms, ps, cs = plan(pacientes=4, medicos=2)
+    datos = Datos(medicos=ms, pacientes=ps, cuidadores=cs, id_parametro=1, id_unidad=1)
+
+    r = await correr("http://api", datos, usuarios=3, duracion=0.3, pausa=0, transport=_api_falsa())
+
+    pasos = {p.paso: p for p in r.pasos}
+    assert pasos["medicion: crear"].requests > 0 and pasos["medicion: crear"].errores == 0
+    assert pasos["alertas: tomar"].tolerados == pasos["alertas: tomar"].requests > 0
+    assert "alertas: cambiar estado" not in pasos      # tras un 409 el flujo no sigue
+    assert pasos["paciente: adherencia"].errores == pasos["paciente: adherencia"].requests > 0
+    assert r.flujos["paciente-dashboard"].get("ok", 0) == 0
+    assert any("500" in e for e in r.errores)
+    assert "p95" in formatear(r)
+    json.dumps(r.__dict__, default=lambda o: o.__dict__)
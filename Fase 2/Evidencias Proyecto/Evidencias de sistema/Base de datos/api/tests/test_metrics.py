@@ -0,0 +1,45 @@
+# tests/test_metrics.py
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core import metrics
+
+
+def _app():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with engine.begin() as c:
+        c.execute(text("create table t (id integer primary key)"))
+        c.execute(text("insert into t values (1), (2), (3)"))
+    metrics.instalar(engine)
+    registro = metrics.Registro()
+
+    app = FastAPI()
+    app.add_middleware(metrics.MetricasMiddleware, registro=registro)
+
+    @app.get("/items/{id_item}")
+    def item(id_item: int):
+        with engine.connect() as c:
+            for _ in range(id_item):  # un "N+1" de id_item consultas
+                c.execute(text("select id from t")).all()
+        return {"ok": True}
+
+    return app, registro
+
+
+def test_cuenta_sql_por_ruta_y_agrega_server_timing():
+    app, registro = _app()
+    client = TestClient(app)
+
+    r = client.get("/items/3")
+    assert r.status_code == 200
+    assert 'desc="3 sql"' in r.headers["server-timing"]
+    client.get("/items/5")
+    client.get("/no-existe")
+
+    salida = registro.exportar()
+    assert 'http_request_duration_seconds_count{method="GET",route="/items/{id_item}",status="200"} 2' in salida
+    assert 'db_statements_per_request_sum{method="GET",route="/items/{id_item}"} 8.000000' in salida
+    assert 'db_statements_per_request_bucket{method="GET",route="/items/{id_item}",le="5"} 2' in salida
+    assert 'route="sin_ruta",status="404"' in salida
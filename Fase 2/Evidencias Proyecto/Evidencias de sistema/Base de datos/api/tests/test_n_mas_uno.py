@@ -0,0 +1,74 @@
+# tests/test_n_mas_uno.py
+import pytest
+from sqlalchemy import Column, ForeignKey, Integer, String, create_engine
+from sqlalchemy.orm import DeclarativeBase, Session, relationship, selectinload
+from sqlalchemy.pool import StaticPool
+
+from app.core import n_mas_uno
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class _Paciente(_Base):
+    __tablename__ = "paciente"
+    rut = Column(String, primary_key=True)
+    mediciones = relationship("_Medicion", back_populates="paciente")
+
+
+class _Medicion(_Base):
+    __tablename__ = "medicion"
+    id = Column(Integer, primary_key=True)
+    rut = Column(String, ForeignKey("paciente.rut"))
+    paciente = relationship("_Paciente", back_populates="mediciones")
+
+
+@pytest.fixture
+def engine():
+    e = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    _Base.metadata.create_all(e)
+    with Session(e) as db:
+        for i in range(6):
+            db.add(_Paciente(rut=f"{i}-K", mediciones=[_Medicion(), _Medicion()]))
+        db.commit()
+    n_mas_uno.instalar(e)
+    return e
+
+
+def _contar_mediciones(db, eager: bool) -> int:
+    q = db.query(_Paciente)
+    if eager:
+        q = q.options(selectinload(_Paciente.mediciones))
+    return sum(len(p.mediciones) for p in q)   # sin eager: 1 SELECT por paciente
+
+
+def test_assert_max_queries_pasa_con_eager(engine, assert_max_queries):
+    with Session(engine) as db, assert_max_queries(2, engine):
+        assert _contar_mediciones(db, eager=True) == 12
+
+
+def test_contador_reporta_la_forma_repetida_y_desde_donde(engine):
+    with Session(engine) as db, n_mas_uno.ContadorConsultas(engine) as contador:
+        _contar_mediciones(db, eager=False)
+    assert len(contador) == 7
+    [(forma, veces, lugares)] = contador.repetidas()
+    assert veces == 6 and "FROM medicion" in forma
+    assert any(l.startswith("tests/test_n_mas_uno.py:") for l in lugares)   # el acceso perezoso, no SQLAlchemy
+
+
+def test_vigilar_levanta_en_modo_raise(engine):
+    with Session(engine) as db, n_mas_uno.vigilar(umbral=3, modo="raise"):
+        with pytest.raises(n_mas_uno.NMasUnoError, match="N\\+1: 3x"):
+            _contar_mediciones(db, eager=False)
+
+
+def test_vigilar_loguea_una_vez_por_forma(engine, caplog):
+    with Session(engine) as db, n_mas_uno.vigilar(umbral=3, modo="log"):
+        _contar_mediciones(db, eager=False)
+    avisos = [r for r in caplog.records if r.message.startswith("N+1:")]
+    assert len(avisos) == 1 and "desde tests/test_n_mas_uno.py:" in avisos[0].message
+
+
+def test_forma_colapsa_listas_de_in():
+    assert n_mas_uno.forma("SELECT a FROM t WHERE id IN (?, ?, ?)") == n_mas_uno.forma("SELECT a FROM t WHERE id IN (?)")
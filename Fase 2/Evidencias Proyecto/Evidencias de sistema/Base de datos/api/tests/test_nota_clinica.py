@@ -0,0 +1,46 @@
+from sqlalchemy import create_engine, literal, select
+from sqlalchemy.dialects import postgresql
+
+from app.services import nota_clinica as svc
+
+
+def test_escapar_html_deja_el_texto_inerte():
+    # replace() se comporta igual en SQLite y en Postgres
+    nota = "<script>alert('x')</script> & \"dolor\" &lt;"
+    with create_engine("sqlite://").connect() as conn:
+        escapada = conn.execute(select(svc._escapar_html(literal(nota)))).scalar_one()
+    assert escapada == ("&lt;script&gt;alert(&#x27;x&#x27;)&lt;/script&gt; &amp; "
+                        "&quot;dolor&quot; &amp;lt;")
+
+
+class _Consulta:
+    """Query sin base: guarda lo que se pidió y no devuelve filas"""
+
+    def __init__(self, capturadas, *entidades):
+        self.capturadas = capturadas
+        capturadas.append(entidades)
+
+    def __getattr__(self, nombre):
+        return lambda *a, **k: self
+
+    def count(self):
+        return 0
+
+    def all(self):
+        return []
+
+    def subquery(self):
+        return select(literal(1).label("id_nota"), literal(0.0).label("rank")).subquery()
+
+
+def test_search_resalta_sobre_la_nota_escapada():
+    capturadas = []
+
+    class _Db:
+        def query(self, *entidades):
+            return _Consulta(capturadas, *entidades)
+
+    assert svc.search(_Db(), "dolor", 0, 20) == ([], 0)
+    snippet = capturadas[-1][-1]
+    sql = str(snippet.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("ts_headline('spanish'::regconfig, replace(replace(replace(replace(replace(nota_clinica.nota")
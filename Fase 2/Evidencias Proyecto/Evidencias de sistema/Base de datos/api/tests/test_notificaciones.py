@@ -0,0 +1,49 @@
+from collections import deque
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.services import notificaciones
+from app.services.notificaciones import AgregadorAlertas, Alerta
+
+
+def _alerta(email="c@x.cl", severidad="warning"):
+    return Alerta(email=email, rut_paciente="123456785", nombre_paciente="Ana Pérez",
+                  severidad=severidad, resumen="Glucosa alta", fecha=datetime(2026, 1, 1, 8))
+
+
+def test_tick_olvida_envios_de_hace_mas_de_una_hora(monkeypatch):
+    ag = AgregadorAlertas()
+    monkeypatch.setattr(notificaciones.time, "monotonic", lambda: 10_000.0)
+    ag._envios = {"viejo@x.cl": deque([1.0, 2.0]), "nuevo@x.cl": deque([1.0, 9_990.0])}
+    ag.tomar_listos()
+    assert ag._envios == {"nuevo@x.cl": deque([9_990.0])}
+
+
+class _Query:
+    def __init__(self, filas):
+        self.filas = filas
+
+    def join(self, *a):
+        return self
+
+    def filter(self, *a):
+        return self
+
+    def __iter__(self):
+        return iter(self.filas)
+
+
+def test_sin_hilo_la_alerta_se_envia_al_tiro(monkeypatch):
+    ag = AgregadorAlertas()
+    enviados = []
+    monkeypatch.setattr(ag, "_enviar", lambda correos: enviados.extend(correos))
+    monkeypatch.setattr(notificaciones, "_alerta", lambda email, *a: email)
+    monkeypatch.setattr(notificaciones, "agregador", ag)
+    db = SimpleNamespace(query=lambda *a: _Query([("c@x.cl",)]))
+    medicion = SimpleNamespace(
+        rut_paciente="123456785", severidad_max="warning", resumen_alerta="Glucosa alta",
+        fecha_registro=datetime(2026, 1, 1, 8),
+        paciente=SimpleNamespace(primer_nombre_paciente="Ana", primer_apellido_paciente="Pérez"),
+    )
+    assert notificaciones.notificar_alerta_medicion(db, medicion) == 1
+    assert enviados == ["c@x.cl"] and not ag._grupos
@@ -0,0 +1,10 @@
+from types import SimpleNamespace
+
+from app.services import paciente as svc
+
+
+def test_batch_get_oculta_deshabilitados_como_el_get_simple(monkeypatch):
+    filas = {"1": SimpleNamespace(estado=True), "2": SimpleNamespace(estado=False)}
+    monkeypatch.setattr(svc, "buscar_por_claves", lambda db, modelo, columna, claves: [filas.get(c) for c in claves])
+    assert svc.get_many(None, ["1", "2", "3"]) == [filas["1"], None, None]
+    assert svc.get_many(None, ["1", "2", "3"], only_active=False) == [filas["1"], filas["2"], None]
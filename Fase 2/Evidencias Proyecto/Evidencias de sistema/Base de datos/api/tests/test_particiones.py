@@ -0,0 +1,43 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.jobs import particiones
+
+
+def test_meses_y_nombres():
+    assert particiones.sumar_meses(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert particiones.sumar_meses(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert particiones.nombre("medicion_detalle", date(2025, 3, 1)) == "medicion_detalle_p2025_03"
+    # el mes se toma en UTC: las 22:00 del 31 en Chile ya son del mes siguiente
+    chile = timezone(timedelta(hours=-3))
+    assert particiones.mes_de(datetime(2025, 10, 31, 22, 0, tzinfo=chile)) == date(2025, 11, 1)
+
+
+def test_ddl_mes():
+    ddl = particiones.ddl_mes("medicion", date(2025, 12, 1))
+    assert "medicion_p2025_12 PARTITION OF medicion" in ddl
+    assert "FROM ('2025-12-01 00:00:00+00') TO ('2026-01-01 00:00:00+00')" in ddl
+
+
+def test_separar_rechaza_el_mes_en_curso():
+    with pytest.raises(ValueError, match="cerrados"):
+        particiones.separar(None, datetime.now(timezone.utc).date())
+
+
+def test_separar_deja_sync_borrado_antes_del_detach(monkeypatch):
+    mes = date(2025, 3, 1)
+    monkeypatch.setattr(particiones, "listar", lambda conn: [
+        particiones.Particion(t, particiones.nombre(t, mes), "", 0, 0) for t in particiones.TABLAS
+    ])
+    ejecutadas = []
+
+    class _Conn:
+        def execute(self, stmt, params=None):
+            ejecutadas.append(str(stmt))
+            return type("R", (), {"scalars": lambda self: []})()
+
+    assert particiones.separar(_Conn(), mes) == ["medicion_detalle_p2025_03", "medicion_p2025_03"]
+    assert ejecutadas[0].startswith("INSERT INTO sync_borrado")
+    assert "FROM medicion_p2025_03" in ejecutadas[0]
+    assert any("DETACH PARTITION medicion_p2025_03" in s for s in ejecutadas[1:])
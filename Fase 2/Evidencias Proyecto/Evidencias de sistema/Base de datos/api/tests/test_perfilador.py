@@ -0,0 +1,40 @@
+# tests/test_perfilador.py
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.core.perfilador import PerfiladorMiddleware, RegistroPerfiles
+
+
+def _lento():
+    fin = time.perf_counter() + 0.15
+    while time.perf_counter() < fin:
+        pass
+
+
+def test_perfila_endpoint_sync_con_header(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secreto")
+    registro = RegistroPerfiles()
+    app = FastAPI()
+    app.add_middleware(PerfiladorMiddleware, registro=registro)
+
+    @app.get("/cuidador/{rut}/alertas")
+    def alertas(rut: str):
+        _lento()
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert "x-perfil-id" not in client.get("/cuidador/1-9/alertas").headers   # sin header no se perfila
+    assert "x-perfil-id" not in client.get("/cuidador/1-9/alertas", headers={"X-Perfilar": "1"}).headers
+
+    r = client.get("/cuidador/1-9/alertas", headers={"X-Perfilar": "1", "X-Admin-Token": "secreto"})
+    perfil = registro.get(r.headers["x-perfil-id"])
+    assert perfil.ruta == "/cuidador/{rut}/alertas" and perfil.status == 200
+    assert "test_perfilador:_lento" in perfil.colapsado()
+
+    doc = perfil.speedscope()
+    [p] = doc["profiles"]
+    assert len(p["samples"]) == len(p["weights"]) > 0
+    assert all(i < len(doc["shared"]["frames"]) for s in p["samples"] for i in s)
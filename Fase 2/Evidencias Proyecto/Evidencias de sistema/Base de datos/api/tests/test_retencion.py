@@ -0,0 +1,40 @@
+import pytest
+
+from app.db import Base
+from app.jobs import retencion
+
+
+@pytest.mark.parametrize("nombre", sorted(retencion.POLITICAS))
+def test_politicas_apuntan_a_columnas_reales(nombre):
+    p = retencion.POLITICAS[nombre]
+    columnas = Base.metadata.tables[p.tabla].c
+    assert p.clave in columnas and p.fecha in columnas
+    assert columnas[p.clave].primary_key
+
+
+def test_lote_a_tabla_no_espera_locks_y_archiva_todas_las_columnas():
+    sql = retencion.sql_lote(retencion.POLITICAS["eventos"], "tabla")
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert 'INSERT INTO archivo.evento_gamificacion ("id_evento", "rut_paciente"' in sql
+    assert '"version_sync") SELECT' in sql
+    assert "coalesce(sum(puntos), 0)" in sql
+
+
+def test_lote_a_parquet_solo_borra_lo_exportado():
+    sql = retencion.sql_lote(retencion.POLITICAS["descargas"], "parquet")
+    assert "id_descarga = ANY(:claves)" in sql
+    assert "archivo." not in sql
+
+
+def test_ejecutar_valida_destino_y_politicas():
+    with pytest.raises(ValueError, match="Destino"):
+        retencion.ejecutar(destino="s3")
+    with pytest.raises(ValueError, match="desconocidas: alertas"):
+        retencion.ejecutar(["eventos", "alertas"], destino="tabla")
+
+
+def test_lote_de_tabla_sincronizada_deja_el_borrado_para_sync():
+    sql = retencion.sql_lote(retencion.POLITICAS["eventos"], "parquet")
+    assert "INSERT INTO sync_borrado (tabla, clave, rut_paciente)" in sql
+    assert "CAST(id_evento AS text), rut_paciente FROM movidas" in sql
+    assert "sync_borrado" not in retencion.sql_lote(retencion.POLITICAS["descargas"], "tabla")
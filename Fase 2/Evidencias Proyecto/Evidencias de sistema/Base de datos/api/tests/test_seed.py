@@ -0,0 +1,74 @@
+import io
+import time
+from collections import Counter
+
+from app.schemas.evento_gamificacion import _validate_rut_plain
+from app.tools import seed
+
+CFG = seed.Config(pacientes=300, cesfams=5, mediciones=20, eventos=10)
+IDS_PARAMETRO = {p.codigo: i for i, p in enumerate(seed.PARAMETROS, 1)}
+IDS_UNIDAD = {u: i for i, u in enumerate(seed.UNIDADES, 1)}
+
+
+def _generar():
+    ahora = time.time()
+    detalles = io.StringIO()
+    mediciones, siguiente = [], 1
+    for i in range(CFG.pacientes):
+        p = seed.paciente(CFG, i)
+        mediciones += [l.split("\t") for l in seed.filas_medicion(
+            CFG, p, siguiente, 100, IDS_PARAMETRO, IDS_UNIDAD, ahora, detalles)]
+        siguiente += p.mediciones
+    return mediciones, [l.split("\t") for l in detalles.getvalue().splitlines()]
+
+
+def test_ruts_validos_y_disjuntos():
+    ruts = {CFG.rut_paciente(i) for i in range(50)} | {CFG.rut_cuidador(j) for j in range(50)}
+    ruts |= {CFG.rut_medico(c, k) for c in range(CFG.cesfams) for k in range(CFG.medicos_por_cesfam)}
+    assert len(ruts) == 100 + CFG.cesfams * CFG.medicos_por_cesfam
+    for r in ruts:
+        assert _validate_rut_plain(r) == r
+
+
+def test_determinista_por_paciente():
+    a, b = seed.paciente(CFG, 7), seed.paciente(CFG, 7)
+    assert (a.cesfam, a.mediciones, a.cuidadores) == (b.cesfam, b.mediciones, b.cuidadores)
+    assert seed.fila_paciente(CFG, a, 1, 1, "h", 0.0) == seed.fila_paciente(CFG, b, 1, 1, "h", 0.0)
+
+
+def test_mediciones_consistentes():
+    mediciones, detalles = _generar()
+    assert all(len(m) == len(seed.COLUMNAS["medicion"]) for m in mediciones)
+    assert all(len(d) == len(seed.COLUMNAS["medicion_detalle"]) for d in detalles)
+
+    ids = [int(m[0]) for m in mediciones]
+    assert ids == list(range(1, len(ids) + 1))
+    ids_detalle = [int(d[0]) for d in detalles]
+    assert len(set(ids_detalle)) == len(ids_detalle)
+    assert {int(d[1]) for d in detalles} == set(ids)
+    # el detalle lleva la fecha de su medición (misma partición mensual)
+    fechas = {m[0]: m[2] for m in mediciones}
+    assert all(d[2] == fechas[d[1]] for d in detalles)
+
+    # severidad de la medición = peor severidad de sus detalles
+    orden = {"normal": 0, "warning": 1, "critical": 2}
+    peor = Counter()
+    for d in detalles:
+        peor[d[1]] = max(peor[d[1]], orden[d[8]])
+    for m in mediciones:
+        assert orden[m[8]] == peor[m[0]]
+        assert (m[7] == "t") == (m[8] != "normal")
+        if m[10] == "nueva":
+            assert m[11] == seed.NULO
+        else:
+            assert m[7] == "t" and m[11] != seed.NULO
+
+    alertas = sum(m[7] == "t" for m in mediciones) / len(mediciones)
+    assert 0.1 < alertas < 0.45
+
+
+def test_lector_copy():
+    lector = seed._Lector(["a\tb", "c"])
+    assert lector.read(3) + lector.read(100) == "a\tb\nc\n"
+    assert lector.read(10) == ""
+    assert lector.filas == 2
@@ -0,0 +1,147 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.schemas.solicitud_reporte import SolicitudReporteUpdate
+from app.services import reporte_generador
+from app.services import solicitud_reporte as svc
+
+
+def _t(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_huella_usa_el_rango_exacto():
+    a = reporte_generador.huella("patient", "csv", _t(2026, 1, 1, 8), _t(2026, 1, 2, 10, 50))
+    b = reporte_generador.huella("patient", "csv", _t(2026, 1, 1, 8), _t(2026, 1, 2, 11))
+    assert a != b == reporte_generador.huella("patient", "csv", _t(2026, 1, 1, 8), _t(2026, 1, 2, 11))
+
+
+class _Consulta:
+    """Query sin base: guarda el SELECT que se habría ejecutado"""
+    def __init__(self, q, capturada):
+        self.q, self.capturada = q, capturada
+
+    def __getattr__(self, nombre):
+        return lambda *a, **k: _Consulta(getattr(self.q, nombre)(*a, **k), self.capturada)
+
+    def first(self):
+        self.capturada.append(self.q.statement)
+        return None
+
+
+def test_cache_solo_reusa_artefactos_leidos_con_el_rango_cerrado():
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.orm import Query
+
+    capturada = []
+    db = SimpleNamespace(query=lambda *cols: _Consulta(Query(cols), capturada))
+    assert svc.artefacto_en_cache(db, "x" * 64, _t(2026, 1, 2, 10, 50)) is None
+    sql = str(capturada[0].compile(dialect=postgresql.dialect()))
+    assert "solicitud_reporte.iniciado_en >= %(iniciado_en_1)s" in sql
+
+
+def test_preparar_no_cambia_el_rango_pedido(monkeypatch):
+    visto = {}
+    previo = SimpleNamespace(archivo_sha256="ab" * 32, archivo_bytes=8, formato="csv",
+                             iniciado_en=_t(2026, 1, 2, 11, 1))
+    monkeypatch.setattr(svc, "artefacto_en_cache", lambda db, huella, hasta: visto.setdefault("hasta", hasta) and previo)
+    obj = SimpleNamespace(tipo="patient", formato="csv", rango_desde=_t(2026, 1, 1, 8, 7),
+                          rango_hasta=_t(2026, 1, 2, 10, 50, 3))
+    svc._preparar(None, obj)
+    assert (obj.rango_desde, obj.rango_hasta) == (_t(2026, 1, 1, 8, 7), _t(2026, 1, 2, 10, 50, 3))
+    assert visto["hasta"] == obj.rango_hasta
+    assert obj.estado == svc.LISTO and obj.iniciado_en == previo.iniciado_en
+
+
+def test_runner_solo_recupera_tomas_sin_latido():
+    from sqlalchemy.dialects import postgresql
+    from app.jobs.reportes import RunnerReportes
+
+    stmt = RunnerReportes._stmt_recuperar(_t(2026, 1, 2, 12))
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    donde = sql.split("WHERE", 1)[1]
+    assert "latido_en <" in donde and "latido_en IS NULL AND solicitud_reporte.iniciado_en <" in donde
+
+
+class _Db:
+    def __init__(self, obj):
+        self.obj = obj
+
+    def get(self, modelo, id_):
+        return self.obj
+
+    def commit(self):
+        pass
+
+    def refresh(self, obj):
+        pass
+
+
+@pytest.mark.parametrize("estado", [svc.LISTO, svc.PROCESANDO, svc.ERROR])
+def test_patch_no_fija_estados_del_runner(estado):
+    obj = SimpleNamespace(estado=svc.PENDIENTE, archivo_sha256=None)
+    with pytest.raises(ValueError, match="no se puede fijar por PATCH"):
+        svc.update(_Db(obj), 1, SolicitudReporteUpdate(estado=estado))
+    assert obj.estado == svc.PENDIENTE
+
+
+def test_patch_pendiente_vuelve_a_encolar(monkeypatch):
+    monkeypatch.setattr(svc, "artefacto_en_cache", lambda db, huella, hasta: None)
+    obj = SimpleNamespace(
+        estado=svc.ERROR, error="boom", archivo_sha256=None, archivo_bytes=None,
+        tipo="patient", formato="csv", rango_desde=_t(2026, 1, 1), rango_hasta=_t(2026, 1, 2),
+        iniciado_en=None, terminado_en=None,
+    )
+    svc.update(_Db(obj), 1, SolicitudReporteUpdate(estado=svc.PENDIENTE))
+    assert obj.estado == svc.PENDIENTE and obj.error is None and obj.huella
+
+
+@pytest.fixture
+def archivo(tmp_path, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.db import get_db
+    from app.routes import descarga_reporte, solicitud_reporte
+
+    sha = "ab" * 32
+    monkeypatch.setattr(reporte_generador.settings, "REPORTES_DIR", str(tmp_path))
+    ruta = reporte_generador.ruta_artefacto(sha, "csv")
+    ruta.parent.mkdir(parents=True)
+    ruta.write_bytes(b"a,b\n1,2\n")
+    obj = SimpleNamespace(id_reporte=7, rut_medico="123456785", estado=svc.LISTO, archivo_sha256=sha,
+                          archivo_bytes=8, formato="csv", tipo="patient")
+    monkeypatch.setattr(svc, "get", lambda db, id_reporte: obj if id_reporte == 7 else None)
+    registradas = []
+    monkeypatch.setattr(solicitud_reporte.buffer_descargas, "registrar",
+                        lambda id_reporte, rut: registradas.append((id_reporte, rut)))
+
+    app = FastAPI()
+    app.include_router(solicitud_reporte.router)
+    app.include_router(descarga_reporte.router)
+    app.dependency_overrides[get_db] = lambda: None
+    return TestClient(app), obj, registradas
+
+
+def test_archivo_registra_solo_descargas_completas(archivo):
+    client, _, registradas = archivo
+    r = client.get("/solicitud-reporte/7/archivo", headers={"Range": "bytes=0-3"})
+    assert r.status_code == 206 and registradas == []
+    r = client.get("/solicitud-reporte/7/archivo")
+    assert r.status_code == 200 and r.content == b"a,b\n1,2\n"
+    assert registradas == [(7, "123456785")]
+
+
+def test_ruta_antigua_redirige_al_archivo(archivo):
+    client, _, registradas = archivo
+    r = client.get("/descarga-reporte/7/file", follow_redirects=False)
+    assert r.status_code == 308 and r.headers["location"].endswith("/solicitud-reporte/7/archivo")
+    assert client.get("/descarga-reporte/7/file").status_code == 200
+    assert registradas == [(7, "123456785")]
+
+
+def test_archivo_sin_artefacto_es_404(archivo):
+    client, obj, _ = archivo
+    obj.archivo_sha256 = None
+    assert client.get("/solicitud-reporte/7/archivo").status_code == 404
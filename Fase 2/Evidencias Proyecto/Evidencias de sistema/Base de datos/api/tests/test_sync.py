@@ -0,0 +1,69 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.models.sync import SyncBorrado, SyncMarca
+from app.services import sync as svc
+
+
+def _borrado(version):
+    return SimpleNamespace(tabla="nota_clinica", clave=str(version), rut_paciente="123456785",
+                           borrado_en=datetime.now(timezone.utc), version_sync=version)
+
+
+def test_token_no_pasa_una_version_aun_en_vuelo(monkeypatch):
+    # A toma la versión 100 y sigue abierta; B toma la 101 y confirma primero
+    confirmadas = {101: _borrado(101)}
+    visible = {"v": 99}   # la marca con xid posterior a A no es visible mientras A siga en vuelo
+
+    def pendientes(db, modelo, ruts, desde, hasta, limit):
+        if modelo is not SyncBorrado:
+            return []
+        return [confirmadas[v] for v in sorted(confirmadas) if desde < v <= hasta]
+
+    monkeypatch.setattr(svc, "registrar_marca", lambda forzar=False: None)
+    monkeypatch.setattr(svc, "version_visible", lambda db: visible["v"])
+    monkeypatch.setattr(svc, "_pendientes", pendientes)
+
+    r = svc.cambios_desde(None, ["123456785"], "90")
+    assert r["token"] == "99" and r["borrados"] == []
+
+    # A confirma: ahora la marca es visible y entran las dos
+    confirmadas[100] = _borrado(100)
+    visible["v"] = 101
+    r = svc.cambios_desde(None, ["123456785"], r["token"])
+    assert r["token"] == "101"
+    assert [b["clave"] for b in r["borrados"]] == ["100", "101"]
+
+
+def test_sin_marcas_visibles_el_token_no_avanza(monkeypatch):
+    monkeypatch.setattr(svc, "registrar_marca", lambda forzar=False: None)
+    monkeypatch.setattr(svc, "version_visible", lambda db: None)
+    monkeypatch.setattr(svc, "_pendientes", lambda *a: [])
+    assert svc.cambios_desde(None, ["123456785"], "42")["token"] == "42"
+
+
+def test_marca_en_postgres_con_confirmaciones_desordenadas():
+    from app.db import engine
+    from sqlalchemy.orm import Session
+    try:
+        with engine.connect() as conn:
+            conn.execute(select(func.count()).select_from(SyncMarca)).scalar()
+    except SQLAlchemyError:
+        pytest.skip("requiere Postgres con las migraciones aplicadas")
+
+    with engine.connect() as a:
+        version_a = a.execute(select(func.sync_version_next())).scalar_one()   # A queda abierta
+        with engine.begin() as b:
+            version_b = b.execute(select(func.sync_version_next())).scalar_one()
+        assert version_b > version_a
+        svc.registrar_marca(forzar=True)
+        with Session(engine) as db:
+            assert (svc.version_visible(db) or 0) < version_a
+        a.commit()
+    svc.registrar_marca(forzar=True)
+    with Session(engine) as db:
+        assert svc.version_visible(db) >= version_b
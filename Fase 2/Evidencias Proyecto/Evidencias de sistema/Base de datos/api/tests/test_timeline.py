@@ -0,0 +1,14 @@
+import pytest
+
+from app.services import timeline
+
+
+@pytest.mark.parametrize("tipos, mensaje", [
+    (["foo"], "tipos inválidos: foo"),
+    (["medicion", "foo", "bar"], "tipos inválidos: bar, foo"),
+    ([], r"tipos inválidos: \(ninguno\)"),
+])
+def test_tipos_invalidos_son_value_error(tipos, mensaje):
+    # antes de tocar la base: db=None no se alcanza a usar
+    with pytest.raises(ValueError, match=mensaje):
+        timeline.get_timeline(None, "123456785", tipos=tipos)